@@ -0,0 +1,331 @@
+"""
+EPC Engine Benchmarks
+
+Times the EPC encoder, decoder and database file writer on synthetic jobs
+and saves the results as JSON so runs can be compared between releases.
+Runs headless - only numpy/pandas are needed, not Qt.
+
+Every case runs in a fresh child process so its peak RSS is its own.
+
+Usage:
+    python benchmarks/bench_epc.py
+    python benchmarks/bench_epc.py --sizes 1000,10000 --qty-per-db 1000,5000
+    python benchmarks/bench_epc.py --compare benchmarks/results/epc-20250101-120000.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import concurrent.futures
+import multiprocessing
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+
+from src.utils.epc_conversion import (
+    generate_epc, generate_epc_array, generate_epc_batch_optimized, _epc_prefix_value,
+    reverse_epc_to_upc_and_serial, decode_epc_array, generate_epc_database_files_with_progress
+)
+
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_QTY_PER_DB = [1000, 10000, 50000]
+DEFAULT_UPC = "012345678905"
+DEFAULT_START_SERIAL = 1000
+
+# Per-record Python loops (generate_epc / reverse_epc_to_upc_and_serial)
+# above this size are skipped unless --scalar-limit is raised
+DEFAULT_SCALAR_LIMIT = 100000
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return int(counters.PeakWorkingSetSize)
+        return None
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _folder_bytes(folder):
+    return sum(entry.stat().st_size for entry in os.scandir(folder) if entry.is_file())
+
+
+# --- Cases ------------------------------------------------------------------
+# Each case takes the case parameters and returns (records, bytes_written)
+
+def case_encode_scalar(size, upc, **_):
+    for serial in range(DEFAULT_START_SERIAL, DEFAULT_START_SERIAL + size):
+        generate_epc(upc, serial)
+    return size, 0
+
+
+def case_encode_array(size, upc, **_):
+    generate_epc_array(upc, DEFAULT_START_SERIAL, size)
+    return size, 0
+
+
+def case_encode_batch_optimized(size, upc, **_):
+    prefix = format(_epc_prefix_value(upc), "058b")
+    serials = np.arange(DEFAULT_START_SERIAL, DEFAULT_START_SERIAL + size, dtype=np.int64)
+    generate_epc_batch_optimized(prefix, serials)
+    return size, 0
+
+
+def case_decode_scalar(size, upc, epcs=None, **_):
+    for epc in epcs:
+        reverse_epc_to_upc_and_serial(epc)
+    return size, 0
+
+
+def case_decode_array(size, upc, epcs=None, **_):
+    decode_epc_array(epcs)
+    return size, 0
+
+
+def case_generate_files(size, upc, qty_per_db=None, workers=None, **_):
+    folder = tempfile.mkdtemp(prefix="bench_epc_")
+    try:
+        files = generate_epc_database_files_with_progress(
+            upc, DEFAULT_START_SERIAL, size, qty_per_db, folder, max_workers=workers
+        )
+        if len(files) != -(-size // qty_per_db):
+            raise RuntimeError(f"Expected {-(-size // qty_per_db)} files, got {len(files)}")
+        return size, _folder_bytes(folder)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+CASES = {
+    "encode_scalar": case_encode_scalar,
+    "encode_array": case_encode_array,
+    "encode_batch_optimized": case_encode_batch_optimized,
+    "decode_scalar": case_decode_scalar,
+    "decode_array": case_decode_array,
+    "generate_files": case_generate_files,
+}
+SCALAR_CASES = {"encode_scalar", "decode_scalar"}
+
+
+def run_case(name, params, repeat):
+    """
+    Run one case (in the child process) and measure it.
+
+    Returns:
+        dict: Result row for the JSON report
+    """
+    case = CASES[name]
+    kwargs = dict(params)
+    if name.startswith("decode"):
+        # Input EPCs are prepared outside the timed section
+        kwargs["epcs"] = generate_epc_array(params["upc"], DEFAULT_START_SERIAL, params["size"])
+        if name == "decode_scalar":
+            kwargs["epcs"] = kwargs["epcs"].tolist()
+
+    baseline_rss = peak_rss_bytes()
+    timings = []
+    records = bytes_written = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        records, bytes_written = case(**kwargs)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    return {
+        "case": name,
+        "size": params["size"],
+        "qty_per_db": params.get("qty_per_db"),
+        "workers": params.get("workers"),
+        "seconds": best,
+        "seconds_all": timings,
+        "records_per_sec": records / best if best > 0 else None,
+        "bytes_written": bytes_written,
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def build_plan(sizes, qty_per_db_values, cases, scalar_limit, workers, upc):
+    """List the (case, params) combinations to run."""
+    plan = []
+    for size in sizes:
+        for name in cases:
+            if name in SCALAR_CASES and size > scalar_limit:
+                continue
+            if name == "generate_files":
+                for qty_per_db in qty_per_db_values:
+                    if qty_per_db > size and qty_per_db != min(qty_per_db_values):
+                        continue  # Same single file as the smallest chunk size
+                    plan.append((name, {"size": size, "upc": upc, "qty_per_db": qty_per_db,
+                                        "workers": workers}))
+            else:
+                plan.append((name, {"size": size, "upc": upc}))
+    return plan
+
+
+def environment_info():
+    """Describe the machine and code version the results were taken on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _result_key(result):
+    return (result["case"], result["size"], result.get("qty_per_db"), result.get("workers"))
+
+
+def print_results(results, previous=None):
+    """Print a table of results, with the speed change against a previous run if given."""
+    previous_by_key = {_result_key(r): r for r in (previous or [])}
+    header = f"{'case':<24}{'size':>10}{'qty/db':>8}{'seconds':>10}{'records/s':>14}{'peak RSS':>11}{'written':>11}"
+    if previous:
+        header += f"{'vs prev':>9}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (
+            f"{result['case']:<24}{result['size']:>10,}{result['qty_per_db'] or '':>8}"
+            f"{result['seconds']:>10.3f}{result['records_per_sec'] or 0:>14,.0f}"
+            f"{_format_bytes(result['peak_rss_bytes']):>11}{_format_bytes(result['bytes_written']):>11}"
+        )
+        old = previous_by_key.get(_result_key(result))
+        if previous:
+            line += f"{old['seconds'] / result['seconds']:>8.2f}x" if old and result["seconds"] else f"{'-':>9}"
+        print(line)
+
+
+def _parse_int_list(text):
+    return [int(value.replace("_", "")) for value in text.split(",") if value.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the EPC encoder, decoder and file writer.")
+    parser.add_argument("--sizes", type=_parse_int_list, default=DEFAULT_SIZES,
+                        help="Comma separated serial counts (default: 1000,10000,100000,1000000)")
+    parser.add_argument("--qty-per-db", type=_parse_int_list, default=DEFAULT_QTY_PER_DB,
+                        help="Comma separated records per DB file for generate_files")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help=f"Comma separated cases to run ({', '.join(CASES)})")
+    parser.add_argument("--scalar-limit", type=int, default=DEFAULT_SCALAR_LIMIT,
+                        help="Largest size for the per-record loop cases")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="max_workers for generate_files (default: sequential, 0 = all cores)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest is reported")
+    parser.add_argument("--upc", default=DEFAULT_UPC)
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/epc-<time>.json)")
+    parser.add_argument("--compare", help="Previous JSON result to compare against")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run every case in this process (faster, but peak RSS is cumulative)")
+    args = parser.parse_args(argv)
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"Unknown case(s): {', '.join(unknown)}")
+
+    plan = build_plan(args.sizes, args.qty_per_db, cases, args.scalar_limit, args.workers, args.upc)
+    print(f"Running {len(plan)} benchmark cases...")
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for index, (name, params) in enumerate(plan, 1):
+        label = f"[{index}/{len(plan)}] {name} size={params['size']:,}"
+        if params.get("qty_per_db"):
+            label += f" qty_per_db={params['qty_per_db']:,}"
+        print(label, flush=True)
+        if args.in_process:
+            results.append(run_case(name, params, args.repeat))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                results.append(executor.submit(run_case, name, params, args.repeat).result())
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f).get("results", [])
+
+    print()
+    print_results(results, previous)
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"epc-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    report = {
+        "environment": environment_info(),
+        "settings": {
+            "sizes": args.sizes, "qty_per_db": args.qty_per_db, "cases": cases,
+            "scalar_limit": args.scalar_limit, "workers": args.workers,
+            "repeat": args.repeat, "upc": args.upc, "in_process": args.in_process,
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Job Index Benchmark
+
+Builds a scratch archive of synthetic job folders (a job_data.json each,
+like the real archive) and times the job index:
+
+  - cold scan: first scan into an empty index
+  - warm scan: rescan with nothing changed (stat only)
+  - list: loading every archived job from an existing index, what the
+    archive page does on startup before its background scan
+  - search: a two-word global search
+  - incremental scan after touching a few jobs
+
+For comparison it also times the old way of listing, parsing every
+job_data.json. A second scratch tree with the active layout
+(customer/label size/job folder, each job with its data, print and roll
+tracker folders) compares directory listings of a full os.walk with the
+pruned scanner. Runs headless - Qt is not needed.
+
+Usage:
+    python benchmarks/bench_job_index.py
+    python benchmarks/bench_job_index.py --jobs 20000 --keep
+    python benchmarks/bench_job_index.py --active-jobs 2000 --files-per-job 50
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.utils.job_index import JobIndex, ARCHIVE, JOB_DATA_FILE_NAME, find_job_files
+
+CUSTOMERS = ["Acme Apparel", "Blue Ridge", "Cobalt Retail", "Delta Goods", "Evergreen", "Fjord Outdoor"]
+LABEL_SIZES = ["1.5x1.5", "2x1", "2x2", "4x2"]
+
+
+def build_archive(root, jobs):
+    """Write jobs job folders below root; returns the job_data.json paths."""
+    paths = []
+    for number in range(jobs):
+        customer = CUSTOMERS[number % len(CUSTOMERS)]
+        label_size = LABEL_SIZES[number % len(LABEL_SIZES)]
+        folder = os.path.join(root, f"{customer} {label_size} {number:06d}")
+        os.makedirs(os.path.join(folder, "print"), exist_ok=True)
+        job_data = {
+            "Customer": customer, "Part#": f"P-{number:06d}", "Ticket#": f"{100000 + number}",
+            "PO#": f"PO{number // 12:05d}", "Inlay Type": "M730", "Label Size": label_size,
+            "Quantity": f"{(number % 50 + 1) * 1000:,}", "Due Date": "2025-06-01",
+            "Status": "Archived", "UPC Number": f"{400000000000 + number}",
+            "dateArchived": "2025-06-02 10:00:00",
+        }
+        path = os.path.join(folder, JOB_DATA_FILE_NAME)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(job_data, f, indent=4)
+        paths.append(path)
+    return paths
+
+
+def build_active_tree(root, jobs, files_per_job):
+    """Write an active jobs tree: customer/label size/mm.dd.yy - PO - ticket with job subfolders."""
+    for number in range(jobs):
+        customer = CUSTOMERS[number % len(CUSTOMERS)]
+        label_size = LABEL_SIZES[number % len(LABEL_SIZES)]
+        folder = os.path.join(root, customer, label_size, f"06.01.25 - PO{number:05d} - {100000 + number}")
+        data_folder = os.path.join(folder, f"{400000000000 + number}", "data")
+        for sub in (data_folder, os.path.join(folder, "print"), os.path.join(folder, "roll tracker")):
+            os.makedirs(sub, exist_ok=True)
+        for part in range(files_per_job):
+            open(os.path.join(data_folder, f"part {part + 1:03d}.xlsx"), "wb").close()
+        with open(os.path.join(folder, JOB_DATA_FILE_NAME), "w", encoding="utf-8") as f:
+            json.dump({"Customer": customer, "Label Size": label_size, "Ticket#": f"{100000 + number}"}, f)
+
+
+def walk_job_files(root):
+    """The pre-index scan: a full os.walk; returns (job files, directories listed)."""
+    found = []
+    listed = 0
+    for folder, _, files in os.walk(root):
+        listed += 1
+        if JOB_DATA_FILE_NAME in files:
+            found.append(os.path.join(folder, JOB_DATA_FILE_NAME))
+    return found, listed
+
+
+def list_by_parsing(root):
+    """The pre-index archive listing: parse every top-level job_data.json."""
+    jobs = []
+    for folder_name in os.listdir(root):
+        metadata_path = os.path.join(root, folder_name, JOB_DATA_FILE_NAME)
+        if os.path.exists(metadata_path):
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                jobs.append(json.load(f))
+    return jobs
+
+
+def timed(label, func, timings=None):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<38} {elapsed * 1000:10.1f} ms")
+    if timings is not None:
+        timings[label] = elapsed
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the SQLite job index on a synthetic archive.")
+    parser.add_argument("--jobs", type=int, default=20000, help="Archived jobs to generate")
+    parser.add_argument("--touch", type=int, default=25, help="Jobs changed before the incremental scan")
+    parser.add_argument("--active-jobs", type=int, default=1000, help="Jobs in the active layout tree")
+    parser.add_argument("--files-per-job", type=int, default=50, help="Database files in each active job")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch folder")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="job-index-bench-")
+    archive = os.path.join(scratch, "archive")
+    try:
+        paths = timed(f"build {args.jobs:,} job folders", lambda: build_archive(archive, args.jobs))
+        index_path = os.path.join(scratch, "job_index.sqlite")
+
+        timings = {}
+        timed("parse every job_data.json (old way)", lambda: list_by_parsing(archive), timings)
+
+        index = JobIndex(index_path)
+        timed("cold scan", lambda: index.scan(ARCHIVE, archive))
+        timed("warm scan (nothing changed)", lambda: index.scan(ARCHIVE, archive), timings)
+        index.close()
+        print(f"Warm scan takes {timings['warm scan (nothing changed)'] / timings['parse every job_data.json (old way)']:.2f}x "
+              f"the time of parsing every file")
+
+        # A new process opening the existing index
+        index = JobIndex(index_path)
+        jobs = timed("list archived jobs from the index", lambda: index.jobs(ARCHIVE, top_level_only=True))
+        results = timed("search 'cobalt 2x2'", lambda: index.search("cobalt 2x2", ARCHIVE))
+
+        for path in paths[:args.touch]:
+            with open(path, "r+", encoding="utf-8") as f:
+                job_data = json.load(f)
+                job_data["Status"] = "Reopened"
+                f.seek(0)
+                json.dump(job_data, f, indent=2)
+                f.truncate()
+        changed = timed(f"incremental scan ({args.touch} changed)", lambda: index.scan(ARCHIVE, archive))
+        index.close()
+
+        print(f"Listed {len(jobs):,} jobs, search matched {len(results):,}, incremental scan updated {changed}")
+
+        active = os.path.join(scratch, "active")
+        timed(f"build {args.active_jobs:,} active jobs", lambda: build_active_tree(
+            active, args.active_jobs, args.files_per_job))
+        walked, walk_listed = timed("os.walk active tree", lambda: walk_job_files(active))
+        pruned, pruned_listed = timed("pruned scan of active tree", lambda: find_job_files(active))
+        print(f"Directories listed: os.walk {walk_listed:,}, pruned {pruned_listed:,} "
+              f"({walk_listed / max(pruned_listed, 1):.1f}x fewer)")
+
+        ok = (len(jobs) == args.jobs and changed == min(args.touch, args.jobs)
+              and sorted(walked) == sorted(path for path, _ in pruned))
+        print("OK" if ok else "FAILED")
+        return 0 if ok else 1
+    finally:
+        if args.keep:
+            print(f"Kept {scratch}")
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+Job Change Journal Benchmark
+
+Times what a network client does on each periodic refresh with the change
+journal, against the job tree scan it replaces:
+
+  - append: recording job changes (under the journal lock)
+  - idle poll: read_changes() with nothing new (a single stat)
+  - poll after changes: reading the entries another workstation appended
+  - rotation: a poll after the journal was rotated asks for a rescan
+  - new journal: a reader that started before the journal existed reads it
+    from its first entry
+  - tree scan: the pruned scan of an active jobs tree, the old refresh
+
+and checks that every entry is read once and in order. Runs headless - Qt
+is not needed.
+
+Usage:
+    python benchmarks/bench_job_journal.py
+    python benchmarks/bench_job_journal.py --entries 20000 --active-jobs 2000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import src.utils.job_journal as job_journal
+from src.utils.job_journal import JobJournal
+from src.utils.job_index import find_job_files
+
+from bench_job_index import build_active_tree
+
+
+def make_job(number):
+    return {
+        "Customer": "Cobalt Retail", "Part#": f"P-{number:06d}", "Ticket#": f"{100000 + number}",
+        "PO#": f"PO{number // 12:05d}", "Inlay Type": "M730", "Label Size": "2x1",
+        "Quantity": "10,000", "Due Date": "2025-06-01", "UPC Number": f"{400000000000 + number}",
+        "job_folder_path": f"/jobs/Cobalt Retail/2x1/06.01.25 - PO{number // 12:05d} - {100000 + number}",
+    }
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<38} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time polling the job change journal.")
+    parser.add_argument("--entries", type=int, default=5000, help="Changes already in the journal")
+    parser.add_argument("--new", type=int, default=25, help="Changes appended between two polls")
+    parser.add_argument("--active-jobs", type=int, default=1000, help="Jobs in the active tree to scan")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch folder")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="job-journal-bench-")
+    try:
+        journal = JobJournal(scratch)
+        _, empty_position, _ = journal.read_changes(None)
+        timed(f"append {args.entries:,} changes", lambda: [
+            journal.append("updated", make_job(number)) for number in range(args.entries)])
+
+        first, _, first_rescan = journal.read_changes(empty_position)
+        new_journal_ok = not first_rescan and [entry["seq"] for entry in first] == list(range(1, args.entries + 1))
+
+        _, position, _ = journal.read_changes(None)
+        polls = 1000
+        idle = timed(f"{polls:,} idle polls", lambda: [journal.read_changes(position) for _ in range(polls)])
+        idle_ok = all(not entries and not rescan for entries, _, rescan in idle)
+
+        for number in range(args.new):
+            journal.append("created", make_job(args.entries + number))
+        entries, position, rescan = timed(f"poll after {args.new} changes", lambda: journal.read_changes(position))
+        seqs = [entry["seq"] for entry in entries]
+        read_ok = (not rescan and seqs == list(range(args.entries + 1, args.entries + args.new + 1))
+                   and journal.read_changes(position)[0] == [])
+
+        # Force the next append to rotate the journal
+        job_journal.MAX_JOURNAL_BYTES = 0
+        journal.append("deleted", make_job(0))
+        _, _, rotated = timed("poll after rotation", lambda: journal.read_changes(position))
+
+        active = os.path.join(scratch, "active")
+        build_active_tree(active, args.active_jobs, 0)
+        found, _ = timed(f"pruned scan of {args.active_jobs:,} active jobs", lambda: find_job_files(active))
+
+        print(f"Journal {os.path.getsize(journal.path) + os.path.getsize(journal.path + '.1'):,} bytes, "
+              f"read {len(entries)} new entries, scan found {len(found):,} jobs")
+        ok = new_journal_ok and idle_ok and read_ok and rotated and len(found) == args.active_jobs
+        print("OK" if ok else "FAILED")
+        return 0 if ok else 1
+    finally:
+        if args.keep:
+            print(f"Kept {scratch}")
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Job Table Model Benchmark
+
+Fills the shared JobTableModel with synthetic jobs and times what the job
+tables do with it:
+
+  - load: set_jobs() with every job (archive page start-up)
+  - sort: a click on the Qty and Customer headers, through the proxy
+  - filter: a search filter on the proxy, and clearing it
+  - duplicate check: ticket and UPC lookups, the new job wizard's check
+  - update and remove: a refresh that changes and drops a few rows
+
+and checks the results (sort order, filtered row count, lookups, that a
+selection follows its job through a sort). Only QtCore is needed.
+
+Usage:
+    python benchmarks/bench_job_table_model.py
+    python benchmarks/bench_job_table_model.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from PySide6.QtCore import QCoreApplication, QPersistentModelIndex, Qt
+
+from src.widgets.job_table_model import (
+    JobTableModel, JobSortFilterProxyModel, JobColumn, job_field,
+    format_quantity, quantity_sort_key, format_iso_date,
+)
+
+CUSTOMERS = ["Acme Apparel", "Blue Ridge", "Cobalt Retail", "Delta Goods", "Evergreen", "Fjord Outdoor"]
+
+COLUMNS = [
+    JobColumn("Customer", job_field("Customer")),
+    JobColumn("Part#", job_field("Part#")),
+    JobColumn("Ticket#", job_field("Ticket#", "Job Ticket#")),
+    JobColumn("PO#", job_field("PO#")),
+    JobColumn("Inlay Type", job_field("Inlay Type")),
+    JobColumn("Label Size", job_field("Label Size")),
+    JobColumn("Qty", job_field("Qty", "Quantity"), format_quantity, quantity_sort_key),
+    JobColumn("Due Date", job_field("Due Date"), format_iso_date),
+]
+QTY_COLUMN = 6
+
+
+def make_jobs(count):
+    return [{
+        "Customer": CUSTOMERS[number % len(CUSTOMERS)], "Part#": f"P-{number:06d}",
+        "Ticket#": f"{100000 + number}", "PO#": f"PO{number // 12:05d}", "Inlay Type": "M730",
+        "Label Size": "2x1", "Quantity": str((number * 7919) % 50000 + 1),
+        "Due Date": f"2025-{number % 12 + 1:02d}-{number % 28 + 1:02d}",
+        "UPC Number": f"{400000000000 + number}",
+        "job_folder_path": f"/jobs/{100000 + number}",
+    } for number in range(count)]
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<38} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the shared job table model.")
+    parser.add_argument("--jobs", type=int, default=100000, help="Jobs to load")
+    args = parser.parse_args(argv)
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    jobs = make_jobs(args.jobs)
+    model = JobTableModel(COLUMNS)
+    proxy = JobSortFilterProxyModel()
+    proxy.setSourceModel(model)
+
+    timed(f"load {args.jobs:,} jobs", lambda: model.set_jobs(jobs))
+    # A selected cell, as the view holds it
+    selected_job = jobs[args.jobs // 2]
+    selected = QPersistentModelIndex(proxy.index(args.jobs // 2, 0))
+
+    timed("sort by Qty (descending)", lambda: proxy.sort(QTY_COLUMN, Qt.SortOrder.DescendingOrder))
+    quantities = [quantity_sort_key(job["Quantity"]) for job in model.jobs()]
+    sorted_ok = quantities == sorted(quantities, reverse=True)
+    first_qty = proxy.index(0, QTY_COLUMN).data()
+    selection_ok = model.job_at(proxy.mapToSource(proxy.index(selected.row(), 0)).row()) is selected_job
+    timed("sort by Customer", lambda: proxy.sort(0, Qt.SortOrder.AscendingOrder))
+
+    visible = timed("filter 'Cobalt'", lambda: (
+        proxy.set_row_filter(lambda job: "cobalt" in job["Customer"].lower()), proxy.rowCount())[1])
+    timed("clear filter", lambda: proxy.set_row_filter(None))
+
+    lookups = min(args.jobs, 10000)
+    found = timed(f"{lookups:,} ticket + UPC lookups", lambda: sum(
+        model.find_ticket(str(100000 + n)) is not None and model.find_upc(str(400000000000 + n)) is not None
+        for n in range(lookups)))
+
+    changed = [dict(job, Quantity="1") for job in jobs[:25]]
+
+    def refresh():
+        for job_data in changed:
+            model.update_job(model.row_for_folder(job_data["job_folder_path"]), job_data)
+        model.remove_rows(model.row_for_folder(job["job_folder_path"]) for job in jobs[-25:])
+        app.processEvents()   # the deferred re-sort
+    timed("update 25 and remove 25 rows", refresh)
+
+    print(f"First Qty after sort {first_qty}, filter showed {visible:,}, lookups found {found:,}")
+    ok = (sorted_ok and selection_ok and visible == len([j for j in jobs if j["Customer"] == "Cobalt Retail"])
+          and found == lookups and model.rowCount() == args.jobs - 25
+          and model.find_ticket(jobs[-1]["Ticket#"]) is None
+          and model.job_at(model.row_for_folder(changed[0]["job_folder_path"])) is changed[0])
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
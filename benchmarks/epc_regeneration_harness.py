@@ -0,0 +1,117 @@
+"""
+EPC Regeneration Harness
+
+Checks that edits to a job's serial range reach the EPC regeneration plan.
+Writes the database files of a scratch job, then applies the edits the job
+details dialog allows and plans the regeneration for each, the way
+JobRegenerationWorker does (serial_range_for_edited_job() followed by
+plan_epc_regeneration()):
+
+  - a new Serial Number under Manual Serial Override moves every chunk
+  - a 2% buffer under the override adds a chunk and keeps the rest
+  - a Serial Number typed without the override keeps the allocated range
+  - a buffer that outgrows the allocated range takes a new allocation
+
+Exits with status 1 if any check fails. Runs headless - Qt is not needed.
+
+Usage:
+    python benchmarks/epc_regeneration_harness.py
+    python benchmarks/epc_regeneration_harness.py --quantity 50000 --qty-per-db 5000
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.utils.epc_conversion import generate_epc_database_files_with_progress, plan_epc_regeneration
+from src.utils.serial_manager import serial_range_for_edited_job
+
+UPC = "012345678905"
+
+
+def plan_edit(data_folder, original, changes, allocate=None):
+    """Apply changes to a copy of the job and plan the regeneration; returns (job, plan)."""
+    job_data = dict(original, **changes)
+    start_serial, end_serial, total_qty, source = serial_range_for_edited_job(job_data, original, allocate)
+    job_data.update({'Serial Range Start': start_serial, 'Serial Range End': end_serial,
+                     'Total Quantity with Buffers': total_qty, 'range source': source})
+    plan = plan_epc_regeneration(data_folder, UPC, start_serial, total_qty, int(original['Qty per DB']))
+    return job_data, plan
+
+
+def check(label, ok, detail):
+    print(f"{'ok  ' if ok else 'FAIL'} {label:<44} {detail}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that serial range edits change the EPC regeneration plan.")
+    parser.add_argument("--quantity", type=int, default=5000, help="Base quantity of the scratch job")
+    parser.add_argument("--qty-per-db", type=int, default=1000, help="Records per database file")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch folder")
+    args = parser.parse_args(argv)
+
+    scratch = tempfile.mkdtemp(prefix="epc-regeneration-")
+    try:
+        data_folder = os.path.join(scratch, "data")
+        os.makedirs(data_folder)
+        start_serial = 1000
+        original = {
+            'UPC Number': UPC, 'Quantity': str(args.quantity), 'Qty per DB': str(args.qty_per_db),
+            'Enable EPC Generation': True, 'Manual Serial Override': True,
+            'Include 2% Buffer': False, 'Include 7% Buffer': False,
+            'Serial Number': str(start_serial), 'Serial Range Start': start_serial,
+            'Serial Range End': start_serial + args.quantity - 1,
+            'Total Quantity with Buffers': args.quantity,
+        }
+        files = generate_epc_database_files_with_progress(UPC, start_serial, args.quantity, args.qty_per_db,
+                                                          data_folder, max_workers=1)
+        chunks = len(files)
+        results = []
+
+        job, plan = plan_edit(data_folder, original, {'Serial Number': str(start_serial + 10 * args.quantity)})
+        results.append(check("override: new Serial Number",
+                             job['Serial Range Start'] == start_serial + 10 * args.quantity
+                             and len(plan['write']) == chunks and not plan['keep']
+                             and len(plan['delete']) == chunks,
+                             f"write {len(plan['write'])}, keep {len(plan['keep'])}, delete {len(plan['delete'])}"))
+
+        job, plan = plan_edit(data_folder, original, {'Include 2% Buffer': True})
+        added = job['Total Quantity with Buffers'] - args.quantity
+        results.append(check("override: add 2% buffer",
+                             added > 0 and plan['write'] and len(plan['keep']) == args.quantity // args.qty_per_db
+                             and all(chunk[1] > original['Serial Range End'] for chunk in plan['write']),
+                             f"+{added} serials, write {len(plan['write'])}, keep {len(plan['keep'])}"))
+
+        allocated = dict(original, **{'Manual Serial Override': False})
+        job, plan = plan_edit(data_folder, allocated, {'Serial Number': str(start_serial + 1)})
+        results.append(check("allocated: Serial Number typed in",
+                             job['range source'] == 'kept' and not plan['write'] and not plan['delete'],
+                             f"{job['range source']}, write {len(plan['write'])}, keep {len(plan['keep'])}"))
+
+        new_start = 900000
+        job, plan = plan_edit(data_folder, allocated, {'Include 7% Buffer': True},
+                              allocate=lambda quantity, job_data: (new_start, new_start + quantity - 1))
+        results.append(check("allocated: 7% buffer outgrows the range",
+                             job['range source'] == 'allocated' and job['Serial Range Start'] == new_start
+                             and not plan['keep'] and len(plan['delete']) == chunks,
+                             f"{job['range source']}, write {len(plan['write'])}, delete {len(plan['delete'])}"))
+
+        ok = all(results)
+        print("OK" if ok else "FAILED")
+        return 0 if ok else 1
+    finally:
+        if args.keep:
+            print(f"Kept {scratch}")
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
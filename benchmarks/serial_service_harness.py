@@ -0,0 +1,208 @@
+"""
+Serial Allocation Service Harness
+
+Runs the serial allocation service in-process against a scratch serial
+folder and hammers it with concurrent allocations. Checks afterwards that no
+two allocations overlap and that every allocation is in the ledger. Also
+reports request latency and throughput. Runs headless - Qt is not needed.
+
+Three kinds of clients run at the same time:
+  - asyncio connections speaking the JSON protocol directly
+  - threads using SerialNumberManager with the service configured
+  - threads using SerialNumberManager without it (the file-lock fallback),
+    to show both paths can share one ledger
+
+Exits with status 1 if any check fails.
+
+Usage:
+    python benchmarks/serial_service_harness.py
+    python benchmarks/serial_service_harness.py --connections 200 --requests 50 --lease-size 100000
+    python benchmarks/serial_service_harness.py --unix
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import threading
+import statistics
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.utils.serial_manager import SerialNumberManager
+from src.utils.serial_service import SerialAllocationServer, parse_service_address
+
+
+def start_server_thread(base_path, address, lease_size):
+    """
+    Run the server on its own event loop in a daemon thread.
+
+    Returns:
+        tuple: (server, loop, thread, bound address)
+    """
+    ready = threading.Event()
+    state = {}
+
+    def run():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = SerialAllocationServer(base_path, lease_size)
+        loop.run_until_complete(server.start(address))
+        state.update(server=server, loop=loop)
+        ready.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="serial-service", daemon=True)
+    thread.start()
+    ready.wait()
+
+    server = state["server"]
+    kind, target = parse_service_address(address)
+    if kind == "tcp":
+        host, port = server.addresses[0][:2]
+        address = f"{host}:{port}"
+    return server, state["loop"], thread, address
+
+
+def stop_server_thread(server, loop, thread):
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+async def _protocol_connection(address, requests, quantity, results, latencies):
+    kind, target = parse_service_address(address)
+    if kind == "unix":
+        reader, writer = await asyncio.open_unix_connection(target)
+    else:
+        reader, writer = await asyncio.open_connection(*target)
+    try:
+        for index in range(requests):
+            started = time.perf_counter()
+            writer.write((json.dumps({"id": index, "op": "allocate", "quantity": quantity,
+                                      "job_info": {"customer": "harness"}}) + "\n").encode("utf-8"))
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - started)
+            if not reply.get("ok") or reply.get("id") != index:
+                raise RuntimeError(f"Bad reply: {reply}")
+            results.append((reply["start_serial"], reply["end_serial"]))
+    finally:
+        writer.close()
+
+
+async def drive_protocol_clients(address, connections, requests, quantity):
+    """Open many connections and allocate from all of them concurrently."""
+    results, latencies = [], []
+    await asyncio.gather(*(
+        _protocol_connection(address, requests, quantity, results, latencies)
+        for _ in range(connections)
+    ))
+    return results, latencies
+
+
+def drive_manager_threads(base_path, address, threads, requests, quantity):
+    """Allocate through SerialNumberManager from several threads, one manager each."""
+    results = []
+    results_lock = threading.Lock()
+
+    def work():
+        manager = SerialNumberManager(base_path, service_address=address)
+        local = [manager.allocate_serials(quantity, {"customer": "harness-thread"}) for _ in range(requests)]
+        manager.release_lease()
+        with results_lock:
+            results.extend(local)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def find_overlaps(ranges):
+    """Return neighbouring (a, b) pairs of sorted ranges that overlap."""
+    ordered = sorted(ranges)
+    return [(a, b) for a, b in zip(ordered, ordered[1:]) if b[0] <= a[1]]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the serial allocation service with concurrent clients.")
+    parser.add_argument("--connections", type=int, default=100, help="Concurrent protocol connections")
+    parser.add_argument("--requests", type=int, default=30, help="Allocations per connection / thread")
+    parser.add_argument("--quantity", type=int, default=250, help="Serials per allocation")
+    parser.add_argument("--service-threads", type=int, default=4,
+                        help="Threads allocating through SerialNumberManager with the service")
+    parser.add_argument("--fallback-threads", type=int, default=2,
+                        help="Threads allocating through the file-lock path at the same time")
+    parser.add_argument("--lease-size", type=int, default=0, help="Lease size used by the server")
+    parser.add_argument("--unix", action="store_true", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch serial folder")
+    args = parser.parse_args(argv)
+
+    base_path = tempfile.mkdtemp(prefix="serial-harness-")
+    address = f"unix:{os.path.join(base_path, 'service.sock')}" if args.unix else "127.0.0.1:0"
+    server, loop, thread, address = start_server_thread(base_path, address, args.lease_size)
+    print(f"Service listening on {address}, ledger folder {base_path}")
+
+    try:
+        manager_results = []
+        fallback = threading.Thread(target=lambda: manager_results.extend(
+            drive_manager_threads(base_path, None, args.fallback_threads, args.requests, args.quantity)))
+        service = threading.Thread(target=lambda: manager_results.extend(
+            drive_manager_threads(base_path, address, args.service_threads, args.requests, args.quantity)))
+
+        started = time.perf_counter()
+        fallback.start()
+        service.start()
+        protocol_results, latencies = asyncio.run(
+            drive_protocol_clients(address, args.connections, args.requests, args.quantity))
+        protocol_elapsed = time.perf_counter() - started
+        fallback.join()
+        service.join()
+        total_elapsed = time.perf_counter() - started
+    finally:
+        stop_server_thread(server, loop, thread)
+
+    all_ranges = protocol_results + manager_results
+    overlaps = find_overlaps(all_ranges)
+
+    summary = SerialNumberManager(base_path).get_daily_usage_summary()
+    logged = {(entry["start_serial"], entry["end_serial"]) for entry in summary["usage_log"]}
+    missing = [r for r in all_ranges if tuple(r) not in logged]
+
+    print(f"Protocol allocations: {len(protocol_results)} over {args.connections} connections "
+          f"in {protocol_elapsed:.2f}s ({len(protocol_results) / protocol_elapsed:,.0f}/s)")
+    print(f"Latency p50 {statistics.median(latencies) * 1e6:,.0f} us, "
+          f"p99 {_percentile(latencies, 0.99) * 1e6:,.0f} us")
+    print(f"Manager allocations (service + file fallback): {len(manager_results)}")
+    print(f"Total: {len(all_ranges)} allocations in {total_elapsed:.2f}s, "
+          f"next serial {summary['next_serial']}")
+    print(f"Overlapping ranges: {len(overlaps)}")
+    print(f"Allocations missing from the ledger: {len(missing)}")
+
+    if args.keep:
+        print(f"Kept {base_path}")
+    else:
+        shutil.rmtree(base_path, ignore_errors=True)
+
+    ok = not overlaps and not missing and len(all_ranges) == args.requests * (
+        args.connections + args.service_threads + args.fallback_threads)
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
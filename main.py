@@ -15,6 +15,7 @@ from PySide6.QtWidgets import (
     QSizePolicy
 )
 import pymupdf, shutil, os, sys
+import multiprocessing
 from qt_material import apply_stylesheet
 from PySide6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve
 from PySide6.QtGui import QIcon, QPixmap, QFont, QPainter
@@ -31,6 +32,8 @@ from src.tabs.tools_page import ToolsPageWidget
 from src.widgets.job_details_dialog import JobDetailsDialog
 import src.config as config
 from src.utils.file_utils import resource_path
+from src.utils.serial_manager import get_serial_manager
+from src.utils.serial_compaction import start_daily_serial_compaction, wait_for_serial_compaction
 
 
 class MainWindow(QMainWindow):
@@ -47,6 +50,13 @@ class MainWindow(QMainWindow):
         # Ensure that the directories specified in the config exist
         config.ensure_dirs_exist()
 
+        # Point the shared serial manager at the configured path, leasing mode and service
+        get_serial_manager(config.get_serial_numbers_path(), lease_size=config.get_serial_lease_size(),
+                           service_address=config.get_serial_service_address(),
+                           spool_path=config.SERIAL_LEASE_SPOOL_FILE)
+        # Fold old daily ledgers into the summary file, once a day
+        start_daily_serial_compaction()
+
         # Main layout
         main_layout = QHBoxLayout()
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -114,6 +124,9 @@ class MainWindow(QMainWindow):
         """Save data when the application is closing."""
         print("Closing application")
         self.jobs_page.save_data()
+        # Hand unused leased serials back to the shared counter
+        get_serial_manager().release_lease()
+        wait_for_serial_compaction()
         event.accept()
 
     def add_page(self, title, widget, icon_name):
@@ -159,6 +172,8 @@ class MainWindow(QMainWindow):
         self.dashboard_page.refresh_dashboard()
 
 if __name__ == "__main__":
+    # Required for the EPC generation process pool in the frozen Windows build
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     apply_stylesheet(app, theme='dark_blue.xml')
     window = MainWindow()
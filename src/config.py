@@ -79,12 +79,49 @@ PERIODIC_REFRESH_INTERVAL_KEY = "monitoring/periodic_refresh_interval"
 DEFAULT_PERIODIC_REFRESH_INTERVAL = 30000  # 30 seconds
 PERIODIC_REFRESH_INTERVAL = settings.value(PERIODIC_REFRESH_INTERVAL_KEY, DEFAULT_PERIODIC_REFRESH_INTERVAL, type=int)
 
+# --- EPC Generation Settings ---
+# Number of worker processes used to write EPC database files in parallel.
+# 0 = one worker per CPU core, 1 = write the files one after another.
+# Small jobs are always written one after another (see
+# epc_conversion.PARALLEL_MIN_RECORDS_PER_WORKER).
+EPC_GENERATION_WORKERS_KEY = "epc/generation_workers"
+DEFAULT_EPC_GENERATION_WORKERS = 0
+EPC_GENERATION_WORKERS = settings.value(EPC_GENERATION_WORKERS_KEY, DEFAULT_EPC_GENERATION_WORKERS, type=int)
+
+# --- Serial Number Settings ---
+# Serials a workstation reserves per lease from the shared daily file.
+# 0 = no leasing, every job is allocated directly from the shared file.
+SERIAL_LEASE_SIZE_KEY = "serials/lease_size"
+DEFAULT_SERIAL_LEASE_SIZE = 0
+SERIAL_LEASE_SIZE = settings.value(SERIAL_LEASE_SIZE_KEY, DEFAULT_SERIAL_LEASE_SIZE, type=int)
+
+# Address of the serial allocation service ("host:port" or "unix:/path").
+# Empty = every workstation allocates from the shared file directly.
+SERIAL_SERVICE_ADDRESS_KEY = "serials/service_address"
+DEFAULT_SERIAL_SERVICE_ADDRESS = ""
+SERIAL_SERVICE_ADDRESS = settings.value(SERIAL_SERVICE_ADDRESS_KEY, DEFAULT_SERIAL_SERVICE_ADDRESS, type=str)
+
 # --- TXT File Paths for Combobox Data ---
 # These are the .txt files that the job wizard reads from
 CUSTOMER_NAMES_FILE = os.path.join(BASE_PATH, "data", "Customer_names.txt")
 LABEL_SIZES_FILE = os.path.join(BASE_PATH, "data", "Label_sizes.txt")
 INLAY_TYPES_FILE = os.path.join(BASE_PATH, "data", "Inlay_types.txt")
 
+# Days of serial ledgers left uncompacted in the serial numbers folder, and
+# the day (ISO date) this workstation last ran the compaction
+SERIAL_LEDGER_KEEP_DAYS = 7
+SERIAL_COMPACTION_DATE_KEY = "serials/last_compaction"
+SERIAL_COMPACTION_DATE = settings.value(SERIAL_COMPACTION_DATE_KEY, "", type=str)
+
+# Allocations served from this workstation's serial lease, kept until the lease is settled
+SERIAL_LEASE_SPOOL_FILE = os.path.join(BASE_PATH, "data", "serial_lease_spool.jsonl")
+
+# Local index of all serial allocations (rebuilt from the serial numbers folder if deleted)
+SERIAL_INDEX_FILE = os.path.join(BASE_PATH, "data", "serials_index.sqlite")
+
+# Local index of the active and archived jobs (rebuilt from the job folders if deleted)
+JOB_INDEX_FILE = os.path.join(BASE_PATH, "data", "job_index.sqlite")
+
 
 def ensure_dirs_exist():
     """
@@ -188,6 +225,54 @@ def get_monitoring_settings():
     }
 
 
+def save_epc_generation_workers(workers):
+    """Save the number of worker processes used for EPC database generation."""
+    settings.setValue(EPC_GENERATION_WORKERS_KEY, workers)
+    global EPC_GENERATION_WORKERS
+    EPC_GENERATION_WORKERS = workers
+
+
+def get_epc_generation_workers():
+    """Get the number of worker processes used for EPC database generation."""
+    return EPC_GENERATION_WORKERS
+
+
+def save_serial_lease_size(lease_size):
+    """Save the number of serials reserved per lease (0 disables leasing)."""
+    settings.setValue(SERIAL_LEASE_SIZE_KEY, lease_size)
+    global SERIAL_LEASE_SIZE
+    SERIAL_LEASE_SIZE = lease_size
+
+
+def get_serial_lease_size():
+    """Get the number of serials reserved per lease (0 disables leasing)."""
+    return SERIAL_LEASE_SIZE
+
+
+def save_serial_service_address(address):
+    """Save the serial allocation service address ('' disables the service)."""
+    settings.setValue(SERIAL_SERVICE_ADDRESS_KEY, address)
+    global SERIAL_SERVICE_ADDRESS
+    SERIAL_SERVICE_ADDRESS = address
+
+
+def get_serial_service_address():
+    """Get the serial allocation service address ('' when not used)."""
+    return SERIAL_SERVICE_ADDRESS
+
+
+def save_serial_compaction_date(day):
+    """Save the day (ISO date) this workstation last compacted the serial ledgers."""
+    settings.setValue(SERIAL_COMPACTION_DATE_KEY, day)
+    global SERIAL_COMPACTION_DATE
+    SERIAL_COMPACTION_DATE = day
+
+
+def get_serial_compaction_date():
+    """Get the day (ISO date) this workstation last compacted the serial ledgers ('' if never)."""
+    return SERIAL_COMPACTION_DATE
+
+
 # Template configuration
 def save_template_base_path(path):
     """Save the template base path to settings"""
@@ -24,10 +24,63 @@ from PySide6.QtWidgets import (
 )
 
 from src.widgets.job_details_dialog import JobDetailsDialog, FileOperationProgressDialog
+from src.widgets.job_table_model import (
+    JobTableModel, JobSortFilterProxyModel, JobColumn, job_field,
+    format_quantity, quantity_sort_key, format_iso_date,
+)
 import src.config as config
+from src.utils.job_index import get_job_index, ARCHIVE
+from src.utils.job_journal import record_job_change
+from src.utils.job_journal_watcher import get_job_journal_watcher
+
+from PySide6.QtGui import QFont, QIcon
+from PySide6.QtCore import Qt, QDate, QTimer, Signal, QThread
+
+
+def archived_date_of(job_data, tag=None):
+    """Archive date of a job as saved (yyyy-mm-dd), trying the older field names too."""
+    # First try the full timestamp, then the date-only and legacy fields
+    date_with_time = str(job_data.get("dateArchived", "") or "")
+    if date_with_time:
+        return date_with_time.split()[0]
+    return str(job_data.get("archivedDate", "") or job_data.get("archived_date", "") or "")
+
+
+def format_archived_date(archived_date):
+    """Show an archive date as MM/DD/YYYY."""
+    if not archived_date:
+        # Show current date as fallback (shouldn't happen with proper archiving)
+        return datetime.now().strftime('%m/%d/%Y')
+    return format_iso_date(archived_date)
+
+
+ARCHIVE_TABLE_COLUMNS = [
+    JobColumn("Customer", job_field("Customer")),
+    JobColumn("Ticket#", job_field("Ticket#", "Job Ticket#")),
+    JobColumn("PO#", job_field("PO#")),
+    JobColumn("Part#", job_field("Part#")),
+    JobColumn("Inlay", job_field("Inlay Type")),
+    JobColumn("Size", job_field("Label Size")),
+    JobColumn("Qty", job_field("Qty", "Quantity"), format_quantity, quantity_sort_key),
+    JobColumn("Archived Date", archived_date_of, format_archived_date),
+]
+
+class ArchiveScanWorker(QThread):
+    """Worker thread that brings the job index up to date with the archive directory."""
+
+    scan_complete = Signal(int)  # jobs added, changed or removed
+    scan_failed = Signal(str)
+
+    def __init__(self, archive_dir):
+        super().__init__()
+        self.archive_dir = archive_dir
+
+    def run(self):
+        try:
+            self.scan_complete.emit(get_job_index().scan(ARCHIVE, self.archive_dir))
+        except Exception as e:
+            self.scan_failed.emit(str(e))
 
-from PySide6.QtGui import QStandardItem, QStandardItemModel, QFont, QIcon
-from PySide6.QtCore import Qt, QDate, QTimer, Signal, QSortFilterProxyModel
 
 class ArchivePageWidget(QWidget):
     job_was_archived = Signal()
@@ -38,8 +91,8 @@ class ArchivePageWidget(QWidget):
         self.base_path = base_path
         self.archive_dir = config.ARCHIVE_DIR
         
-        self.all_jobs = []  # Complete list of archived jobs
-        self.filtered_jobs = []  # Currently filtered/searched jobs
+        self.scan_worker = None  # Background archive scan, see scan_archive_in_background()
+        self.rescan_pending = False
         
         # Timer for search debouncing
         self.search_timer = QTimer()
@@ -48,6 +101,11 @@ class ArchivePageWidget(QWidget):
         
         self.setup_ui()
         self.load_jobs()
+        
+        # Other workstations' archive changes, from the change journal the jobs page polls
+        journal_watcher = get_job_journal_watcher()
+        journal_watcher.changes_received.connect(self.on_journal_changes)
+        journal_watcher.rescan_needed.connect(self.scan_archive_in_background)
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -164,19 +222,19 @@ class ArchivePageWidget(QWidget):
 
         self.setLayout(main_layout)
 
+    @property
+    def all_jobs(self):
+        """Complete list of archived jobs, in source row order. Read only; use source_model to change it."""
+        return self.source_model.jobs()
+
     def setup_results_table(self):
         """Set up the results table with proper formatting and functionality."""
-        self.source_model = QStandardItemModel()
-        # Removed Status column, reordered for better space utilization
-        # Updated headers: "Inlay Type" → "Inlay", "Label Size" → "Size"
-        self.headers = [
-            "Customer", "Ticket#", "PO#", "Part#", 
-            "Inlay", "Size", "Qty", "Archived Date"
-        ]
-        self.source_model.setHorizontalHeaderLabels(self.headers)
-        
-        # Create proxy model for sorting
-        self.proxy_model = QSortFilterProxyModel()
+        # Holds every archived job; searches and filters only hide rows in the proxy
+        self.source_model = JobTableModel(ARCHIVE_TABLE_COLUMNS)
+        self.headers = self.source_model.headers
+        
+        # Create proxy model for sorting and filtering
+        self.proxy_model = JobSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.source_model)
         
         self.jobs_table = QTableView()
@@ -241,18 +299,13 @@ class ArchivePageWidget(QWidget):
 
     def apply_filters(self):
         """Apply all active filters and search criteria."""
-        self.source_model.removeRows(0, self.source_model.rowCount())
-        self.filtered_jobs = []
-        
         search_text = self.search_input.text().lower().strip()
         customer_filter = self.customer_filter.currentText()
-        # Removed status_filter since we don't need the status column
-        # status_filter = self.status_filter.currentText()
         date_from = self.date_from.date()
         date_to = self.date_to.date()
         use_date_filter = self.advanced_filters_frame.isVisible()
         
-        for job in self.all_jobs:
+        def accepts(job):
             # Search filter - search across all relevant fields
             if search_text:
                 searchable_fields = [
@@ -275,130 +328,46 @@ class ArchivePageWidget(QWidget):
                 combined_text = " ".join(str(field) for field in searchable_fields if field).lower()
                 
                 if search_text not in combined_text:
-                    continue
+                    return False
             
             # Customer filter
             if customer_filter != "All Customers" and job.get("Customer") != customer_filter:
-                continue
-            
-            # Removed status filter
-            # if status_filter != "All Status" and job.get("Status") != status_filter:
-            #     continue
+                return False
             
             # Date filter (only if advanced filters are shown)
             if use_date_filter:
-                # Try multiple date field names for archive date
-                archive_date_str = ""
-                
-                # First try the full timestamp field
-                date_with_time = job.get('dateArchived', '')
-                if date_with_time:
-                    if ' ' in date_with_time:
-                        archive_date_str = date_with_time.split(' ')[0]  # Extract date part
-                    else:
-                        archive_date_str = date_with_time
-                
-                # If no dateArchived, try the date-only field
-                if not archive_date_str:
-                    archive_date_str = job.get('archivedDate', '')
-                
-                # If still no date, try legacy field names
-                if not archive_date_str:
-                    archive_date_str = job.get('archived_date', '')
-                
+                archive_date_str = archived_date_of(job)
                 if archive_date_str:
-                    try:
-                        # Parse the date string (expecting yyyy-mm-dd format)
-                        if len(archive_date_str) >= 10:
-                            date_part = archive_date_str[:10]  # Take first 10 chars (yyyy-mm-dd)
-                            archive_date = QDate.fromString(date_part, 'yyyy-MM-dd')
-                            if archive_date.isValid() and not (date_from <= archive_date <= date_to):
-                                continue
-                    except Exception as e:
-                        print(f"Error parsing archive date '{archive_date_str}': {e}")
-                        continue  # Skip jobs with invalid dates
+                    # Parse the date string (expecting yyyy-mm-dd format)
+                    if len(archive_date_str) >= 10:
+                        archive_date = QDate.fromString(archive_date_str[:10], 'yyyy-MM-dd')
+                        if archive_date.isValid() and not (date_from <= archive_date <= date_to):
+                            return False
             
             # Job passed all filters
-            self.filtered_jobs.append(job)
-            self.add_job_to_table(job)
+            return True
+        
+        filtering = bool(search_text or customer_filter != "All Customers" or use_date_filter)
+        self.proxy_model.set_row_filter(accepts if filtering else None)
         
         # Update stats
-        total_jobs = len(self.all_jobs)
-        filtered_count = len(self.filtered_jobs)
+        total_jobs = self.source_model.rowCount()
+        filtered_count = self.proxy_model.rowCount()
         
-        if search_text or customer_filter != "All Customers" or use_date_filter:
+        if filtering:
             self.stats_label.setText(f"{filtered_count} of {total_jobs} jobs found")
         else:
             self.stats_label.setText(f"{total_jobs} archived jobs")
 
-    def add_job_to_table(self, job_data):
-        """Add a job to the results table."""
-        # Handle both old and new field names for compatibility
-        ticket_num = job_data.get("Ticket#", job_data.get("Job Ticket#", ""))
-        quantity = job_data.get("Qty", job_data.get("Quantity", ""))
-        
-        # Format quantity with commas if it's a number
-        if quantity and str(quantity).replace(",", "").isdigit():
-            quantity = f"{int(str(quantity).replace(',', '')):,}"
-        
-        # Handle archived date display - try multiple field names and format properly
-        archived_date = ""
-        
-        # First try the full timestamp
-        date_with_time = job_data.get("dateArchived", "")
-        if date_with_time:
-            try:
-                if " " in date_with_time:
-                    # Extract just the date part from timestamp
-                    archived_date = date_with_time.split()[0]
-                else:
-                    archived_date = date_with_time
-            except Exception:
-                archived_date = date_with_time
-        
-        # If no dateArchived, try the date-only field
-        if not archived_date:
-            archived_date = job_data.get("archivedDate", "")
-        
-        # If still no date, try legacy field names
-        if not archived_date:
-            archived_date = job_data.get("archived_date", "")
-        
-        # Format the date for better display if it's in ISO format
-        if archived_date and len(archived_date) >= 10:
-            try:
-                # Try to parse and reformat if it's in yyyy-mm-dd format
-                if archived_date[4] == '-' and archived_date[7] == '-':
-                    date_obj = datetime.strptime(archived_date[:10], '%Y-%m-%d')
-                    archived_date = date_obj.strftime('%m/%d/%Y')  # Convert to MM/DD/YYYY
-            except Exception:
-                # If parsing fails, keep the original format
-                pass
-        
-        # If still no date, show current date as fallback (shouldn't happen with proper archiving)
-        if not archived_date:
-            archived_date = datetime.now().strftime('%m/%d/%Y')
-            print(f"Warning: No archive date found for job {ticket_num}, using current date")
-        
-        row_items = [
-            QStandardItem(job_data.get("Customer", "")),
-            QStandardItem(ticket_num),
-            QStandardItem(job_data.get("PO#", "")),
-            QStandardItem(job_data.get("Part#", "")),
-            QStandardItem(job_data.get("Inlay Type", "")),
-            QStandardItem(job_data.get("Label Size", "")),
-            QStandardItem(str(quantity)),
-            QStandardItem(archived_date)
-        ]
-        
-        # Store the complete job data in the first column's item
-        row_items[0].setData(job_data, Qt.ItemDataRole.UserRole)
-        
-        self.source_model.appendRow(row_items)
-
     def load_jobs(self):
-        """Load all archived jobs from the archive directory."""
-        self.all_jobs = []
+        """
+        Load all archived jobs from the job index.
+
+        The table shows what the index knows right away; the archive
+        directory is then scanned in the background and the table reloaded
+        if any job was added, changed or removed.
+        """
+        self.source_model.clear()
         
         if not os.path.exists(self.archive_dir):
             os.makedirs(self.archive_dir)
@@ -406,27 +375,50 @@ class ArchivePageWidget(QWidget):
             self.update_ui_after_load()
             return
         
-        print(f"Loading archived jobs from: {self.archive_dir}")
-        job_count = 0
-        
-        for folder_name in os.listdir(self.archive_dir):
-            job_folder_path = os.path.join(self.archive_dir, folder_name)
-            if os.path.isdir(job_folder_path):
-                metadata_path = os.path.join(job_folder_path, 'job_data.json')
-                if os.path.exists(metadata_path):
-                    try:
-                        with open(metadata_path, 'r', encoding='utf-8') as f:
-                            job_data = json.load(f)
-                            # Ensure the path is correct for operations like deletion
-                            job_data['job_folder_path'] = job_folder_path
-                            self.all_jobs.append(job_data)
-                            job_count += 1
-                    except Exception as e:
-                        print(f"Error loading job data from {metadata_path}: {e}")
-        
-        print(f"Loaded {job_count} archived jobs")
+        try:
+            self.source_model.set_jobs(get_job_index().jobs(ARCHIVE, top_level_only=True))
+        except Exception as e:
+            print(f"Error reading the job index: {e}")
+        
+        print(f"Loaded {len(self.all_jobs)} archived jobs from the job index")
+        self.update_ui_after_load()
+        self.scan_archive_in_background()
+
+    def scan_archive_in_background(self):
+        """Update the job index from the archive directory in a worker thread."""
+        if self.scan_worker is not None:
+            self.rescan_pending = True
+            return
+        
+        self.scan_worker = ArchiveScanWorker(self.archive_dir)
+        self.scan_worker.scan_complete.connect(self.on_archive_scan_complete)
+        self.scan_worker.scan_failed.connect(self.on_archive_scan_failed)
+        self.scan_worker.finished.connect(self.on_archive_scan_finished)
+        self.scan_worker.start()
+
+    def on_archive_scan_complete(self, changed):
+        """Reload the table from the index if the scan found changes."""
+        if not changed:
+            return
+        print(f"Archive scan updated {changed} jobs in the job index")
+        self.source_model.set_jobs(get_job_index().jobs(ARCHIVE, top_level_only=True))
         self.update_ui_after_load()
 
+    def on_journal_changes(self, entries):
+        """Rescan the archive if another workstation archived or deleted an archived job."""
+        if any(entry.get('area') == ARCHIVE for entry in entries):
+            self.scan_archive_in_background()
+
+    def on_archive_scan_failed(self, error_message):
+        print(f"Error scanning archive directory: {error_message}")
+
+    def on_archive_scan_finished(self):
+        self.scan_worker.deleteLater()
+        self.scan_worker = None
+        if self.rescan_pending:
+            self.rescan_pending = False
+            self.scan_archive_in_background()
+
     def update_ui_after_load(self):
         """Update UI components after loading jobs."""
         self.populate_customer_filter()
@@ -510,9 +502,10 @@ class ArchivePageWidget(QWidget):
                     json.dump(job_data, f, indent=4)
                 
                 print(f"Saved archive metadata to: {metadata_path}")
+                record_job_change("archived", job_data, ARCHIVE)
                 
                 # Add to the archive list and refresh display
-                self.all_jobs.append(job_data)
+                self.source_model.append_job(job_data)
                 self.update_ui_after_load()
                 
                 QMessageBox.information(self, "Success", f"Job archived successfully:\n{destination_path}")
@@ -534,8 +527,7 @@ class ArchivePageWidget(QWidget):
         # Map the proxy index to source index
         source_index = self.proxy_model.mapToSource(index)
         
-        # Get the job data from the first column's UserRole data
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
         
         if not job_data:
             QMessageBox.warning(self, "Error", "Could not retrieve job data.")
@@ -552,8 +544,7 @@ class ArchivePageWidget(QWidget):
         if not source_index.isValid():
             return None
             
-        # Get the job data from the UserRole data
-        return self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        return self.source_model.job_at(source_index.row())
 
     def contextMenuEvent(self, event):
         """Handle right-click context menu."""
@@ -568,7 +559,7 @@ class ArchivePageWidget(QWidget):
         source_index = self.proxy_model.mapToSource(proxy_index)
         
         # Get job data using the source index
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
         
         menu.addAction("View Details", lambda: self.open_job_details(proxy_index))
         menu.addSeparator()
@@ -594,7 +585,7 @@ class ArchivePageWidget(QWidget):
         source_index = self.proxy_model.mapToSource(proxy_index)
         
         # Get job data using the source index
-        job_to_remove = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_to_remove = self.source_model.job_at(source_index.row())
         
         if not job_to_remove:
             QMessageBox.warning(self, "Error", "Could not find job data to delete.")
@@ -604,7 +595,6 @@ class ArchivePageWidget(QWidget):
         if job_folder_path and os.path.exists(job_folder_path):
             # Store data for callback
             self.temp_delete_job_data = job_to_remove
-            self.temp_delete_source_index = source_index  # Store source index instead of row
             
             # Use threaded deletion for potentially large folders
             progress_dialog = FileOperationProgressDialog(
@@ -625,19 +615,14 @@ class ArchivePageWidget(QWidget):
             return
             
         job_to_remove = self.temp_delete_job_data
-        source_index = self.temp_delete_source_index  # Use stored source index
         
         # Clean up temporary data
         delattr(self, 'temp_delete_job_data')
-        delattr(self, 'temp_delete_source_index')
         
         if success:
-            # Remove from the source model using the source index
-            self.source_model.removeRow(source_index.row())
-            
-            # Remove from the all_jobs list - find by job folder path to ensure correct removal
-            job_folder_path = job_to_remove.get('job_folder_path')
-            self.all_jobs = [j for j in self.all_jobs if j.get('job_folder_path') != job_folder_path]
+            # Remove the job's row; rows may have moved while the folder was deleted
+            self.source_model.remove_job(job_to_remove)
+            record_job_change("deleted", job_to_remove, ARCHIVE)
             
             QMessageBox.information(self, "Deleted", "Archived job has been permanently deleted.")
             self.job_was_deleted.emit()
@@ -1,5 +1,4 @@
 import os
-import json
 from datetime import datetime, timedelta
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
@@ -9,71 +8,35 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QTimer, Signal, QPropertyAnimation, QEasingCurve, QRect, QObject, QThread
 from PySide6.QtGui import QFont, QColor, QPalette, QIcon, QPainter, QBrush, QPen
 import src.config as config
+from src.utils.job_index import get_job_index, ACTIVE, ARCHIVE
 
 
 class DashboardDataWorker(QObject):
     """Worker to load all dashboard data in the background."""
-    data_loaded = Signal(dict, list)  # updated_jobs, all_job_paths
+    data_loaded = Signal(list, list)  # active_jobs, archived_jobs
     error = Signal(str)
 
-    def __init__(self, active_dir, archive_dir, cache):
+    def __init__(self, active_dir, archive_dir):
         super().__init__()
         self.active_jobs_source_dir = active_dir
         self.archive_dir = archive_dir
-        self.cache = cache
         self.is_cancelled = False
 
     def run(self):
-        """Load data from the filesystem, using cache to avoid re-reading files."""
+        """Bring the job index up to date and load the active and archived jobs from it."""
         try:
-            active_jobs, active_paths = self._load_jobs(self.active_jobs_source_dir, is_archived=False)
-            if self.is_cancelled: return
-            
-            archived_jobs, archived_paths = self._load_jobs(self.archive_dir, is_archived=True)
-            if self.is_cancelled: return
-
-            updated_jobs = {**active_jobs, **archived_jobs}
-            all_job_paths = active_paths.union(archived_paths)
-
-            self.data_loaded.emit(updated_jobs, list(all_job_paths))
+            job_index = get_job_index()
+            for kind, directory in ((ACTIVE, self.active_jobs_source_dir), (ARCHIVE, self.archive_dir)):
+                if not os.path.exists(directory):
+                    os.makedirs(directory, exist_ok=True)
+                # Only files whose mtime or size changed are re-read
+                job_index.scan(kind, directory, cancelled=lambda: self.is_cancelled)
+                if self.is_cancelled: return
+
+            self.data_loaded.emit(job_index.jobs(ACTIVE), job_index.jobs(ARCHIVE))
         except Exception as e:
             self.error.emit(f"Failed to load dashboard data: {e}")
 
-    def _load_jobs(self, directory, is_archived):
-        """Generic job loader that uses modification times to update a cache."""
-        updated_jobs = {}
-        found_paths = set()
-        if not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
-            return updated_jobs, found_paths
-        
-        for root, _, files in os.walk(directory):
-            if self.is_cancelled:
-                break
-            if "job_data.json" in files:
-                job_data_path = os.path.join(root, "job_data.json")
-                found_paths.add(job_data_path)
-                try:
-                    last_modified = os.path.getmtime(job_data_path)
-                    
-                    # Check cache
-                    if job_data_path in self.cache and self.cache[job_data_path]['mtime'] == last_modified:
-                        # File is unchanged, skip reading
-                        continue
-
-                    with open(job_data_path, "r", encoding='utf-8') as f:
-                        job_data = json.load(f)
-                    
-                    if is_archived:
-                        job_data['job_folder_path'] = root
-                    else:
-                        job_data['active_source_folder_path'] = root
-
-                    updated_jobs[job_data_path] = {'mtime': last_modified, 'data': job_data}
-                except Exception as e:
-                    print(f"Error loading job from {job_data_path}: {e}")
-        return updated_jobs, found_paths
-
     def cancel(self):
         self.is_cancelled = True
 
@@ -260,7 +223,6 @@ class DashboardPageWidget(QWidget):
         self.active_jobs_source_dir = config.ACTIVE_JOBS_SOURCE_DIR
         self.archive_dir = config.ARCHIVE_DIR
         self.is_loading = False # Prevent concurrent refreshes
-        self.job_data_cache = {} # Cache for job data and modification times
         
         # Setup UI
         self.setup_ui()
@@ -513,7 +475,7 @@ class DashboardPageWidget(QWidget):
 
         # Setup worker thread
         self.load_thread = QThread()
-        self.worker = DashboardDataWorker(self.active_jobs_source_dir, self.archive_dir, self.job_data_cache)
+        self.worker = DashboardDataWorker(self.active_jobs_source_dir, self.archive_dir)
         self.worker.moveToThread(self.load_thread)
 
         # Connect signals
@@ -530,44 +492,8 @@ class DashboardPageWidget(QWidget):
 
         self.load_thread.start()
 
-    def on_data_loaded(self, updated_jobs, all_job_paths):
+    def on_data_loaded(self, active_jobs, archived_jobs):
         """Handle the data loaded by the worker thread."""
-        print(f"Dashboard data updated with {len(updated_jobs)} changed jobs. Total paths found: {len(all_job_paths)}.")
-        
-        # Update cache with new/modified jobs
-        self.job_data_cache.update(updated_jobs)
-        
-        # Purge deleted jobs from cache
-        current_paths_in_cache = set(self.job_data_cache.keys())
-        paths_on_disk = set(all_job_paths)
-        deleted_paths = current_paths_in_cache - paths_on_disk
-        
-        if deleted_paths:
-            print(f"Purging {len(deleted_paths)} deleted jobs from cache.")
-            for path in deleted_paths:
-                if path in self.job_data_cache:
-                    del self.job_data_cache[path]
-
-        # --- REFINED FILTERING LOGIC ---
-        # Use file paths to definitively separate active from archived jobs.
-        
-        active_jobs = []
-        archived_jobs = []
-        
-        active_dir_path = os.path.normpath(self.active_jobs_source_dir)
-        archive_dir_path = os.path.normpath(self.archive_dir)
-
-        for path, item in self.job_data_cache.items():
-            job_data = item['data']
-            normalized_path = os.path.normpath(path)
-
-            if normalized_path.startswith(archive_dir_path):
-                # If it's in the archive directory, it's archived.
-                archived_jobs.append(job_data)
-            elif normalized_path.startswith(active_dir_path):
-                # If it's in the active directory, it's active.
-                active_jobs.append(job_data)
-        
         # This will now give the correct counts, matching the Jobs tab.
         print(f"Recalculating stats with {len(active_jobs)} active and {len(archived_jobs)} archived jobs.")
         
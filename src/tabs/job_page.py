@@ -26,11 +26,14 @@ from PySide6.QtWidgets import (
 )
 import fitz
 import pymupdf, shutil, os, sys
-from PySide6.QtGui import QStandardItem, QStandardItemModel
-from PySide6.QtCore import Qt, Signal, QFileSystemWatcher, QTimer, QThread, QObject, QSortFilterProxyModel
+from PySide6.QtCore import Qt, Signal, QFileSystemWatcher, QTimer, QThread, QObject
 from src.wizards.new_job_wizard import NewJobWizard
 from src.widgets.job_details_dialog import JobDetailsDialog, EPCProgressDialog, FileOperationProgressDialog, PDFProgressDialog
 from src.widgets.interactive_roll_tracker_dialog import InteractiveRollTrackerDialog
+from src.widgets.job_table_model import (
+    JobTableModel, JobSortFilterProxyModel, JobColumn, job_field, ticket_of,
+    format_quantity, quantity_sort_key, format_iso_date,
+)
 import src.config as config
 from src.utils.epc_conversion import (
     create_upc_folder_structure,
@@ -42,51 +45,105 @@ from src.utils.epc_conversion import (
 from src.utils.roll_tracker import generate_quality_control_sheet
 import re
 from src.utils.template_mapping import get_template_manager
+from src.utils.job_index import get_job_index, ACTIVE
+from src.utils.job_journal import record_job_change
+from src.utils.job_journal_watcher import get_job_journal_watcher
+
+
+# Jobs table columns; dates are stored as yyyy-mm-dd and shown as mm/dd/yyyy
+JOB_TABLE_COLUMNS = [
+    JobColumn("Customer", job_field("Customer")),
+    JobColumn("Part#", job_field("Part#")),
+    JobColumn("Ticket#", job_field("Ticket#", "Job Ticket#")),
+    JobColumn("PO#", job_field("PO#")),
+    JobColumn("Inlay Type", job_field("Inlay Type")),
+    JobColumn("Label Size", job_field("Label Size")),
+    JobColumn("Qty", job_field("Qty", "Quantity"), format_quantity, quantity_sort_key),
+    JobColumn("Due Date", job_field("Due Date"), format_iso_date),
+]
+
+
+def job_table_key(job_data):
+    """Key that identifies a job's row in the Jobs table: its ticket, or its folder if it has none."""
+    ticket = str(job_data.get("Ticket#", job_data.get("Job Ticket#", ""))).strip()
+    if ticket:
+        return ticket
+    return "folder:" + str(job_data.get("active_source_folder_path") or job_data.get("job_folder_path", ""))
+
+
+def _job_fingerprint(job_data):
+    return json.dumps(job_data, sort_keys=True, default=str)
 
 
 class JobLoaderWorker(QObject):
     """Worker to load job data from the filesystem in a background thread."""
-    jobs_loaded = Signal(list)
+    jobs_loaded = Signal(dict)  # diff: added, changed, removed (see run)
     error = Signal(str)
 
-    def __init__(self, source_dir):
+    def __init__(self, source_dir, current_fingerprints=None):
+        """
+        Args:
+            source_dir (str): Active jobs source directory
+            current_fingerprints (dict): {job_table_key: fingerprint} of the
+                table right now (JobTableModel.fingerprints()); the worker
+                reports the difference to these
+        """
         super().__init__()
         self.source_dir = source_dir
+        self.current_fingerprints = dict(current_fingerprints or {})
         self.is_cancelled = False
 
     def run(self):
-        """Scan the source directory for job_data.json files, skipping archived jobs."""
-        jobs = []
+        """
+        Update the job index from the source directory and diff its jobs
+        against the table, skipping archived jobs.
+
+        Emits jobs_loaded with {'added': [job, ...], 'changed': [job, ...],
+        'removed': [key, ...]}, keyed by job_table_key().
+        """
         if not os.path.exists(self.source_dir):
             self.error.emit(f"Source directory not found: {self.source_dir}")
             return
 
         try:
-            for root, _, files in os.walk(self.source_dir):
-                if self.is_cancelled:
-                    return
+            job_index = get_job_index()
+            job_index.scan(ACTIVE, self.source_dir, cancelled=lambda: self.is_cancelled)
+            if self.is_cancelled:
+                return
+
+            jobs = {}
+            used_upcs = {}
+            for job_data in job_index.jobs(ACTIVE):
+                # Critical Fix: Do not load jobs marked as 'Archived'
+                if job_data.get('Status') == 'Archived':
+                    print(f"Skipping archived job found in active directory: {job_data['active_source_folder_path']}")
+                    continue
+
+                # Same rules as check_for_duplicate_job: tickets and UPCs are unique
+                key = job_table_key(job_data)
+                upc_number = str(job_data.get("UPC Number", "")).strip()
+                if key in jobs:
+                    print(f"DUPLICATE SKIPPED: Ticket# {key} already loaded from {jobs[key].get('active_source_folder_path')}")
+                    continue
+                if upc_number and not key.startswith("folder:") and upc_number in used_upcs:
+                    print(f"UPC CONFLICT SKIPPED: UPC {upc_number} of Ticket# {key} already used by Ticket# {used_upcs[upc_number]}")
+                    continue
+                if upc_number and not key.startswith("folder:"):
+                    used_upcs[upc_number] = key
+                jobs[key] = job_data
+
+            current = self.current_fingerprints
+            added = []
+            changed = []
+            for key, job_data in jobs.items():
+                if key not in current:
+                    added.append(job_data)
+                elif current[key] != _job_fingerprint(job_data):
+                    changed.append(job_data)
+            removed = [key for key in current if key not in jobs]
 
-                if "job_data.json" in files:
-                    job_data_path = os.path.join(root, "job_data.json")
-                    try:
-                        with open(job_data_path, "r", encoding="utf-8") as f:
-                            job_data = json.load(f)
-                        
-                        # Critical Fix: Do not load jobs marked as 'Archived'
-                        if job_data.get('Status') == 'Archived':
-                            print(f"Skipping archived job found in active directory: {job_data_path}")
-                            continue
-
-                        # Add the canonical path from the filesystem
-                        job_data["active_source_folder_path"] = root
-                        jobs.append(job_data)
-                    except json.JSONDecodeError:
-                        print(f"Error decoding JSON from {job_data_path}")
-                    except Exception as e:
-                        print(f"Error loading job from {job_data_path}: {e}")
-            
             if not self.is_cancelled:
-                self.jobs_loaded.emit(jobs)
+                self.jobs_loaded.emit({'added': added, 'changed': changed, 'removed': removed})
 
         except Exception as e:
             self.error.emit(f"Failed to scan job directory: {e}")
@@ -104,7 +161,6 @@ class JobPageWidget(QWidget):
         self.base_path = base_path
         self.save_file = os.path.join(self.base_path, "data", "active_jobs.json")
         self.network_path = r"Z:\3 Encoding and Printing Files\Customers Encoding Files"
-        self.all_jobs = []  # This will be the source of truth
         self.is_loading = False # Flag to prevent concurrent loads
 
         # Initialize file system watcher for real-time monitoring
@@ -137,22 +193,12 @@ class JobPageWidget(QWidget):
         actions_layout.addStretch()
         layout.addLayout(actions_layout)
 
-        # Create source model
-        self.source_model = QStandardItemModel()
-        self.headers = [
-            "Customer",
-            "Part#",
-            "Ticket#",
-            "PO#",
-            "Inlay Type",
-            "Label Size",
-            "Qty",
-            "Due Date",
-        ]
-        self.source_model.setHorizontalHeaderLabels(self.headers)
+        # Create source model; it holds the jobs and is the source of truth
+        self.source_model = JobTableModel(JOB_TABLE_COLUMNS)
+        self.headers = self.source_model.headers
 
         # Create proxy model for sorting
-        self.proxy_model = QSortFilterProxyModel()
+        self.proxy_model = JobSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.source_model)
 
         self.jobs_table = QTableView()
@@ -201,12 +247,24 @@ class JobPageWidget(QWidget):
         layout.addWidget(self.jobs_table)
         self.setLayout(layout)
 
-        self.load_jobs()
+        # Changes other workstations record in the change journal
+        journal_watcher = get_job_journal_watcher()
+        journal_watcher.changes_received.connect(self.apply_journal_entries)
+        journal_watcher.rescan_needed.connect(self.refresh_jobs_table)
+
+        # Monitoring first: it marks where in the change journal to follow
+        # from, so nothing recorded during the first scan is missed
         self.setup_directory_monitoring()
+        self.load_jobs()
 
         # Add double-click handler for the table
         self.jobs_table.doubleClicked.connect(self.open_job_details)
 
+    @property
+    def all_jobs(self):
+        """Jobs in the table, in source row order. Read only; change jobs through source_model."""
+        return self.source_model.jobs()
+
     def setup_directory_monitoring(self):
         """Set up file system monitoring for the active jobs source directory with performance optimizations."""
         active_source_dir = config.ACTIVE_JOBS_SOURCE_DIR
@@ -252,7 +310,9 @@ class JobPageWidget(QWidget):
         print("Setting up LIMITED network monitoring (performance mode)")
         
         # DO NOT use the file watcher for network drives, it's unreliable and slow.
-        # Rely on periodic refresh and manual refresh instead.
+        # Poll the change journal periodically instead; the job tree itself is
+        # only rescanned on manual refresh or when the journal was rotated.
+        get_job_journal_watcher().follow(active_source_dir)
         
         # Schedule periodic refresh for network drives
         if not hasattr(self, 'periodic_refresh_timer'):
@@ -260,7 +320,7 @@ class JobPageWidget(QWidget):
             self.periodic_refresh_timer = QTimer()
             self.periodic_refresh_timer.timeout.connect(self.periodic_refresh)
             self.periodic_refresh_timer.start(config.PERIODIC_REFRESH_INTERVAL)
-            print(f"Enabled periodic refresh every {config.PERIODIC_REFRESH_INTERVAL//1000} seconds for network drive")
+            print(f"Enabled change journal polling every {config.PERIODIC_REFRESH_INTERVAL//1000} seconds for network drive")
 
     def setup_full_local_monitoring(self, active_source_dir):
         """Setup full monitoring for local drives."""
@@ -326,8 +386,8 @@ class JobPageWidget(QWidget):
 
     def periodic_refresh(self):
         """Periodic refresh for network drives where file system watching is unreliable."""
-        print("Performing periodic refresh for network drive...")
-        self.refresh_jobs_table()
+        # Only the change journal is read; see apply_journal_entries()
+        get_job_journal_watcher().request_poll()
 
     def on_directory_changed(self, path):
         """Handle directory change events from the file system watcher."""
@@ -346,16 +406,6 @@ class JobPageWidget(QWidget):
         print("=== Refreshing jobs table due to file system changes ===")
         self.load_jobs_in_background()
 
-    def restore_table_selection(self, job_identifiers):
-        """Restore table selection based on job ticket and PO number."""
-        job_ticket, po_num = job_identifiers
-        for row in range(self.model.rowCount()):
-            row_job_ticket = self.model.item(row, self.headers.index("Ticket#")).text()
-            row_po_num = self.model.item(row, self.headers.index("PO#")).text()
-            if row_job_ticket == job_ticket and row_po_num == po_num:
-                self.jobs_table.selectRow(row)
-                break
-
     def open_new_job_wizard(self):
         wizard = NewJobWizard(self, base_path=self.base_path)
         wizard.setWindowTitle("New Job")
@@ -438,28 +488,22 @@ class JobPageWidget(QWidget):
         2. Same UPC Number (if provided) = UPC CONFLICT (not allowed)
         3. Same PO# + Different Ticket# = ALLOWED (multiple tickets can share PO#)
         """
-        customer = job_data.get("Customer", "").strip()
-        po_number = job_data.get("PO#", "").strip()
-        upc_number = job_data.get("UPC Number", "").strip()
-        job_ticket = job_data.get("Ticket#", job_data.get("Job Ticket#", "")).strip()
+        upc_number = str(job_data.get("UPC Number", "")).strip()
+        job_ticket = ticket_of(job_data)
         
         # Skip empty ticket numbers for meaningful duplicate detection
         if not job_ticket:
             return False, None, None
         
-        for existing_job in self.all_jobs:
-            existing_customer = existing_job.get("Customer", "").strip()
-            existing_po = existing_job.get("PO#", "").strip()
-            existing_upc = existing_job.get("UPC Number", "").strip()
-            existing_ticket = existing_job.get("Ticket#", existing_job.get("Job Ticket#", "")).strip()
-            
-            # Check for exact ticket number match (primary duplicate check)
-            if job_ticket and existing_ticket and job_ticket == existing_ticket:
-                return True, "ticket_duplicate", existing_job
-            
-            # Check for UPC conflict (if both have UPC numbers)
-            if (upc_number and existing_upc and 
-                upc_number == existing_upc):
+        # Check for exact ticket number match (primary duplicate check)
+        existing_job = self.source_model.find_ticket(job_ticket)
+        if existing_job is not None:
+            return True, "ticket_duplicate", existing_job
+        
+        # Check for UPC conflict (if both have UPC numbers)
+        if upc_number:
+            existing_job = self.source_model.find_upc(upc_number)
+            if existing_job is not None:
                 return True, "upc_conflict", existing_job
         
         return False, None, None
@@ -520,53 +564,14 @@ class JobPageWidget(QWidget):
         # If we get here, it's not a duplicate - proceed with adding
         print(f"  No conflicts found - proceeding to add job")
 
-        # Format the due date to mm/dd/yyyy
-        due_date_formatted = self.format_date_for_display(job_data.get("Due Date", ""))
-
-        # Handle both old and new column names for backward compatibility
-        quantity = job_data.get("Qty", job_data.get("Quantity", ""))
-
-        # Format quantity with commas for display in table
-        formatted_quantity = quantity
-        if quantity and str(quantity).isdigit():
-            formatted_quantity = f"{int(quantity):,}"
-
-        row_items = [
-            QStandardItem(job_data.get("Customer", "")),
-            QStandardItem(job_data.get("Part#", "")),
-            QStandardItem(job_ticket),
-            QStandardItem(job_data.get("PO#", "")),
-            QStandardItem(job_data.get("Inlay Type", "")),
-            QStandardItem(job_data.get("Label Size", "")),
-            QStandardItem(formatted_quantity),
-            QStandardItem(due_date_formatted),
-        ]
-        
-        # Store the complete job data in the first column's item
-        row_items[0].setData(job_data, Qt.ItemDataRole.UserRole)
-        
-        self.source_model.appendRow(row_items)
-        # Add the full job data to our source of truth list
-        self.all_jobs.append(job_data)
+        self.append_job_row(job_data)
         print(f"SUCCESS: Added job to table - Customer: {customer}, PO#: {po_number}, Ticket#: {job_ticket}")
         print(f"Table now contains {len(self.all_jobs)} jobs")
         return True
 
-    def format_date_for_display(self, date_string):
-        """Convert date from ISO format (yyyy-mm-dd) to mm/dd/yyyy format."""
-        if not date_string:
-            return ""
-
-        try:
-            # Parse the ISO date format (yyyy-mm-dd)
-            from datetime import datetime
-
-            date_obj = datetime.strptime(date_string, "%Y-%m-%d")
-            # Format as mm/dd/yyyy
-            return date_obj.strftime("%m/%d/%Y")
-        except ValueError:
-            # If parsing fails, return the original string
-            return date_string
+    def append_job_row(self, job_data):
+        """Append a row for a job without duplicate checks."""
+        self.source_model.append_job(job_data)
 
     def load_jobs(self):
         """
@@ -591,7 +596,9 @@ class JobPageWidget(QWidget):
         
         # Setup worker thread
         self.load_thread = QThread()
-        self.worker = JobLoaderWorker(active_source_dir)
+        # Cached per row by the model, so an unchanged table costs no serializing
+        self.worker = JobLoaderWorker(active_source_dir,
+                                      self.source_model.fingerprints(job_table_key, _job_fingerprint))
         self.worker.moveToThread(self.load_thread)
         
         # Connect signals
@@ -608,35 +615,71 @@ class JobPageWidget(QWidget):
         # Start the thread
         self.load_thread.start()
 
-    def on_jobs_loaded(self, loaded_jobs):
-        """Slot to handle the list of jobs loaded by the worker thread."""
-        print(f"Background load complete. Found {len(loaded_jobs)} jobs.")
+    def on_jobs_loaded(self, diff):
+        """
+        Slot to apply the job changes found by the worker thread.
 
-        # Preserve selection
-        current_selection = None
-        selection_model = self.jobs_table.selectionModel()
-        if selection_model.hasSelection():
-            selected_row = selection_model.selectedRows()[0].row()
-            if 0 <= selected_row < len(self.all_jobs):
-                current_job = self.all_jobs[selected_row]
-                current_selection = (
-                    self.get_job_data_value(current_job, "Ticket#", "Job Ticket#"),
-                    current_job.get("PO#"),
-                )
+        Only the rows of added, changed and removed jobs are touched, so
+        the selection and scroll position stay where they are.
+        """
+        print(f"Background load complete: {len(diff['added'])} added, "
+              f"{len(diff['changed'])} changed, {len(diff['removed'])} removed.")
+        self.apply_job_diff(diff)
+        self.on_load_finished()
 
-        # Clear existing data
-        self.all_jobs = []
-        self.source_model.removeRows(0, self.source_model.rowCount())
+    def apply_job_diff(self, diff):
+        """
+        Apply {'added': [job, ...], 'changed': [job, ...], 'removed': [key, ...]}
+        to the table, matching rows by job_table_key(). Jobs are added or
+        updated depending on whether their key is in the table now, since
+        the journal may have applied a change while a scan was running.
+        """
+        upserts = list(diff['added']) + list(diff['changed'])
+        removed = diff['removed']
+
+        if upserts or removed:
+            # Rows shift as others are removed or re-sorted, so look them
+            # up by job object rather than keeping row numbers
+            current = {}
+            for job in self.all_jobs:
+                current.setdefault(job_table_key(job), job)
+
+            added = []
+            for job_data in upserts:
+                old_job = current.get(job_table_key(job_data))
+                row = None if old_job is None else self.source_model.row_of_job(old_job)
+                if row is None:
+                    added.append(job_data)
+                else:
+                    self.source_model.update_job(row, job_data)
+
+            removed_rows = (self.source_model.row_of_job(current[key]) for key in removed if key in current)
+            self.source_model.remove_rows(row for row in removed_rows if row is not None)
+            self.source_model.append_jobs(added)
+
+    def apply_journal_entries(self, entries):
+        """Apply the job changes other workstations recorded in the change journal."""
+        latest = {}
+        for entry in entries:
+            if entry.get('area') != ACTIVE:
+                continue
+            job_data = entry.get('job') or {}
+            gone = entry.get('op') in ('archived', 'deleted') or job_data.get('Status') == 'Archived'
+            key = job_table_key(job_data)
+            previous_key = entry.get('previous_key')
+            if previous_key and previous_key != key:
+                # The ticket changed or the folder moved; drop the old row
+                latest[previous_key] = None
+            latest[key] = None if gone else job_data
+        if not latest:
+            return
 
-        # Add jobs to table (with duplicate checks)
-        for job_data in loaded_jobs:
-            self.add_job_to_table(job_data)
-        
-        # Restore selection
-        if current_selection:
-            self.restore_table_selection(current_selection)
-        
-        self.on_load_finished()
+        print(f"Applying {len(latest)} job changes from the change journal")
+        self.apply_job_diff({
+            'added': [job_data for job_data in latest.values() if job_data is not None],
+            'changed': [],
+            'removed': [key for key, job_data in latest.items() if job_data is None],
+        })
 
     def on_load_error(self, error_message):
         """Slot to handle errors from the worker thread."""
@@ -670,7 +713,7 @@ class JobPageWidget(QWidget):
         source_index = self.proxy_model.mapToSource(proxy_index)
         
         # Get job data using the source index
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
 
         menu.addAction(
             "Create Job Folder...",
@@ -699,7 +742,7 @@ class JobPageWidget(QWidget):
 
     def edit_selected_job_in_details(self, source_index):
         """Open the job details dialog in edit mode for the selected job."""
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
 
         if not job_data:
             QMessageBox.warning(self, "Error", "Could not retrieve job data.")
@@ -844,7 +887,7 @@ class JobPageWidget(QWidget):
 
         # Use threaded generation to prevent UI freezing
         self.epc_progress_dialog = EPCProgressDialog(
-            upc, start_serial, total_qty, qty_per_db, data_folder_path, self
+            upc, start_serial, total_qty, qty_per_db, data_folder_path, self, job_data
         )
         
         # Connect completion signal
@@ -864,7 +907,7 @@ class JobPageWidget(QWidget):
         if reply == QMessageBox.StandardButton.No:
             return
 
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
         job_folder_path = job_data.get("job_folder_path")
 
         if not job_folder_path or not os.path.exists(job_folder_path):
@@ -889,10 +932,10 @@ class JobPageWidget(QWidget):
 
         # Since it's archived, we delete it from the active jobs directories
         self._delete_job_files(job_data)
+        record_job_change("archived", job_data)
 
-        # Remove the job from the source model and active list
-        self.source_model.removeRow(source_index.row())
-        self.all_jobs = [j for j in self.all_jobs if j.get('job_folder_path') != job_folder_path]
+        # Remove the job from the table
+        self.source_model.remove_job(job_data)
 
         # Ensure monitoring continues after archiving
         self.ensure_directory_monitoring()
@@ -901,7 +944,7 @@ class JobPageWidget(QWidget):
 
     def delete_job_by_index(self, source_index):
         """Delete job by source model index, including all its files."""
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
 
         if not job_data:
             QMessageBox.warning(self, "Error", "Could not find job data to delete.")
@@ -915,9 +958,9 @@ class JobPageWidget(QWidget):
         )
         if reply == QMessageBox.StandardButton.Yes:
             self._delete_job_files(job_data)
-            # Remove from the source model and active list
-            self.source_model.removeRow(source_index.row())
-            self.all_jobs = [j for j in self.all_jobs if j.get('job_folder_path') != job_data.get('job_folder_path')]
+            record_job_change("deleted", job_data)
+            # Remove from the table
+            self.source_model.remove_job(job_data)
 
             # Ensure monitoring continues after deletion
             self.ensure_directory_monitoring()
@@ -928,7 +971,7 @@ class JobPageWidget(QWidget):
         if not selection_model.hasSelection():
             return
 
-        selected_row_index = selection_model.selectedRows()[0]
+        selected_row_index = self.proxy_model.mapToSource(selection_model.selectedRows()[0])
 
         job_data = {}
         for col, header in enumerate(self.headers):
@@ -1126,8 +1169,7 @@ class JobPageWidget(QWidget):
         # Map the proxy index to source index
         source_index = self.proxy_model.mapToSource(index)
         
-        # Get the job data from the first column's UserRole data
-        job_data = self.source_model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        job_data = self.source_model.job_at(source_index.row())
 
         if not job_data:
             QMessageBox.warning(self, "Error", "Could not retrieve job data.")
@@ -1145,34 +1187,10 @@ class JobPageWidget(QWidget):
 
     def update_job_in_table(self, updated_job_data):
         """Update job data in the table and filesystem. Called from details dialog."""
-        # Find the row with matching job data and update it
-        for i, job in enumerate(self.all_jobs):
-            # Use a reliable identifier to find the job
-            if job.get("job_folder_path") == updated_job_data.get("job_folder_path"):
-                # Update the source of truth
-                self.all_jobs[i] = updated_job_data
-
-                # Update the view with proper formatting
-                for col, header in enumerate(self.headers):
-                    if header in updated_job_data:
-                        # Special handling for Due Date formatting
-                        if header == "Due Date":
-                            formatted_value = self.format_date_for_display(
-                                updated_job_data[header]
-                            )
-                            item = QStandardItem(formatted_value)
-                        # Special handling for Qty formatting
-                        elif header == "Qty":
-                            qty_value = updated_job_data[header]
-                            if qty_value and str(qty_value).isdigit():
-                                formatted_value = f"{int(qty_value):,}"
-                            else:
-                                formatted_value = str(qty_value)
-                            item = QStandardItem(formatted_value)
-                        else:
-                            item = QStandardItem(str(updated_job_data[header]))
-                        self.source_model.setItem(i, col, item)
-                break
+        # Find the row showing this job by its folder and update it
+        row = self.source_model.row_for_folder(updated_job_data.get("job_folder_path"))
+        if row is not None:
+            self.source_model.update_job(row, updated_job_data)
 
     def handle_job_archived(self, job_data):
         """Handle job being archived from details dialog"""
@@ -1188,12 +1206,11 @@ class JobPageWidget(QWidget):
         self.job_to_archive.emit(job_data)
 
         # Find the row and remove it, deleting files as part of the process
-        for i, job in enumerate(self.all_jobs):
-            if job.get("job_folder_path") == job_data.get("job_folder_path"):
-                self._delete_job_files(job_data)
-                self.source_model.removeRow(i)
-                del self.all_jobs[i]
-                break
+        row = self.source_model.row_for_folder(job_data.get("job_folder_path"))
+        if row is not None:
+            self._delete_job_files(job_data)
+            record_job_change("archived", job_data)
+            self.source_model.remove_row(row)
 
         # Ensure monitoring continues after archiving
         self.ensure_directory_monitoring()
@@ -1201,17 +1218,18 @@ class JobPageWidget(QWidget):
     def handle_job_deleted_from_details(self, job_data):
         """Handle job being deleted from details dialog with the same logic as context menu."""
         # Find the row in the source model that matches this job
-        for i in range(self.source_model.rowCount()):
-            row_job_data = self.source_model.item(i, 0).data(Qt.ItemDataRole.UserRole)
-            if row_job_data and row_job_data.get("job_folder_path") == job_data.get("job_folder_path"):
-                # Use the same deletion logic as delete_job_by_index
-                self._delete_job_files(job_data)
-                # Remove from the source model and active list
-                self.source_model.removeRow(i)
-                self.all_jobs = [j for j in self.all_jobs if j.get('job_folder_path') != job_data.get('job_folder_path')]
-                # Ensure monitoring continues after deletion
-                self.ensure_directory_monitoring()
-                break
+        row = self.source_model.row_for_folder(job_data.get("job_folder_path"))
+        if row is not None:
+            # Use the same deletion logic as delete_job_by_index
+            self._delete_job_files(job_data)
+            record_job_change("deleted", job_data)
+            self.source_model.remove_row(row)
+            # Ensure monitoring continues after deletion
+            self.ensure_directory_monitoring()
+
+    def _get_job_data_for_row(self, row):
+        """Get the full job data for a source model row."""
+        return self.source_model.job_at(row)
 
     def delete_job_by_row(self, row):
         """Delete job by row index, including all its files."""
@@ -1227,8 +1245,8 @@ class JobPageWidget(QWidget):
 
             if reply == QMessageBox.StandardButton.Yes:
                 self._delete_job_files(job_data)
-                self.source_model.removeRow(row)
-                del self.all_jobs[row]
+                record_job_change("deleted", job_data)
+                self.source_model.remove_row(row)
 
                 # Ensure monitoring continues after deletion
                 self.ensure_directory_monitoring()
@@ -1482,6 +1500,7 @@ class JobPageWidget(QWidget):
         """Copy .btw template file to the job's print folder."""
         try:
             from src.utils.epc_conversion import get_template_path_with_inlay
+            from src.utils.template_index import get_template_index
             from src.utils.template_mapping import get_template_manager
             
             # First, check template mappings
@@ -1494,7 +1513,7 @@ class JobPageWidget(QWidget):
                 # Fall back to directory scanning
                 template_base_path = config.get_template_base_path()
                 
-                if not template_base_path or not os.path.exists(template_base_path):
+                if not template_base_path or not get_template_index(template_base_path).exists():
                     print(f"Template base path not configured or doesn't exist: {template_base_path}")
                     return
                 
@@ -1759,7 +1778,7 @@ class JobPageWidget(QWidget):
             # Connect completion signal
             self.copy_progress_dialog.operation_finished.connect(
                 lambda success, message: self.on_copy_operation_finished(
-                    success, message, destination_path
+                    success, message, destination_path, job_data
                 )
             )
             
@@ -1773,10 +1792,12 @@ class JobPageWidget(QWidget):
                 f"Could not copy job folder to active source directory.\n\nError: {e}",
             )
 
-    def on_copy_operation_finished(self, success, message, destination_path):
+    def on_copy_operation_finished(self, success, message, destination_path, job_data=None):
         """Handle completion of copy operation."""
         if success:
             print(f"Successfully copied job folder to: {destination_path}")
+            if job_data is not None:
+                record_job_change("created", job_data)
             # Trigger a refresh to ensure the job appears in the table
             # This is a safety net in case the file system watcher didn't catch it
             self.refresh_timer.start(100)  # Quick refresh after copy completes
@@ -1842,7 +1863,7 @@ class JobPageWidget(QWidget):
         selection_model = self.jobs_table.selectionModel()
         if not selection_model.hasSelection():
             return
-        selected_row_index = selection_model.selectedRows()[0]
+        selected_row_index = self.proxy_model.mapToSource(selection_model.selectedRows()[0])
 
         current_data = self._get_job_data_for_row(selected_row_index.row())
 
@@ -1862,7 +1883,7 @@ class JobPageWidget(QWidget):
         if not selection_model.hasSelection():
             return
 
-        selected_row_index = selection_model.selectedRows()[0]
+        selected_row_index = self.proxy_model.mapToSource(selection_model.selectedRows()[0])
 
         job_data = {}
         for col, header in enumerate(self.headers):
@@ -1973,6 +1994,8 @@ class JobPageWidget(QWidget):
             )
             return
 
+        previous_key = job_table_key(current_data)
+
         # --- 1. Determine new path for the primary job folder ---
         try:
             # Preserve creation date from the original folder name
@@ -2040,6 +2063,7 @@ class JobPageWidget(QWidget):
                     os.makedirs(os.path.dirname(new_active_source_path), exist_ok=True)
                     shutil.move(old_active_source_path, new_active_source_path)
                     print(f"Renamed active source folder: {old_active_source_path} -> {new_active_source_path}")
+                new_data["active_source_folder_path"] = new_active_source_path
 
                 # Save updated job data to active source
                 with open(os.path.join(new_active_source_path, "job_data.json"), "w") as f:
@@ -2047,9 +2071,10 @@ class JobPageWidget(QWidget):
         except Exception as e:
             print(f"Warning: Could not update active jobs source folder: {e}")
 
+        record_job_change("updated", new_data, previous_key=previous_key)
+
         # --- 6. Update the UI ---
-        self.all_jobs[row_index] = new_data
-        self.update_job_in_table(new_data)
+        self.source_model.update_job(row_index, new_data)
         
         QMessageBox.information(self, "Success", "Job updated successfully.")
         
@@ -7,9 +7,36 @@ original EPC database script, adapted for use in the workflow optimizer applicat
 
 import os
 import math
+import operator
+import concurrent.futures
+import numpy as np
 import pandas as pd
 import openpyxl
 from datetime import datetime
+from .xlsx_writer import write_epc_database_xlsx, EPC_COLUMN_WIDTHS
+from .epc_schemes import DEFAULT_SCHEME, EPCScheme, get_scheme
+from .template_index import get_template_index
+from .epc_manifest import (
+    describe_db_file, write_manifest, load_manifest, load_resumable_entries, verify_db_file
+)
+
+
+from .sgtin_codec import (
+    SGTIN96_HEADER, SERIAL_BITS, MAX_SERIAL, DEFAULT_COMPANY_PREFIX_LENGTH, DEFAULT_FILTER_VALUE,
+    _HEX_BLOCK_ROWS, get_sgtin96_codec, decode_sgtin96, decode_sgtin96_lanes,
+    prefix_cache_info, clear_prefix_cache,
+    encode_lanes as _encode_lanes, lanes_to_hex as _lanes_to_hex, hex_to_lanes as _hex_to_lanes,
+)
+
+
+# Records each worker process must have to write before generation uses a
+# process pool. A spawned worker re-imports numpy, pandas and openpyxl
+# (most of a second on Windows), about what writing this many records
+# sequentially takes, so smaller jobs stay in this process.
+PARALLEL_MIN_RECORDS_PER_WORKER = 200_000
+
+_UPC_DIGIT_POWERS = 10 ** np.arange(10, -1, -1, dtype=np.int64)
+_UPC12_DIGIT_POWERS = 10 ** np.arange(11, -1, -1, dtype=np.int64)
 
 
 def dec_to_bin(value, length):
@@ -23,29 +50,248 @@ def bin_to_hex(binary_str):
     return hex_str.zfill(len(binary_str) // 4)
 
 
-def generate_epc(upc, serial_number):
+def generate_epc(upc, serial_number, filter_value=DEFAULT_FILTER_VALUE,
+                 company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
     """
     Generate EPC hex value from UPC and serial number.
     
     Args:
-        upc (str): 12-digit UPC code
+        upc (str): 12-digit UPC code (a GTIN-14 is accepted as well)
         serial_number (int): Serial number
+        filter_value (int): SGTIN filter value (0-7)
+        company_prefix_length (int): GS1 company prefix length in digits (6-12)
         
     Returns:
         str: EPC hex value
     """
-    gs1_company_prefix = "0" + upc[:6]
-    item_reference_number = upc[6:11]
-    gtin14 = "0" + gs1_company_prefix + item_reference_number
-    header = "00110000"
-    filter_value = "001"
-    partition = "101"
-    gs1_binary = dec_to_bin(gs1_company_prefix, 24)
-    item_reference_binary = dec_to_bin(item_reference_number, 20)
-    serial_binary = dec_to_bin(serial_number, 38)
-    epc_binary = header + filter_value + partition + gs1_binary + item_reference_binary + serial_binary
-    epc_hex = bin_to_hex(epc_binary)
-    return epc_hex
+    return get_sgtin96_codec(company_prefix_length, filter_value).encode(upc, serial_number)
+
+
+def _epc_prefix_value(upc, filter_value=DEFAULT_FILTER_VALUE,
+                      company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+    """
+    Compute the fixed 58-bit part of an SGTIN-96 EPC for a UPC.
+
+    This is the integer form of header + filter + partition + company prefix
+    + item reference, i.e. everything except the 38-bit serial.
+    """
+    return get_sgtin96_codec(company_prefix_length, filter_value).cached_prefix_value(upc)
+
+
+def generate_epc_for_serials(upc, serial_numbers, filter_value=DEFAULT_FILTER_VALUE,
+                             company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+    """
+    Generate EPC hex values for an arbitrary collection of serial numbers.
+
+    Args:
+        upc (str): 12-digit UPC code
+        serial_numbers (sequence): Serial numbers within the 38-bit range
+        filter_value (int): SGTIN filter value (0-7)
+        company_prefix_length (int): GS1 company prefix length in digits (6-12)
+
+    Returns:
+        numpy.ndarray: EPC hex values (dtype '<U24'), same order as the input
+    """
+    return get_sgtin96_codec(company_prefix_length, filter_value).encode_serials(upc, serial_numbers)
+
+
+def generate_epc_array(upc, start_serial, count, filter_value=DEFAULT_FILTER_VALUE,
+                       company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+    """
+    Generate EPC hex values for a contiguous serial range using NumPy.
+
+    Produces exactly the same strings as calling generate_epc() once per
+    serial, but computes the 96-bit values as integer lanes in bulk.
+
+    Args:
+        upc (str): 12-digit UPC code
+        start_serial (int): First serial number in the range
+        count (int): Number of consecutive serials to encode
+        filter_value (int): SGTIN filter value (0-7)
+        company_prefix_length (int): GS1 company prefix length in digits (6-12)
+
+    Returns:
+        numpy.ndarray: EPC hex values (dtype '<U24')
+    """
+    return get_sgtin96_codec(company_prefix_length, filter_value).encode_range(upc, start_serial, count)
+
+
+class EPCRange:
+    """
+    Immutable, lazily encoded range of consecutive EPCs for one UPC.
+
+    Behaves like a read-only sequence of EPC hex strings without storing any
+    per-item data: indexing, membership and index lookups are O(1), and
+    slicing or splitting returns further EPCRange objects. EPCs are encoded
+    with a registered scheme (see epc_schemes), SGTIN-96 by default.
+
+    Example:
+        epcs = EPCRange("012345678905", 1000, 50000)
+        for roll in epcs.split(lpr):
+            print(roll.first_epc, roll.last_epc)
+    """
+
+    __slots__ = ("_upc", "_start_serial", "_count", "_scheme", "_options", "_key")
+
+    def __init__(self, upc, start_serial, count, scheme=None, scheme_options=None):
+        """
+        Args:
+            upc (str): 12-digit UPC
+            start_serial (int): First serial of the range
+            count (int): Number of EPCs
+            scheme (str or EPCScheme): Registered EPC scheme (default SGTIN-96)
+            scheme_options (dict): Options for the scheme, e.g. filter_value
+        """
+        start_serial = int(start_serial)
+        count = int(count)
+        scheme = scheme if isinstance(scheme, EPCScheme) else get_scheme(scheme)
+        if count < 0:
+            raise ValueError("Count must not be negative")
+        if start_serial < 0 or (count and start_serial + count - 1 > scheme.max_serial):
+            raise ValueError(f"Serial range must lie between 0 and {scheme.max_serial} for {scheme.name}")
+        self._upc = upc
+        self._start_serial = start_serial
+        self._count = count
+        self._scheme = scheme
+        self._options = dict(scheme_options or {})
+        self._key = scheme.reference_key(upc, **self._options)
+
+    @property
+    def upc(self):
+        return self._upc
+
+    @property
+    def scheme(self):
+        return self._scheme
+
+    @property
+    def scheme_options(self):
+        return dict(self._options)
+
+    @property
+    def start_serial(self):
+        return self._start_serial
+
+    @property
+    def end_serial(self):
+        """Last serial in the range (start_serial - 1 when the range is empty)."""
+        return self._start_serial + self._count - 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def first_epc(self):
+        return self[0]
+
+    @property
+    def last_epc(self):
+        return self[-1]
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def _sub_range(self, offset, count):
+        return EPCRange(self._upc, self._start_serial + offset, count, self._scheme, self._options)
+
+    def encode_serials(self, serials):
+        """Encode serials with this range's UPC, scheme and options; returns an array of hex strings."""
+        return self._scheme.encode_serials(self._upc, np.asarray(serials, dtype=np.int64), **self._options)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                raise ValueError("EPCRange slices must be contiguous (step 1)")
+            return self._sub_range(start, max(0, stop - start))
+        return str(self.encode_serials([self.serial_at(operator.index(index))])[0])
+
+    def __iter__(self):
+        for block_start in range(0, self._count, _HEX_BLOCK_ROWS):
+            block_count = min(_HEX_BLOCK_ROWS, self._count - block_start)
+            yield from self._sub_range(block_start, block_count).to_array().tolist()
+
+    def __contains__(self, epc_hex):
+        return self.contains_epc(epc_hex)
+
+    def _identity(self):
+        return (self._scheme.name, self._key, tuple(sorted(self._options.items())),
+                self._start_serial, self._count)
+
+    def __eq__(self, other):
+        if not isinstance(other, EPCRange):
+            return NotImplemented
+        return self._identity() == other._identity()
+
+    def __hash__(self):
+        return hash(self._identity())
+
+    def __repr__(self):
+        return (f"EPCRange(upc={self._upc!r}, start_serial={self._start_serial}, count={self._count}, "
+                f"scheme={self._scheme.name!r})")
+
+    def serial_at(self, index):
+        """Serial number at a position in the range."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("EPCRange index out of range")
+        return self._start_serial + index
+
+    def index_of_epc(self, epc_hex):
+        """
+        Position of an EPC within the range.
+
+        Raises:
+            ValueError: If the EPC is malformed, belongs to another UPC or
+                scheme, or its serial falls outside the range
+        """
+        epc_hex = str(epc_hex).strip().upper()
+        if len(epc_hex) != self._scheme.hex_length:
+            raise ValueError(f"{epc_hex!r} is not a valid {self._scheme.name} EPC")
+        decoded = self._scheme.decode_array(np.array([epc_hex]))
+        if not decoded['valid'][0]:
+            raise ValueError(f"{epc_hex!r} is not a valid {self._scheme.name} EPC")
+        if decoded['key'][0] != self._key:
+            raise ValueError(f"{epc_hex} does not belong to UPC {self._upc}")
+        index = int(decoded['serial'][0]) - self._start_serial
+        if not 0 <= index < self._count:
+            raise ValueError(f"{epc_hex} is outside serials {self._start_serial}-{self.end_serial}")
+        return index
+
+    def contains_epc(self, epc_hex):
+        """True if the EPC is one of the EPCs in this range."""
+        try:
+            self.index_of_epc(epc_hex)
+        except ValueError:
+            return False
+        return True
+
+    def split(self, size):
+        """
+        Split into consecutive sub-ranges of at most `size` EPCs.
+
+        Use the database quantity for per-file ranges or LPR for per-roll
+        ranges; the last sub-range holds the remainder.
+
+        Returns:
+            list: EPCRange objects covering this range in order
+        """
+        if size <= 0:
+            raise ValueError("Split size must be greater than 0")
+        return [self[offset:offset + size] for offset in range(0, self._count, size)]
+
+    def serials(self):
+        """Serial numbers of the range as an int64 array."""
+        return np.arange(self._start_serial, self._start_serial + self._count, dtype=np.int64)
+
+    def to_array(self):
+        """Encode the whole range at once as an array of hex strings."""
+        return self._scheme.encode_range(self._upc, self._start_serial, self._count, **self._options)
 
 
 def hex_to_bin(hex_str):
@@ -62,56 +308,19 @@ def reverse_epc_to_upc_and_serial(epc_hex):
     """
     Reverse EPC hex value back to UPC and serial number.
     
+    Any SGTIN-96 partition and filter value is accepted. GTINs that have no
+    UPC-12 form (non-zero indicator or leading digit) come back as GTIN-14.
+    
     Args:
         epc_hex (str): EPC hex value
         
     Returns:
         tuple: (upc, serial_number) or (None, None) if invalid
     """
-    try:
-        # Convert hex to binary
-        epc_binary = hex_to_bin(epc_hex)
-        
-        # Check if we have enough bits (should be 96 bits total)
-        if len(epc_binary) != 96:
-            return None, None
-        
-        # Extract parts according to EPC structure
-        header = epc_binary[0:8]
-        filter_value = epc_binary[8:11]
-        partition = epc_binary[11:14]
-        gs1_binary = epc_binary[14:38]  # 24 bits
-        item_reference_binary = epc_binary[38:58]  # 20 bits
-        serial_binary = epc_binary[58:96]  # 38 bits
-        
-        # Validate expected values
-        if header != "00110000" or filter_value != "001" or partition != "101":
-            return None, None
-        
-        # Convert binaries back to decimal
-        gs1_company_prefix = bin_to_dec(gs1_binary)
-        item_reference = bin_to_dec(item_reference_binary)
-        serial_number = bin_to_dec(serial_binary)
-        
-        # Reconstruct UPC from GS1 company prefix and item reference
-        # Remove the leading "0" from GS1 company prefix to get original 6 digits
-        gs1_str = str(gs1_company_prefix).zfill(7)[1:]  # Remove leading 0, pad to 6 digits
-        item_ref_str = str(item_reference).zfill(5)  # Pad to 5 digits
-        
-        # Get the check digit (last digit of original UPC)
-        # We need to calculate it since it's not stored in the EPC
-        partial_upc = gs1_str + item_ref_str
-        if len(partial_upc) != 11:
-            return None, None
-        
-        # Calculate check digit
-        check_digit = calculate_upc_check_digit(partial_upc)
-        upc = partial_upc + str(check_digit)
-        
-        return upc, serial_number
-        
-    except Exception:
+    fields = decode_sgtin96(epc_hex)
+    if fields is None:
         return None, None
+    return fields['upc'] or fields['gtin14'], fields['serial']
 
 
 def calculate_upc_check_digit(partial_upc):
@@ -133,10 +342,112 @@ def calculate_upc_check_digit(partial_upc):
     
     total = (odd_sum * 3) + even_sum
     check_digit = (10 - (total % 10)) % 10
-    
+
     return check_digit
 
 
+def calculate_upc_check_digits(partial_upcs):
+    """
+    Vectorized calculate_upc_check_digit for an array of 11-digit partial UPCs.
+
+    Args:
+        partial_upcs (numpy.ndarray): Partial UPCs as integers (0 - 99999999999)
+
+    Returns:
+        numpy.ndarray: Check digits (0-9)
+    """
+    digits = (np.asarray(partial_upcs, dtype=np.int64)[:, None] // _UPC_DIGIT_POWERS) % 10
+    total = digits[:, 0::2].sum(axis=1) * 3 + digits[:, 1::2].sum(axis=1)
+    return (10 - total % 10) % 10
+
+
+def _decode_epc_lanes(hex_array):
+    """Shared bulk decode used by decode_epc_array and summarize_epc_array."""
+    hi, lo, well_formed = _hex_to_lanes(hex_array)
+    fields = decode_sgtin96_lanes(hi, lo)
+    sgtin_header = well_formed & (fields['header'] == SGTIN96_HEADER)
+    # Only GTINs with a UPC-12 form (GTIN-14 starting "00") map to a UPC
+    valid = well_formed & fields['valid'] & (fields['gtin13'] < 10 ** 11)
+
+    partial_upcs = np.where(valid, fields['gtin13'], 0)
+    upc_values = np.where(valid, partial_upcs * 10 + calculate_upc_check_digits(partial_upcs), -1)
+    serials = np.where(valid, fields['serial'], -1)
+    return upc_values, serials, valid, well_formed, sgtin_header
+
+
+def _format_upcs(upc_values):
+    """Render integer UPCs as 12-digit strings; negative values become ''."""
+    upc_values = np.asarray(upc_values, dtype=np.int64)
+    upc_digits = (np.maximum(upc_values, 0)[:, None] // _UPC12_DIGIT_POWERS) % 10
+    upcs = (upc_digits + ord("0")).astype(np.uint8).view("S12").ravel().astype("U12")
+    upcs[upc_values < 0] = ""
+    return upcs
+
+
+def decode_epc_array(hex_array):
+    """
+    Bulk version of reverse_epc_to_upc_and_serial.
+
+    Parses the hex strings into two uint64 lanes, splits company prefix and
+    item reference according to each row's partition and rebuilds the UPCs
+    (including check digits) without a per-row Python round trip.
+
+    Args:
+        hex_array (sequence): EPC hex strings (24 characters each)
+
+    Returns:
+        tuple: (upcs, serials, valid) numpy arrays. Rows that are not a
+               valid SGTIN-96 for this application have upc '' and serial -1.
+    """
+    upc_values, serials, valid, _, _ = _decode_epc_lanes(hex_array)
+    return _format_upcs(upc_values), serials, valid
+
+
+def summarize_epc_array(hex_array):
+    """
+    Count valid, invalid and foreign-header tags in a bulk EPC read.
+
+    A foreign-header tag is a well formed 96-bit EPC whose header is not
+    SGTIN-96 (e.g. another customer's SSCC or GRAI tags in the same read).
+
+    Args:
+        hex_array (sequence): EPC hex strings
+
+    Returns:
+        dict: total, valid, invalid, foreign_header and duplicate counts plus
+              a per-UPC breakdown of the valid tags
+    """
+    upc_values, serials, valid, well_formed, sgtin_header = _decode_epc_lanes(hex_array)
+    foreign_header = well_formed & ~sgtin_header
+
+    valid_upcs = upc_values[valid]
+    valid_serials = serials[valid]
+    upc_counts = {}
+    duplicates = 0
+    if valid_upcs.size:
+        unique_upcs, counts = np.unique(valid_upcs, return_counts=True)
+        upc_counts = dict(zip(_format_upcs(unique_upcs).tolist(), counts.tolist()))
+        order = np.lexsort((valid_serials, valid_upcs))
+        sorted_upcs = valid_upcs[order]
+        sorted_serials = valid_serials[order]
+        duplicates = int(((sorted_upcs[1:] == sorted_upcs[:-1])
+                          & (sorted_serials[1:] == sorted_serials[:-1])).sum())
+
+    total = len(valid)
+    valid_count = int(valid.sum())
+    foreign_count = int(foreign_header.sum())
+    return {
+        'total': total,
+        'valid': valid_count,
+        'invalid': total - valid_count - foreign_count,
+        'foreign_header': foreign_count,
+        'duplicates': duplicates,
+        'upc_counts': upc_counts,
+        'serial_min': int(valid_serials.min()) if valid_serials.size else None,
+        'serial_max': int(valid_serials.max()) if valid_serials.size else None,
+    }
+
+
 def validate_upc_with_round_trip(upc):
     """
     Validate UPC by performing round-trip conversion: UPC -> EPC -> UPC.
@@ -277,7 +588,8 @@ def create_upc_folder_structure(base_path, customer, label_size, po_number, tick
     }
 
 
-def generate_epc_database_files(upc, start_serial, total_qty, qty_per_db, save_location):
+def generate_epc_database_files(upc, start_serial, total_qty, qty_per_db, save_location,
+                                scheme=None, scheme_options=None):
     """
     Generate EPC database files split into chunks.
     
@@ -287,6 +599,8 @@ def generate_epc_database_files(upc, start_serial, total_qty, qty_per_db, save_l
         total_qty (int): Total quantity to generate
         qty_per_db (int): Quantity per database file
         save_location (str): Directory to save files
+        scheme (str): Registered EPC scheme name (default SGTIN-96)
+        scheme_options (dict): Options for the scheme, e.g. filter_value
         
     Returns:
         list: List of created file paths
@@ -294,40 +608,27 @@ def generate_epc_database_files(upc, start_serial, total_qty, qty_per_db, save_l
     if not validate_upc(upc):
         raise ValueError("Invalid UPC format")
     
-    end_serial = start_serial + total_qty - 1
-    num_serials = end_serial - start_serial + 1
-    num_dbs = math.ceil(num_serials / qty_per_db)
-    
     created_files = []
+    manifest_entries = []
     
-    for db_index in range(num_dbs):
-        chunk_start = start_serial + db_index * qty_per_db
-        chunk_end = min(chunk_start + qty_per_db - 1, end_serial)
-        chunk_serial_numbers = list(range(chunk_start, chunk_end + 1))
-        epc_values = [generate_epc(upc, sn) for sn in chunk_serial_numbers]
-
-        df = pd.DataFrame({
-            'UPC': [upc] * len(chunk_serial_numbers),
-            'Serial #': chunk_serial_numbers,
-            'EPC': epc_values
-        })
-
-        start_range = (chunk_start // 1000) + 1 if chunk_start % 1000 == 0 else (chunk_start // 1000)
-        end_range = ((chunk_end + 1) // 1000)
-        file_name = f"{upc}.DB{db_index + 1}.{start_range}K-{end_range}K.xlsx"
+    job_epcs = EPCRange(upc, start_serial, total_qty, scheme, scheme_options)
+    for db_index, db_epcs in enumerate(job_epcs.split(qty_per_db)):
+        file_name = _db_file_name(upc, db_index, db_epcs.start_serial, db_epcs.end_serial)
         file_path = os.path.join(save_location, file_name)
         
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Sheet1')
-            worksheet = writer.sheets['Sheet1']
-            worksheet.column_dimensions['C'].width = 40
+        manifest_entries.append(_write_epc_db_file(
+            upc, db_index, db_epcs.start_serial, db_epcs.end_serial, file_path, scheme, scheme_options
+        ))
 
         created_files.append(file_path)
     
+    write_manifest(save_location, upc, manifest_entries, start_serial, total_qty, qty_per_db,
+                   scheme=job_epcs.scheme.name, scheme_options=scheme_options)
+    
     return created_files
 
 
-def generate_epc_preview_data(upc, start_serial, preview_count=10):
+def generate_epc_preview_data(upc, start_serial, preview_count=10, scheme=None, scheme_options=None):
     """
     Generate preview data for EPC generation.
     
@@ -335,6 +636,8 @@ def generate_epc_preview_data(upc, start_serial, preview_count=10):
         upc (str): 12-digit UPC
         start_serial (int): Starting serial number
         preview_count (int): Number of rows to preview
+        scheme (str): Registered EPC scheme name (default SGTIN-96)
+        scheme_options (dict): Options for the scheme
         
     Returns:
         pandas.DataFrame: Preview data
@@ -342,8 +645,8 @@ def generate_epc_preview_data(upc, start_serial, preview_count=10):
     if not validate_upc(upc):
         raise ValueError("Invalid UPC format")
     
-    serial_numbers = list(range(start_serial, start_serial + preview_count))
-    epc_values = [generate_epc(upc, sn) for sn in serial_numbers]
+    serial_numbers = np.arange(start_serial, start_serial + preview_count, dtype=np.int64)
+    epc_values = _encode_epc_chunk(upc, start_serial, preview_count, scheme, scheme_options)
     
     return pd.DataFrame({
         'UPC': [upc] * len(serial_numbers),
@@ -365,51 +668,18 @@ def get_template_path(template_base_path, customer, label_size):
     Returns:
         str: Full path to template file, or None if not found
     """
-    if not template_base_path or not os.path.exists(template_base_path):
-        return None
-    
-    # Look for label size directory (handle variations in spacing and case)
-    label_size_dir = os.path.join(template_base_path, label_size)
-    
-    if not os.path.exists(label_size_dir):
-        # Try to find label size directory with case-insensitive matching
-        try:
-            for item in os.listdir(template_base_path):
-                item_path = os.path.join(template_base_path, item)
-                if os.path.isdir(item_path) and item.lower().replace(' ', '') == label_size.lower().replace(' ', ''):
-                    label_size_dir = item_path
-                    break
-            else:
-                return None
-        except Exception:
-            return None
-    
-    if not os.path.exists(label_size_dir):
+    if not template_base_path:
         return None
-    
-    # Look for template files in the label size directory
-    try:
-        for filename in os.listdir(label_size_dir):
-            if filename.lower().endswith('.btw'):
-                # Check if the customer name is in the filename
-                if customer.lower() in filename.lower():
-                    return os.path.join(label_size_dir, filename)
-        
-        # If no customer-specific template found, return the first .btw file
-        for filename in os.listdir(label_size_dir):
-            if filename.lower().endswith('.btw'):
-                return os.path.join(label_size_dir, filename)
-                
-    except Exception:
-        pass
-    
-    return None
+    return get_template_index(template_base_path).find_customer_template(customer, label_size)
 
 
 def get_template_path_with_inlay(template_base_path, customer, label_size, inlay_type=None):
     """
     Enhanced template lookup that considers inlay type for better matching.
     
+    Template names are scored by customer words (100 each), inlay type (50)
+    and inlay digits (25) against the cached template index.
+    
     Args:
         template_base_path (str): Base path for templates
         customer (str): Customer name
@@ -419,73 +689,9 @@ def get_template_path_with_inlay(template_base_path, customer, label_size, inlay
     Returns:
         str: Full path to template file, or None if not found
     """
-    if not template_base_path or not os.path.exists(template_base_path):
+    if not template_base_path:
         return None
-    
-    # Look for label size directory (handle variations in spacing and case)
-    label_size_dir = os.path.join(template_base_path, label_size)
-    
-    if not os.path.exists(label_size_dir):
-        # Try to find label size directory with case-insensitive matching
-        try:
-            for item in os.listdir(template_base_path):
-                item_path = os.path.join(template_base_path, item)
-                if os.path.isdir(item_path) and item.lower().replace(' ', '') == label_size.lower().replace(' ', ''):
-                    label_size_dir = item_path
-                    break
-            else:
-                return None
-        except Exception:
-            return None
-    
-    if not os.path.exists(label_size_dir):
-        return None
-    
-    try:
-        template_files = [f for f in os.listdir(label_size_dir) if f.lower().endswith('.btw')]
-        
-        if not template_files:
-            return None
-        
-        # Scoring system for best template match
-        best_score = 0
-        best_template = None
-        
-        for filename in template_files:
-            score = 0
-            filename_lower = filename.lower()
-            
-            # Customer match (highest priority) - check for partial matches
-            customer_words = customer.lower().split()
-            for word in customer_words:
-                if len(word) > 2 and word in filename_lower:  # Skip very short words
-                    score += 100
-            
-            # Inlay type match (medium priority)
-            if inlay_type and inlay_type.lower() in filename_lower:
-                score += 50
-            
-            # Check for specific inlay type numbers that might be in filename
-            if inlay_type:
-                inlay_numbers = ''.join(filter(str.isdigit, inlay_type))
-                if inlay_numbers and inlay_numbers in filename:
-                    score += 25
-            
-            if score > best_score:
-                best_score = score
-                best_template = os.path.join(label_size_dir, filename)
-        
-        # If we found a template with any matching criteria, return it
-        if best_template:
-            return best_template
-        
-        # Otherwise, return the first template file as fallback
-        return os.path.join(label_size_dir, template_files[0])
-        
-    except Exception:
-        pass
-    
-    return None
+    return get_template_index(template_base_path).find_template(customer, label_size, inlay_type)
 
 
 def list_available_templates(template_base_path):
@@ -498,28 +704,9 @@ def list_available_templates(template_base_path):
     Returns:
         dict: Dictionary with label sizes as keys and lists of template files as values
     """
-    templates = {}
-    
-    if not template_base_path or not os.path.exists(template_base_path):
-        return templates
-    
-    try:
-        for item in os.listdir(template_base_path):
-            item_path = os.path.join(template_base_path, item)
-            if os.path.isdir(item_path):
-                template_files = []
-                try:
-                    for filename in os.listdir(item_path):
-                        if filename.lower().endswith('.btw'):
-                            template_files.append(filename)
-                    if template_files:
-                        templates[item] = template_files
-                except Exception:
-                    continue
-    except Exception:
-        pass
-    
-    return templates
+    if not template_base_path:
+        return {}
+    return get_template_index(template_base_path).templates_by_label_size()
 
 
 def populate_customer_dropdown_from_templates(template_base_path):
@@ -532,16 +719,9 @@ def populate_customer_dropdown_from_templates(template_base_path):
     Returns:
         list: List of customer names
     """
-    if not os.path.exists(template_base_path):
+    if not template_base_path:
         return []
-    
-    customers = []
-    for item in os.listdir(template_base_path):
-        item_path = os.path.join(template_base_path, item)
-        if os.path.isdir(item_path):
-            customers.append(item)
-    
-    return sorted(customers)
+    return get_template_index(template_base_path).label_sizes()
 
 
 def populate_label_sizes_for_customer(template_base_path, customer):
@@ -568,11 +748,70 @@ def populate_label_sizes_for_customer(template_base_path, customer):
     return sorted(label_sizes)
 
 
+def _db_file_name(upc, db_index, chunk_start, chunk_end):
+    """Build the database file name for one chunk, e.g. 012345678905.DB1.1K-50K.xlsx."""
+    start_range = (chunk_start // 1000) + 1 if chunk_start % 1000 == 0 else (chunk_start // 1000)
+    end_range = ((chunk_end + 1) // 1000)
+    return f"{upc}.DB{db_index + 1}.{start_range}K-{end_range}K.xlsx"
+
+
+def _encode_epc_chunk(upc, chunk_start, chunk_size, scheme=None, scheme_options=None):
+    """Encode a serial range with the given scheme (SGTIN-96 when none is given)."""
+    if (scheme or DEFAULT_SCHEME) == DEFAULT_SCHEME and not scheme_options:
+        return generate_epc_array(upc, chunk_start, chunk_size)
+    return get_scheme(scheme).encode_range(upc, chunk_start, chunk_size, **(scheme_options or {}))
+
+
+def _epc_column_widths(scheme=None):
+    """Column widths for a database file; longer EPCs get a wider column C."""
+    hex_length = get_scheme(scheme).hex_length
+    if hex_length <= 24:
+        return EPC_COLUMN_WIDTHS
+    return {"C": EPC_COLUMN_WIDTHS["C"] * hex_length // 24}
+
+
+def _write_epc_chunk(upc, chunk_start, chunk_end, file_path, scheme=None, scheme_options=None):
+    """
+    Generate and save one database file.
+
+    Kept at module level so it can be pickled and run in a worker process;
+    the scheme is passed by name for the same reason.
+
+    Returns:
+        str: file_path
+    """
+    chunk_serial_numbers = np.arange(chunk_start, chunk_end + 1, dtype=np.int64)
+    epc_values = _encode_epc_chunk(upc, chunk_start, len(chunk_serial_numbers), scheme, scheme_options)
+    return write_epc_database_xlsx(file_path, upc, chunk_serial_numbers, epc_values,
+                                   column_widths=_epc_column_widths(scheme))
+
+
+def _write_epc_db_file(upc, db_index, chunk_start, chunk_end, file_path, scheme=None, scheme_options=None):
+    """
+    Write one database file and return its manifest entry.
+
+    Hashing happens here as well, so on the process pool it runs in the
+    worker alongside the write.
+
+    Returns:
+        dict: Manifest entry from describe_db_file()
+    """
+    _write_epc_chunk(upc, chunk_start, chunk_end, file_path, scheme, scheme_options)
+    return describe_db_file(file_path, db_index, chunk_start, chunk_end)
+
+
 def generate_epc_database_files_with_progress(upc, start_serial, total_qty, qty_per_db, save_location, 
-                                            progress_callback=None, cancel_check=None):
+                                            progress_callback=None, cancel_check=None, max_workers=None,
+                                            scheme=None, scheme_options=None, resume=False):
     """
     Generate EPC database files with progress reporting and cancellation support.
     
+    The manifest in save_location is rewritten after every finished file, so
+    an interrupted or cancelled run leaves a checkpoint behind. With
+    resume=True the files recorded in a matching checkpoint are verified
+    (row count, size and SHA-256) and kept; only the missing or damaged
+    chunks are generated.
+    
     Args:
         upc (str): 12-digit UPC
         start_serial (int): Starting serial number
@@ -581,9 +820,18 @@ def generate_epc_database_files_with_progress(upc, start_serial, total_qty, qty_
         save_location (str): Directory to save files
         progress_callback (callable): Function to call with (percentage, message) for progress updates
         cancel_check (callable): Function that returns True if generation should be cancelled
+        max_workers (int): Number of worker processes. None or 1 writes the files one
+            after another in this process; 0 uses one worker per CPU core.
+            Fewer workers are started when there are not enough records
+            left for each to write PARALLEL_MIN_RECORDS_PER_WORKER.
+        scheme (str): Registered EPC scheme name (default SGTIN-96)
+        scheme_options (dict): Options for the scheme, e.g. filter_value
+        resume (bool): Continue from the checkpoint of an unfinished run
         
     Returns:
-        list: List of created file paths
+        list: List of created file paths (including files kept from a
+            checkpoint). A manifest.json describing them is written to
+            save_location as well.
     """
     if not validate_upc(upc):
         raise ValueError("Invalid UPC format")
@@ -595,87 +843,305 @@ def generate_epc_database_files_with_progress(upc, start_serial, total_qty, qty_
     num_serials = end_serial - start_serial + 1
     num_dbs = math.ceil(num_serials / qty_per_db)
     
-    created_files = []
+    # Fail on an unknown scheme before any file is written
+    scheme_name = get_scheme(scheme).name
     
-    # Pre-calculate common binary values to optimize performance
-    gs1_company_prefix = "0" + upc[:6]
-    item_reference_number = upc[6:11]
-    header = "00110000"
-    filter_value = "001"
-    partition = "101"
-    gs1_binary = dec_to_bin(gs1_company_prefix, 24)
-    item_reference_binary = dec_to_bin(item_reference_number, 20)
+    # db_index -> manifest entry of every file finished so far
+    completed = {}
+    if resume:
+        completed = load_resumable_entries(save_location, upc, start_serial, total_qty, qty_per_db,
+                                           scheme_name, scheme_options)
+        if completed and progress_callback:
+            progress_callback(int((len(completed) / num_dbs) * 100),
+                              f"Resuming: {len(completed)} of {num_dbs} database files verified")
     
-    # Constants for EPC generation
-    epc_prefix = header + filter_value + partition + gs1_binary + item_reference_binary
+    def save_checkpoint(complete=False):
+        write_manifest(save_location, upc, list(completed.values()), start_serial, total_qty, qty_per_db,
+                       scheme=scheme_name, scheme_options=scheme_options, complete=complete)
+    
+    # Mark the folder as unfinished before the first file is touched
+    save_checkpoint()
+    
+    if max_workers == 0:
+        max_workers = os.cpu_count() or 1
+    remaining = num_dbs - len(completed)
+    remaining_records = sum(min(qty_per_db, num_serials - db_index * qty_per_db)
+                            for db_index in range(num_dbs) if db_index not in completed)
+    workers = min(max_workers or 1, remaining, remaining_records // PARALLEL_MIN_RECORDS_PER_WORKER)
+    if workers > 1:
+        _generate_epc_database_files_parallel(
+            upc, start_serial, end_serial, qty_per_db, num_dbs, save_location,
+            workers, progress_callback, cancel_check,
+            scheme, scheme_options, completed, save_checkpoint
+        )
+        save_checkpoint(complete=len(completed) == num_dbs)
+        return [os.path.join(save_location, completed[db_index]['file']) for db_index in sorted(completed)]
     
     if progress_callback:
-        progress_callback(0, f"Starting generation of {num_dbs} database files...")
+        progress_callback(int((len(completed) / num_dbs) * 100),
+                          f"Starting generation of {remaining} of {num_dbs} database files...")
     
     for db_index in range(num_dbs):
         if cancel_check and cancel_check():
             if progress_callback:
                 progress_callback(0, "Generation cancelled")
             break
+        
+        if db_index in completed:
+            continue
             
         chunk_start = start_serial + db_index * qty_per_db
         chunk_end = min(chunk_start + qty_per_db - 1, end_serial)
         chunk_size = chunk_end - chunk_start + 1
         
+        # Progress counts finished files, so it never goes back when a resume
+        # fills in an earlier chunk after later ones were verified
         if progress_callback:
-            overall_progress = int((db_index / num_dbs) * 100)
+            overall_progress = int((len(completed) / num_dbs) * 100)
             progress_callback(overall_progress, f"Generating database {db_index + 1} of {num_dbs} ({chunk_size:,} records)...")
         
-        # Generate EPCs in batches for better performance
-        chunk_serial_numbers = list(range(chunk_start, chunk_end + 1))
-        epc_values = generate_epc_batch_optimized(epc_prefix, chunk_serial_numbers, 
-                                                progress_callback, cancel_check, 
-                                                db_index, num_dbs)
+        # Generate the whole chunk of EPCs in one vectorized pass
+        chunk_serial_numbers = np.arange(chunk_start, chunk_end + 1, dtype=np.int64)
+        epc_values = _encode_epc_chunk(upc, chunk_start, chunk_size, scheme, scheme_options)
         
         if cancel_check and cancel_check():
             break
         
-        # Create DataFrame
-        df = pd.DataFrame({
-            'UPC': [upc] * len(chunk_serial_numbers),
-            'Serial #': chunk_serial_numbers,
-            'EPC': epc_values
-        })
-
-        # Generate filename
-        start_range = (chunk_start // 1000) + 1 if chunk_start % 1000 == 0 else (chunk_start // 1000)
-        end_range = ((chunk_end + 1) // 1000)
-        file_name = f"{upc}.DB{db_index + 1}.{start_range}K-{end_range}K.xlsx"
+        file_name = _db_file_name(upc, db_index, chunk_start, chunk_end)
         file_path = os.path.join(save_location, file_name)
         
         if progress_callback:
-            save_progress = int(((db_index + 0.8) / num_dbs) * 100)
+            save_progress = int(((len(completed) + 0.8) / num_dbs) * 100)
             progress_callback(save_progress, f"Saving database {db_index + 1}: {file_name}")
         
-        # Save Excel file with optimizations
-        try:
-            with pd.ExcelWriter(file_path, engine='openpyxl', options={'write_only': True}) as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-                # Note: write_only mode doesn't support column width adjustment for performance
-        except Exception as e:
-            # Fallback to standard mode if write_only fails
-            with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Sheet1')
-                worksheet = writer.sheets['Sheet1']
-                worksheet.column_dimensions['C'].width = 40
+        # Stream the sheet straight into the .xlsx archive
+        write_epc_database_xlsx(file_path, upc, chunk_serial_numbers, epc_values,
+                                column_widths=_epc_column_widths(scheme))
 
-        created_files.append(file_path)
+        completed[db_index] = describe_db_file(file_path, db_index, chunk_start, chunk_end)
+        save_checkpoint()
         
         if progress_callback:
-            completion_progress = int(((db_index + 1) / num_dbs) * 100)
+            completion_progress = int((len(completed) / num_dbs) * 100)
             progress_callback(completion_progress, f"Completed database {db_index + 1} of {num_dbs}")
     
+    save_checkpoint(complete=len(completed) == num_dbs)
+    created_files = [os.path.join(save_location, completed[db_index]['file']) for db_index in sorted(completed)]
+    
     if progress_callback and not (cancel_check and cancel_check()):
         progress_callback(100, f"Generation complete! Created {len(created_files)} database files.")
     
     return created_files
 
 
+def _generate_epc_database_files_parallel(upc, start_serial, end_serial, qty_per_db, num_dbs,
+                                          save_location, max_workers, progress_callback, cancel_check,
+                                          scheme=None, scheme_options=None, completed=None, checkpoint=None):
+    """
+    Write the database files on a process pool, one chunk per task.
+
+    Progress is reported as files complete. When cancel_check() turns True the
+    chunks that have not started are cancelled; files already being written
+    are allowed to finish and are included in the result.
+
+    Args:
+        completed (dict): db_index -> manifest entry of files that already
+            exist; those chunks are skipped and new entries are added to it
+        checkpoint (callable): Called after every finished file
+
+    Returns:
+        list: Manifest entries of all finished files in database order
+    """
+    if completed is None:
+        completed = {}
+    remaining = num_dbs - len(completed)
+
+    if progress_callback:
+        progress_callback(int((len(completed) / num_dbs) * 100),
+                          f"Starting generation of {remaining} of {num_dbs} database files "
+                          f"on {max_workers} workers...")
+
+    cancelled = False
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        for db_index in range(num_dbs):
+            if db_index in completed:
+                continue
+            chunk_start = start_serial + db_index * qty_per_db
+            chunk_end = min(chunk_start + qty_per_db - 1, end_serial)
+            file_path = os.path.join(save_location, _db_file_name(upc, db_index, chunk_start, chunk_end))
+            future = executor.submit(_write_epc_db_file, upc, db_index, chunk_start, chunk_end,
+                                     file_path, scheme, scheme_options)
+            pending[future] = db_index
+
+        try:
+            while pending:
+                if not cancelled and cancel_check and cancel_check():
+                    cancelled = True
+                    for future in pending:
+                        future.cancel()
+                    if progress_callback:
+                        progress_callback(0, "Generation cancelled")
+
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    db_index = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    completed[db_index] = future.result()
+                    if checkpoint:
+                        checkpoint()
+                    if progress_callback and not cancelled:
+                        progress_callback(
+                            int((len(completed) / num_dbs) * 100),
+                            f"Completed database {db_index + 1} of {num_dbs} "
+                            f"({len(completed)}/{num_dbs} done)"
+                        )
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    if progress_callback and not cancelled:
+        progress_callback(100, f"Generation complete! Created {len(completed)} database files.")
+
+    return [completed[db_index] for db_index in sorted(completed)]
+
+
+def epc_chunk_layout(upc, start_serial, total_qty, qty_per_db):
+    """
+    List the database chunks of a job.
+
+    Returns:
+        list: (db_index, chunk_start, chunk_end, file_name) per DB file
+    """
+    end_serial = start_serial + total_qty - 1
+    layout = []
+    for db_index in range(math.ceil(total_qty / qty_per_db)):
+        chunk_start = start_serial + db_index * qty_per_db
+        chunk_end = min(chunk_start + qty_per_db - 1, end_serial)
+        layout.append((db_index, chunk_start, chunk_end, _db_file_name(upc, db_index, chunk_start, chunk_end)))
+    return layout
+
+
+def plan_epc_regeneration(save_location, upc, start_serial, total_qty, qty_per_db,
+                          scheme=None, scheme_options=None, previous=None):
+    """
+    Work out which database files an edit to a job actually changes.
+
+    The current files are described by the manifest in save_location. Data
+    folders written before manifests existed have none; there `previous`
+    (a dict with 'upc', 'start_serial', 'total_qty' and 'qty_per_db') gives
+    the old layout and its files are matched by name.
+
+    A file is kept only if its chunk has the same UPC, scheme, serial range
+    and file name in the new layout and, when a manifest is available, its
+    size and SHA-256 still match.
+
+    Returns:
+        dict: 'keep' (db_index -> manifest entry, None if there was no manifest),
+              'write' (chunks from epc_chunk_layout() to generate),
+              'delete' (file names of orphaned chunks) and
+              'touched' (existing file names that will be overwritten or deleted)
+    """
+    scheme_name = get_scheme(scheme).name
+    manifest = load_manifest(save_location) if os.path.isdir(save_location) else None
+
+    # file name -> (upc, scheme, options, chunk_start, chunk_end, manifest entry)
+    old_files = {}
+    if manifest:
+        for entry in manifest.get('files', []):
+            old_files[entry['file']] = (
+                manifest.get('upc'), manifest.get('scheme'), manifest.get('scheme_options') or {},
+                entry['start_serial'], entry['end_serial'], entry
+            )
+    elif previous:
+        for _, chunk_start, chunk_end, file_name in epc_chunk_layout(
+                previous['upc'], int(previous['start_serial']),
+                int(previous['total_qty']), int(previous['qty_per_db'])):
+            old_files[file_name] = (previous['upc'], previous.get('scheme') or DEFAULT_SCHEME,
+                                    previous.get('scheme_options') or {}, chunk_start, chunk_end, None)
+
+    layout = epc_chunk_layout(upc, start_serial, total_qty, qty_per_db)
+    keep = {}
+    write = []
+    for chunk in layout:
+        db_index, chunk_start, chunk_end, file_name = chunk
+        old = old_files.get(file_name)
+        unchanged = (
+            old is not None
+            and old[:5] == (upc, scheme_name, scheme_options or {}, chunk_start, chunk_end)
+            and os.path.exists(os.path.join(save_location, file_name))
+            and (old[5] is None or verify_db_file(save_location, old[5], chunk_start, chunk_end))
+        )
+        if unchanged:
+            keep[db_index] = old[5]
+        else:
+            write.append(chunk)
+
+    # Old files whose name is not part of the new layout are orphans
+    layout_names = {chunk[3] for chunk in layout}
+    delete = sorted(name for name in old_files
+                    if name not in layout_names and os.path.exists(os.path.join(save_location, name)))
+    touched = sorted(set(delete) | {chunk[3] for chunk in write
+                                    if os.path.exists(os.path.join(save_location, chunk[3]))})
+
+    return {'keep': keep, 'write': write, 'delete': delete, 'touched': touched}
+
+
+def apply_epc_regeneration(plan, save_location, upc, start_serial, total_qty, qty_per_db,
+                           scheme=None, scheme_options=None, progress_callback=None, cancel_check=None):
+    """
+    Carry out a plan from plan_epc_regeneration() and rewrite the manifest.
+
+    Returns:
+        list: Paths of all database files of the job after the update, or
+            None if cancel_check() stopped it part way
+    """
+    scheme_name = get_scheme(scheme).name
+    os.makedirs(save_location, exist_ok=True)
+
+    layout = epc_chunk_layout(upc, start_serial, total_qty, qty_per_db)
+    completed = {}
+    for db_index, entry in plan['keep'].items():
+        if entry is None:
+            # Kept file from before manifests existed: describe it now
+            _, chunk_start, chunk_end, file_name = layout[db_index]
+            entry = describe_db_file(os.path.join(save_location, file_name), db_index, chunk_start, chunk_end)
+        completed[db_index] = entry
+
+    def save_checkpoint(complete=False):
+        write_manifest(save_location, upc, list(completed.values()), start_serial, total_qty, qty_per_db,
+                       scheme=scheme_name, scheme_options=scheme_options, complete=complete)
+
+    total_steps = len(plan['write']) + len(plan['delete'])
+    for step, (db_index, chunk_start, chunk_end, file_name) in enumerate(plan['write']):
+        if cancel_check and cancel_check():
+            save_checkpoint()
+            return None
+        if progress_callback:
+            progress_callback(int(step / max(total_steps, 1) * 100),
+                              f"Writing {file_name} ({chunk_end - chunk_start + 1:,} records)")
+        completed[db_index] = _write_epc_db_file(upc, db_index, chunk_start, chunk_end,
+                                                 os.path.join(save_location, file_name),
+                                                 scheme, scheme_options)
+
+    for file_name in plan['delete']:
+        file_path = os.path.join(save_location, file_name)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"Removed orphaned EPC database file: {file_name}")
+
+    save_checkpoint(complete=True)
+    if progress_callback:
+        progress_callback(100, f"Wrote {len(plan['write'])} database files, kept {len(plan['keep'])}, "
+                               f"removed {len(plan['delete'])}")
+    return [os.path.join(save_location, completed[db_index]['file']) for db_index in sorted(completed)]
+
+
 def generate_epc_batch_optimized(epc_prefix, serial_numbers, progress_callback=None, 
                                cancel_check=None, db_index=0, total_dbs=1):
     """
@@ -695,6 +1161,7 @@ def generate_epc_batch_optimized(epc_prefix, serial_numbers, progress_callback=N
     epc_values = []
     batch_size = 1000  # Process in smaller batches for progress updates
     total_serials = len(serial_numbers)
+    epc_prefix_value = int(epc_prefix, 2)
     
     for i in range(0, total_serials, batch_size):
         if cancel_check and cancel_check():
@@ -703,14 +1170,9 @@ def generate_epc_batch_optimized(epc_prefix, serial_numbers, progress_callback=N
         batch_end = min(i + batch_size, total_serials)
         batch = serial_numbers[i:batch_end]
         
-        # Generate EPCs for this batch
-        for serial in batch:
-            if cancel_check and cancel_check():
-                break
-            serial_binary = dec_to_bin(serial, 38)
-            epc_binary = epc_prefix + serial_binary
-            epc_hex = bin_to_hex(epc_binary)
-            epc_values.append(epc_hex)
+        # Generate EPCs for this batch with integer lanes instead of binary strings
+        hi, lo = _encode_lanes(epc_prefix_value, batch)
+        epc_values.extend(_lanes_to_hex(hi, lo).tolist())
         
         # Update progress within the current database
         if progress_callback and total_serials > batch_size:
@@ -734,17 +1196,6 @@ def generate_epc_optimized(upc, serial_number):
     Returns:
         str: EPC hex value
     """
-    # Pre-calculate parts that don't change for the same UPC
-    gs1_company_prefix = "0" + upc[:6]
-    item_reference_number = upc[6:11]
-    header = "00110000"
-    filter_value = "001"
-    partition = "101"
-    gs1_binary = dec_to_bin(gs1_company_prefix, 24)
-    item_reference_binary = dec_to_bin(item_reference_number, 20)
-    
-    # Only calculate the changing part
-    serial_binary = dec_to_bin(serial_number, 38)
-    epc_binary = header + filter_value + partition + gs1_binary + item_reference_binary + serial_binary
-    epc_hex = bin_to_hex(epc_binary)
-    return epc_hex 
\ No newline at end of file
+    # The codec for the default partition/filter is cached, so this is the
+    # same fast path as generate_epc()
+    return generate_epc(upc, serial_number)
@@ -0,0 +1,326 @@
+"""
+EPC Database Manifest
+
+Every generation run writes a manifest.json next to its DB files that lists
+each file's serial range, row count, byte size and SHA-256. The manifest
+answers "which file and row holds serial N" with a binary search, without
+opening any .xlsx, and lets later runs verify the files on disk.
+
+While a run is in progress the manifest is rewritten after every finished
+file with "complete": false, so it doubles as the checkpoint that an
+interrupted run is resumed from.
+"""
+
+import os
+import json
+import bisect
+import hashlib
+from datetime import datetime
+
+
+MANIFEST_FILE_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Spreadsheet row of the first serial in a DB file (row 1 is the header)
+FIRST_DATA_ROW = 2
+
+# How deep to look below a job folder for data/manifest.json
+_MANIFEST_SEARCH_DEPTH = 3
+
+# manifest path -> (mtime_ns, size, manifest, sorted start serials)
+_manifest_cache = {}
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """Return the hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def describe_db_file(file_path, db_index, start_serial, end_serial):
+    """
+    Build the manifest entry for one DB file that has just been written.
+
+    Args:
+        file_path (str): Path of the .xlsx file
+        db_index (int): 0-based position of the file in the job
+        start_serial (int): First serial in the file
+        end_serial (int): Last serial in the file
+
+    Returns:
+        dict: Manifest entry
+    """
+    return {
+        'file': os.path.basename(file_path),
+        'db_index': db_index,
+        'start_serial': int(start_serial),
+        'end_serial': int(end_serial),
+        'rows': int(end_serial) - int(start_serial) + 1,
+        'bytes': os.path.getsize(file_path),
+        'sha256': file_sha256(file_path),
+    }
+
+
+def manifest_path_for(save_location):
+    """Path of the manifest that belongs to a data folder."""
+    return os.path.join(save_location, MANIFEST_FILE_NAME)
+
+
+def write_manifest(save_location, upc, entries, start_serial, total_qty, qty_per_db,
+                   scheme=None, scheme_options=None, complete=True):
+    """
+    Write manifest.json for a data folder.
+
+    The file is written to a temporary name and moved into place so a reader
+    never sees a half-written manifest.
+
+    Args:
+        save_location (str): Folder holding the DB files
+        upc (str): UPC the files were generated for
+        entries (list): describe_db_file() entries, any order
+        start_serial (int): First serial of the job
+        total_qty (int): Number of serials in the job
+        qty_per_db (int): Serials per DB file
+        scheme (str): EPC scheme name
+        scheme_options (dict): Options the scheme was encoded with
+        complete (bool): False when generation stopped before the last file
+
+    Returns:
+        str: Path of the manifest
+    """
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'upc': upc,
+        'scheme': scheme or "SGTIN-96",
+        'scheme_options': scheme_options or {},
+        'start_serial': int(start_serial),
+        'total_qty': int(total_qty),
+        'qty_per_db': int(qty_per_db),
+        'complete': bool(complete),
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'files': sorted(entries, key=lambda entry: entry['start_serial']),
+    }
+
+    manifest_path = manifest_path_for(save_location)
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, manifest_path)
+    _manifest_cache.pop(manifest_path, None)
+    return manifest_path
+
+
+def _cached_manifest(manifest_path):
+    """Load a manifest and its start-serial index, reusing it while the file is unchanged."""
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        _manifest_cache.pop(manifest_path, None)
+        return None, None
+
+    cached = _manifest_cache.get(manifest_path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2], cached[3]
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read EPC manifest {manifest_path}: {e}")
+        return None, None
+
+    files = sorted(manifest.get('files', []), key=lambda entry: entry['start_serial'])
+    manifest['files'] = files
+    starts = [entry['start_serial'] for entry in files]
+    _manifest_cache[manifest_path] = (stat.st_mtime_ns, stat.st_size, manifest, starts)
+    return manifest, starts
+
+
+def load_manifest(location):
+    """
+    Load the manifest of a data folder (or a manifest.json path).
+
+    Returns:
+        dict: The manifest, or None if there is none
+    """
+    if os.path.isdir(location):
+        location = manifest_path_for(location)
+    manifest, _ = _cached_manifest(location)
+    return manifest
+
+
+def find_manifest_paths(job):
+    """
+    Find the manifests that belong to a job.
+
+    Args:
+        job: A job data dict (data_folder_path / upc_folder_path /
+            job_folder_path are used), a data folder, a job folder or a
+            manifest.json path
+
+    Returns:
+        list: Existing manifest paths
+    """
+    if isinstance(job, dict):
+        candidates = [job.get('data_folder_path')]
+        if job.get('upc_folder_path'):
+            candidates.append(os.path.join(job['upc_folder_path'], 'data'))
+        candidates.append(job.get('job_folder_path'))
+    else:
+        candidates = [job]
+
+    found = []
+    for candidate in candidates:
+        if not candidate:
+            continue
+        if os.path.isfile(candidate):
+            found.append(candidate)
+            continue
+        if not os.path.isdir(candidate):
+            continue
+        direct = manifest_path_for(candidate)
+        if os.path.isfile(direct):
+            found.append(direct)
+            continue
+        # A job folder: look for <upc>/data/manifest.json below it
+        base_depth = candidate.rstrip(os.sep).count(os.sep)
+        for root, dirs, files in os.walk(candidate):
+            if MANIFEST_FILE_NAME in files:
+                found.append(os.path.join(root, MANIFEST_FILE_NAME))
+            if root.count(os.sep) - base_depth >= _MANIFEST_SEARCH_DEPTH:
+                dirs[:] = []
+
+    # Keep order, drop duplicates
+    return list(dict.fromkeys(os.path.normpath(path) for path in found))
+
+
+def locate_serial_in_manifest(manifest_path, serial):
+    """
+    Find the DB file and spreadsheet row of a serial using one manifest.
+
+    Returns:
+        tuple: (file_path, row) with row being the 1-based spreadsheet row,
+            or None if the serial is not in any file of this manifest
+    """
+    manifest, starts = _cached_manifest(manifest_path)
+    if not manifest or not starts:
+        return None
+
+    position = bisect.bisect_right(starts, serial) - 1
+    if position < 0:
+        return None
+    entry = manifest['files'][position]
+    if serial > entry['end_serial']:
+        return None
+
+    file_path = os.path.join(os.path.dirname(manifest_path), entry['file'])
+    return file_path, FIRST_DATA_ROW + serial - entry['start_serial']
+
+
+def locate_serial(job, serial, upc=None):
+    """
+    Find which DB file and row of a job holds a serial number.
+
+    Args:
+        job: Job data dict or folder, see find_manifest_paths()
+        serial (int): Serial number to look up
+        upc (str): Only consider manifests generated for this UPC
+
+    Returns:
+        tuple: (file_path, row) with row being the 1-based spreadsheet row,
+            or None if no manifest of the job covers the serial
+    """
+    serial = int(serial)
+    for manifest_path in find_manifest_paths(job):
+        if upc:
+            manifest = load_manifest(manifest_path)
+            if not manifest or manifest.get('upc') != upc:
+                continue
+        location = locate_serial_in_manifest(manifest_path, serial)
+        if location:
+            return location
+    return None
+
+
+def _same_layout(manifest, upc, start_serial, total_qty, qty_per_db, scheme, scheme_options):
+    """True if a manifest was written for exactly this job layout."""
+    return (
+        manifest.get('upc') == upc
+        and manifest.get('start_serial') == int(start_serial)
+        and manifest.get('total_qty') == int(total_qty)
+        and manifest.get('qty_per_db') == int(qty_per_db)
+        and manifest.get('scheme') == (scheme or "SGTIN-96")
+        and (manifest.get('scheme_options') or {}) == (scheme_options or {})
+    )
+
+
+def find_unfinished_checkpoint(save_location, upc=None, start_serial=None, total_qty=None,
+                               qty_per_db=None, scheme=None, scheme_options=None):
+    """
+    Return the manifest of an interrupted run in a data folder.
+
+    When the job layout is given, a checkpoint left by a run with a
+    different UPC, serial range, chunk size or scheme is ignored.
+
+    Returns:
+        dict: The unfinished manifest, or None
+    """
+    manifest = load_manifest(save_location) if os.path.isdir(save_location) else None
+    if not manifest or manifest.get('complete', True):
+        return None
+    if upc is not None and not _same_layout(manifest, upc, start_serial, total_qty,
+                                            qty_per_db, scheme, scheme_options):
+        return None
+    return manifest
+
+
+def verify_db_file(save_location, entry, expected_start, expected_end):
+    """
+    Check a checkpointed DB file against the chunk it should hold.
+
+    The recorded range and row count must match the expected chunk, and the
+    file on disk must have the recorded size and SHA-256.
+    """
+    rows = expected_end - expected_start + 1
+    if (entry.get('start_serial') != expected_start or entry.get('end_serial') != expected_end
+            or entry.get('rows') != rows):
+        return False
+    file_path = os.path.join(save_location, entry['file'])
+    try:
+        if os.path.getsize(file_path) != entry.get('bytes'):
+            return False
+        return file_sha256(file_path) == entry.get('sha256')
+    except OSError:
+        return False
+
+
+def load_resumable_entries(save_location, upc, start_serial, total_qty, qty_per_db,
+                           scheme=None, scheme_options=None):
+    """
+    Collect the files of an interrupted run that can be kept.
+
+    Returns:
+        dict: db_index -> manifest entry for every file that verified; empty
+            if there is no matching checkpoint
+    """
+    manifest = find_unfinished_checkpoint(save_location, upc, start_serial, total_qty,
+                                          qty_per_db, scheme, scheme_options)
+    if not manifest:
+        return {}
+
+    end_serial = int(start_serial) + int(total_qty) - 1
+    verified = {}
+    for entry in manifest['files']:
+        db_index = entry.get('db_index')
+        if db_index is None:
+            continue
+        chunk_start = int(start_serial) + db_index * int(qty_per_db)
+        chunk_end = min(chunk_start + int(qty_per_db) - 1, end_serial)
+        if verify_db_file(save_location, entry, chunk_start, chunk_end):
+            verified[db_index] = entry
+        else:
+            print(f"Checkpointed file {entry.get('file')} failed verification and will be regenerated")
+    return verified
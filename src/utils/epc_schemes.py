@@ -0,0 +1,571 @@
+"""
+EPC Scheme Registry
+
+Pluggable EPC encoding schemes (SGTIN-96, SGTIN-198, SSCC-96, GRAI-96).
+Every scheme encodes and decodes in bulk over NumPy uint64 "lanes": a
+96-bit EPC lives in two lanes and a 198-bit EPC (52 hex characters,
+padded to a 16-bit word) in four. Fields are packed into and extracted
+from the lanes with the same generic bit packer, so no scheme falls back
+to building per-item binary strings.
+
+Each scheme derives its identifiers from the job's UPC, matching how the
+application already derives the SGTIN company prefix and item reference:
+
+    SGTIN-96 / SGTIN-198  GTIN from the UPC, serial = job serial
+    SSCC-96               company prefix from the UPC, serial reference
+                          = extension digit + job serial
+    GRAI-96               company prefix and asset type from the UPC,
+                          serial = job serial
+
+Usage:
+    scheme, options = scheme_from_job_data(job_data)
+    epcs = scheme.encode_range(upc, start_serial, count, **options)
+"""
+
+import numpy as np
+
+from .sgtin_codec import (
+    SERIAL_BITS, MAX_SERIAL, DEFAULT_COMPANY_PREFIX_LENGTH, DEFAULT_FILTER_VALUE,
+    get_sgtin96_codec, normalize_gtin, gtin_check_digit,
+    gtin_check_digits, hex_to_lanes, decode_sgtin_prefix, decode_sgtin96_lanes,
+    _HEX_DIGITS, _HEX_VALUES, _HEX_BLOCK_ROWS,
+)
+
+
+DEFAULT_SCHEME = "SGTIN-96"
+
+# Job data fields the schemes read their encoding options from
+SCHEME_OPTION_FIELDS = ('EPC Filter Value', 'Company Prefix Length', 'Extension Digit')
+
+# Partition tables: partition -> (company prefix bits, company prefix digits,
+#                                 second field bits, second field digits)
+SSCC_PARTITION_TABLE = {
+    0: (40, 12, 18, 5),
+    1: (37, 11, 21, 6),
+    2: (34, 10, 24, 7),
+    3: (30, 9, 28, 8),
+    4: (27, 8, 31, 9),
+    5: (24, 7, 34, 10),
+    6: (20, 6, 38, 11),
+}
+GRAI_PARTITION_TABLE = {
+    0: (40, 12, 4, 0),
+    1: (37, 11, 7, 1),
+    2: (34, 10, 10, 2),
+    3: (30, 9, 14, 3),
+    4: (27, 8, 17, 4),
+    5: (24, 7, 20, 5),
+    6: (20, 6, 24, 6),
+}
+
+
+# --- Generic multi-lane bit packer ------------------------------------------
+
+def lane_count(hex_length):
+    """Number of uint64 lanes needed to hold an EPC of hex_length characters."""
+    return -(-hex_length * 4 // 64)
+
+
+def _field_position(offset, width, hex_length, lanes):
+    """Locate a field given as (offset from the EPC's first bit, width)."""
+    lsb = hex_length * 4 - offset - width
+    return lanes - 1 - lsb // 64, lsb % 64
+
+
+def pack_field(lanes, values, offset, width, hex_length):
+    """
+    OR a field of up to 64 bits into a (rows, lanes) uint64 matrix in place.
+
+    Args:
+        lanes (numpy.ndarray): uint64 matrix, most significant lane first
+        values (int or numpy.ndarray): Field values (scalar or one per row)
+        offset (int): Bit offset of the field from the EPC's first (header) bit
+        width (int): Field width in bits
+        hex_length (int): EPC length in hex characters (sets the padding)
+    """
+    lane, shift = _field_position(offset, width, hex_length, lanes.shape[1])
+    values = np.asarray(values, dtype=np.uint64)
+    lanes[:, lane] |= values << np.uint64(shift)
+    if shift + width > 64:
+        lanes[:, lane - 1] |= values >> np.uint64(64 - shift)
+
+
+def extract_field(lanes, offset, width, hex_length):
+    """Read a field of up to 64 bits out of a (rows, lanes) uint64 matrix."""
+    lane, shift = _field_position(offset, width, hex_length, lanes.shape[1])
+    values = lanes[:, lane] >> np.uint64(shift)
+    if shift + width > 64:
+        values = values | (lanes[:, lane - 1] << np.uint64(64 - shift))
+    if width < 64:
+        values = values & np.uint64((1 << width) - 1)
+    return values
+
+
+def lanes_to_hex_strings(lanes, hex_length):
+    """Render a (rows, lanes) uint64 matrix as uppercase hex strings of hex_length."""
+    count, lane_total = lanes.shape
+    positions = (hex_length - 1 - np.arange(hex_length)) * 4
+    lane_index = lane_total - 1 - positions // 64
+    shifts = (positions % 64).astype(np.uint64)
+    ascii_rows = np.empty((count, hex_length), dtype=np.uint8)
+    for block_start in range(0, count, _HEX_BLOCK_ROWS):
+        block = slice(block_start, min(block_start + _HEX_BLOCK_ROWS, count))
+        ascii_rows[block] = _HEX_DIGITS[(lanes[block][:, lane_index] >> shifts) & np.uint64(0xF)]
+    return ascii_rows.view(f"S{hex_length}").ravel().astype(f"U{hex_length}")
+
+
+def hex_strings_to_lanes(hex_array, hex_length):
+    """
+    Parse hex strings into a (rows, lanes) uint64 matrix.
+
+    Returns:
+        tuple: (lanes, well_formed) - well_formed marks rows that were exactly
+               hex_length hex characters (others are all zero)
+    """
+    values = np.char.strip(np.asarray(hex_array, dtype=str))
+    count = len(values)
+    total_nibbles = lane_count(hex_length) * 16
+    well_formed = np.char.str_len(values) == hex_length
+
+    # Read the UTF-32 code points straight out of the string buffer
+    width = values.dtype.itemsize // 4
+    usable = min(width, hex_length)
+    codes = np.zeros((count, hex_length), dtype=np.uint32)
+    codes[:, :usable] = values.view(np.uint32).reshape(count, width)[:, :usable]
+    nibbles = _HEX_VALUES[np.minimum(codes, 0xFF)]
+    well_formed &= (nibbles != 0xFF).all(axis=1)
+    nibbles[~well_formed] = 0
+
+    # Right-align the nibbles in whole lanes, pack pairs into bytes and
+    # reinterpret them as big-endian words
+    padded = np.zeros((count, total_nibbles), dtype=np.uint8)
+    padded[:, total_nibbles - hex_length:] = nibbles
+    packed = (padded[:, 0::2] << 4) | padded[:, 1::2]
+    return packed.view(">u8").astype(np.uint64), well_formed
+
+
+def _format_keys(values, digit_counts):
+    """
+    Render integer identifiers as zero-padded digit strings.
+
+    Only the distinct (value, width) pairs are formatted in Python, which
+    keeps bulk decodes fast since a read log rarely holds many products.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    digit_counts = np.broadcast_to(np.asarray(digit_counts, dtype=np.int64), values.shape)
+    keys = np.full(values.shape, "", dtype="U20")
+    present = values >= 0
+    if present.any():
+        # Identifiers stay below 10^14, so value and width fit in one int64
+        packed = values[present] * 32 + digit_counts[present]
+        unique_packed, inverse = np.unique(packed, return_inverse=True)
+        formatted = np.array([str(value // 32).zfill(value % 32) for value in unique_packed.tolist()],
+                             dtype="U20")
+        keys[present] = formatted[inverse.ravel()]
+    return keys
+
+
+# --- Schemes ----------------------------------------------------------------
+
+class EPCScheme:
+    """
+    Base class for an EPC encoding scheme.
+
+    Subclasses implement encode_serials() and decode_array(); everything
+    works on NumPy arrays so a whole database file is encoded in one call.
+    """
+
+    name = None
+    header = None
+    epc_bits = 96
+    hex_length = 24
+    max_serial = MAX_SERIAL
+    # Hex digits of reserved (always zero) bits after the serial
+    reserved_tail_hex = 0
+
+    def options_from_job_data(self, job_data):
+        """Pick this scheme's encoding options out of a job's data."""
+        options = {}
+        if job_data.get('EPC Filter Value') not in (None, ''):
+            options['filter_value'] = int(job_data['EPC Filter Value'])
+        if job_data.get('Company Prefix Length') not in (None, ''):
+            options['company_prefix_length'] = int(job_data['Company Prefix Length'])
+        return options
+
+    def _check_serials(self, serials):
+        serials = np.asarray(serials, dtype=np.int64)
+        if serials.size and (serials.min() < 0 or serials.max() > self.max_serial):
+            raise ValueError(f"{self.name} serial numbers must be between 0 and {self.max_serial:,}")
+        return serials
+
+    def encode_range(self, upc, start_serial, count, **options):
+        """Encode a contiguous serial range; returns an array of hex strings."""
+        if count < 0:
+            raise ValueError("Count must not be negative")
+        serials = np.arange(start_serial, start_serial + count, dtype=np.int64)
+        return self.encode_serials(upc, serials, **options)
+
+    def encode_serials(self, upc, serial_numbers, **options):
+        raise NotImplementedError
+
+    def decode_array(self, hex_array):
+        """
+        Decode hex EPCs in bulk.
+
+        Returns:
+            dict: 'key' (identifier string the tag belongs to, '' if invalid),
+                  'serial' (int64, -1 if invalid) and 'valid' (bool) arrays
+        """
+        raise NotImplementedError
+
+    def reference_key(self, upc, **options):
+        """The 'key' decode_array() reports for tags encoded from this UPC."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<EPCScheme {self.name}>"
+
+
+class SGTIN96Scheme(EPCScheme):
+    """SGTIN-96: GTIN + 38-bit numeric serial (the application's default)."""
+
+    name = "SGTIN-96"
+    header = 0x30
+
+    def encode_serials(self, upc, serial_numbers, filter_value=DEFAULT_FILTER_VALUE,
+                       company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+        codec = get_sgtin96_codec(company_prefix_length, filter_value)
+        return codec.encode_serials(upc, self._check_serials(serial_numbers))
+
+    def encode_range(self, upc, start_serial, count, filter_value=DEFAULT_FILTER_VALUE,
+                     company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+        return get_sgtin96_codec(company_prefix_length, filter_value).encode_range(upc, start_serial, count)
+
+    def decode_array(self, hex_array):
+        hi, lo, well_formed = hex_to_lanes(hex_array)
+        fields = decode_sgtin96_lanes(hi, lo)
+        valid = well_formed & fields['valid']
+        gtin13 = np.where(valid, fields['gtin13'], 0)
+        gtin14 = np.where(valid, gtin13 * 10 + gtin_check_digits(gtin13, 13), -1)
+        return {
+            'key': _format_keys(gtin14, 14),
+            'serial': np.where(valid, fields['serial'], -1),
+            'valid': valid,
+        }
+
+    def reference_key(self, upc, **options):
+        return normalize_gtin(upc)
+
+
+class SGTIN198Scheme(EPCScheme):
+    """
+    SGTIN-198: GTIN + alphanumeric serial of up to 20 7-bit characters.
+
+    Job serials are numeric, so they are written as their decimal digits.
+    The 198 bits are padded to 208 (52 hex characters).
+    """
+
+    name = "SGTIN-198"
+    header = 0x36
+    epc_bits = 198
+    hex_length = 52
+    max_serial = 10 ** 18 - 1
+
+    _SERIAL_OFFSET = 58
+    _SERIAL_CHARS = 20
+    _DIGIT_POWERS = 10 ** np.arange(19, -1, -1, dtype=np.uint64)
+
+    def encode_serials(self, upc, serial_numbers, filter_value=DEFAULT_FILTER_VALUE,
+                       company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+        serials = self._check_serials(serial_numbers).astype(np.uint64)
+        count = len(serials)
+        # Same 58-bit prefix as SGTIN-96, just with the SGTIN-198 header
+        prefix = get_sgtin96_codec(company_prefix_length, filter_value).prefix_value(upc)
+        prefix = (prefix & ((1 << 50) - 1)) | (self.header << 50)
+
+        lanes = np.zeros((count, lane_count(self.hex_length)), dtype=np.uint64)
+        pack_field(lanes, prefix, 0, 58, self.hex_length)
+
+        # Left-aligned decimal digits as 7-bit ASCII, zero padded to 20 characters
+        padded_digits = (serials[:, None] // self._DIGIT_POWERS) % np.uint64(10)
+        leading_zeros = (padded_digits != 0).argmax(axis=1)
+        digit_count = np.where(serials == 0, 1, self._SERIAL_CHARS - leading_zeros)
+        positions = np.arange(self._SERIAL_CHARS)
+        source = np.minimum(positions[None, :] + (self._SERIAL_CHARS - digit_count)[:, None],
+                            self._SERIAL_CHARS - 1)
+        chars = np.take_along_axis(padded_digits, source, axis=1) + np.uint64(ord("0"))
+        chars[positions[None, :] >= digit_count[:, None]] = 0
+        for position in range(self._SERIAL_CHARS):
+            pack_field(lanes, chars[:, position], self._SERIAL_OFFSET + 7 * position, 7, self.hex_length)
+        return lanes_to_hex_strings(lanes, self.hex_length)
+
+    def decode_array(self, hex_array):
+        lanes, well_formed = hex_strings_to_lanes(hex_array, self.hex_length)
+        fields = decode_sgtin_prefix(extract_field(lanes, 0, 58, self.hex_length), self.header)
+
+        chars = np.stack([extract_field(lanes, self._SERIAL_OFFSET + 7 * position, 7, self.hex_length)
+                          for position in range(self._SERIAL_CHARS)], axis=1).astype(np.int64)
+        used = chars != 0
+        digit_count = used.sum(axis=1)
+        positions = np.arange(self._SERIAL_CHARS)[None, :]
+        numeric = ((used == (positions < digit_count[:, None])).all(axis=1)
+                   & ((~used) | ((chars >= ord("0")) & (chars <= ord("9")))).all(axis=1)
+                   & (digit_count > 0) & (digit_count <= 18)
+                   & ((chars[:, 0] != ord("0")) | (digit_count == 1)))
+        serials = np.zeros(len(chars), dtype=np.int64)
+        for position in range(self._SERIAL_CHARS):
+            take = position < digit_count
+            serials = np.where(take, serials * 10 + (chars[:, position] - ord("0")), serials)
+
+        valid = well_formed & fields['valid'] & numeric
+        gtin13 = np.where(valid, fields['gtin13'], 0)
+        gtin14 = np.where(valid, gtin13 * 10 + gtin_check_digits(gtin13, 13), -1)
+        return {
+            'key': _format_keys(gtin14, 14),
+            'serial': np.where(valid, serials, -1),
+            'valid': valid,
+        }
+
+    def reference_key(self, upc, **options):
+        return normalize_gtin(upc)
+
+
+class _PartitionedScheme(EPCScheme):
+    """
+    Shared layout for SSCC-96 and GRAI-96: header, filter, partition, then a
+    58-bit (SSCC) or 44-bit (GRAI) field holding the company prefix and a
+    second partition-dependent field.
+    """
+
+    partition_table = None
+    combined_bits = None
+
+    def __init__(self):
+        self._second_bits_lut = np.array(
+            [self.partition_table[p][2] for p in range(7)] + [0], dtype=np.uint64)
+        self._company_limit_lut = np.array(
+            [10 ** self.partition_table[p][1] for p in range(7)] + [0], dtype=np.int64)
+        self._second_limit_lut = np.array(
+            [10 ** self.partition_table[p][3] for p in range(7)] + [0], dtype=np.int64)
+        self._partition_by_length = {digits: partition
+                                     for partition, (_, digits, _, _) in self.partition_table.items()}
+
+    def _layout(self, company_prefix_length):
+        if company_prefix_length not in self._partition_by_length:
+            raise ValueError("GS1 company prefix length must be between 6 and 12 digits")
+        partition = self._partition_by_length[company_prefix_length]
+        return (partition,) + self.partition_table[partition]
+
+    @staticmethod
+    def _check_filter(filter_value):
+        if not 0 <= filter_value <= 7:
+            raise ValueError("Filter value must be between 0 and 7")
+
+    def _split_combined(self, lanes):
+        """Read header/filter/partition and split the combined field per row."""
+        header = extract_field(lanes, 0, 8, self.hex_length)
+        partition = extract_field(lanes, 11, 3, self.hex_length).astype(np.intp)
+        combined = extract_field(lanes, 14, self.combined_bits, self.hex_length)
+        second_bits = self._second_bits_lut[partition]
+        second = (combined & ((np.uint64(1) << second_bits) - np.uint64(1))).astype(np.int64)
+        company = (combined >> second_bits).astype(np.int64)
+        valid = ((header == self.header)
+                 & (partition < 7)
+                 & (company < self._company_limit_lut[partition])
+                 & (second < self._second_limit_lut[partition]))
+        return partition, company, second, valid
+
+
+class SSCC96Scheme(_PartitionedScheme):
+    """
+    SSCC-96: company prefix + serial reference (extension digit first).
+
+    The job serial fills the serial reference after the extension digit, so
+    with the default 7-digit prefix up to 999,999,999 cartons are available.
+    """
+
+    name = "SSCC-96"
+    header = 0x31
+    partition_table = SSCC_PARTITION_TABLE
+    combined_bits = 58
+    reserved_tail_hex = 6
+
+    def options_from_job_data(self, job_data):
+        options = super().options_from_job_data(job_data)
+        if job_data.get('Extension Digit') not in (None, ''):
+            options['extension_digit'] = int(job_data['Extension Digit'])
+        return options
+
+    def encode_serials(self, upc, serial_numbers, filter_value=0,
+                       company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH, extension_digit=0):
+        self._check_filter(filter_value)
+        if not 0 <= extension_digit <= 9:
+            raise ValueError("Extension digit must be between 0 and 9")
+        partition, company_bits, company_digits, serial_ref_bits, serial_ref_digits = \
+            self._layout(company_prefix_length)
+        serial_limit = 10 ** (serial_ref_digits - 1)
+        serials = self._check_serials(serial_numbers)
+        if serials.size and serials.max() >= serial_limit:
+            raise ValueError(f"SSCC-96 serials must be below {serial_limit:,} "
+                             f"with a {company_prefix_length}-digit company prefix")
+
+        company_prefix = int(normalize_gtin(upc)[1:1 + company_digits])
+        lanes = np.zeros((len(serials), lane_count(self.hex_length)), dtype=np.uint64)
+        pack_field(lanes, (self.header << 6) | (filter_value << 3) | partition, 0, 14, self.hex_length)
+        pack_field(lanes, company_prefix, 14, company_bits, self.hex_length)
+        pack_field(lanes, serials.astype(np.uint64) + np.uint64(extension_digit * serial_limit),
+                   14 + company_bits, serial_ref_bits, self.hex_length)
+        # The remaining 24 bits are reserved and stay zero
+        return lanes_to_hex_strings(lanes, self.hex_length)
+
+    def decode_array(self, hex_array):
+        lanes, well_formed = hex_strings_to_lanes(hex_array, self.hex_length)
+        partition, company, serial_ref, valid = self._split_combined(lanes)
+        valid &= well_formed & (extract_field(lanes, 72, 24, self.hex_length) == 0)
+
+        company_digits = np.array([self.partition_table[p][1] for p in range(7)] + [0])[partition]
+        serial_limit = np.array([10 ** (self.partition_table[p][3] - 1) for p in range(7)] + [1],
+                                dtype=np.int64)[partition]
+        extension = serial_ref // serial_limit
+        key_values = np.where(valid, extension * 10 ** company_digits.astype(np.int64) + company, -1)
+        return {
+            'key': _format_keys(key_values, company_digits + 1),
+            'serial': np.where(valid, serial_ref % serial_limit, -1),
+            'valid': valid,
+        }
+
+    def reference_key(self, upc, company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH,
+                      extension_digit=0, **options):
+        return str(extension_digit) + normalize_gtin(upc)[1:1 + company_prefix_length]
+
+
+class GRAI96Scheme(_PartitionedScheme):
+    """
+    GRAI-96: company prefix + asset type + 38-bit numeric serial.
+
+    The asset type is taken from the UPC digits that follow the company
+    prefix, i.e. the same digits the SGTIN item reference uses.
+    """
+
+    name = "GRAI-96"
+    header = 0x33
+    partition_table = GRAI_PARTITION_TABLE
+    combined_bits = 44
+
+    def _fixed_prefix(self, upc, filter_value, company_prefix_length):
+        self._check_filter(filter_value)
+        partition, _, company_digits, asset_bits, _ = self._layout(company_prefix_length)
+        gtin14 = normalize_gtin(upc)
+        company_prefix = int(gtin14[1:1 + company_digits])
+        asset_type = int(gtin14[1 + company_digits:13] or 0)
+        return ((self.header << 50) | (filter_value << 47) | (partition << 44)
+                | (company_prefix << asset_bits) | asset_type)
+
+    def encode_serials(self, upc, serial_numbers, filter_value=0,
+                       company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH):
+        serials = self._check_serials(serial_numbers).astype(np.uint64)
+        lanes = np.zeros((len(serials), lane_count(self.hex_length)), dtype=np.uint64)
+        pack_field(lanes, self._fixed_prefix(upc, filter_value, company_prefix_length),
+                   0, 58, self.hex_length)
+        pack_field(lanes, serials, 58, SERIAL_BITS, self.hex_length)
+        return lanes_to_hex_strings(lanes, self.hex_length)
+
+    def decode_array(self, hex_array):
+        lanes, well_formed = hex_strings_to_lanes(hex_array, self.hex_length)
+        partition, company, asset_type, valid = self._split_combined(lanes)
+        valid &= well_formed
+
+        asset_digits = np.array([self.partition_table[p][3] for p in range(7)] + [0],
+                                dtype=np.int64)[partition]
+        # GRAI = "0" + company prefix + asset type + check digit (13 digits before check)
+        body = np.where(valid, company * 10 ** asset_digits + asset_type, 0)
+        key_values = np.where(valid, body * 10 + gtin_check_digits(body, 13), -1)
+        return {
+            'key': _format_keys(key_values, 14),
+            'serial': np.where(valid, extract_field(lanes, 58, SERIAL_BITS, self.hex_length).astype(np.int64), -1),
+            'valid': valid,
+        }
+
+    def reference_key(self, upc, company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH, **options):
+        gtin14 = normalize_gtin(upc)
+        body = "0" + gtin14[1:13]
+        return body + str(gtin_check_digit(body))
+
+
+# --- Registry ---------------------------------------------------------------
+
+EPC_SCHEMES = {}
+
+
+def register_scheme(scheme):
+    """Add a scheme instance to the registry (keyed by its name)."""
+    EPC_SCHEMES[scheme.name] = scheme
+    return scheme
+
+
+for _scheme in (SGTIN96Scheme(), SGTIN198Scheme(), SSCC96Scheme(), GRAI96Scheme()):
+    register_scheme(_scheme)
+
+
+def list_schemes():
+    """Names of all registered schemes, default first."""
+    return [DEFAULT_SCHEME] + sorted(name for name in EPC_SCHEMES if name != DEFAULT_SCHEME)
+
+
+def get_scheme(name=None):
+    """
+    Look up a registered scheme.
+
+    Raises:
+        ValueError: If no scheme with that name is registered
+    """
+    name = name or DEFAULT_SCHEME
+    try:
+        return EPC_SCHEMES[name]
+    except KeyError:
+        raise ValueError(f"Unknown EPC scheme '{name}'. Available: {', '.join(list_schemes())}")
+
+
+def scheme_from_job_data(job_data):
+    """
+    Pick the scheme and its options for a job.
+
+    Jobs created before schemes existed have no 'EPC Scheme' entry and get
+    SGTIN-96 with the default options.
+
+    Returns:
+        tuple: (scheme, options dict for encode_range/encode_serials)
+    """
+    job_data = job_data or {}
+    scheme = get_scheme(job_data.get('EPC Scheme') or DEFAULT_SCHEME)
+    return scheme, scheme.options_from_job_data(job_data)
+
+
+def detect_scheme(epc_hex):
+    """Identify the registered scheme of an EPC from its header and length; None if unknown."""
+    epc_hex = str(epc_hex).strip()
+    try:
+        header = int(epc_hex[:2], 16)
+    except ValueError:
+        return None
+    for scheme in EPC_SCHEMES.values():
+        if scheme.header == header and scheme.hex_length == len(epc_hex):
+            return scheme
+    return None
+
+
+def detect_scheme_counts(hex_array):
+    """Count the EPCs in a read per registered scheme (plus 'Unknown')."""
+    values = np.char.upper(np.char.strip(np.asarray(hex_array, dtype=str)))
+    headers = values.astype("U2")
+    lengths = np.char.str_len(values)
+    counts = {}
+    matched = np.zeros(len(values), dtype=bool)
+    for scheme in EPC_SCHEMES.values():
+        hits = (headers == f"{scheme.header:02X}") & (lengths == scheme.hex_length)
+        if hits.any():
+            counts[scheme.name] = int(hits.sum())
+            matched |= hits
+    if (~matched).any():
+        counts['Unknown'] = int((~matched).sum())
+    return counts
@@ -0,0 +1,73 @@
+"""
+Cross-Process File Locking
+
+Exclusive locks on files shared between workstations, used by the serial
+number ledgers and the job change journal. Locks are taken on a sidecar
+.lock file next to the file they protect, so they also cover creating or
+replacing it.
+
+Uses msvcrt on Windows and fcntl elsewhere. Where neither is available the
+lock is skipped and callers carry on unlocked.
+"""
+
+import time
+import platform
+from contextlib import contextmanager
+
+# Import file locking modules based on platform
+try:
+    if platform.system() == "Windows":
+        import msvcrt
+    else:
+        import fcntl
+except ImportError:
+    print("Warning: File locking not available on this platform")
+
+
+def lock_file(file_handle):
+    """Lock file for exclusive access (cross-platform)."""
+    try:
+        if platform.system() == "Windows":
+            # Windows file locking
+            while True:
+                try:
+                    msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except IOError:
+                    time.sleep(0.01)  # Wait 10ms and retry
+        else:
+            # Unix-like file locking
+            fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX)
+    except (NameError, AttributeError):
+        # File locking not available, continue without it
+        pass
+
+
+def unlock_file(file_handle):
+    """Unlock file (cross-platform)."""
+    try:
+        if platform.system() == "Windows":
+            msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
+    except (NameError, AttributeError):
+        # File locking not available, continue without it
+        pass
+
+
+@contextmanager
+def sidecar_lock(path: str):
+    """
+    Hold the cross-process lock for a file.
+
+    Args:
+        path (str): File to protect; the lock is taken on path + '.lock'
+    """
+    with open(path + '.lock', 'a+') as lock_handle:
+        lock_handle.seek(0)
+        lock_file(lock_handle)
+        try:
+            yield
+        finally:
+            lock_handle.seek(0)
+            unlock_file(lock_handle)
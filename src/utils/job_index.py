@@ -0,0 +1,408 @@
+"""
+Job Index
+
+Persistent index of the job_data.json files below the active jobs source
+folder and the archive folder. The Jobs tab, the dashboard, the archive
+page and the global search all read their jobs from here instead of each
+walking the folders and parsing every file.
+
+The index is an SQLite database next to the other app data. Every job is
+stored with its source path, the file's mtime and size, the fields the
+tables and filters use, and the full job data as JSON. scan() finds the
+job folders with find_job_files(), which stats each folder's job_data.json
+and stops descending at each job folder, and only re-reads files whose
+(mtime, size) changed; rows of
+files that are gone are dropped. Readers can list the last known jobs before
+any scan, so a table with thousands of archived jobs fills immediately and
+is brought up to date in the background.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+JOB_DATA_FILE_NAME = "job_data.json"
+INDEX_SCHEMA_VERSION = 1
+
+# Index roots
+ACTIVE = "active"
+ARCHIVE = "archive"
+
+# Folders scanned at the same time; on a network share most of a scan is
+# waiting for directory listings, so this is about overlapping round trips
+SCAN_WORKERS = 8
+
+# Chunks of top-level folders per scan worker; a few each, so one slow
+# customer folder does not hold up the rest of the scan
+SCAN_CHUNKS_PER_WORKER = 4
+
+# Key added to each job dict for the folder it was loaded from
+FOLDER_PATH_KEYS = {
+    ACTIVE: "active_source_folder_path",
+    ARCHIVE: "job_folder_path",
+}
+
+# Fields the global search matches against
+SEARCH_FIELDS = (
+    "Customer", "Part#", "Job Ticket#", "Ticket#", "PO#", "Inlay Type", "Label Size",
+    "Quantity", "Qty", "Status", "UPC Number", "Serial Number", "Due Date",
+    "dateArchived", "archivedDate", "Item", "LPR", "Rolls",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS jobs (
+    path TEXT PRIMARY KEY,
+    root_kind TEXT NOT NULL,
+    root TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    top_level INTEGER NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    customer TEXT, part_number TEXT, ticket_number TEXT, po_number TEXT,
+    inlay_type TEXT, label_size TEXT, quantity INTEGER, due_date TEXT,
+    status TEXT, upc TEXT, date_archived TEXT,
+    search_text TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_root ON jobs (root_kind, top_level);
+CREATE INDEX IF NOT EXISTS jobs_customer ON jobs (root_kind, customer);
+"""
+
+
+def _parse_quantity(value):
+    try:
+        return int(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_job_fields(job_data: Dict) -> Dict:
+    """
+    Pull the indexed fields out of a job dict.
+
+    Old jobs use "Job Ticket#" and "Qty"; the newer names win when both
+    are present.
+    """
+    return {
+        'customer': job_data.get("Customer", ""),
+        'part_number': job_data.get("Part#", ""),
+        'ticket_number': job_data.get("Ticket#") or job_data.get("Job Ticket#", ""),
+        'po_number': job_data.get("PO#", ""),
+        'inlay_type': job_data.get("Inlay Type", ""),
+        'label_size': job_data.get("Label Size", ""),
+        'quantity': _parse_quantity(job_data.get("Quantity", job_data.get("Qty"))),
+        'due_date': job_data.get("Due Date", ""),
+        'status': job_data.get("Status", ""),
+        'upc': job_data.get("UPC Number", ""),
+        'date_archived': job_data.get("dateArchived") or job_data.get("archivedDate", ""),
+        'search_text': " ".join(str(job_data.get(field)) for field in SEARCH_FIELDS
+                                if job_data.get(field)).lower(),
+    }
+
+
+_NORMALIZED_COLUMNS = tuple(normalize_job_fields({}).keys())
+
+
+def _scan_job_subtree(folder: str, cancelled=None) -> Tuple[List[Tuple[str, os.stat_result]], int]:
+    """
+    Find the job folders below folder, depth first.
+
+    A folder holding a job_data.json is a job folder: it is recorded and
+    not descended into, so its data, print and roll tracker folders are
+    never listed. Each folder is first probed with a stat of its
+    job_data.json, so a job folder costs one stat instead of a listing.
+
+    Returns:
+        tuple: ([(job_data.json path, stat), ...], directories listed)
+    """
+    found = []
+    listed = 0
+    pending = [folder]
+    while pending:
+        if cancelled is not None and cancelled():
+            break
+        current = pending.pop()
+        job_path = os.path.join(current, JOB_DATA_FILE_NAME)
+        try:
+            found.append((job_path, os.stat(job_path)))
+            continue
+        except OSError:
+            pass
+
+        try:
+            with os.scandir(current) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        listed += 1
+
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    pending.append(entry.path)
+            except OSError:
+                continue
+    return found, listed
+
+
+def _scan_job_subtrees(folders: List[str], cancelled=None) -> Tuple[List[Tuple[str, os.stat_result]], int]:
+    """_scan_job_subtree() over several folders, one after the other."""
+    found = []
+    listed = 0
+    for folder in folders:
+        folder_found, folder_listed = _scan_job_subtree(folder, cancelled)
+        found.extend(folder_found)
+        listed += folder_listed
+    return found, listed
+
+
+def find_job_files(root: str, cancelled=None, max_workers: int = SCAN_WORKERS):
+    """
+    Find every job_data.json below root.
+
+    Uses the known layout (customer / label size / job folder in the active
+    tree, job folders directly in the archive): descent stops at the first
+    folder that has a job_data.json. The subtrees of root's folders are
+    scanned on a thread pool so that round trips to a network share overlap;
+    they are handed out in chunks, since in the flat archive each subtree is
+    a single job folder.
+
+    Args:
+        root (str): Active jobs source folder or archive folder
+        cancelled (callable): Returns True to stop early
+        max_workers (int): Subtrees scanned at the same time
+
+    Returns:
+        tuple: ([(job_data.json path, stat), ...], directories listed)
+    """
+    try:
+        with os.scandir(root) as entries:
+            entries = list(entries)
+    except OSError:
+        return [], 0
+
+    found = []
+    listed = 1
+    subtrees = []
+    for entry in entries:
+        try:
+            if entry.name == JOB_DATA_FILE_NAME and entry.is_file():
+                found.append((entry.path, entry.stat()))
+            elif entry.is_dir():
+                subtrees.append(entry.path)
+        except OSError:
+            continue
+    if found:
+        # root itself is a job folder
+        return found, listed
+
+    chunk_size = max(1, len(subtrees) // (max_workers * SCAN_CHUNKS_PER_WORKER))
+    chunks = [subtrees[start:start + chunk_size] for start in range(0, len(subtrees), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for chunk_found, chunk_listed in pool.map(lambda chunk: _scan_job_subtrees(chunk, cancelled), chunks):
+            found.extend(chunk_found)
+            listed += chunk_listed
+    return found, listed
+
+
+class JobIndex:
+    """SQLite index of the jobs in the active and archive folders."""
+
+    def __init__(self, index_path: str):
+        """
+        Args:
+            index_path (str): SQLite file for the index
+        """
+        self.index_path = index_path
+        self._lock = threading.Lock()          # database access
+        self._scan_lock = threading.Lock()     # one scan at a time
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(index_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        row = None
+        try:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.DatabaseError:
+            pass
+        if row is not None and int(row['value']) != INDEX_SCHEMA_VERSION:
+            # Built by another version: start over, it is only a cache
+            for table in ('jobs', 'meta'):
+                self._db.execute(f"DROP TABLE IF EXISTS {table}")
+        self._db.executescript(_SCHEMA)
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                         (str(INDEX_SCHEMA_VERSION),))
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- Scanning ---
+
+    def _upsert(self, kind: str, root: str, path: str, stat, job_data: Dict):
+        folder = os.path.dirname(path)
+        fields = normalize_job_fields(job_data)
+        self._db.execute(
+            "INSERT OR REPLACE INTO jobs (path, root_kind, root, folder, top_level, mtime_ns, size, "
+            + ", ".join(_NORMALIZED_COLUMNS) + ", data) VALUES (?, ?, ?, ?, ?, ?, ?"
+            + ", ?" * len(_NORMALIZED_COLUMNS) + ", ?)",
+            (path, kind, root, folder,
+             int(os.path.normpath(os.path.dirname(folder)) == os.path.normpath(root)),
+             stat.st_mtime_ns, stat.st_size,
+             *(fields[column] for column in _NORMALIZED_COLUMNS),
+             json.dumps(job_data)))
+
+    def scan(self, kind: str, root: str, cancelled=None) -> int:
+        """
+        Bring the index up to date with one folder.
+
+        The folder is walked without holding the database lock, so queries
+        keep answering from the previous state while a scan runs.
+
+        Args:
+            kind (str): ACTIVE or ARCHIVE
+            root (str): Folder to scan
+            cancelled (callable): Returns True to stop early; nothing is
+                written then
+
+        Returns:
+            int: Number of jobs added, changed or removed
+        """
+        with self._scan_lock:
+            with self._lock:
+                known = {row['path']: (row['mtime_ns'], row['size']) for row in self._db.execute(
+                    "SELECT path, mtime_ns, size FROM jobs WHERE root_kind = ? AND root = ?", (kind, root))}
+
+            job_files, _ = find_job_files(root, cancelled)
+            if cancelled is not None and cancelled():
+                return 0
+
+            updates = []
+            seen = set()
+            for path, stat in job_files:
+                seen.add(path)
+                if known.get(path) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        job_data = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error loading job from {path}: {e}")
+                    seen.discard(path)  # drop the stale row, like a missing file
+                    continue
+                if isinstance(job_data, dict):
+                    updates.append((path, stat, job_data))
+
+            removed = set(known) - seen
+            with self._lock:
+                try:
+                    # Rows of another folder of this kind are from before a settings change
+                    changed = self._db.execute("DELETE FROM jobs WHERE root_kind = ? AND root != ?",
+                                               (kind, root)).rowcount
+                    for path, stat, job_data in updates:
+                        self._upsert(kind, root, path, stat, job_data)
+                    for path in removed:
+                        self._db.execute("DELETE FROM jobs WHERE path = ?", (path,))
+                    self._db.commit()
+                except Exception:
+                    self._db.rollback()
+                    raise
+
+            return changed + len(updates) + len(removed)
+
+    # --- Queries ---
+
+    def _rows_to_jobs(self, rows) -> List[Dict]:
+        jobs = []
+        for row in rows:
+            job_data = json.loads(row['data'])
+            job_data[FOLDER_PATH_KEYS[row['root_kind']]] = row['folder']
+            jobs.append(job_data)
+        return jobs
+
+    def jobs(self, kind: str, top_level_only: bool = False, exclude_status: str = None) -> List[Dict]:
+        """
+        List the indexed jobs of one root, without touching the folders.
+
+        Args:
+            kind (str): ACTIVE or ARCHIVE
+            top_level_only (bool): Only jobs whose folder sits directly in the root
+            exclude_status (str): Leave out jobs with this Status
+
+        Returns:
+            list: Job dicts with the folder path key for the root kind set
+        """
+        query = "SELECT root_kind, folder, data FROM jobs WHERE root_kind = ?"
+        params = [kind]
+        if top_level_only:
+            query += " AND top_level = 1"
+        if exclude_status is not None:
+            query += " AND status IS NOT ?"
+            params.append(exclude_status)
+        query += " ORDER BY path"
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return self._rows_to_jobs(rows)
+
+    def search(self, terms: str, kind: str, top_level_only: bool = False) -> List[Dict]:
+        """
+        Find jobs whose SEARCH_FIELDS contain every word of terms.
+
+        Args:
+            terms (str): Search words; empty matches every job
+            kind (str): ACTIVE or ARCHIVE
+            top_level_only (bool): Only jobs whose folder sits directly in the root
+
+        Returns:
+            list: Matching job dicts
+        """
+        query = "SELECT root_kind, folder, data FROM jobs WHERE root_kind = ?"
+        params = [kind]
+        if top_level_only:
+            query += " AND top_level = 1"
+        for word in terms.lower().split():
+            query += " AND instr(search_text, ?) > 0"
+            params.append(word)
+        query += " ORDER BY path"
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return self._rows_to_jobs(rows)
+
+    def job_count(self, kind: str = None) -> int:
+        with self._lock:
+            if kind is None:
+                return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            return self._db.execute("SELECT COUNT(*) FROM jobs WHERE root_kind = ?", (kind,)).fetchone()[0]
+
+
+# Global instance for application-wide use
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index(index_path: str = None) -> JobIndex:
+    """
+    Get the shared job index.
+
+    Args:
+        index_path (str): Index file (used when the index is first opened);
+            defaults to config.JOB_INDEX_FILE
+
+    Returns:
+        JobIndex: Global job index
+    """
+    global _job_index
+    with _job_index_lock:
+        if _job_index is None:
+            if index_path is None:
+                import src.config as config
+                index_path = config.JOB_INDEX_FILE
+            _job_index = JobIndex(index_path)
+        return _job_index
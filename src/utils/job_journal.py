@@ -0,0 +1,262 @@
+"""
+Job Change Journal
+
+Append-only log of job changes, kept in the active jobs source folder, so
+workstations on a network drive can follow each other's changes by reading
+one small file instead of walking the job tree.
+
+job_changes.jsonl starts with a fixed-width header line (like the serial
+ledgers) that holds next_seq and the journal's id, followed by one JSON
+line per change:
+
+    {"seq": 42, "op": "created", "area": "active", "time": ..., "user": ...,
+     "machine": ..., "writer": ..., "job": {...}}
+
+op is created, updated, archived or deleted; area is the tree the change
+happened in, ACTIVE or ARCHIVE (see job_index). An update that changed the
+job's ticket or moved its folder also carries "previous_key", the job's
+key before the change, so readers can drop the old row. Sequence numbers go
+up by one per entry. Writers append under a lock on a sidecar .lock file and then
+rewrite the header in place.
+
+When the journal grows past MAX_JOURNAL_BYTES the next writer rotates it:
+the file is renamed to job_changes.jsonl.1 and started again with a new id,
+carrying on the sequence numbers. Readers remember a position (journal id,
+offset, next seq). read_changes() only stats the file until it changes,
+then reads the new lines. If the journal was rotated or an entry is missing,
+it tells the reader to rescan the job tree instead.
+"""
+
+import os
+import json
+import uuid
+import platform
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .job_index import ACTIVE
+from .file_lock import sidecar_lock
+
+
+JOURNAL_FILE_NAME = "job_changes.jsonl"
+JOURNAL_VERSION = 1
+
+# Width of the header line including its newline
+HEADER_SIZE = 256
+
+# Size at which the next writer starts a new journal
+MAX_JOURNAL_BYTES = 4 * 1024 * 1024
+
+JOB_CHANGE_OPS = ("created", "updated", "archived", "deleted")
+
+# Identifies this process's entries, so it can skip its own changes
+WRITER_ID = f"{os.getenv('COMPUTERNAME', platform.node() or 'unknown')}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def _encode_header(header):
+    text = json.dumps(header, separators=(',', ':'))
+    if len(text) >= HEADER_SIZE:
+        raise ValueError(f"Journal header is longer than {HEADER_SIZE - 1} bytes")
+    return (text.ljust(HEADER_SIZE - 1) + "\n").encode("utf-8")
+
+
+class JobJournal:
+    """The change journal of one active jobs source folder."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): Active jobs source folder
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, JOURNAL_FILE_NAME)
+
+    def _create(self, next_seq: int):
+        """Start a new, empty journal (caller holds the lock)."""
+        header = {
+            'type': 'header',
+            'version': JOURNAL_VERSION,
+            'journal_id': uuid.uuid4().hex[:12],
+            'first_seq': next_seq,
+            'next_seq': next_seq,
+            'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(_encode_header(header))
+        os.replace(temp_path, self.path)
+
+    def read_header(self) -> Dict:
+        with open(self.path, 'rb') as f:
+            return json.loads(f.read(HEADER_SIZE).decode("utf-8"))
+
+    # --- Writing ---
+
+    def append(self, op: str, job_data: Dict, area: str = ACTIVE, previous_key: str = None) -> int:
+        """
+        Record a job change.
+
+        Args:
+            op (str): created, updated, archived or deleted
+            job_data (dict): The job as it is after the change (as it was,
+                for deletions)
+            area (str): ACTIVE or ARCHIVE, the tree that changed
+            previous_key (str): The job's key before an update that changed it
+
+        Returns:
+            int: Sequence number of the entry
+        """
+        if op not in JOB_CHANGE_OPS:
+            raise ValueError(f"Unknown job change: {op}")
+        entry = {
+            'seq': None,
+            'op': op,
+            'area': area,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'user': os.getenv('USERNAME', 'unknown'),
+            'machine': os.getenv('COMPUTERNAME', 'unknown'),
+            'writer': WRITER_ID,
+            'job': job_data,
+        }
+        if previous_key:
+            entry['previous_key'] = previous_key
+        os.makedirs(self.directory, exist_ok=True)
+        with sidecar_lock(self.path):
+            if not os.path.exists(self.path):
+                self._create(1)
+            elif os.path.getsize(self.path) > MAX_JOURNAL_BYTES:
+                next_seq = self.read_header()['next_seq']
+                os.replace(self.path, self.path + '.1')
+                self._create(next_seq)
+
+            with open(self.path, 'r+b') as f:
+                header = json.loads(f.read(HEADER_SIZE).decode("utf-8"))
+                entry['seq'] = header['next_seq']
+                line = json.dumps(entry, separators=(',', ':'), default=str) + "\n"
+                f.seek(0, os.SEEK_END)
+                original_size = f.tell()
+                try:
+                    if original_size > HEADER_SIZE:
+                        # Start on a fresh line if a previous writer died mid-entry
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            f.write(b"\n")
+                    f.write(line.encode("utf-8"))
+                    f.flush()
+                except OSError:
+                    f.truncate(original_size)
+                    raise
+                header['next_seq'] = entry['seq'] + 1
+                f.seek(0)
+                f.write(_encode_header(header))
+        return entry['seq']
+
+    # --- Reading ---
+
+    def read_changes(self, position: Optional[Dict] = None) -> Tuple[List[Dict], Dict, bool]:
+        """
+        Read the entries written after a position.
+
+        Without a position nothing is returned, only the current end of the
+        journal to read from next time. While the file's size and mtime
+        match the position this is a single stat.
+
+        When there is no journal yet the position says so (its journal_id
+        is None); once the journal is created the next call reads it from
+        its first entry.
+
+        Args:
+            position (dict): What the last call returned, or None
+
+        Returns:
+            tuple: (entries, new position, rescan). rescan is True when the
+                journal was rotated or replaced, or entries are missing;
+                the entries are then incomplete and the caller should
+                rescan the job tree.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # A journal that disappeared was replaced by hand; nobody knows what changed
+            lost = position is not None and position['journal_id'] is not None
+            return [], {'journal_id': None, 'offset': HEADER_SIZE, 'next_seq': 1,
+                        'size': -1, 'mtime_ns': -1}, lost
+        if (position is not None and position['size'] == stat.st_size
+                and position['mtime_ns'] == stat.st_mtime_ns):
+            return [], position, False
+
+        with open(self.path, 'rb') as f:
+            header = json.loads(f.read(HEADER_SIZE).decode("utf-8"))
+            end_position = {
+                'journal_id': header['journal_id'],
+                'offset': max(stat.st_size, HEADER_SIZE),
+                'next_seq': header['next_seq'],
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+            }
+            if position is None:
+                return [], end_position, False
+            if position['journal_id'] is None:
+                # Created since the last call. If it was already rotated the
+                # first entries are in the old file, so rescan instead
+                if header['first_seq'] != position['next_seq']:
+                    return [], end_position, True
+                position = dict(position, journal_id=header['journal_id'])
+            if header['journal_id'] != position['journal_id'] or stat.st_size < position['offset']:
+                return [], end_position, True
+
+            f.seek(position['offset'])
+            data = f.read(stat.st_size - position['offset'])
+
+        # Only complete lines; a writer may be halfway through the last one
+        end = data.rfind(b"\n") + 1
+        entries = []
+        next_seq = position['next_seq']
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn line left by a writer that died; its seq was reused
+            seq = entry.get('seq')
+            if not isinstance(seq, int) or seq < next_seq:
+                continue
+            if seq > next_seq:
+                return entries, end_position, True
+            entries.append(entry)
+            next_seq += 1
+
+        return entries, {
+            'journal_id': position['journal_id'],
+            'offset': position['offset'] + end,
+            'next_seq': next_seq,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }, False
+
+
+def record_job_change(op: str, job_data: Dict, area: str = ACTIVE, directory: str = None,
+                      previous_key: str = None) -> Optional[int]:
+    """
+    Record a job change in the journal of the active jobs source folder.
+
+    The journal only lets other workstations catch up sooner, so failures
+    are logged and otherwise ignored.
+
+    Args:
+        op (str): created, updated, archived or deleted
+        job_data (dict): The job after the change
+        area (str): ACTIVE or ARCHIVE
+        directory (str): Journal folder; defaults to config.ACTIVE_JOBS_SOURCE_DIR
+        previous_key (str): The job's key before an update that changed it
+
+    Returns:
+        int: Sequence number of the entry, or None if it could not be written
+    """
+    if directory is None:
+        import src.config as config
+        directory = config.ACTIVE_JOBS_SOURCE_DIR
+    try:
+        return JobJournal(directory).append(op, dict(job_data or {}), area, previous_key)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not record job change in the journal: {e}")
+        return None
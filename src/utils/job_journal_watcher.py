@@ -0,0 +1,119 @@
+"""
+Job Journal Watcher
+
+Follows the change journal (see job_journal) of the active jobs source
+folder for the UI. On network drives the Jobs page polls the journal on its
+periodic refresh timer instead of rescanning the job tree, and applies what
+other workstations recorded.
+
+Each poll runs in a worker thread: a stat of the journal, and a read of the
+new lines only when the file changed. changes_received carries the entries
+written by other processes; rescan_needed means the journal was rotated or
+replaced and the job tree has to be scanned again.
+"""
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+from .job_journal import JobJournal, WRITER_ID
+
+
+class JobJournalPollWorker(QThread):
+    """Worker thread that reads the journal entries after a position."""
+
+    polled = Signal(str, list, object, bool)   # directory, entries, new position, rescan
+
+    def __init__(self, directory, position):
+        super().__init__()
+        self.directory = directory
+        self.position = position
+
+    def run(self):
+        try:
+            entries, position, rescan = JobJournal(self.directory).read_changes(self.position)
+            # follow() could not read the journal, so changes since then are unknown
+            rescan = rescan or self.position is None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading the job change journal: {e}")
+            entries, position, rescan = [], self.position, False
+        self.polled.emit(self.directory, entries, position, rescan)
+
+
+class JobJournalWatcher(QObject):
+    """Position in the change journal of one folder, and the polls that move it on."""
+
+    changes_received = Signal(list)   # journal entries from other workstations, in order
+    rescan_needed = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._directory = None
+        self._position = None
+        self._worker = None
+        self._poll_pending = False
+
+    def follow(self, directory):
+        """
+        Start following the journal of a folder from its current end.
+
+        Reads the journal header once, in the calling thread, so changes
+        made after this call are not missed by a job scan started after it.
+        A journal that does not exist yet is read from its first entry once
+        it is created.
+        """
+        if directory == self._directory:
+            return
+        self._directory = directory
+        try:
+            _, self._position, _ = JobJournal(directory).read_changes(None)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading the job change journal: {e}")
+            self._position = None
+
+    def request_poll(self):
+        """Check the journal for new entries in the background; returns immediately."""
+        if self._directory is None:
+            return
+        if self._worker is not None:
+            self._poll_pending = True
+            return
+
+        self._worker = JobJournalPollWorker(self._directory, self._position)
+        self._worker.polled.connect(self._on_polled)
+        self._worker.finished.connect(self._on_worker_finished)
+        self._worker.start()
+
+    def _on_polled(self, directory, entries, position, rescan):
+        if directory != self._directory:
+            return  # Folder changed in the settings while the poll ran
+        self._position = position
+        if rescan:
+            self.rescan_needed.emit()
+            return
+        entries = [entry for entry in entries if entry.get('writer') != WRITER_ID]
+        if entries:
+            self.changes_received.emit(entries)
+
+    def _on_worker_finished(self):
+        self._worker.deleteLater()
+        self._worker = None
+        if self._poll_pending:
+            self._poll_pending = False
+            self.request_poll()
+
+
+# Global instance for application-wide use
+_job_journal_watcher = None
+
+def get_job_journal_watcher() -> JobJournalWatcher:
+    """
+    Get the global job journal watcher.
+
+    Must be called from the GUI thread.
+
+    Returns:
+        JobJournalWatcher: Global watcher instance
+    """
+    global _job_journal_watcher
+    if _job_journal_watcher is None:
+        _job_journal_watcher = JobJournalWatcher()
+    return _job_journal_watcher
@@ -2,8 +2,34 @@ import os
 import math
 from datetime import datetime
 
-# Assuming epc_conversion.py is in the same utils folder or accessible
-from .epc_conversion import generate_epc
+import numpy as np
+
+from .epc_schemes import scheme_from_job_data, detect_scheme
+from .epc_conversion import EPCRange
+
+
+def roll_boundary_epcs(rolls):
+    """
+    Encode the first and last EPC of each roll.
+
+    All boundaries are encoded in one call with the rolls' EPC scheme, so
+    roll pages stay consistent with the job's database files.
+
+    Args:
+        rolls (list): EPCRange per roll, all of one UPC and scheme (e.g.
+            from EPCRange.split(lpr))
+
+    Returns:
+        tuple: (start EPCs, end EPCs) as lists of hex strings
+    """
+    if not rolls:
+        return [], []
+    serials = np.empty(2 * len(rolls), dtype=np.int64)
+    serials[0::2] = [roll.start_serial for roll in rolls]
+    serials[1::2] = [roll.end_serial for roll in rolls]
+    epcs = rolls[0].encode_serials(serials).tolist()
+    return epcs[0::2], epcs[1::2]
+
 
 def generate_roll_tracker_html(params):
     """
@@ -12,7 +38,8 @@ def generate_roll_tracker_html(params):
     Args:
         params (dict): A dictionary containing all necessary parameters:
             'upc', 'start_serial', 'adjusted_qty', 'lpr', 'qty_per_db',
-            'job_ticket_number', 'customer_name', 'output_directory'
+            'job_ticket_number', 'customer_name', 'output_directory',
+            and optionally 'scheme' and 'scheme_options' (default SGTIN-96)
     
     Returns:
         str: The full path to the generated HTML file, or None on failure.
@@ -34,7 +61,8 @@ def generate_roll_tracker_html(params):
         
         num_files = math.ceil(adjusted_qty / qty_per_db)
         
-        db_pages_html, qc_rolls = _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ticket_number, customer_name, num_files)
+        db_pages_html, qc_rolls = _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ticket_number, customer_name, num_files,
+                                                      params.get('scheme'), params.get('scheme_options'))
 
         with open(roll_tracker_filename, "w", encoding="utf-8") as f:
             f.write("<!DOCTYPE html><html lang='en'><head><meta charset='UTF-8'>")
@@ -107,26 +135,25 @@ def generate_quality_control_sheet(job_data, output_path):
         
         # Calculate roll information
         num_rolls = math.ceil(total_quantity / lpr)
-        rolls_data = []
-        current_serial = start_serial
+        roll_quantities = [min(lpr, total_quantity - roll_index * lpr) for roll_index in range(num_rolls)]
+        roll_starts = [start_serial + roll_index * lpr for roll_index in range(num_rolls)]
+        if upc:
+            scheme, scheme_options = scheme_from_job_data(job_data)
+            start_epcs, end_epcs = roll_boundary_epcs(
+                EPCRange(upc, start_serial, total_quantity, scheme, scheme_options).split(lpr))
+        else:
+            start_epcs = end_epcs = ['N/A'] * num_rolls
         
-        for roll_num in range(1, num_rolls + 1):
-            remaining_qty = total_quantity - (roll_num - 1) * lpr
-            roll_qty = min(lpr, remaining_qty)
-            
-            roll_start_serial = current_serial
-            roll_end_serial = current_serial + roll_qty - 1
-            
-            roll_info = {
-                'roll_number': roll_num,
+        rolls_data = []
+        for roll_index, (roll_start_serial, roll_qty) in enumerate(zip(roll_starts, roll_quantities)):
+            rolls_data.append({
+                'roll_number': roll_index + 1,
                 'quantity': roll_qty,
                 'start_serial': roll_start_serial,
-                'end_serial': roll_end_serial,
-                'start_epc': generate_epc(upc, roll_start_serial) if upc else 'N/A',
-                'end_epc': generate_epc(upc, roll_end_serial) if upc else 'N/A'
-            }
-            rolls_data.append(roll_info)
-            current_serial += roll_qty
+                'end_serial': roll_start_serial + roll_qty - 1,
+                'start_epc': start_epcs[roll_index],
+                'end_epc': end_epcs[roll_index]
+            })
         
         # Generate the HTML content
         html_content = _generate_qc_sheet_html(
@@ -146,20 +173,25 @@ def generate_quality_control_sheet(job_data, output_path):
         print(f"Error generating quality control sheet: {e}")
         return None
 
-def _short_epc(e):
-    return e[-5:] if len(e) >= 5 else e
+def short_epc(e, length=5):
+    """Last hex digits of an EPC that carry the serial (SSCC-96 ends in reserved zeros)."""
+    scheme = detect_scheme(e)
+    if scheme is not None and scheme.reserved_tail_hex:
+        e = e[:-scheme.reserved_tail_hex]
+    return e[-length:] if len(e) >= length else e
 
-def _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ticket_number, customer_name, num_files):
+def _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ticket_number, customer_name, num_files,
+                        scheme=None, scheme_options=None):
     db_pages_html = []
     rolls_for_qc = []
     total_roll_num = 1
-    global_serial = start_serial
-    
-    for db_index in range(1, num_files + 1):
-        db_label_count = min(qty_per_db, adjusted_qty - (db_index - 1) * qty_per_db)
-        if db_label_count <= 0:
-            break
 
+    # Rolls of each DB file; a roll never spans two files
+    job_epcs = EPCRange(upc, start_serial, min(adjusted_qty, num_files * qty_per_db), scheme, scheme_options)
+    db_rolls = [db_epcs.split(lpr) for db_epcs in job_epcs.split(qty_per_db)]
+    start_epcs, end_epcs = roll_boundary_epcs([roll for rolls in db_rolls for roll in rolls])
+    
+    for db_index, rolls in enumerate(db_rolls, start=1):
         chunk = ["<div class='db-container'>"]
         chunk.append("<table>")
         chunk.append(f"<tr class='db-header'><td colspan='4'>Database {db_index}</td></tr>")
@@ -170,23 +202,18 @@ def _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ti
         chunk.append(f"</td></tr>")
         chunk.append("<tr><th>Roll #</th><th>Label Range</th><th>Start EPC</th><th>End EPC</th></tr>")
 
-        db_remaining = db_label_count
-        db_current_start_label = 1
+        roll_local_start = 1
 
-        while db_remaining > 0:
-            roll_count = min(lpr, db_remaining)
-            roll_local_start = db_current_start_label
-            roll_local_end = roll_local_start + roll_count - 1
-            
-            epc_start_serial = global_serial
-            epc_end_serial = global_serial + roll_count - 1
-
-            epc_start_val = generate_epc(upc, epc_start_serial)
-            epc_end_val = generate_epc(upc, epc_end_serial)
+        for roll in rolls:
+            roll_start_serial, roll_qty = roll.start_serial, roll.count
+            roll_local_end = roll_local_start + roll_qty - 1
 
             label_range_formatted = f"{roll_local_start:,} - {roll_local_end:,}"
 
-            chunk.append(f"<tr><td>{total_roll_num}</td><td>{label_range_formatted}</td><td>{_short_epc(epc_start_val)}</td><td>{_short_epc(epc_end_val)}</td></tr>")
+            start_epc = start_epcs[total_roll_num - 1]
+            end_epc = end_epcs[total_roll_num - 1]
+
+            chunk.append(f"<tr><td>{total_roll_num}</td><td>{label_range_formatted}</td><td>{short_epc(start_epc)}</td><td>{short_epc(end_epc)}</td></tr>")
 
             # Notes Sub-row
             chunk.append("<tr class='sub-row'><td colspan='4'>")
@@ -195,13 +222,13 @@ def _generate_roll_data(upc, start_serial, adjusted_qty, lpr, qty_per_db, job_ti
 
             rolls_for_qc.append({
                 "roll_num": total_roll_num,
-                "start_serial": epc_start_serial,
-                "end_serial": epc_end_serial
+                "start_serial": roll_start_serial,
+                "end_serial": roll_start_serial + roll_qty - 1,
+                "start_epc": start_epc,
+                "end_epc": end_epc
             })
 
-            db_current_start_label += roll_count
-            db_remaining -= roll_count
-            global_serial += roll_count
+            roll_local_start = roll_local_end + 1
             total_roll_num += 1
 
         chunk.append("</table></div>")
@@ -219,9 +246,10 @@ def _get_qc_page_html(job_ticket, customer, upc, qc_rolls):
     html.append("<tr><th>Roll #</th><th>Start EPC</th><th>End EPC</th><th>QC Check</th></tr>")
 
     for roll_info in qc_rolls:
-        epc_start = generate_epc(upc, roll_info["start_serial"])
-        epc_end = generate_epc(upc, roll_info["end_serial"])
-        html.append(f"<tr><td>{roll_info['roll_num']}</td><td>{_short_epc(epc_start)}</td><td>{_short_epc(epc_end)}</td><td></td></tr>")
+        # Reuse the EPCs the DB pages already encoded
+        epc_start = roll_info["start_epc"]
+        epc_end = roll_info["end_epc"]
+        html.append(f"<tr><td>{roll_info['roll_num']}</td><td>{short_epc(epc_start)}</td><td>{short_epc(epc_end)}</td><td></td></tr>")
 
     html.append("</table></div>")
     return "".join(html)
@@ -299,8 +327,8 @@ def _generate_qc_sheet_html(customer, job_ticket, po_number, part_number, item,
         html.append(f'<td class="serial-range">{roll["start_serial"]:,} - {roll["end_serial"]:,}</td>')
         
         if upc:
-            html.append(f'<td class="epc">{_short_epc(roll["start_epc"])}</td>')
-            html.append(f'<td class="epc">{_short_epc(roll["end_epc"])}</td>')
+            html.append(f'<td class="epc">{short_epc(roll["start_epc"])}</td>')
+            html.append(f'<td class="epc">{short_epc(roll["end_epc"])}</td>')
         
         html.append('</tr>')
     
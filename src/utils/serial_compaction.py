@@ -0,0 +1,62 @@
+"""
+Serial Ledger Compaction
+Runs the compaction of the shared serial numbers folder (see
+serial_ledger.compact_ledgers) once a day, in the background at startup.
+
+Each workstation compacts on its first start of the day; the compaction
+holds the summary file's lock, so when several start at once the later
+ones find nothing left to do.
+"""
+
+from datetime import date
+
+from PySide6.QtCore import QThread, Signal
+
+import src.config as config
+from .serial_manager import get_serial_manager
+
+
+class SerialCompactionWorker(QThread):
+    """Worker thread that folds old daily ledgers into the summary file."""
+
+    compaction_done = Signal(str, list)   # day it ran, compacted dates
+
+    def __init__(self, keep_days):
+        super().__init__()
+        self.keep_days = keep_days
+
+    def run(self):
+        try:
+            compacted = get_serial_manager().compact(self.keep_days)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error compacting serial ledgers: {e}")
+            return
+        if compacted:
+            print(f"Compacted {len(compacted)} daily serial ledgers ({compacted[0]} to {compacted[-1]})")
+        self.compaction_done.emit(date.today().isoformat(), compacted)
+
+
+# Global instance for application-wide use
+_compaction_worker = None
+
+def start_daily_serial_compaction():
+    """
+    Compact the serial ledgers in the background unless this workstation
+    already did today.
+
+    Must be called from the GUI thread.
+    """
+    global _compaction_worker
+    if config.get_serial_compaction_date() == date.today().isoformat():
+        return
+    if _compaction_worker is not None and _compaction_worker.isRunning():
+        return
+    _compaction_worker = SerialCompactionWorker(config.SERIAL_LEDGER_KEEP_DAYS)
+    _compaction_worker.compaction_done.connect(lambda day, _: config.save_serial_compaction_date(day))
+    _compaction_worker.start()
+
+
+def wait_for_serial_compaction():
+    """Let a running compaction finish, e.g. before the application exits."""
+    if _compaction_worker is not None:
+        _compaction_worker.wait()
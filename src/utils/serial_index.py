@@ -0,0 +1,344 @@
+"""
+Serial Allocation Index
+
+Persistent interval index over every allocation in the serial numbers
+folder: the live daily ledgers, the compacted archives and old-format daily
+JSON files. It answers "which job allocated serial N" and "which jobs for
+this UPC overlap" without opening the files one by one.
+
+The index is an SQLite database. Allocation ranges sit in an R*Tree
+virtual table; because serials restart every day, each range is stored with
+its date. Leases are indexed too, trimmed to their used portion once
+settled, so a serial handed out from a lease that was never settled still
+names the workstation that holds it. The database remembers how far it has
+read each ledger.
+update() then only parses the lines appended since the last call. Files
+that were replaced are re-read, and rows of files that disappeared are
+dropped, e.g. when compaction moves a day into the archive.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, List, Tuple
+
+from .serial_ledger import (
+    LEDGER_SUFFIX, LEGACY_SUFFIX, ARCHIVE_DIR_NAME, HEADER_SIZE,
+    parse_ledger_date, read_ledger_records
+)
+
+
+INDEX_FILE_NAME = "serials_index.sqlite"
+INDEX_SCHEMA_VERSION = 2
+
+# Seconds between folder scans when queries come in quick succession
+UPDATE_INTERVAL = 5.0
+
+# Job fields copied from allocation records into the index
+JOB_FIELDS = ('customer', 'po_number', 'ticket_number', 'upc', 'label_size',
+              'user', 'machine', 'timestamp', 'lease_id')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    day TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    offset INTEGER
+);
+CREATE TABLE IF NOT EXISTS allocations (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    start_serial INTEGER NOT NULL,
+    end_serial INTEGER NOT NULL,
+    quantity INTEGER,
+    customer TEXT, po_number TEXT, ticket_number TEXT, upc TEXT, label_size TEXT,
+    user TEXT, machine TEXT, timestamp TEXT, lease_id TEXT
+);
+CREATE INDEX IF NOT EXISTS allocations_source ON allocations (source);
+CREATE INDEX IF NOT EXISTS allocations_upc ON allocations (upc, start_serial);
+CREATE VIRTUAL TABLE IF NOT EXISTS allocation_ranges USING rtree (id, start_serial, end_serial);
+"""
+
+
+class SerialIndex:
+    """Interval index over all serial allocations in a serial numbers folder."""
+
+    def __init__(self, base_path: str, index_path: str = None):
+        """
+        Args:
+            base_path (str): Serial numbers folder
+            index_path (str): SQLite file for the index; defaults to
+                serials_index.sqlite in the serial numbers folder
+        """
+        self.base_path = base_path
+        self.index_path = index_path or os.path.join(base_path, INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+        self._updated_at = None
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        row = None
+        try:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        except sqlite3.DatabaseError:
+            pass
+        if row is not None and int(row['value']) != INDEX_SCHEMA_VERSION:
+            # Built by another version: start over, it is only a cache
+            for table in ('allocation_ranges', 'allocations', 'sources', 'meta'):
+                self._db.execute(f"DROP TABLE IF EXISTS {table}")
+        self._db.executescript(_SCHEMA)
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                         (str(INDEX_SCHEMA_VERSION),))
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # --- Updating ---
+
+    def _list_sources(self) -> Dict[str, Tuple[str, date]]:
+        """Indexable files: relative name -> (full path, date)."""
+        sources = {}
+        folders = [('', self.base_path), (ARCHIVE_DIR_NAME, os.path.join(self.base_path, ARCHIVE_DIR_NAME))]
+        for prefix, folder in folders:
+            try:
+                names = os.listdir(folder)
+            except OSError:
+                continue
+            for name in names:
+                day = parse_ledger_date(name)
+                if day is not None:
+                    sources[os.path.join(prefix, name) if prefix else name] = (os.path.join(folder, name), day)
+
+        # An imported old-format file is covered by its ledger
+        ledger_days = {day for name, (_, day) in sources.items() if not name.endswith(LEGACY_SUFFIX)}
+        return {name: value for name, value in sources.items()
+                if not (name.endswith(LEGACY_SUFFIX) and value[1] in ledger_days)}
+
+    def _settle(self, source: str, record: Dict):
+        """Trim a lease to the serials that were used from it."""
+        rows = self._db.execute("SELECT id FROM allocations WHERE source = ? AND kind = 'lease' "
+                                "AND lease_id = ?", (source, record.get('lease_id'))).fetchall()
+        for row in rows:
+            if not record.get('used_quantity'):
+                self._db.execute("DELETE FROM allocation_ranges WHERE id = ?", (row['id'],))
+                self._db.execute("DELETE FROM allocations WHERE id = ?", (row['id'],))
+                continue
+            used_end = int(record['used_end'])
+            self._db.execute("UPDATE allocations SET end_serial = ?, quantity = ? WHERE id = ?",
+                             (used_end, record['used_quantity'], row['id']))
+            self._db.execute("UPDATE allocation_ranges SET end_serial = ? WHERE id = ?", (used_end, row['id']))
+
+    def _insert(self, source: str, day: date, records):
+        """Index the allocation and lease records of one file."""
+        day_text = day.isoformat()
+        for record in records:
+            kind = record.get('type', 'allocation')
+            if kind == 'lease_settle':
+                self._settle(source, record)
+                continue
+            if kind not in ('allocation', 'lease') or 'start_serial' not in record:
+                continue
+            start_serial = int(record['start_serial'])
+            end_serial = int(record['end_serial'])
+            cursor = self._db.execute(
+                "INSERT INTO allocations (source, day, kind, start_serial, end_serial, quantity, "
+                + ", ".join(JOB_FIELDS) + ") VALUES (?, ?, ?, ?, ?, ?" + ", ?" * len(JOB_FIELDS) + ")",
+                (source, day_text, kind, start_serial, end_serial,
+                 record.get('quantity', end_serial - start_serial + 1),
+                 *(record.get(field) for field in JOB_FIELDS)))
+            self._db.execute("INSERT INTO allocation_ranges VALUES (?, ?, ?)",
+                             (cursor.lastrowid, start_serial, end_serial))
+
+    def _drop_source(self, source: str):
+        self._db.execute("DELETE FROM allocation_ranges WHERE id IN "
+                         "(SELECT id FROM allocations WHERE source = ?)", (source,))
+        self._db.execute("DELETE FROM allocations WHERE source = ?", (source,))
+        self._db.execute("DELETE FROM sources WHERE name = ?", (source,))
+
+    def _read_ledger_tail(self, path: str, offset: int) -> Tuple[List[Dict], int]:
+        """Parse the complete lines of a live ledger after offset."""
+        with open(path, 'rb') as f:
+            f.seek(max(offset, HEADER_SIZE))
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # torn line left by a writer that died
+        return records, max(offset, HEADER_SIZE) + end
+
+    def _index_source(self, name: str, path: str, day: date, stat, known):
+        if name.endswith(LEDGER_SUFFIX):
+            # Live ledgers only grow; read what was appended since last time
+            offset = known['offset'] if known is not None and stat.st_size >= known['offset'] else 0
+            if known is not None and offset == 0:
+                self._drop_source(name)
+            records, offset = self._read_ledger_tail(path, offset)
+        else:
+            if known is not None:
+                self._drop_source(name)
+            if name.endswith(LEGACY_SUFFIX):
+                with open(path, 'r') as f:
+                    records = json.load(f).get('usage_log', [])
+            else:
+                records = read_ledger_records(path)[1]
+            offset = stat.st_size
+
+        self._insert(name, day, records)
+        self._db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)",
+                         (name, day.isoformat(), stat.st_size, stat.st_mtime_ns, offset))
+        return len(records)
+
+    def update(self, force: bool = False) -> int:
+        """
+        Bring the index up to date with the folder.
+
+        Args:
+            force (bool): Scan even if the last scan was less than
+                UPDATE_INTERVAL seconds ago
+
+        Returns:
+            int: Number of records read
+        """
+        with self._lock:
+            if (not force and self._updated_at is not None
+                    and time.monotonic() - self._updated_at < UPDATE_INTERVAL):
+                return 0
+
+            known = {row['name']: row for row in self._db.execute("SELECT * FROM sources")}
+            current = self._list_sources()
+            read = 0
+            try:
+                for name in set(known) - set(current):
+                    self._drop_source(name)
+
+                for name, (path, day) in sorted(current.items()):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    previous = known.get(name)
+                    if (previous is not None and previous['size'] == stat.st_size
+                            and previous['mtime_ns'] == stat.st_mtime_ns):
+                        continue
+                    try:
+                        read += self._index_source(name, path, day, stat, previous)
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"Could not index serial file {name}: {e}")
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+            self._updated_at = time.monotonic()
+            return read
+
+    # --- Queries ---
+
+    def _rows_to_dicts(self, rows) -> List[Dict]:
+        return [{key: row[key] for key in row.keys() if key not in ('id', 'source')} for row in rows]
+
+    def find_allocation(self, serial: int, date=None, upc: str = None) -> List[Dict]:
+        """
+        Find the allocations that contain a serial.
+
+        Serials restart every day, so without a date one match per day is
+        possible. A serial served from a lease whose allocations are not in
+        the ledger yet matches the lease itself (kind 'lease', with the
+        machine and lease_id that hold it).
+
+        Args:
+            serial (int): Serial number
+            date (date or str): Only look at this day
+            upc (str): Only allocations logged for this UPC
+
+        Returns:
+            list: Allocation dicts (day, kind, start_serial, end_serial,
+                quantity and the job fields), newest day first
+        """
+        self.update()
+        serial = int(serial)
+        # The R*Tree stores 32-bit float bounds rounded outward, so the exact
+        # columns are checked as well
+        query = ("SELECT a.* FROM allocation_ranges r JOIN allocations a ON a.id = r.id "
+                 "WHERE r.start_serial <= ? AND r.end_serial >= ? "
+                 "AND a.start_serial <= ? AND a.end_serial >= ?")
+        params = [serial, serial, serial, serial]
+        if date is not None:
+            query += " AND a.day = ?"
+            params.append(date if isinstance(date, str) else date.isoformat())
+        if upc:
+            query += " AND (a.upc = ? OR a.kind = 'lease')"
+            params.append(upc)
+        query += " ORDER BY a.day DESC, a.start_serial"
+        with self._lock:
+            rows = self._rows_to_dicts(self._db.execute(query, params).fetchall())
+        # A lease only says who holds the serial until its allocation is recorded
+        allocated_days = {row['day'] for row in rows if row['kind'] == 'allocation'}
+        return [row for row in rows if row['kind'] == 'allocation' or row['day'] not in allocated_days]
+
+    def find_overlaps(self, upc: str) -> List[Tuple[Dict, Dict]]:
+        """
+        Find allocations for a UPC whose serial ranges overlap.
+
+        The EPC is built from UPC + serial, so overlapping ranges for the
+        same UPC on any two days mean duplicate tags.
+
+        Returns:
+            list: (allocation, allocation) pairs, by start serial
+        """
+        self.update()
+        with self._lock:
+            rows = self._rows_to_dicts(self._db.execute(
+                "SELECT * FROM allocations WHERE upc = ? AND kind = 'allocation' "
+                "ORDER BY start_serial, end_serial",
+                (upc,)).fetchall())
+
+        overlaps = []
+        for i, first in enumerate(rows):
+            for second in rows[i + 1:]:
+                if second['start_serial'] > first['end_serial']:
+                    break
+                overlaps.append((first, second))
+        return overlaps
+
+    def allocation_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM allocations WHERE kind = 'allocation'").fetchone()[0]
+
+
+# Global instances, one per serial numbers folder
+_serial_indexes = {}
+_serial_indexes_lock = threading.Lock()
+
+
+def get_serial_index(base_path: str, index_path: str = None) -> SerialIndex:
+    """
+    Get the shared serial index for a serial numbers folder.
+
+    Args:
+        base_path (str): Serial numbers folder
+        index_path (str): Index file (used when the index is first opened)
+
+    Returns:
+        SerialIndex: Index for that folder
+    """
+    with _serial_indexes_lock:
+        index = _serial_indexes.get(base_path)
+        if index is None:
+            index = SerialIndex(base_path, index_path)
+            _serial_indexes[base_path] = index
+        return index
@@ -0,0 +1,426 @@
+"""
+Serial Allocation Ledger
+
+Append-only, one-file-per-day record of serial number allocations.
+
+A ledger file (serials_YYYY-MM-DD.jsonl) starts with a fixed-width header
+line that holds current_serial and is rewritten in place, followed by one
+small JSON line per event:
+
+    {"type": "allocation", "start_serial": ..., "end_serial": ..., "next_serial": ...}
+    {"type": "lease", "lease_id": ..., "start_serial": ..., "end_serial": ..., "next_serial": ...}
+    {"type": "lease_settle", "lease_id": ..., "used_quantity": ..., "next_serial": ...}
+
+Every record carries the counter value after it, so the next free serial
+is known from the header or from the last line alone. Writers append under
+the daily lock; nothing ever rewrites the whole file.
+
+Old days can be compacted: their totals go into serials_summary.json and
+the ledger is moved, gzipped, to the archive folder. Daily JSON files from
+the previous format (serials_YYYY-MM-DD.json) can be imported.
+"""
+
+import os
+import json
+import gzip
+import shutil
+from datetime import date, datetime, timedelta
+
+from .file_lock import sidecar_lock
+
+
+LEDGER_VERSION = 1
+DEFAULT_START_SERIAL = 1000
+
+# Width of the header line including its newline. The header is padded with
+# spaces so it can be rewritten in place without moving the records.
+HEADER_SIZE = 256
+
+# Bytes read from the end of the file when looking for the last record
+TAIL_BLOCK_SIZE = 4096
+
+LEDGER_PREFIX = "serials_"
+LEDGER_SUFFIX = ".jsonl"
+LEGACY_SUFFIX = ".json"
+ARCHIVE_DIR_NAME = "archive"
+SUMMARY_FILE_NAME = "serials_summary.json"
+
+
+def ledger_filename(day):
+    """Ledger file name for a date, e.g. serials_2025-01-31.jsonl."""
+    return f"{LEDGER_PREFIX}{day.strftime('%Y-%m-%d')}{LEDGER_SUFFIX}"
+
+
+def legacy_filename(day):
+    """Name of the old whole-file JSON for a date."""
+    return f"{LEDGER_PREFIX}{day.strftime('%Y-%m-%d')}{LEGACY_SUFFIX}"
+
+
+def parse_ledger_date(filename):
+    """Date of a ledger or legacy file name, or None for other files."""
+    for suffix in (LEDGER_SUFFIX + ".gz", LEDGER_SUFFIX, LEGACY_SUFFIX):
+        if filename.startswith(LEDGER_PREFIX) and filename.endswith(suffix):
+            try:
+                return datetime.strptime(filename[len(LEDGER_PREFIX):-len(suffix)], "%Y-%m-%d").date()
+            except ValueError:
+                return None
+    return None
+
+
+def _encode_header(header):
+    """Render the header as a fixed-width line."""
+    text = json.dumps(header, separators=(',', ':'))
+    if len(text) >= HEADER_SIZE:
+        raise ValueError(f"Ledger header is longer than {HEADER_SIZE - 1} bytes")
+    return (text.ljust(HEADER_SIZE - 1) + "\n").encode("utf-8")
+
+
+def _parse_line(line):
+    """Parse one record line; torn or blank lines give None."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class SerialLedger:
+    """One day's append-only allocation ledger."""
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+
+    def exists(self):
+        return os.path.exists(self.filepath)
+
+    def create(self, start_serial=DEFAULT_START_SERIAL, day=None):
+        """Write a new ledger holding only the header."""
+        header = {
+            'type': 'header',
+            'version': LEDGER_VERSION,
+            'date': (day or date.today()).isoformat(),
+            'current_serial': int(start_serial),
+            'created_by': os.getenv('USERNAME', 'unknown'),
+            'machine': os.getenv('COMPUTERNAME', 'unknown'),
+        }
+        temp_path = self.filepath + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(_encode_header(header))
+        os.replace(temp_path, self.filepath)
+        return header
+
+    def read_header(self):
+        """Read the header line."""
+        with open(self.filepath, 'rb') as f:
+            return json.loads(f.read(HEADER_SIZE).decode("utf-8"))
+
+    def _write_current_serial(self, handle, current_serial):
+        handle.seek(0)
+        header = json.loads(handle.read(HEADER_SIZE).decode("utf-8"))
+        header['current_serial'] = int(current_serial)
+        handle.seek(0)
+        handle.write(_encode_header(header))
+
+    def append(self, records):
+        """
+        Append records and move the header's current_serial to the last one.
+
+        Callers hold the daily lock. Each record must carry next_serial.
+        All records go out in one write; if it fails the file is cut back
+        to its old length, so either all of them are logged or none is.
+
+        Args:
+            records (list): Record dicts to append, in order
+        """
+        if not records:
+            return
+        lines = "".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+        with open(self.filepath, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            original_size = f.tell()
+            try:
+                if original_size > HEADER_SIZE:
+                    # Start on a fresh line if a previous writer died mid-record
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(lines.encode("utf-8"))
+                f.flush()
+            except OSError:
+                f.truncate(original_size)
+                raise
+            self._write_current_serial(f, records[-1]['next_serial'])
+
+    def last_record(self):
+        """Return the last complete record without reading the whole file, or None."""
+        with open(self.filepath, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            block = TAIL_BLOCK_SIZE
+            while True:
+                start = max(HEADER_SIZE, end - block)
+                f.seek(start)
+                lines = f.read(end - start).split(b"\n")
+                # The first piece may be a partial line unless we read from the header
+                candidates = lines if start == HEADER_SIZE else lines[1:]
+                for line in reversed(candidates):
+                    record = _parse_line(line.decode("utf-8", errors="replace"))
+                    if record is not None:
+                        return record
+                if start == HEADER_SIZE:
+                    return None
+                block *= 2
+
+    def next_serial(self):
+        """Next free serial: from the last record, or the header if there is none."""
+        record = self.last_record()
+        if record is not None and 'next_serial' in record:
+            return int(record['next_serial'])
+        return int(self.read_header()['current_serial'])
+
+    def records(self):
+        """All records after the header, in order."""
+        return read_ledger_records(self.filepath)[1]
+
+
+def read_ledger_records(filepath):
+    """
+    Read a whole ledger, plain or gzipped.
+
+    Returns:
+        tuple: (header dict, list of records)
+    """
+    opener = gzip.open if filepath.endswith(".gz") else open
+    with opener(filepath, 'rb') as f:
+        header = json.loads(f.read(HEADER_SIZE).decode("utf-8"))
+        records = [record for record in (_parse_line(line.decode("utf-8", errors="replace")) for line in f)
+                   if record is not None]
+    return header, records
+
+
+def summarize_records(header, records):
+    """
+    Build the usage summary of one day from its ledger.
+
+    Returns:
+        dict: usage_log (allocation records), leases (lease records merged
+            with their settlement), totals and next_serial
+    """
+    usage_log = []
+    leases = []
+    for record in records:
+        kind = record.get('type')
+        if kind == 'allocation':
+            usage_log.append(record)
+        elif kind == 'lease':
+            leases.append(dict(record, status='active'))
+        elif kind == 'lease_settle':
+            # Settle the newest lease with this id that is still open
+            for lease in reversed(leases):
+                if lease['lease_id'] == record['lease_id'] and lease['status'] == 'active':
+                    lease.update({k: v for k, v in record.items() if k not in ('type', 'next_serial')})
+                    lease['status'] = 'closed'
+                    break
+
+    next_serial = records[-1]['next_serial'] if records else header.get('current_serial', DEFAULT_START_SERIAL)
+    return {
+        'date': header.get('date'),
+        'total_allocated': sum(entry.get('quantity', 0) for entry in usage_log),
+        'allocations_count': len(usage_log),
+        'usage_log': usage_log,
+        'leases': leases,
+        'next_serial': next_serial,
+    }
+
+
+def import_legacy_daily_file(legacy_path, ledger_path=None, overwrite=False):
+    """
+    Convert an old serials_YYYY-MM-DD.json into a ledger.
+
+    Usage log entries become allocation records and leases become lease
+    and lease_settle records; the final counter is the file's current_serial.
+
+    Args:
+        legacy_path (str): The old daily JSON file
+        ledger_path (str): Destination, defaults to the same name with .jsonl
+        overwrite (bool): Replace an existing ledger
+
+    Returns:
+        str: Path of the ledger, or None if it already existed
+    """
+    if ledger_path is None:
+        ledger_path = os.path.splitext(legacy_path)[0] + LEDGER_SUFFIX
+    if os.path.exists(ledger_path) and not overwrite:
+        return None
+
+    with open(legacy_path, 'r') as f:
+        data = json.load(f)
+
+    day = parse_ledger_date(os.path.basename(legacy_path)) or date.today()
+    usage_log = data.get('usage_log', [])
+    leases = data.get('leases', [])
+    starts = [entry['start_serial'] for entry in usage_log + leases if 'start_serial' in entry]
+    current_serial = int(data.get('current_serial', DEFAULT_START_SERIAL))
+    first_serial = min(starts + [current_serial])
+
+    # Replay in serial order; the counter only ever moved forward except for reclaims
+    events = []
+    for entry in usage_log:
+        events.append((entry['start_serial'], 1, dict(entry, type='allocation')))
+    for lease in leases:
+        base = {k: lease[k] for k in ('lease_id', 'timestamp', 'start_serial', 'end_serial',
+                                      'quantity', 'user', 'machine') if k in lease}
+        events.append((lease['start_serial'], 0, dict(base, type='lease')))
+        if lease.get('status') == 'closed':
+            settle = {k: lease[k] for k in ('lease_id', 'closed_timestamp', 'used_quantity', 'used_end',
+                                            'returned_start', 'returned_end', 'reclaimed') if k in lease}
+            events.append((lease['end_serial'], 2, dict(settle, type='lease_settle')))
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    records = []
+    counter = first_serial
+    for _, _, record in events:
+        if record['type'] in ('allocation', 'lease'):
+            counter = max(counter, record['end_serial'] + 1)
+        record['next_serial'] = counter
+        records.append(record)
+    if records:
+        records[-1]['next_serial'] = current_serial
+    else:
+        first_serial = current_serial
+
+    temp_path = ledger_path + '.import'
+    ledger = SerialLedger(temp_path)
+    ledger.create(first_serial, day)
+    header = ledger.read_header()
+    for key in ('created_date', 'created_by', 'machine'):
+        if key in data:
+            header[key] = data[key]
+    try:
+        with open(temp_path, 'r+b') as f:
+            f.write(_encode_header(header))
+    except ValueError:
+        pass  # Keep the default header if the old one does not fit
+    ledger.append(records)
+    os.replace(temp_path, ledger_path)
+    return ledger_path
+
+
+def import_legacy_daily_files(base_path, remove=False):
+    """
+    Import every old daily JSON file in a folder that has no ledger yet.
+
+    Args:
+        base_path (str): Serial numbers folder
+        remove (bool): Delete each old file once it has been imported
+
+    Returns:
+        list: Paths of the ledgers created
+    """
+    created = []
+    for filename in sorted(os.listdir(base_path)):
+        if not filename.endswith(LEGACY_SUFFIX) or parse_ledger_date(filename) is None:
+            continue
+        legacy_path = os.path.join(base_path, filename)
+        try:
+            ledger_path = import_legacy_daily_file(legacy_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not import serial file {filename}: {e}")
+            continue
+        if ledger_path:
+            created.append(ledger_path)
+            print(f"Imported {filename} -> {os.path.basename(ledger_path)}")
+        if remove and os.path.exists(os.path.splitext(legacy_path)[0] + LEDGER_SUFFIX):
+            os.remove(legacy_path)
+    return created
+
+
+def load_summary_file(base_path):
+    """Per-day totals of compacted days: {date: summary}."""
+    path = os.path.join(base_path, SUMMARY_FILE_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def archived_ledger_path(base_path, day):
+    """Where a compacted day's ledger is kept."""
+    return os.path.join(base_path, ARCHIVE_DIR_NAME, ledger_filename(day) + ".gz")
+
+
+def compact_ledgers(base_path, keep_days=7, today=None):
+    """
+    Fold ledgers older than keep_days into serials_summary.json.
+
+    Each folded day's totals are added to the summary file and its ledger
+    is gzipped into the archive folder, so the live folder only holds
+    recent days. The caller makes sure no one allocates on those days any
+    more, which holds for any day before today.
+
+    Workstations may compact at the same time: the whole run holds the
+    lock of the summary file, and a ledger another workstation already
+    compacted is skipped.
+
+    Args:
+        base_path (str): Serial numbers folder
+        keep_days (int): Number of most recent days left in place (at least 1)
+        today (date): Reference date, defaults to today
+
+    Returns:
+        list: Dates (ISO strings) that were compacted
+    """
+    cutoff = (today or date.today()) - timedelta(days=max(1, keep_days) - 1)
+    summary_path = os.path.join(base_path, SUMMARY_FILE_NAME)
+    compacted = []
+
+    with sidecar_lock(summary_path):
+        summary = load_summary_file(base_path)
+        for filename in sorted(os.listdir(base_path)):
+            if not filename.endswith(LEDGER_SUFFIX):
+                continue
+            day = parse_ledger_date(filename)
+            if day is None or day >= cutoff:
+                continue
+
+            ledger_path = os.path.join(base_path, filename)
+            archive_path = archived_ledger_path(base_path, day)
+            try:
+                # A lease settled late may still be writing to the day
+                with sidecar_lock(ledger_path):
+                    header, records = read_ledger_records(ledger_path)
+                    os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+                    with open(ledger_path, 'rb') as src, gzip.open(archive_path + '.tmp', 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+                    os.replace(archive_path + '.tmp', archive_path)
+            except FileNotFoundError:
+                continue  # compacted by another workstation since the listing
+
+            day_summary = summarize_records(header, records)
+            starts = [record['start_serial'] for record in records if 'start_serial' in record]
+            summary[day.isoformat()] = {
+                'first_serial': min(starts) if starts else header.get('current_serial'),
+                'next_serial': day_summary['next_serial'],
+                'total_allocated': day_summary['total_allocated'],
+                'allocations_count': day_summary['allocations_count'],
+                'leases_count': len(day_summary['leases']),
+                'archive': os.path.relpath(archive_path, base_path),
+            }
+            compacted.append(day.isoformat())
+
+        if compacted:
+            with open(summary_path + '.tmp', 'w') as f:
+                json.dump(dict(sorted(summary.items())), f, indent=2)
+            os.replace(summary_path + '.tmp', summary_path)
+            # Only drop the live ledgers once the summary that points at the archives is written
+            for day_text in compacted:
+                ledger_path = os.path.join(base_path, ledger_filename(date.fromisoformat(day_text)))
+                for path in (ledger_path, ledger_path + '.lock'):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    return compacted
@@ -6,30 +6,53 @@ for EPC generation to ensure globally unique serial numbers across
 all users and workstations.
 
 Features:
-- Daily serial number files on shared drive
+- Daily append-only allocation ledgers on shared drive (see serial_ledger)
 - Atomic serial number allocation with file locking
 - Usage logging with timestamps and job information
 - Automatic file creation and directory setup
 - Integration with all EPC generation workflows
+- Optional block leasing: a workstation reserves a block of serials in one
+  locked transaction and serves allocations from it in memory
+- Optional allocation service (see serial_service): when one is configured
+  and reachable it allocates on the workstation's behalf, otherwise the
+  file-lock path below is used. An allocation the service received but
+  never answered is not repeated on the file path, since the service may
+  already have committed it
+
+Leasing:
+With lease_size > 0 the manager reserves lease_size serials at a time and
+records the lease in the daily ledger. Allocations that fit
+the lease are served from memory. When the lease runs out, the day changes
+or the application exits, the lease is settled: the used portion and the
+returned tail are written back together with the usage log entries of the
+allocations served from it. If nothing was allocated from the shared file
+since the lease was taken, the tail is reclaimed so the serials are not lost.
+Jobs larger than the lease are allocated directly from the daily file.
+
+Until the lease is settled its allocations are also kept in a spool file on
+the workstation, written before each allocation is handed out. If the
+application dies with a lease held, the next start settles that lease from
+the spool, so no job attribution is lost.
 """
 
 import os
 import json
+import atexit
 import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime, date
 from pathlib import Path
-import platform
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from .serial_ledger import (
+    SerialLedger, DEFAULT_START_SERIAL, ledger_filename, legacy_filename,
+    import_legacy_daily_file, read_ledger_records, summarize_records,
+    archived_ledger_path, load_summary_file, compact_ledgers
+)
+from .file_lock import sidecar_lock
 
-# Import file locking modules based on platform
-try:
-    if platform.system() == "Windows":
-        import msvcrt
-    else:
-        import fcntl
-except ImportError:
-    print("Warning: File locking not available on this platform")
+# Seconds to stay on the file path after the allocation service was unreachable
+SERVICE_RETRY_INTERVAL = 30.0
 
 
 class SerialNumberManager:
@@ -40,17 +63,39 @@ class SerialNumberManager:
     and atomic allocation to prevent duplicates across all users.
     """
     
-    def __init__(self, base_path: str = None):
+    def __init__(self, base_path: str = None, lease_size: int = 0, service_address: str = None,
+                 spool_path: str = None):
         """
         Initialize serial number manager.
         
         Args:
             base_path (str): Base path for serial number files.
                            Defaults to Z:\3 Encoding and Printing Files\Serial Numbers
+            lease_size (int): Serials reserved per lease; 0 allocates every
+                           job directly from the daily file
+            service_address (str): Allocation service ("host:port" or
+                           "unix:/path"); None uses the daily file only
+            spool_path (str): File that keeps the allocations of the held
+                           lease until it is settled. Defaults to a file per
+                           machine in the serial numbers folder
         """
         self.base_path = base_path or r"Z:\3 Encoding and Printing Files\Serial Numbers"
         self.lock = threading.Lock()
+        self.lease_size = max(0, int(lease_size or 0))
+        self._lease = None       # active lease, see _take_lease()
+        self._lease_log = []     # usage log entries served from the lease, not yet written
+        self._release_registered = False
+        self.service_address = service_address or None
+        self._service_client = None
+        self._service_retry_at = 0.0
+        self.spool_path = spool_path or os.path.join(
+            self.base_path, f".lease_spool_{os.getenv('COMPUTERNAME', 'unknown')}.jsonl")
         self._ensure_base_directory()
+        if os.path.exists(self.spool_path):
+            try:
+                self._settle_spooled_lease()
+            except Exception as e:
+                print(f"Warning: Could not settle the serial lease left by the last run: {e}")
     
     def _ensure_base_directory(self):
         """Ensure the base serial numbers directory exists."""
@@ -59,101 +104,100 @@ class SerialNumberManager:
         except Exception as e:
             print(f"Warning: Could not create serial numbers directory: {e}")
     
+    def _call_service(self, method: str, *args):
+        """
+        Run a request against the allocation service.
+        
+        Returns:
+            tuple: (True, result) on success, (False, None) if there is no
+                   service or it cannot be reached right now
+        
+        Raises:
+            RuntimeError: An allocation was sent but not answered; falling
+                back could allocate the same job twice
+        """
+        if not self.service_address or time.monotonic() < self._service_retry_at:
+            return False, None
+        
+        from .serial_service import SerialServiceClient, SerialServiceUnavailable, SerialServiceNoReply
+        if self._service_client is None or self._service_client.address != self.service_address:
+            self._service_client = SerialServiceClient(self.service_address)
+        try:
+            return True, getattr(self._service_client, method)(*args)
+        except SerialServiceUnavailable as e:
+            # Don't pay the connect timeout on every job while the service is down
+            self._service_retry_at = time.monotonic() + SERVICE_RETRY_INTERVAL
+            print(f"{e} - using the serial file on the shared drive")
+            return False, None
+        except SerialServiceNoReply as e:
+            raise RuntimeError(f"{e}. The serials may already be allocated; check the serial "
+                               f"history before allocating this job again.") from e
+    
     def _get_today_filename(self) -> str:
-        """Get the filename for today's serial number file."""
-        today = date.today().strftime("%Y-%m-%d")
-        return f"serials_{today}.json"
+        """Get the filename for today's serial number ledger."""
+        return ledger_filename(date.today())
     
     def _get_today_filepath(self) -> str:
         """Get the full file path for today's serial number file."""
         return os.path.join(self.base_path, self._get_today_filename())
     
-    def _lock_file(self, file_handle):
-        """Lock file for exclusive access (cross-platform)."""
-        try:
-            if platform.system() == "Windows":
-                # Windows file locking
-                while True:
-                    try:
-                        msvcrt.locking(file_handle.fileno(), msvcrt.LK_NBLCK, 1)
-                        break
-                    except IOError:
-                        time.sleep(0.01)  # Wait 10ms and retry
-            else:
-                # Unix-like file locking
-                fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX)
-        except (NameError, AttributeError):
-            # File locking not available, continue without it
-            pass
-    
-    def _unlock_file(self, file_handle):
-        """Unlock file (cross-platform)."""
-        try:
-            if platform.system() == "Windows":
-                msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
-            else:
-                fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
-        except (NameError, AttributeError):
-            # File locking not available, continue without it
-            pass
+    @contextmanager
+    def _locked_daily_file(self, filepath: str):
+        """
+        Hold the cross-process lock for a daily file.
+        
+        The lock is taken on a sidecar .lock file so it also covers creating
+        the ledger.
+        """
+        with sidecar_lock(filepath):
+            yield
     
-    def _load_daily_data(self, filepath: str) -> Dict:
+    def _open_ledger(self, filepath: str) -> SerialLedger:
         """
-        Load or create daily serial number data.
+        Open a daily ledger, creating it if needed (caller holds the daily lock).
         
-        Returns:
-            dict: Daily data structure with current_serial and usage_log
+        A daily JSON file in the old format is imported on first use.
         """
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    # Ensure required keys exist
-                    if 'current_serial' not in data:
-                        data['current_serial'] = 1000  # Default starting serial
-                    if 'usage_log' not in data:
-                        data['usage_log'] = []
-                    return data
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Warning: Could not load serial data, creating new: {e}")
-        
-        # Create new daily data structure
-        return {
-            'current_serial': 1000,  # Starting serial number
-            'usage_log': [],
-            'created_date': date.today().isoformat(),
-            'created_by': os.getenv('USERNAME', 'unknown'),
+        ledger = SerialLedger(filepath)
+        if not ledger.exists():
+            legacy_path = filepath[:-len('.jsonl')] + '.json'
+            if os.path.exists(legacy_path):
+                import_legacy_daily_file(legacy_path, filepath)
+                print(f"Imported {os.path.basename(legacy_path)} into the allocation ledger")
+            else:
+                ledger.create(DEFAULT_START_SERIAL)
+        return ledger
+    
+    def _build_log_entry(self, start_serial: int, end_serial: int, job_info: Dict = None) -> Dict:
+        """Build the usage log entry for one allocation."""
+        log_entry = {
+            'timestamp': datetime.now().isoformat(),
+            'start_serial': start_serial,
+            'end_serial': end_serial,
+            'quantity': end_serial - start_serial + 1,
+            'user': os.getenv('USERNAME', 'unknown'),
             'machine': os.getenv('COMPUTERNAME', 'unknown')
         }
-    
-    def _save_daily_data(self, filepath: str, data: Dict):
-        """Save daily serial number data to file."""
-        try:
-            # Write to temporary file first, then rename for atomic operation
-            temp_path = filepath + '.tmp'
-            with open(temp_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-            # Atomic rename
-            if os.path.exists(filepath):
-                os.replace(temp_path, filepath)
-            else:
-                os.rename(temp_path, filepath)
-                
-        except Exception as e:
-            print(f"Error saving serial data: {e}")
-            # Clean up temp file if it exists
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
-            raise
+        
+        # Add job information if provided
+        if job_info:
+            log_entry.update({
+                'customer': job_info.get('customer', ''),
+                'po_number': job_info.get('po_number', ''),
+                'ticket_number': job_info.get('ticket_number', ''),
+                'upc': job_info.get('upc', ''),
+                'label_size': job_info.get('label_size', '')
+            })
+        return log_entry
     
     def allocate_serials(self, quantity: int, job_info: Dict = None) -> Tuple[int, int]:
         """
         Allocate a range of serial numbers atomically.
         
+        With an allocation service configured and reachable the service
+        allocates. Otherwise, in leasing mode, jobs that fit in a lease are
+        served from the workstation's lease without touching the shared file.
+        
         Args:
             quantity (int): Number of serial numbers to allocate
             job_info (dict): Job information for logging (optional)
@@ -167,64 +211,374 @@ class SerialNumberManager:
         if quantity <= 0:
             raise ValueError("Quantity must be positive")
         
+        served, serial_range = self._call_service('allocate', quantity, job_info)
+        if served:
+            return serial_range
+        
+        if self.lease_size and quantity <= self.lease_size:
+            return self._allocate_from_lease([(quantity, job_info)])[0]
+        
         filepath = self._get_today_filepath()
         
         with self.lock:  # Thread-level lock
             try:
-                # Load current data
-                data = self._load_daily_data(filepath)
+                with self._locked_daily_file(filepath):  # Workstation-level lock
+                    ledger = self._open_ledger(filepath)
+                    
+                    # Allocate serial range
+                    start_serial = ledger.next_serial()
+                    end_serial = start_serial + quantity - 1
+                    
+                    # Log the allocation as one ledger line
+                    record = self._build_log_entry(start_serial, end_serial, job_info)
+                    ledger.append([dict(record, type='allocation', next_serial=end_serial + 1)])
                 
-                # Allocate serial range
-                start_serial = data['current_serial']
-                end_serial = start_serial + quantity - 1
-                data['current_serial'] = end_serial + 1
+                return start_serial, end_serial
                 
-                # Log the allocation
-                log_entry = {
-                    'timestamp': datetime.now().isoformat(),
-                    'start_serial': start_serial,
-                    'end_serial': end_serial,
-                    'quantity': quantity,
-                    'user': os.getenv('USERNAME', 'unknown'),
-                    'machine': os.getenv('COMPUTERNAME', 'unknown')
-                }
+            except Exception as e:
+                print(f"Error in serial allocation: {e}")
+                raise
+    
+    def allocate_serials_batch(self, jobs: List[Tuple[int, Dict]]) -> List[Tuple[int, int]]:
+        """
+        Allocate serial ranges for several jobs at once.
+        
+        The ranges follow each other in the order of jobs and are reserved
+        under one lock with one ledger write; every job still gets its own
+        usage log entry, tagged with a shared batch_id. Either every job gets
+        its range or, if the allocation fails, none does.
+        
+        Args:
+            jobs (list): (quantity, job_info) pairs
+        
+        Returns:
+            list: (start_serial, end_serial) per job, in the order given
+        
+        Raises:
+            Exception: If allocation fails
+        """
+        jobs = [(int(quantity), job_info) for quantity, job_info in jobs]
+        if not jobs:
+            return []
+        if any(quantity <= 0 for quantity, _ in jobs):
+            raise ValueError("Quantity must be positive")
+        
+        served, ranges = self._call_service('allocate_batch', jobs)
+        if served:
+            return ranges
+        
+        if self.lease_size and sum(quantity for quantity, _ in jobs) <= self.lease_size:
+            return self._allocate_from_lease(jobs, batch=True)
+        
+        filepath = self._get_today_filepath()
+        
+        with self.lock:  # Thread-level lock
+            try:
+                with self._locked_daily_file(filepath):  # Workstation-level lock
+                    ledger = self._open_ledger(filepath)
+                    start_serial = ledger.next_serial()
+                    batch_id = f"{os.getenv('COMPUTERNAME', 'unknown')}-{start_serial}"
+                    
+                    ranges = []
+                    records = []
+                    for quantity, job_info in jobs:
+                        end_serial = start_serial + quantity - 1
+                        record = self._build_log_entry(start_serial, end_serial, job_info)
+                        records.append(dict(record, type='allocation', batch_id=batch_id,
+                                            next_serial=end_serial + 1))
+                        ranges.append((start_serial, end_serial))
+                        start_serial = end_serial + 1
+                    
+                    # One write for the whole batch
+                    ledger.append(records)
                 
-                # Add job information if provided
-                if job_info:
-                    log_entry.update({
-                        'customer': job_info.get('customer', ''),
-                        'po_number': job_info.get('po_number', ''),
-                        'ticket_number': job_info.get('ticket_number', ''),
-                        'upc': job_info.get('upc', ''),
-                        'label_size': job_info.get('label_size', '')
-                    })
+                return ranges
                 
-                data['usage_log'].append(log_entry)
+            except Exception as e:
+                print(f"Error in batch serial allocation: {e}")
+                raise
+    
+    def _allocate_from_lease(self, jobs: List[Tuple[int, Dict]], batch: bool = False) -> List[Tuple[int, int]]:
+        """
+        Serve allocations from the active lease, renewing it when needed.
+        
+        All jobs are served from the same lease, so they get consecutive
+        ranges; the lease is only renewed before the first one.
+        """
+        quantity = sum(job_quantity for job_quantity, _ in jobs)
+        with self.lock:
+            try:
+                lease = self._lease
+                if (lease is None or lease['filepath'] != self._get_today_filepath()
+                        or lease['end_serial'] - lease['next_serial'] + 1 < quantity):
+                    lease = self._renew_lease()
                 
-                # Save updated data
-                self._save_daily_data(filepath, data)
+                batch_id = f"{lease['lease_id']}-{lease['next_serial']}" if batch else None
+                next_serial = lease['next_serial']
+                ranges = []
+                log_entries = []
+                for job_quantity, job_info in jobs:
+                    start_serial = next_serial
+                    end_serial = start_serial + job_quantity - 1
+                    next_serial = end_serial + 1
+                    
+                    log_entry = self._build_log_entry(start_serial, end_serial, job_info)
+                    log_entry['lease_id'] = lease['lease_id']
+                    if batch_id:
+                        log_entry['batch_id'] = batch_id
+                    log_entries.append(log_entry)
+                    ranges.append((start_serial, end_serial))
                 
-                return start_serial, end_serial
+                # On disk before the serials are handed out, see _settle_spooled_lease()
+                self._write_spool(log_entries)
+                lease['next_serial'] = next_serial
+                self._lease_log.extend(log_entries)
+                return ranges
                 
             except Exception as e:
-                print(f"Error in serial allocation: {e}")
+                print(f"Error in leased serial allocation: {e}")
                 raise
     
+    def _take_lease(self, ledger: SerialLedger, filepath: str) -> Tuple[Dict, Dict]:
+        """
+        Reserve lease_size serials from a ledger.
+        
+        Returns:
+            tuple: (in-memory lease, ledger record to append)
+        """
+        start_serial = ledger.next_serial()
+        end_serial = start_serial + self.lease_size - 1
+        
+        machine = os.getenv('COMPUTERNAME', 'unknown')
+        lease_id = f"{machine}-{start_serial}"
+        record = {
+            'type': 'lease',
+            'lease_id': lease_id,
+            'timestamp': datetime.now().isoformat(),
+            'start_serial': start_serial,
+            'end_serial': end_serial,
+            'quantity': self.lease_size,
+            'user': os.getenv('USERNAME', 'unknown'),
+            'machine': machine,
+            'next_serial': end_serial + 1
+        }
+        lease = {
+            'lease_id': lease_id,
+            'filepath': filepath,
+            'start_serial': start_serial,
+            'end_serial': end_serial,
+            'next_serial': start_serial
+        }
+        return lease, record
+    
+    def _settle_lease(self, ledger: SerialLedger, lease: Dict, lease_log: List[Dict]) -> List[Dict]:
+        """
+        Build the ledger records that close a lease.
+        
+        The allocations served from the lease come first, then a
+        lease_settle record with the used portion and the returned tail.
+        """
+        current_serial = ledger.next_serial()
+        records = [dict(entry, type='allocation', next_serial=current_serial) for entry in lease_log]
+        
+        used_quantity = lease['next_serial'] - lease['start_serial']
+        settle = {
+            'type': 'lease_settle',
+            'lease_id': lease['lease_id'],
+            'closed_timestamp': datetime.now().isoformat(),
+            'used_quantity': used_quantity,
+            'used_end': lease['next_serial'] - 1 if used_quantity else None
+        }
+        if lease['next_serial'] <= lease['end_serial']:
+            # Hand the tail back to the shared counter if nobody allocated after the lease
+            reclaimed = current_serial == lease['end_serial'] + 1
+            if reclaimed:
+                current_serial = lease['next_serial']
+            settle.update({
+                'returned_start': lease['next_serial'],
+                'returned_end': lease['end_serial'],
+                'reclaimed': reclaimed
+            })
+        settle['next_serial'] = current_serial
+        records.append(settle)
+        return records
+    
+    def _renew_lease(self) -> Dict:
+        """Settle the current lease and take a new one (caller holds self.lock)."""
+        if self._lease is None and os.path.exists(self.spool_path):
+            # Never start a new spool over a lease that is still unsettled
+            self._settle_spooled_lease()
+        filepath = self._get_today_filepath()
+        old_lease = self._lease
+        if old_lease is not None and old_lease['filepath'] != filepath:
+            # The day changed: settle yesterday's lease in yesterday's ledger
+            self._release_lease_locked()
+            old_lease = None
+        
+        with self._locked_daily_file(filepath):
+            ledger = self._open_ledger(filepath)
+            if old_lease is not None:
+                ledger.append(self._settle_lease(ledger, old_lease, self._lease_log))
+            lease, record = self._take_lease(ledger, filepath)
+            ledger.append([record])
+        
+        self._lease = lease
+        self._lease_log = []
+        self._write_spool([dict(lease, type='lease')], new=True)
+        if not self._release_registered:
+            atexit.register(self.release_lease)
+            self._release_registered = True
+        print(f"Leased serials {lease['start_serial']}-{lease['end_serial']}")
+        return lease
+    
+    def _release_lease_locked(self):
+        """Settle the current lease in its daily ledger (caller holds self.lock)."""
+        lease = self._lease
+        if lease is None:
+            return
+        with self._locked_daily_file(lease['filepath']):
+            ledger = self._open_ledger(lease['filepath'])
+            ledger.append(self._settle_lease(ledger, lease, self._lease_log))
+        self._lease = None
+        self._lease_log = []
+        self._remove_spool()
+    
+    def _write_spool(self, records: List[Dict], new: bool = False):
+        """Write records to the lease spool and flush them to disk (caller holds self.lock)."""
+        os.makedirs(os.path.dirname(self.spool_path) or '.', exist_ok=True)
+        with open(self.spool_path, 'w' if new else 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _remove_spool(self):
+        try:
+            os.remove(self.spool_path)
+        except FileNotFoundError:
+            pass
+    
+    def _settle_spooled_lease(self):
+        """
+        Settle the lease a previous run left in the spool file.
+        
+        The spool holds the lease followed by the usage log entries served
+        from it. If the ledger already has the lease settled (the run died
+        after settling it) the spool is just removed. A spool whose daily
+        ledger is gone is kept aside as .unsettled for manual review.
+        """
+        try:
+            with open(self.spool_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        
+        lease = None
+        lease_log = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line: that allocation was never handed out
+            if record.get('type') == 'lease':
+                lease = {key: record[key] for key in
+                         ('lease_id', 'filepath', 'start_serial', 'end_serial', 'next_serial')}
+            elif lease is not None:
+                lease_log.append(record)
+        if lease is None:
+            self._remove_spool()
+            return
+        lease['next_serial'] = max([lease['start_serial']] + [entry['end_serial'] + 1 for entry in lease_log])
+        
+        ledger = SerialLedger(lease['filepath'])
+        if not ledger.exists():
+            os.replace(self.spool_path, self.spool_path + '.unsettled')
+            print(f"Warning: Ledger of serial lease {lease['lease_id']} not found; "
+                  f"kept its allocations in {self.spool_path}.unsettled")
+            return
+        with self._locked_daily_file(lease['filepath']):
+            settled = any(record.get('type') == 'lease_settle' and record.get('lease_id') == lease['lease_id']
+                          for record in ledger.records())
+            if not settled:
+                ledger.append(self._settle_lease(ledger, lease, lease_log))
+        self._remove_spool()
+        if not settled:
+            print(f"Settled serial lease {lease['lease_id']} left by the last run "
+                  f"({len(lease_log)} allocations)")
+    
+    def release_lease(self):
+        """
+        Return the unused part of the lease and write its usage log.
+        
+        Called automatically at exit; safe to call when no lease is held.
+        """
+        with self.lock:
+            try:
+                self._release_lease_locked()
+            except Exception as e:
+                print(f"Error releasing serial lease: {e}")
+    
     def get_next_serial(self) -> int:
         """
         Get the next available serial number without allocating it.
         
+        With an active lease for today this is the next serial of the lease.
+        Otherwise only the last record of today's ledger is read.
+        
         Returns:
             int: Next available serial number
         """
         filepath = self._get_today_filepath()
-        data = self._load_daily_data(filepath)
-        return data['current_serial']
+        lease = self._lease
+        if lease is not None and lease['filepath'] == filepath and lease['next_serial'] <= lease['end_serial']:
+            return lease['next_serial']
+        
+        served, next_serial = self._call_service('next_serial')
+        if served:
+            return next_serial
+        
+        ledger = SerialLedger(filepath)
+        try:
+            if ledger.exists():
+                return ledger.next_serial()
+            legacy_path = os.path.join(self.base_path, legacy_filename(date.today()))
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
+                    return json.load(f).get('current_serial', DEFAULT_START_SERIAL)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read serial ledger: {e}")
+        return DEFAULT_START_SERIAL
+    
+    def get_ledger_signature(self):
+        """
+        Cheap fingerprint of today's serial state, for callers that cache
+        get_next_serial() and the usage summary.
+        
+        Only stats today's ledger (or old-format file); the held lease is
+        included because it hands out serials without touching the ledger.
+        
+        Returns:
+            tuple: (path, size, mtime_ns, lease next serial); size and
+                mtime are None when there is no file for today yet
+        """
+        filepath = self._get_today_filepath()
+        lease = self._lease
+        lease_next = lease['next_serial'] if lease is not None and lease['filepath'] == filepath else None
+        for path in (filepath, os.path.join(self.base_path, legacy_filename(date.today()))):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            return (path, stat.st_size, stat.st_mtime_ns, lease_next)
+        return (filepath, None, None, lease_next)
     
     def get_daily_usage_summary(self, target_date: date = None) -> Dict:
         """
         Get usage summary for a specific date.
         
+        Reads the day's ledger, its compacted archive, or an old-format
+        daily JSON file, whichever exists.
+        
         Args:
             target_date (date): Date to get summary for (defaults to today)
         
@@ -234,31 +588,54 @@ class SerialNumberManager:
         if target_date is None:
             target_date = date.today()
         
-        filename = f"serials_{target_date.strftime('%Y-%m-%d')}.json"
-        filepath = os.path.join(self.base_path, filename)
-        
-        if not os.path.exists(filepath):
-            return {
-                'date': target_date.isoformat(),
-                'total_allocated': 0,
-                'allocations_count': 0,
-                'usage_log': [],
-                'next_serial': 1000
-            }
+        empty = {
+            'date': target_date.isoformat(),
+            'total_allocated': 0,
+            'allocations_count': 0,
+            'usage_log': [],
+            'leases': [],
+            'next_serial': DEFAULT_START_SERIAL
+        }
         
-        data = self._load_daily_data(filepath)
+        try:
+            for ledger_path in (os.path.join(self.base_path, ledger_filename(target_date)),
+                                archived_ledger_path(self.base_path, target_date)):
+                if os.path.exists(ledger_path):
+                    summary = summarize_records(*read_ledger_records(ledger_path))
+                    summary['date'] = target_date.isoformat()
+                    return summary
+            
+            legacy_path = os.path.join(self.base_path, legacy_filename(target_date))
+            if os.path.exists(legacy_path):
+                with open(legacy_path, 'r') as f:
+                    data = json.load(f)
+                usage_log = data.get('usage_log', [])
+                return dict(empty,
+                            total_allocated=sum(entry.get('quantity', 0) for entry in usage_log),
+                            allocations_count=len(usage_log),
+                            usage_log=usage_log,
+                            leases=data.get('leases', []),
+                            next_serial=data.get('current_serial', DEFAULT_START_SERIAL))
+            
+            compacted = load_summary_file(self.base_path).get(target_date.isoformat())
+            if compacted:
+                return dict(empty,
+                            total_allocated=compacted.get('total_allocated', 0),
+                            allocations_count=compacted.get('allocations_count', 0),
+                            next_serial=compacted.get('next_serial', DEFAULT_START_SERIAL))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read serial usage for {target_date}: {e}")
         
-        total_allocated = 0
-        for entry in data.get('usage_log', []):
-            total_allocated += entry.get('quantity', 0)
+        return empty
+    
+    def compact(self, keep_days: int = 7) -> List[str]:
+        """
+        Fold ledgers older than keep_days into serials_summary.json.
         
-        return {
-            'date': target_date.isoformat(),
-            'total_allocated': total_allocated,
-            'allocations_count': len(data.get('usage_log', [])),
-            'usage_log': data.get('usage_log', []),
-            'next_serial': data.get('current_serial', 1000)
-        }
+        Returns:
+            list: Dates (ISO strings) that were compacted
+        """
+        return compact_ledgers(self.base_path, keep_days)
     
     def validate_base_path(self) -> Tuple[bool, str]:
         """
@@ -297,22 +674,105 @@ class SerialNumberManager:
 # Global instance for application-wide use
 _serial_manager = None
 
-def get_serial_manager(base_path: str = None) -> SerialNumberManager:
+def get_serial_manager(base_path: str = None, lease_size: int = None,
+                       service_address: str = None, spool_path: str = None) -> SerialNumberManager:
     """
     Get the global serial number manager instance.
     
     Args:
         base_path (str): Base path for serial files (used only on first call)
+        lease_size (int): Serials per lease, 0 to disable leasing; keeps the
+                          current setting when None
+        service_address (str): Allocation service address, '' to disable;
+                          keeps the current setting when None
+        spool_path (str): Lease spool file (used only when the manager is created)
     
     Returns:
         SerialNumberManager: Global serial manager instance
     """
     global _serial_manager
     if _serial_manager is None or (base_path and base_path != _serial_manager.base_path):
-        _serial_manager = SerialNumberManager(base_path)
+        if lease_size is None:
+            lease_size = _serial_manager.lease_size if _serial_manager else 0
+        if service_address is None:
+            service_address = _serial_manager.service_address if _serial_manager else None
+        if _serial_manager is not None:
+            _serial_manager.release_lease()
+        _serial_manager = SerialNumberManager(base_path, lease_size, service_address, spool_path)
+        return _serial_manager
+    
+    if lease_size is not None and lease_size != _serial_manager.lease_size:
+        _serial_manager.release_lease()
+        _serial_manager.lease_size = max(0, int(lease_size))
+    if service_address is not None and (service_address or None) != _serial_manager.service_address:
+        _serial_manager.service_address = service_address or None
+        _serial_manager._service_retry_at = 0.0
     return _serial_manager
 
 
+def _job_info_from_job_data(job_data: Dict = None) -> Dict:
+    """Extract the job fields logged with an allocation."""
+    if not job_data:
+        return {}
+    return {
+        'customer': job_data.get('Customer', ''),
+        'po_number': job_data.get('PO#', ''),
+        'ticket_number': job_data.get('Ticket#', job_data.get('Job Ticket#', '')),
+        'upc': job_data.get('UPC Number', ''),
+        'label_size': job_data.get('Label Size', '')
+    }
+
+
+# Job fields an edit of which changes the job's serial range
+SERIAL_RANGE_FIELDS = ('Quantity', 'Qty', 'Serial Number', 'Manual Serial Override',
+                       'Include 2% Buffer', 'Include 7% Buffer')
+
+
+def serial_range_for_edited_job(job_data: Dict, original_data: Dict, allocate=None) -> Tuple[int, int, int, str]:
+    """
+    Work out a job's serial range after an edit.
+
+    Under a manual serial override the range starts at the job's Serial
+    Number. Otherwise the job keeps its allocated range while the new total
+    still fits in it, which keeps its existing EPC database files valid, and
+    gets a new allocation when it does not.
+
+    Args:
+        job_data (dict): The job after the edit
+        original_data (dict): The job before the edit
+        allocate (callable): (quantity, job_data) -> (start, end); defaults
+            to allocate_serials_for_job
+
+    Returns:
+        tuple: (start_serial, end_serial, total_qty, source) where source is
+            'manual', 'kept' or 'allocated'
+    """
+    from .epc_conversion import calculate_total_quantity_with_percentages
+
+    base_qty = int(str(job_data.get('Quantity', job_data.get('Qty', '0'))).replace(',', ''))
+    if job_data.get('Enable EPC Generation', False):
+        total_qty = calculate_total_quantity_with_percentages(
+            base_qty,
+            job_data.get('Include 2% Buffer', False),
+            job_data.get('Include 7% Buffer', False)
+        )
+    else:
+        total_qty = base_qty
+
+    if job_data.get('Manual Serial Override', False):
+        start_serial = int(str(job_data.get('Serial Number', '1')).replace(',', ''))
+        return start_serial, start_serial + total_qty - 1, total_qty, 'manual'
+
+    old_start = original_data.get('Serial Range Start')
+    old_end = original_data.get('Serial Range End')
+    if old_start not in (None, '') and old_end not in (None, '') and \
+            total_qty <= int(old_end) - int(old_start) + 1:
+        return int(old_start), int(old_start) + total_qty - 1, total_qty, 'kept'
+
+    start_serial, end_serial = (allocate or allocate_serials_for_job)(total_qty, job_data)
+    return start_serial, end_serial, total_qty, 'allocated'
+
+
 def allocate_serials_for_job(quantity: int, job_data: Dict = None) -> Tuple[int, int]:
     """
     Convenience function to allocate serials for a job.
@@ -325,19 +785,22 @@ def allocate_serials_for_job(quantity: int, job_data: Dict = None) -> Tuple[int,
         tuple: (start_serial, end_serial)
     """
     manager = get_serial_manager()
+    return manager.allocate_serials(quantity, _job_info_from_job_data(job_data))
+
+
+def allocate_serials_for_jobs(jobs: List[Tuple[int, Dict]]) -> List[Tuple[int, int]]:
+    """
+    Convenience function to allocate serials for several jobs at once.
     
-    # Extract relevant job info for logging
-    job_info = {}
-    if job_data:
-        job_info = {
-            'customer': job_data.get('Customer', ''),
-            'po_number': job_data.get('PO#', ''),
-            'ticket_number': job_data.get('Ticket#', job_data.get('Job Ticket#', '')),
-            'upc': job_data.get('UPC Number', ''),
-            'label_size': job_data.get('Label Size', '')
-        }
+    Args:
+        jobs (list): (quantity, job_data) pairs
     
-    return manager.allocate_serials(quantity, job_info)
+    Returns:
+        list: (start_serial, end_serial) per job, in the order given
+    """
+    manager = get_serial_manager()
+    return manager.allocate_serials_batch(
+        [(quantity, _job_info_from_job_data(job_data)) for quantity, job_data in jobs])
 
 
 def get_next_available_serial() -> int:
@@ -354,4 +817,6 @@ def get_next_available_serial() -> int:
 def reset_serial_manager():
     """Reset the global serial manager instance to pick up new configuration."""
     global _serial_manager
+    if _serial_manager is not None:
+        _serial_manager.release_lease()
     _serial_manager = None 
\ No newline at end of file
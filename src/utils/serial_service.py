@@ -0,0 +1,380 @@
+"""
+Serial Allocation Service
+
+Optional network service that owns the daily serial ledger so workstations
+do not have to take file locks on the shared drive for every job.
+
+The server is a small asyncio process that speaks newline-delimited JSON
+over TCP or a Unix socket. It allocates through its own SerialNumberManager,
+so it writes the same ledger and takes the same daily lock as workstations
+that fall back to the file path. The two can run side by side.
+
+Requests and replies (one JSON object per line):
+    {"id": 1, "op": "allocate", "quantity": 5000, "job_info": {...}, "request_key": "..."}
+        -> {"id": 1, "ok": true, "start_serial": 1000, "end_serial": 5999}
+    {"id": 2, "op": "allocate_batch", "jobs": [{"quantity": 500, "job_info": {...}}, ...],
+     "request_key": "..."}
+        -> {"id": 2, "ok": true, "ranges": [[6000, 6499], ...]}
+    {"id": 3, "op": "next_serial"}   -> {"id": 3, "ok": true, "next_serial": 6500}
+    {"id": 4, "op": "ping"}          -> {"id": 4, "ok": true}
+    failures                         -> {"id": ..., "ok": false, "error": "..."}
+
+Addresses are "host:port" for TCP or "unix:/path/to/socket".
+
+Allocations are idempotent by request_key: the server remembers the reply
+to recent keys, so a client that lost a reply resends the same request and
+gets the range that was already committed instead of a second one. A client
+whose allocation still goes unanswered raises SerialServiceNoReply, and the
+manager does not fall back to the file path for it.
+
+Usage:
+    python -m src.utils.serial_service --base-path "Z:\\...\\Serial Numbers" --listen 0.0.0.0:8765
+    python -m src.utils.serial_service --base-path /srv/serials --listen unix:/run/serials.sock
+"""
+
+import os
+import json
+import uuid
+import socket
+import asyncio
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .serial_manager import SerialNumberManager
+
+
+DEFAULT_SERVICE_PORT = 8765
+
+# Seconds the client waits for a connection or a reply before falling back
+DEFAULT_CLIENT_TIMEOUT = 2.0
+
+# Seconds the client waits for an allocation reply; the server may be
+# queued behind the daily file lock on the shared drive
+ALLOCATION_REPLY_TIMEOUT = 60.0
+
+# Requests whose outcome only the server knows once they have been sent
+ALLOCATION_OPS = ("allocate", "allocate_batch")
+
+# Allocation replies the server keeps for clients that resend a request
+MAX_REMEMBERED_REQUESTS = 4096
+
+# Longest request line the server accepts
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Pending connections the listening socket queues (asyncio's default is 100)
+SERVER_BACKLOG = 1024
+
+
+class SerialServiceError(Exception):
+    """The service answered, but refused or failed the request."""
+
+
+class SerialServiceUnavailable(Exception):
+    """The service could not be reached or did not answer in time."""
+
+
+class SerialServiceNoReply(Exception):
+    """An allocation was sent but never answered; the service may have committed it."""
+
+
+def parse_service_address(address: str):
+    """
+    Split a service address.
+
+    Returns:
+        tuple: ("unix", path) or ("tcp", (host, port))
+    """
+    address = address.strip()
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    if not host:
+        host, port = address, DEFAULT_SERVICE_PORT
+    return "tcp", (host, int(port))
+
+
+class SerialAllocationServer:
+    """asyncio server answering allocation requests from one SerialNumberManager."""
+
+    def __init__(self, base_path: str, lease_size: int = 0):
+        """
+        Args:
+            base_path (str): Serial numbers folder the server owns
+            lease_size (int): Serials the server leases from the ledger at a
+                time; with a lease most requests are answered from memory
+        """
+        self.manager = SerialNumberManager(base_path, lease_size)
+        self.allocations = 0
+        self._server = None
+        self._completed = OrderedDict()   # request_key -> reply, oldest first
+        self._in_flight = {}              # request_key -> task of a running allocation
+
+    async def start(self, address: str):
+        """Start listening on a "host:port" or "unix:/path" address."""
+        kind, target = parse_service_address(address)
+        if kind == "unix":
+            if os.path.exists(target):
+                os.remove(target)
+            self._server = await asyncio.start_unix_server(self._handle_client, path=target,
+                                                           limit=MAX_REQUEST_BYTES, backlog=SERVER_BACKLOG)
+        else:
+            host, port = target
+            self._server = await asyncio.start_server(self._handle_client, host, port,
+                                                      limit=MAX_REQUEST_BYTES, backlog=SERVER_BACKLOG)
+        return self._server
+
+    @property
+    def addresses(self):
+        """Socket names the server listens on."""
+        return [sock.getsockname() for sock in self._server.sockets] if self._server else []
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening and settle the server's lease."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await asyncio.get_running_loop().run_in_executor(None, self.manager.release_lease)
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    break
+                if not line:
+                    break
+                reply = await self._dispatch(line)
+                writer.write((json.dumps(reply) + "\n").encode("utf-8"))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _allocate(self, op: str, request: Dict) -> Dict:
+        loop = asyncio.get_running_loop()
+        if op == "allocate":
+            # The manager does file I/O, keep it off the event loop
+            start_serial, end_serial = await loop.run_in_executor(
+                None, self.manager.allocate_serials,
+                int(request["quantity"]), request.get("job_info") or {})
+            self.allocations += 1
+            return {"ok": True, "start_serial": start_serial, "end_serial": end_serial}
+        jobs = [(int(job["quantity"]), job.get("job_info") or {}) for job in request["jobs"]]
+        ranges = await loop.run_in_executor(None, self.manager.allocate_serials_batch, jobs)
+        self.allocations += len(ranges)
+        return {"ok": True, "ranges": [list(r) for r in ranges]}
+
+    async def _allocate_once(self, op: str, request: Dict) -> Dict:
+        """
+        Run an allocation at most once per request_key.
+
+        A resent request gets the reply of the first one, waiting for it if
+        it is still running. Failed allocations are not remembered, so they
+        can be retried.
+        """
+        key = request.get("request_key")
+        if not key:
+            return await self._allocate(op, request)
+        if key in self._completed:
+            return self._completed[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._allocate(op, request))
+            self._in_flight[key] = task
+
+            def remember(finished):
+                self._in_flight.pop(key, None)
+                if not finished.cancelled() and finished.exception() is None:
+                    self._completed[key] = finished.result()
+                    while len(self._completed) > MAX_REMEMBERED_REQUESTS:
+                        self._completed.popitem(last=False)
+
+            task.add_done_callback(remember)
+        # A dropped connection must not cancel an allocation another retry may wait for
+        return await asyncio.shield(task)
+
+    async def _dispatch(self, line: bytes) -> Dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request.get("op")
+            loop = asyncio.get_running_loop()
+            if op in ALLOCATION_OPS:
+                return dict(await self._allocate_once(op, request), id=request_id)
+            if op == "next_serial":
+                next_serial = await loop.run_in_executor(None, self.manager.get_next_serial)
+                return {"id": request_id, "ok": True, "next_serial": next_serial}
+            if op == "ping":
+                return {"id": request_id, "ok": True}
+            return {"id": request_id, "ok": False, "error": f"Unknown op: {op}"}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+
+
+class SerialServiceClient:
+    """
+    Blocking client for the allocation service.
+
+    Keeps one connection open and reconnects on the next call after a
+    failure. Safe to share between threads.
+
+    Connecting and short requests use timeout; allocations wait up to
+    reply_timeout for their answer and are resent once, with the same
+    request_key, if the answer is lost.
+    """
+
+    def __init__(self, address: str, timeout: float = DEFAULT_CLIENT_TIMEOUT,
+                 reply_timeout: float = ALLOCATION_REPLY_TIMEOUT):
+        self.address = address
+        self.timeout = timeout
+        self.reply_timeout = reply_timeout
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+
+    def _connect(self):
+        kind, target = parse_service_address(self.address)
+        if kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(target)
+        else:
+            sock = socket.create_connection(target, timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        for item in (self._file, self._sock):
+            try:
+                if item is not None:
+                    item.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    def request(self, op: str, **params) -> Dict:
+        """
+        Send one request and wait for its reply.
+
+        Allocations get a request_key and are resent once on the same key
+        if their reply is lost, so the retry cannot allocate twice.
+
+        Raises:
+            SerialServiceUnavailable: Connection failed or timed out before
+                an allocation was sent (nothing was allocated)
+            SerialServiceNoReply: An allocation was sent but not answered
+            SerialServiceError: The service answered with an error
+        """
+        if op not in ALLOCATION_OPS:
+            return self._send(op, params)
+        params = dict(params, request_key=uuid.uuid4().hex)
+        try:
+            return self._send(op, params)
+        except SerialServiceNoReply as e:
+            print(f"{e} - asking again")
+            try:
+                return self._send(op, params)
+            except SerialServiceUnavailable as retry_error:
+                # The first attempt may still have been committed
+                raise SerialServiceNoReply(str(retry_error)) from e
+
+    def _send(self, op: str, params: Dict) -> Dict:
+        with self._lock:
+            self._next_id += 1
+            message = dict(params, id=self._next_id, op=op)
+            sent = False
+            try:
+                if self._sock is None:
+                    self._connect()
+                self._file.write((json.dumps(message) + "\n").encode("utf-8"))
+                self._file.flush()
+                sent = True
+                if op in ALLOCATION_OPS:
+                    self._sock.settimeout(self.reply_timeout)
+                try:
+                    line = self._file.readline()
+                finally:
+                    self._sock.settimeout(self.timeout)
+                if not line:
+                    raise ConnectionError("Service closed the connection")
+                reply = json.loads(line)
+            except (OSError, ValueError) as e:
+                self._close()
+                if sent and op in ALLOCATION_OPS:
+                    raise SerialServiceNoReply(f"Serial service {self.address} did not answer "
+                                               f"an allocation: {e}") from e
+                raise SerialServiceUnavailable(f"Serial service {self.address} unavailable: {e}") from e
+
+        if reply.get("id") != message["id"]:
+            self.close()
+            raise SerialServiceUnavailable("Serial service reply out of order")
+        if not reply.get("ok"):
+            raise SerialServiceError(reply.get("error", "Unknown error"))
+        return reply
+
+    def allocate(self, quantity: int, job_info: Dict = None) -> Tuple[int, int]:
+        """Allocate serials through the service; returns (start_serial, end_serial)."""
+        reply = self.request("allocate", quantity=int(quantity), job_info=job_info or {})
+        return reply["start_serial"], reply["end_serial"]
+
+    def allocate_batch(self, jobs) -> List[Tuple[int, int]]:
+        """Allocate consecutive ranges for (quantity, job_info) pairs; returns one range per job."""
+        reply = self.request("allocate_batch", jobs=[{"quantity": int(quantity), "job_info": job_info or {}}
+                                                     for quantity, job_info in jobs])
+        return [tuple(serial_range) for serial_range in reply["ranges"]]
+
+    def next_serial(self) -> int:
+        return self.request("next_serial")["next_serial"]
+
+    def ping(self) -> bool:
+        try:
+            self.request("ping")
+            return True
+        except (SerialServiceUnavailable, SerialServiceError):
+            return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve serial number allocations over TCP or a Unix socket.")
+    parser.add_argument("--base-path", required=True, help="Serial numbers folder (the daily ledgers)")
+    parser.add_argument("--listen", default=f"127.0.0.1:{DEFAULT_SERVICE_PORT}",
+                        help='"host:port" or "unix:/path/to/socket"')
+    parser.add_argument("--lease-size", type=int, default=0,
+                        help="Serials the server reserves at a time (0 = write every allocation)")
+    args = parser.parse_args(argv)
+
+    async def run():
+        server = SerialAllocationServer(args.base_path, args.lease_size)
+        await server.start(args.listen)
+        print(f"Serial allocation service for {args.base_path} listening on {args.listen}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("Serial allocation service stopped")
+
+
+if __name__ == "__main__":
+    main()
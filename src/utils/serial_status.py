@@ -0,0 +1,167 @@
+"""
+Serial Status Cache
+Shared, non-blocking view of the serial numbers folder for the UI.
+
+The new job wizard shows the next available serial and today's usage on
+several pages. Working that out touches the shared drive: the write probe
+of validate_base_path(), today's ledger and its usage summary. The cache
+does this in a worker thread and pushes the result with status_changed, so
+pages render whatever is cached and never wait on the network.
+
+Each refresh stats today's ledger first. The ledger is only read again
+when its size or mtime changed (or the held lease moved on); the write
+probe runs again after VALIDATE_INTERVAL, or on every refresh while the
+folder is unreachable.
+"""
+
+import time
+
+from PySide6.QtCore import QObject, QThread, Signal
+
+import src.config as config
+from .serial_manager import get_serial_manager
+
+
+# Seconds a successful write probe of the serial folder is trusted
+VALIDATE_INTERVAL = 300.0
+
+
+def _empty_status(base_path=None):
+    return {
+        'ready': False,          # False until the first refresh finished
+        'is_valid': False,
+        'message': "Checking serial numbers path...",
+        'next_serial': None,
+        'total_allocated': 0,
+        'base_path': base_path,
+        'checked_at': None,
+    }
+
+
+class SerialStatusWorker(QThread):
+    """Worker thread that probes the serial folder and reads today's ledger if it changed."""
+
+    status_ready = Signal(dict, object, object)   # status, ledger signature, validated at
+
+    def __init__(self, base_path, status, signature, validated_at):
+        super().__init__()
+        self.base_path = base_path
+        self.status = status
+        self.signature = signature
+        self.validated_at = validated_at
+
+    def run(self):
+        status = dict(self.status, base_path=self.base_path)
+        signature = self.signature
+        validated_at = self.validated_at
+        try:
+            manager = get_serial_manager(self.base_path)
+
+            now = time.monotonic()
+            if (not status['is_valid'] or validated_at is None
+                    or now - validated_at >= VALIDATE_INTERVAL):
+                is_valid, message = manager.validate_base_path()
+                status.update(is_valid=is_valid, message=message)
+                validated_at = now if is_valid else None
+
+            if status['is_valid']:
+                new_signature = manager.get_ledger_signature()
+                if new_signature != signature or status['next_serial'] is None:
+                    status['next_serial'] = manager.get_next_serial()
+                    status['total_allocated'] = manager.get_daily_usage_summary().get('total_allocated', 0)
+                    signature = new_signature
+            else:
+                status.update(next_serial=None, total_allocated=0)
+                signature = None
+        except Exception as e:
+            print(f"Error refreshing serial status: {e}")
+            status.update(is_valid=False, message=f"Serial manager error: {e}",
+                          next_serial=None, total_allocated=0)
+            signature = None
+            validated_at = None
+
+        status.update(ready=True, checked_at=time.time())
+        self.status_ready.emit(status, signature, validated_at)
+
+
+class SerialStatusCache(QObject):
+    """
+    Last known serial status for the configured serial numbers folder.
+
+    status_changed is emitted with a copy of the status dict whenever a
+    refresh produced something different from what was cached.
+    """
+
+    status_changed = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._status = _empty_status()
+        self._signature = None
+        self._validated_at = None
+        self._worker = None
+        self._refresh_pending = False
+
+    def current_status(self):
+        """
+        Get the cached status without touching the disk.
+
+        Returns:
+            dict: ready, is_valid, message, next_serial, total_allocated,
+                base_path and checked_at
+        """
+        return dict(self._status)
+
+    def request_refresh(self):
+        """Refresh the status in the background; returns immediately."""
+        if self._worker is not None:
+            # One probe at a time; run again once the current one is done
+            self._refresh_pending = True
+            return
+
+        base_path = config.get_serial_numbers_path()
+        status = self._status
+        if base_path != status['base_path']:
+            # Serial folder changed in the settings, forget what we knew
+            status = _empty_status(base_path)
+            self._signature = None
+            self._validated_at = None
+
+        self._worker = SerialStatusWorker(base_path, status, self._signature, self._validated_at)
+        self._worker.status_ready.connect(self._on_status_ready)
+        self._worker.finished.connect(self._on_worker_finished)
+        self._worker.start()
+
+    def _on_status_ready(self, status, signature, validated_at):
+        self._signature = signature
+        self._validated_at = validated_at
+        changed = any(status.get(key) != self._status.get(key)
+                      for key in status if key != 'checked_at')
+        self._status = status
+        if changed:
+            self.status_changed.emit(dict(status))
+
+    def _on_worker_finished(self):
+        self._worker.deleteLater()
+        self._worker = None
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.request_refresh()
+
+
+# Global instance for application-wide use
+_serial_status_cache = None
+
+def get_serial_status_cache() -> SerialStatusCache:
+    """
+    Get the global serial status cache.
+
+    Must be called from the GUI thread.
+
+    Returns:
+        SerialStatusCache: Global cache instance
+    """
+    global _serial_status_cache
+    if _serial_status_cache is None:
+        _serial_status_cache = SerialStatusCache()
+    return _serial_status_cache
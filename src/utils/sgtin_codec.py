@@ -0,0 +1,384 @@
+"""
+SGTIN-96 Codec
+
+Table-driven encoder/decoder for SGTIN-96 EPCs following the GS1 EPC Tag
+Data Standard. Every GS1 company prefix length (partitions 0-6) and every
+filter value is supported, and both UPC-12 and GTIN-14 (as well as GTIN-8
+and GTIN-13) inputs are accepted.
+
+Encoding and decoding work on 96-bit values held as two uint64 "lanes"
+(hi = bits 95-64, lo = bits 63-0), so the single-item functions and the
+NumPy bulk functions share the same arithmetic.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+SGTIN96_HEADER = 0b00110000
+SERIAL_BITS = 38
+MAX_SERIAL = (1 << SERIAL_BITS) - 1
+
+# The application's defaults: "0" + first six UPC digits as a 7-digit
+# company prefix (partition 5) and filter 1 (point-of-sale trade item).
+DEFAULT_COMPANY_PREFIX_LENGTH = 7
+DEFAULT_FILTER_VALUE = 1
+
+# GS1 partition table: partition -> (company prefix bits, company prefix digits,
+#                                    item reference bits, item reference digits)
+PARTITION_TABLE = {
+    0: (40, 12, 4, 1),
+    1: (37, 11, 7, 2),
+    2: (34, 10, 10, 3),
+    3: (30, 9, 14, 4),
+    4: (27, 8, 17, 5),
+    5: (24, 7, 20, 6),
+    6: (20, 6, 24, 7),
+}
+PARTITION_BY_PREFIX_LENGTH = {digits: partition
+                              for partition, (_, digits, _, _) in PARTITION_TABLE.items()}
+
+# Number of (GTIN, company prefix length, filter) prefixes kept by the
+# single-EPC cache; a job touches one or two, the whole app a few dozen
+PREFIX_CACHE_SIZE = 1024
+
+_PREFIX_LO_BITS = 64 - SERIAL_BITS  # prefix bits that spill into the low lane
+_HEX_DIGITS = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+_HI_NIBBLE_SHIFTS = np.arange(28, -1, -4, dtype=np.uint64)
+_LO_NIBBLE_SHIFTS = np.arange(60, -1, -4, dtype=np.uint64)
+_HEX_BLOCK_ROWS = 65536  # bounds the temporary nibble matrices to a few MB
+_HEX_VALUES = np.full(256, 0xFF, dtype=np.uint8)  # ASCII byte -> nibble, 0xFF = not hex
+_HEX_VALUES[np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)] = np.arange(16)
+_HEX_VALUES[np.frombuffer(b"abcdef", dtype=np.uint8)] = np.arange(10, 16)
+
+# Per-partition lookup vectors for the bulk decoder (index 7 is reserved)
+_ITEM_BITS_LUT = np.array([PARTITION_TABLE[p][2] for p in range(7)] + [0], dtype=np.uint64)
+_COMPANY_LIMIT_LUT = np.array([10 ** PARTITION_TABLE[p][1] for p in range(7)] + [0], dtype=np.int64)
+_ITEM_LIMIT_LUT = np.array([10 ** PARTITION_TABLE[p][3] for p in range(7)] + [0], dtype=np.int64)
+_ITEM_REST_LUT = np.array([10 ** (PARTITION_TABLE[p][3] - 1) for p in range(7)] + [1], dtype=np.int64)
+
+
+def normalize_gtin(code):
+    """
+    Normalize a UPC-12, GTIN-8, GTIN-13 or GTIN-14 into a 14-digit GTIN string.
+
+    Raises:
+        ValueError: If the code is not 8, 12, 13 or 14 digits
+    """
+    code = str(code).strip()
+    if not code.isdigit() or len(code) not in (8, 12, 13, 14):
+        raise ValueError(f"'{code}' is not a UPC-12 or GTIN-8/13/14")
+    return code.zfill(14)
+
+
+def gtin_check_digit(digits):
+    """
+    GS1 mod-10 check digit for a digit string (without its check digit).
+
+    Weights alternate 3, 1, ... starting from the rightmost digit, which
+    covers UPC-12, GTIN-13 and GTIN-14 alike.
+    """
+    total = sum(int(d) * (3 if i % 2 == 0 else 1) for i, d in enumerate(reversed(digits)))
+    return (10 - total % 10) % 10
+
+
+def gtin_check_digits(partial_values, digit_count):
+    """
+    Vectorized gtin_check_digit for integer-valued GTIN bodies.
+
+    Args:
+        partial_values (numpy.ndarray): GTIN bodies without check digit, as integers
+        digit_count (int): Number of digits in each body
+
+    Returns:
+        numpy.ndarray: Check digits (0-9)
+    """
+    powers = 10 ** np.arange(digit_count - 1, -1, -1, dtype=np.int64)
+    digits = (np.asarray(partial_values, dtype=np.int64)[:, None] // powers) % 10
+    # The rightmost digit gets weight 3
+    weights = np.where(np.arange(digit_count)[::-1] % 2 == 0, 3, 1)
+    return (10 - (digits * weights).sum(axis=1) % 10) % 10
+
+
+def gtin14_to_upc(gtin14):
+    """Return the UPC-12 form of a GTIN-14, or None if it has no UPC-12 form."""
+    return gtin14[2:] if gtin14.startswith("00") else None
+
+
+def encode_lanes(prefix_value, serials):
+    """
+    Combine a 58-bit SGTIN prefix with a serial vector into two uint64 lanes.
+
+    Returns:
+        tuple: (hi, lo) where hi holds EPC bits 95-64 and lo holds bits 63-0
+    """
+    serials = np.asarray(serials, dtype=np.uint64)
+    hi = np.full(serials.shape, prefix_value >> _PREFIX_LO_BITS, dtype=np.uint64)
+    lo_prefix = np.uint64((prefix_value & ((1 << _PREFIX_LO_BITS) - 1)) << SERIAL_BITS)
+    lo = lo_prefix | serials
+    return hi, lo
+
+
+def lanes_to_hex(hi, lo):
+    """Render (hi, lo) uint64 lanes as an array of 24-character uppercase hex strings."""
+    count = len(lo)
+    ascii_rows = np.empty((count, 24), dtype=np.uint8)
+    for block_start in range(0, count, _HEX_BLOCK_ROWS):
+        block = slice(block_start, min(block_start + _HEX_BLOCK_ROWS, count))
+        ascii_rows[block, :8] = _HEX_DIGITS[(hi[block, None] >> _HI_NIBBLE_SHIFTS) & np.uint64(0xF)]
+        ascii_rows[block, 8:] = _HEX_DIGITS[(lo[block, None] >> _LO_NIBBLE_SHIFTS) & np.uint64(0xF)]
+    return ascii_rows.view("S24").ravel().astype("U24")
+
+
+def hex_to_lanes(hex_array):
+    """
+    Parse 24-character EPC hex strings into two uint64 lanes.
+
+    Surrounding whitespace is ignored and either hex case is accepted.
+
+    Returns:
+        tuple: (hi, lo, well_formed) - hi holds EPC bits 95-64, lo bits 63-0,
+               well_formed marks rows that were exactly 24 hex characters
+    """
+    values = np.char.strip(np.asarray(hex_array, dtype=str))
+    count = len(values)
+    well_formed = np.char.str_len(values) == 24
+
+    # Read the UTF-32 code points straight out of the string buffer
+    width = values.dtype.itemsize // 4
+    codes = np.zeros((count, 24), dtype=np.uint32)
+    codes[:, :min(width, 24)] = values.view(np.uint32).reshape(count, width)[:, :24]
+    nibbles = _HEX_VALUES[np.minimum(codes, 0xFF)]
+    well_formed &= (nibbles != 0xFF).all(axis=1)
+    nibbles[~well_formed] = 0
+
+    # Pack nibble pairs into bytes and reinterpret them as big-endian words
+    packed = np.zeros((count, 16), dtype=np.uint8)
+    packed[:, 4:] = (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+    lanes = packed.view(">u8").astype(np.uint64)
+    return lanes[:, 0].copy(), lanes[:, 1].copy(), well_formed
+
+
+class SGTIN96Codec:
+    """
+    Encoder/decoder for one (company prefix length, filter value) combination.
+
+    Obtain instances through get_sgtin96_codec() so each combination is
+    built once and reused for the rest of the run.
+    """
+
+    def __init__(self, company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH,
+                 filter_value=DEFAULT_FILTER_VALUE):
+        if company_prefix_length not in PARTITION_BY_PREFIX_LENGTH:
+            raise ValueError("GS1 company prefix length must be between 6 and 12 digits")
+        if not 0 <= filter_value <= 7:
+            raise ValueError("Filter value must be between 0 and 7")
+
+        self.company_prefix_length = company_prefix_length
+        self.filter_value = filter_value
+        self.partition = PARTITION_BY_PREFIX_LENGTH[company_prefix_length]
+        (self.company_bits, self.company_digits,
+         self.item_bits, self.item_digits) = PARTITION_TABLE[self.partition]
+        self._fixed_bits = ((SGTIN96_HEADER << 50) | (filter_value << 47) | (self.partition << 44))
+        self._item_mask = (1 << self.item_bits) - 1
+
+    def __repr__(self):
+        return (f"SGTIN96Codec(company_prefix_length={self.company_prefix_length}, "
+                f"filter_value={self.filter_value})")
+
+    def prefix_value(self, gtin):
+        """
+        The fixed 58-bit part of the EPC (everything except the serial).
+
+        Args:
+            gtin (str): UPC-12 or GTIN-8/13/14
+        """
+        gtin14 = normalize_gtin(gtin)
+        company_prefix = int(gtin14[1:1 + self.company_digits])
+        # The indicator digit leads the item reference field
+        item_reference = int(gtin14[0] + gtin14[1 + self.company_digits:13])
+        return self._fixed_bits | (company_prefix << self.item_bits) | item_reference
+
+    def cached_prefix_value(self, gtin):
+        """prefix_value() through the shared LRU prefix cache."""
+        return _cached_serial_base(gtin, self.company_prefix_length, self.filter_value) >> SERIAL_BITS
+
+    def encode(self, gtin, serial_number):
+        """Encode one GTIN + serial as a 24-character hex EPC."""
+        serial_number = int(serial_number)
+        if not 0 <= serial_number <= MAX_SERIAL:
+            raise ValueError(f"Serial number must be between 0 and {MAX_SERIAL}")
+        return f"{_cached_serial_base(gtin, self.company_prefix_length, self.filter_value) | serial_number:024X}"
+
+    def encode_serials(self, gtin, serial_numbers):
+        """Encode an arbitrary collection of serials; returns a '<U24' array."""
+        serials = np.asarray(serial_numbers, dtype=np.int64)
+        if serials.size and (serials.min() < 0 or serials.max() > MAX_SERIAL):
+            raise ValueError(f"Serial numbers must be between 0 and {MAX_SERIAL}")
+        hi, lo = encode_lanes(self.cached_prefix_value(gtin), serials.astype(np.uint64))
+        return lanes_to_hex(hi, lo)
+
+    def encode_range(self, gtin, start_serial, count):
+        """Encode a contiguous serial range; returns a '<U24' array."""
+        if count < 0:
+            raise ValueError("Count must not be negative")
+        if start_serial < 0 or (count and start_serial + count - 1 > MAX_SERIAL):
+            raise ValueError(f"Serial range must lie between 0 and {MAX_SERIAL}")
+        serials = np.arange(start_serial, start_serial + count, dtype=np.uint64)
+        hi, lo = encode_lanes(self.cached_prefix_value(gtin), serials)
+        return lanes_to_hex(hi, lo)
+
+    def decode_value(self, value):
+        """
+        Decode a 96-bit integer EPC that uses this codec's partition and filter.
+
+        Returns:
+            dict: Decoded fields, or None if the EPC does not match this codec
+        """
+        if value >> 88 != SGTIN96_HEADER:
+            return None
+        if (value >> 85) & 0b111 != self.filter_value or (value >> 82) & 0b111 != self.partition:
+            return None
+
+        serial_number = value & MAX_SERIAL
+        item_reference = (value >> SERIAL_BITS) & self._item_mask
+        company_prefix = (value >> (SERIAL_BITS + self.item_bits)) & ((1 << self.company_bits) - 1)
+        if company_prefix >= 10 ** self.company_digits or item_reference >= 10 ** self.item_digits:
+            return None
+
+        company_str = str(company_prefix).zfill(self.company_digits)
+        item_str = str(item_reference).zfill(self.item_digits)
+        gtin13 = item_str[0] + company_str + item_str[1:]
+        gtin14 = gtin13 + str(gtin_check_digit(gtin13))
+        return {
+            'filter': self.filter_value,
+            'partition': self.partition,
+            'company_prefix': company_str,
+            'item_reference': item_str,
+            'gtin14': gtin14,
+            'upc': gtin14_to_upc(gtin14),
+            'serial': serial_number,
+        }
+
+    def decode(self, epc_hex):
+        """Decode a hex EPC; returns the field dict or None."""
+        try:
+            value = int(str(epc_hex).strip(), 16)
+        except ValueError:
+            return None
+        return self.decode_value(value)
+
+
+@lru_cache(maxsize=None)
+def get_sgtin96_codec(company_prefix_length=DEFAULT_COMPANY_PREFIX_LENGTH,
+                      filter_value=DEFAULT_FILTER_VALUE):
+    """Get the shared codec for a (company prefix length, filter value) pair."""
+    return SGTIN96Codec(company_prefix_length, filter_value)
+
+
+@lru_cache(maxsize=PREFIX_CACHE_SIZE)
+def _cached_serial_base(gtin, company_prefix_length, filter_value):
+    """
+    The 96-bit EPC with a zero serial for one SGTIN-96 prefix.
+
+    Keyed by GTIN and the scheme's partition/filter, so encoding a single
+    EPC for a known UPC is one OR with the serial plus a hex format.
+    """
+    return get_sgtin96_codec(company_prefix_length, filter_value).prefix_value(gtin) << SERIAL_BITS
+
+
+def prefix_cache_info():
+    """Hit/miss counters of the SGTIN-96 prefix cache (functools CacheInfo)."""
+    return _cached_serial_base.cache_info()
+
+
+def clear_prefix_cache():
+    """Empty the SGTIN-96 prefix cache and reset its counters."""
+    _cached_serial_base.cache_clear()
+
+
+def decode_sgtin96(epc_hex):
+    """
+    Decode any SGTIN-96 EPC, whatever its partition and filter value.
+
+    Args:
+        epc_hex (str): 24-character hex EPC
+
+    Returns:
+        dict: filter, partition, company_prefix, item_reference, gtin14,
+              upc (None if the GTIN has no UPC-12 form) and serial;
+              None if the EPC is not a valid SGTIN-96
+    """
+    epc_hex = str(epc_hex).strip()
+    if len(epc_hex) != 24:
+        return None
+    try:
+        value = int(epc_hex, 16)
+    except ValueError:
+        return None
+    partition = (value >> 82) & 0b111
+    if value >> 88 != SGTIN96_HEADER or partition not in PARTITION_TABLE:
+        return None
+    codec = get_sgtin96_codec(PARTITION_TABLE[partition][1], (value >> 85) & 0b111)
+    return codec.decode_value(value)
+
+
+def decode_sgtin_prefix(prefix_values, header=SGTIN96_HEADER):
+    """
+    Bulk decode of the 58-bit SGTIN prefix (header, filter, partition,
+    company prefix, item reference), splitting each row by its partition.
+
+    Shared by SGTIN-96 and SGTIN-198, which only differ in the serial part.
+
+    Args:
+        prefix_values (numpy.ndarray): uint64 prefix values
+        header (int): Header the rows must carry to be valid
+
+    Returns:
+        dict: header, filter, partition, company_prefix and item_reference
+              arrays, plus 'gtin13' (GTIN-14 without its check digit, -1
+              where invalid) and 'valid' (expected header, a defined
+              partition and prefix/item values that fit their digit counts)
+    """
+    prefix_values = np.asarray(prefix_values, dtype=np.uint64)
+    row_header = prefix_values >> np.uint64(50)
+    partition = ((prefix_values >> np.uint64(44)) & np.uint64(0b111)).astype(np.intp)
+    # Company prefix and item reference share the low 44 bits of the prefix
+    combined = prefix_values & np.uint64((1 << 44) - 1)
+    item_bits = _ITEM_BITS_LUT[partition]
+    item_reference = (combined & ((np.uint64(1) << item_bits) - np.uint64(1))).astype(np.int64)
+    company_prefix = (combined >> item_bits).astype(np.int64)
+
+    valid = ((row_header == header)
+             & (partition < 7)
+             & (company_prefix < _COMPANY_LIMIT_LUT[partition])
+             & (item_reference < _ITEM_LIMIT_LUT[partition]))
+
+    item_rest = _ITEM_REST_LUT[partition]
+    safe_company = np.where(valid, company_prefix, 0)  # keeps the product below int64 overflow
+    gtin13 = ((item_reference // item_rest) * 10 ** 12
+              + safe_company * item_rest
+              + item_reference % item_rest)
+    return {
+        'header': row_header,
+        'filter': (prefix_values >> np.uint64(47)) & np.uint64(0b111),
+        'partition': partition,
+        'company_prefix': company_prefix,
+        'item_reference': item_reference,
+        'gtin13': np.where(valid, gtin13, -1),
+        'valid': valid,
+    }
+
+
+def decode_sgtin96_lanes(hi, lo):
+    """
+    Bulk decode of SGTIN-96 fields from (hi, lo) lanes.
+
+    Returns:
+        dict: The decode_sgtin_prefix() fields plus the 'serial' array
+    """
+    prefix_values = (hi << np.uint64(_PREFIX_LO_BITS)) | (lo >> np.uint64(SERIAL_BITS))
+    fields = decode_sgtin_prefix(prefix_values, SGTIN96_HEADER)
+    fields['serial'] = (lo & np.uint64(MAX_SERIAL)).astype(np.int64)
+    return fields
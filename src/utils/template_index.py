@@ -0,0 +1,251 @@
+"""
+Template Index
+In-memory index of the BarTender template library.
+
+The template base path holds one folder per label size with the .btw files
+inside it (LabelSize/LabelSize InlayType Customer Template.btw). The index
+lists the library once and answers template lookups from memory. It notices
+added, removed or renamed templates by comparing the directory mtimes it
+recorded against the ones on disk.
+"""
+
+import os
+import threading
+import time
+
+
+# Seconds a validated index is trusted before the directory mtimes are
+# checked again. Keeps repeated lookups (e.g. every keystroke in the wizard)
+# from hitting a network share.
+REVALIDATE_INTERVAL = 2.0
+
+# Customer words this short are ignored when scoring template names
+_MIN_CUSTOMER_WORD_LENGTH = 3
+
+
+def normalize_label_size(label_size):
+    """Key used to match label size folders regardless of case and spacing."""
+    return label_size.lower().replace(' ', '')
+
+
+def score_template_name(filename_lower, customer_words, inlay_lower, inlay_digits):
+    """
+    Score how well a template file name matches a job.
+
+    Args:
+        filename_lower (str): Lower-cased template file name
+        customer_words (tuple): Lower-cased customer words to look for
+        inlay_lower (str): Lower-cased inlay type, or ''
+        inlay_digits (str): Digits of the inlay type, or ''
+
+    Returns:
+        int: 100 per customer word found, 50 for the inlay type, 25 for its digits
+    """
+    score = 0
+    for word in customer_words:
+        if word in filename_lower:
+            score += 100
+    if inlay_lower and inlay_lower in filename_lower:
+        score += 50
+    if inlay_digits and inlay_digits in filename_lower:
+        score += 25
+    return score
+
+
+class TemplateIndex:
+    """Index of the .btw templates below a template base path."""
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self._lock = threading.RLock()
+        self._dir_mtimes = {}       # directory path -> st_mtime_ns at indexing time
+        self._label_dirs = {}       # folder name -> folder path, in listing order
+        self._normalized = {}       # normalize_label_size(name) -> first folder name
+        self._templates = {}        # folder name -> [(filename, filename_lower), ...]
+        self._matches = {}          # (folder, customer words, inlay) -> template path
+        self._validated_at = None
+
+    def _stat_mtime(self, path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _is_current(self):
+        """True if no indexed directory changed since the last refresh."""
+        if self._validated_at is None:
+            return False
+        if time.monotonic() - self._validated_at < REVALIDATE_INTERVAL:
+            return True
+        for path, mtime in self._dir_mtimes.items():
+            if self._stat_mtime(path) != mtime:
+                return False
+        self._validated_at = time.monotonic()
+        return True
+
+    def refresh(self):
+        """Re-read the template library from disk."""
+        dir_mtimes = {}
+        label_dirs = {}
+        normalized = {}
+        templates = {}
+
+        base_mtime = self._stat_mtime(self.base_path) if self.base_path else None
+        if base_mtime is not None:
+            dir_mtimes[self.base_path] = base_mtime
+            try:
+                with os.scandir(self.base_path) as entries:
+                    folders = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
+            except OSError as e:
+                print(f"Error listing template folder {self.base_path}: {e}")
+                folders = []
+
+            for name, path in folders:
+                try:
+                    dir_mtimes[path] = os.stat(path).st_mtime_ns
+                    files = [filename for filename in os.listdir(path)
+                             if filename.lower().endswith('.btw')]
+                except OSError:
+                    continue
+                label_dirs[name] = path
+                normalized.setdefault(normalize_label_size(name), name)
+                if files:
+                    templates[name] = [(filename, filename.lower()) for filename in files]
+
+        self._dir_mtimes = dir_mtimes
+        self._label_dirs = label_dirs
+        self._normalized = normalized
+        self._templates = templates
+        self._matches = {}
+        self._validated_at = time.monotonic()
+
+    def _ensure_current(self):
+        if not self._is_current():
+            self.refresh()
+
+    def exists(self):
+        """True if the base path exists."""
+        with self._lock:
+            self._ensure_current()
+            return self.base_path in self._dir_mtimes
+
+    def find_label_size_folder(self, label_size):
+        """
+        Find the folder for a label size.
+
+        An exact folder name wins; otherwise the first folder whose name
+        matches ignoring case and spaces is used.
+
+        Returns:
+            str: Folder name, or None
+        """
+        with self._lock:
+            self._ensure_current()
+            if not label_size:
+                return None
+            if label_size in self._label_dirs:
+                return label_size
+            return self._normalized.get(normalize_label_size(label_size))
+
+    def label_sizes(self):
+        """Sorted names of all label size folders."""
+        with self._lock:
+            self._ensure_current()
+            return sorted(self._label_dirs)
+
+    def templates_by_label_size(self):
+        """Label size folder -> list of .btw file names, for folders that have any."""
+        with self._lock:
+            self._ensure_current()
+            return {name: [filename for filename, _ in files] for name, files in self._templates.items()}
+
+    def find_template(self, customer, label_size, inlay_type=None):
+        """
+        Find the best matching template for a job.
+
+        Template names are scored by customer words, inlay type and inlay
+        digits; the highest score wins and the first template of the folder
+        is the fallback. Results are kept until the library changes.
+
+        Args:
+            customer (str): Customer name
+            label_size (str): Label size
+            inlay_type (str): Inlay type (optional)
+
+        Returns:
+            str: Full path to the template file, or None if not found
+        """
+        with self._lock:
+            folder = self.find_label_size_folder(label_size)
+            if folder is None:
+                return None
+            files = self._templates.get(folder)
+            if not files:
+                return None
+
+            customer_words = tuple(word for word in (customer or '').lower().split()
+                                   if len(word) >= _MIN_CUSTOMER_WORD_LENGTH)
+            inlay_lower = (inlay_type or '').lower()
+            key = (folder, customer_words, inlay_lower)
+            match = self._matches.get(key)
+            if match is not None:
+                return match
+
+            inlay_digits = ''.join(filter(str.isdigit, inlay_lower))
+            best_score = 0
+            best_name = files[0][0]
+            for filename, filename_lower in files:
+                score = score_template_name(filename_lower, customer_words, inlay_lower, inlay_digits)
+                if score > best_score:
+                    best_score = score
+                    best_name = filename
+
+            match = os.path.join(self._label_dirs[folder], best_name)
+            self._matches[key] = match
+            return match
+
+    def find_customer_template(self, customer, label_size):
+        """
+        Find the first template whose name contains the whole customer name.
+
+        Falls back to the first template of the label size folder.
+
+        Returns:
+            str: Full path to the template file, or None if not found
+        """
+        with self._lock:
+            folder = self.find_label_size_folder(label_size)
+            if folder is None:
+                return None
+            files = self._templates.get(folder)
+            if not files:
+                return None
+
+            customer_lower = (customer or '').lower()
+            for filename, filename_lower in files:
+                if customer_lower in filename_lower:
+                    return os.path.join(self._label_dirs[folder], filename)
+            return os.path.join(self._label_dirs[folder], files[0][0])
+
+
+# Global instances, one per base path
+_template_indexes = {}
+_template_indexes_lock = threading.Lock()
+
+
+def get_template_index(base_path):
+    """
+    Get the shared template index for a base path.
+
+    Args:
+        base_path (str): Template base path
+
+    Returns:
+        TemplateIndex: Index for that path
+    """
+    with _template_indexes_lock:
+        index = _template_indexes.get(base_path)
+        if index is None:
+            index = TemplateIndex(base_path)
+            _template_indexes[base_path] = index
+        return index
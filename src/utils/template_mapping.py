@@ -1,36 +1,69 @@
 """
 Template Mapping Manager
 Manages the mapping of Customer + Label Size pairs to specific template files.
+
+Mapped templates usually live on a network share, so whether a mapped file
+exists is cached for EXISTENCE_TTL seconds and re-checked in the background
+once it goes stale. The mapping file itself is only re-read when its mtime
+changes.
 """
 
 import json
 import os
-from typing import Dict, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 import src.config as config
 
 
+# Seconds a cached "template file exists" answer is used without re-checking
+EXISTENCE_TTL = 60.0
+
+# Seconds between checks of the mapping file's mtime
+MAPPING_CHECK_INTERVAL = 2.0
+
+# Threads used for background and batch existence checks
+EXISTENCE_CHECK_WORKERS = 4
+
+
 class TemplateMappingManager:
     """Manages template mappings stored in a JSON file."""
     
     def __init__(self):
         self._mappings: Dict[str, Dict[str, str]] = {}
         self._mapping_file_path: Optional[str] = None
+        self._mapping_file_mtime: Optional[int] = None
+        self._mapping_checked_at = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+        # template path -> (exists, time.monotonic() of the check)
+        self._existence: Dict[str, Tuple[bool, float]] = {}
+        self._pending_checks = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
         self.load_mappings()
     
     def load_mappings(self) -> bool:
         """Load mappings from the configured JSON file."""
         mapping_file = config.get_template_mapping_file()
+        self._mapping_checked_at = time.monotonic()
+        self._dirty = False
         
         if not mapping_file or not os.path.exists(mapping_file):
             print(f"Template mapping file not found or not configured: {mapping_file}")
             self._mappings = {}
+            self._mapping_file_path = mapping_file or None
+            self._mapping_file_mtime = None
             return False
         
         try:
+            # Recorded before parsing so a broken file is not re-read on every lookup
+            self._mapping_file_path = mapping_file
+            self._mapping_file_mtime = os.stat(mapping_file).st_mtime_ns
             with open(mapping_file, 'r', encoding='utf-8') as f:
                 self._mappings = json.load(f)
-            self._mapping_file_path = mapping_file
             print(f"Loaded {len(self._mappings)} customer template mappings from {mapping_file}")
+            self._check_existence_in_background(self._mapped_paths())
             return True
         except json.JSONDecodeError as e:
             print(f"Error parsing template mapping file: {e}")
@@ -57,12 +90,79 @@ class TemplateMappingManager:
             with open(mapping_file, 'w', encoding='utf-8') as f:
                 json.dump(self._mappings, f, indent=2, sort_keys=True)
             
+            # What is on disk now matches memory, so the new mtime is not a reason to reload
+            self._mapping_file_path = mapping_file
+            self._mapping_file_mtime = os.stat(mapping_file).st_mtime_ns
+            self._dirty = False
             print(f"Saved template mappings to {mapping_file}")
             return True
         except Exception as e:
             print(f"Error saving template mapping file: {e}")
             return False
     
+    def _reload_if_changed(self):
+        """Re-read the mapping file if it changed on disk (or the configured path changed)."""
+        now = time.monotonic()
+        if now - self._mapping_checked_at < MAPPING_CHECK_INTERVAL:
+            return
+        self._mapping_checked_at = now
+        # Unsaved edits from the mapping dialog win over the file
+        if self._dirty:
+            return
+        
+        mapping_file = config.get_template_mapping_file() or None
+        try:
+            mtime = os.stat(mapping_file).st_mtime_ns if mapping_file else None
+        except OSError:
+            mtime = None
+        if mapping_file != self._mapping_file_path or mtime != self._mapping_file_mtime:
+            self.load_mappings()
+    
+    def _mapped_paths(self) -> List[str]:
+        """All template paths in the current mappings."""
+        return [path for sizes in self._mappings.values() for path in sizes.values() if path]
+    
+    def _check_exists(self, template_path: str) -> bool:
+        """Check a template path on disk and remember the answer."""
+        exists = os.path.exists(template_path)
+        with self._lock:
+            self._existence[template_path] = (exists, time.monotonic())
+            self._pending_checks.discard(template_path)
+        return exists
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=EXISTENCE_CHECK_WORKERS,
+                                                thread_name_prefix="template-exists")
+        return self._executor
+    
+    def _check_existence_in_background(self, template_paths: Iterable[str]):
+        """Queue existence checks for paths that are not already being checked."""
+        with self._lock:
+            paths = [path for path in dict.fromkeys(template_paths) if path not in self._pending_checks]
+            self._pending_checks.update(paths)
+        if paths:
+            executor = self._get_executor()
+            for path in paths:
+                executor.submit(self._check_exists, path)
+    
+    def _template_exists(self, template_path: str) -> bool:
+        """
+        Whether a mapped template exists, answered from the cache when possible.
+        
+        A stale answer is still returned and a background check refreshes it;
+        only a path that was never checked is checked synchronously.
+        """
+        with self._lock:
+            cached = self._existence.get(template_path)
+        if cached is None:
+            return self._check_exists(template_path)
+        
+        exists, checked_at = cached
+        if time.monotonic() - checked_at >= EXISTENCE_TTL:
+            self._check_existence_in_background([template_path])
+        return exists
+    
     def get_template(self, customer: str, label_size: str) -> Optional[str]:
         """
         Get the template path for a given customer and label size.
@@ -71,24 +171,54 @@ class TemplateMappingManager:
         if not customer or not label_size:
             return None
         
-        # Check if customer exists in mappings
-        if customer not in self._mappings:
-            return None
-        
-        # Check if label size exists for this customer
-        customer_mappings = self._mappings[customer]
-        if label_size not in customer_mappings:
+        self._reload_if_changed()
+        template_path = self._mappings.get(customer, {}).get(label_size)
+        if not template_path:
             return None
         
-        template_path = customer_mappings[label_size]
-        
         # Verify the template file exists
-        if os.path.exists(template_path):
+        if self._template_exists(template_path):
             return template_path
         else:
             print(f"Mapped template file not found: {template_path}")
             return None
     
+    def resolve_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Resolve many (customer, label_size) pairs at once, e.g. for batch job creation.
+        
+        Template paths without a fresh existence answer are checked in
+        parallel, each distinct path once.
+        
+        Args:
+            pairs: Iterable of (customer, label_size)
+        
+        Returns:
+            dict: (customer, label_size) -> template path, or None if there is
+                no mapping or the mapped file doesn't exist
+        """
+        self._reload_if_changed()
+        pairs = list(dict.fromkeys(pairs))
+        mapped = {
+            pair: self._mappings.get(pair[0], {}).get(pair[1]) if pair[0] and pair[1] else None
+            for pair in pairs
+        }
+        
+        now = time.monotonic()
+        with self._lock:
+            unchecked = [
+                path for path in dict.fromkeys(p for p in mapped.values() if p)
+                if path not in self._existence or now - self._existence[path][1] >= EXISTENCE_TTL
+            ]
+        if unchecked:
+            list(self._get_executor().map(self._check_exists, unchecked))
+        
+        with self._lock:
+            return {
+                pair: path if path and self._existence.get(path, (False, 0))[0] else None
+                for pair, path in mapped.items()
+            }
+    
     def set_template(self, customer: str, label_size: str, template_path: str) -> bool:
         """
         Set the template path for a given customer and label size.
@@ -103,6 +233,9 @@ class TemplateMappingManager:
         
         # Set the mapping
         self._mappings[customer][label_size] = template_path
+        self._dirty = True
+        with self._lock:
+            self._existence.pop(template_path, None)
         return True
     
     def remove_template(self, customer: str, label_size: str) -> bool:
@@ -122,6 +255,7 @@ class TemplateMappingManager:
         if not self._mappings[customer]:
             del self._mappings[customer]
         
+        self._dirty = True
         return True
     
     def get_all_mappings(self) -> Dict[str, Dict[str, str]]:
@@ -139,9 +273,12 @@ class TemplateMappingManager:
     def clear_mappings(self):
         """Clear all mappings."""
         self._mappings = {}
+        self._dirty = True
     
     def reload_mappings(self) -> bool:
         """Reload mappings from file."""
+        with self._lock:
+            self._existence.clear()
         return self.load_mappings()
 
 
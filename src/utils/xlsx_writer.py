@@ -0,0 +1,304 @@
+"""
+Streaming XLSX Writer
+
+Writes simple single-sheet .xlsx workbooks straight into a zip archive,
+row by row, without building a pandas DataFrame or an openpyxl workbook
+in memory. Cells are written as inline strings or plain numbers, which is
+all the EPC database files need and what BarTender reads.
+"""
+
+import os
+import zlib
+import zipfile
+from xml.sax.saxutils import escape
+
+
+# Deflate level used for the archive members. Level 1 is several times faster
+# than the zlib default and the EPC sheets still compress well.
+DEFAULT_COMPRESS_LEVEL = 1
+
+# Number of rows rendered into one string before it is written to the archive
+ROW_BATCH_SIZE = 10000
+
+# Member timestamp (the zip epoch, also what ZipFile.open gives the sheet)
+# so identical input gives identical bytes
+_FIXED_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+EPC_DATABASE_HEADERS = ("UPC", "Serial #", "EPC")
+EPC_COLUMN_WIDTHS = {"C": 40}
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_SHEET_HEADER_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+def column_letter(index):
+    """Convert a 0-based column index into a spreadsheet column letter (0 -> A)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letter):
+    """Convert a spreadsheet column letter into a 1-based column number (A -> 1)."""
+    number = 0
+    for char in letter.upper():
+        number = number * 26 + (ord(char) - 64)
+    return number
+
+
+def _cell_xml(reference, value):
+    """Render one cell as an inline string or a number."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{reference}" t="n"><v>{value}</v></c>'
+    return f'<c r="{reference}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+class StreamingXlsxWriter:
+    """
+    Write a single-sheet workbook row by row directly into a zip archive.
+
+    If the with block raises, the workbook is not finished and the partial
+    file is deleted, so a failed or cancelled run never leaves a file that
+    opens as a shorter, valid sheet.
+
+    Usage:
+        with StreamingXlsxWriter(path, column_widths={"C": 40}) as writer:
+            writer.write_row(["UPC", "Serial #", "EPC"])
+            writer.write_row([upc, 1000, epc])
+    """
+
+    def __init__(self, file_path, sheet_name="Sheet1", column_widths=None,
+                 dimension=None, compresslevel=DEFAULT_COMPRESS_LEVEL):
+        """
+        Args:
+            file_path (str): Destination .xlsx path
+            sheet_name (str): Name of the only worksheet
+            column_widths (dict): Column letter -> width, e.g. {"C": 40}
+            dimension (str): Optional used-range reference such as "A1:C1001"
+            compresslevel (int): Deflate level 0-9 for the archive members
+        """
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.column_widths = column_widths or {}
+        self.dimension = dimension
+        self.compresslevel = compresslevel
+        self.rows_written = 0
+        self._file = None
+        self._zip = None
+        self._sheet = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def open(self):
+        """Create the archive, write the static parts and start the sheet XML."""
+        self._file = open(self.file_path, "wb")
+        try:
+            self._zip = zipfile.ZipFile(self._file, "w", compression=zipfile.ZIP_DEFLATED,
+                                        compresslevel=self.compresslevel)
+            self._write_static("[Content_Types].xml", _CONTENT_TYPES_XML)
+            self._write_static("_rels/.rels", _ROOT_RELS_XML)
+            self._write_static("xl/workbook.xml", _WORKBOOK_XML.format(sheet_name=escape(self.sheet_name)))
+            self._write_static("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS_XML)
+            self._write_static("xl/styles.xml", _STYLES_XML)
+
+            # Opened by name, the sheet takes the archive's compression level
+            self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        except Exception:
+            self.abort()
+            raise
+        parts = [_SHEET_HEADER_XML]
+        if self.dimension:
+            parts.append(f'<dimension ref="{self.dimension}"/>')
+        if self.column_widths:
+            parts.append("<cols>")
+            for letter, width in sorted(self.column_widths.items(), key=lambda item: _column_index(item[0])):
+                number = _column_index(letter)
+                parts.append(f'<col min="{number}" max="{number}" width="{width}" customWidth="1"/>')
+            parts.append("</cols>")
+        parts.append("<sheetData>")
+        self.write_raw("".join(parts))
+
+    def _write_static(self, name, xml_text):
+        """Write one of the fixed workbook parts as a complete archive member."""
+        info = zipfile.ZipInfo(name, date_time=_FIXED_TIMESTAMP)
+        self._zip.writestr(info, xml_text, compress_type=zipfile.ZIP_DEFLATED,
+                           compresslevel=self.compresslevel)
+
+    def write_raw(self, xml_text):
+        """Append pre-rendered XML to the sheet stream."""
+        self._sheet.write(xml_text.encode("utf-8"))
+
+    def write_row(self, values):
+        """Append one row of cell values (str, int, float, bool or None)."""
+        row_number = self.rows_written + 1
+        cells = "".join(_cell_xml(f"{column_letter(col)}{row_number}", value)
+                        for col, value in enumerate(values))
+        self.write_raw(f'<row r="{row_number}">{cells}</row>')
+        self.rows_written += 1
+
+    def write_rows(self, rows):
+        """Append many rows."""
+        for values in rows:
+            self.write_row(values)
+
+    def close(self):
+        """Finish the sheet XML and close the archive."""
+        if self._file is None:
+            return
+        try:
+            if self._sheet is not None:
+                self.write_raw("</sheetData></worksheet>")
+                self._sheet.close()
+                self._sheet = None
+            self._zip.close()
+            self._zip = None
+        except Exception:
+            self.abort()
+            raise
+        self._file.close()
+        self._file = None
+
+    def abort(self):
+        """Stop writing without finishing the workbook and delete the partial file."""
+        if self._file is None:
+            return
+        sheet, archive = self._sheet, self._zip
+        self._sheet = None
+        self._zip = None
+        try:
+            # Only releases the archive; the file is deleted below
+            if sheet is not None:
+                sheet.close()
+            if archive is not None:
+                archive.close()
+        except (OSError, ValueError, zlib.error):
+            pass
+        finally:
+            self._file.close()
+            self._file = None
+            try:
+                os.remove(self.file_path)
+            except OSError as e:
+                print(f"Could not remove partial workbook {self.file_path}: {e}")
+
+
+def write_epc_database_xlsx(file_path, upc, serial_numbers, epc_values,
+                            compresslevel=DEFAULT_COMPRESS_LEVEL, column_widths=None):
+    """
+    Write one EPC database file with the UPC / Serial # / EPC layout.
+
+    Produces the same cells as the former pandas export: a header row,
+    the UPC and EPC as text, the serial as a number, and column C widened
+    to 40 so the EPCs are readable.
+
+    Args:
+        file_path (str): Destination .xlsx path
+        upc (str): UPC written on every row
+        serial_numbers (sequence): Serial numbers, one per row
+        epc_values (sequence): EPC hex strings, one per row
+        compresslevel (int): Deflate level 0-9
+        column_widths (dict): Overrides the default {"C": 40}, e.g. for
+            the longer SGTIN-198 EPCs
+
+    Returns:
+        str: file_path
+    """
+    row_count = len(serial_numbers)
+    if len(epc_values) != row_count:
+        raise ValueError("serial_numbers and epc_values must have the same length")
+
+    row_template = (
+        '<row r="{0}"><c r="A{0}" t="inlineStr"><is><t>' + escape(str(upc)) + '</t></is></c>'
+        '<c r="B{0}" t="n"><v>{1}</v></c>'
+        '<c r="C{0}" t="inlineStr"><is><t>{2}</t></is></c></row>'
+    ).format
+
+    with StreamingXlsxWriter(file_path, column_widths=column_widths or EPC_COLUMN_WIDTHS,
+                             dimension=f"A1:C{row_count + 1}",
+                             compresslevel=compresslevel) as writer:
+        writer.write_row(EPC_DATABASE_HEADERS)
+        serials = [int(serial) for serial in serial_numbers]
+        epcs = epc_values.tolist() if hasattr(epc_values, "tolist") else list(epc_values)
+        for batch_start in range(0, row_count, ROW_BATCH_SIZE):
+            batch_end = min(batch_start + ROW_BATCH_SIZE, row_count)
+            writer.write_raw("".join(
+                row_template(row_index + 2, serials[row_index], epcs[row_index])
+                for row_index in range(batch_start, batch_end)
+            ))
+        writer.rows_written += row_count
+
+    return file_path
@@ -6,20 +6,107 @@ This dialog provides comprehensive EPC validation including:
 - Reverse conversion to UPC and serial number
 - Binary breakdown of EPC components
 - Round-trip validation testing
+- Bulk validation of reader exports / read logs loaded from file
+- Lookup of the job that allocated a decoded serial
 """
 
 import os
+import time
+import pandas as pd
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, 
     QPushButton, QLineEdit, QTextEdit, QGroupBox, QFrame,
-    QGridLayout, QMessageBox, QSizePolicy, QScrollArea, QWidget
+    QGridLayout, QMessageBox, QSizePolicy, QScrollArea, QWidget, QFileDialog
 )
 from PySide6.QtCore import Qt, QThread, Signal
 from PySide6.QtGui import QFont, QPixmap, QPalette
 
 from src.utils.epc_conversion import (
-    reverse_epc_to_upc_and_serial, generate_epc, hex_to_bin, bin_to_dec, validate_upc
+    reverse_epc_to_upc_and_serial, generate_epc, hex_to_bin, bin_to_dec, validate_upc,
+    summarize_epc_array
 )
+from src.utils.sgtin_codec import (
+    PARTITION_TABLE, PARTITION_BY_PREFIX_LENGTH, DEFAULT_FILTER_VALUE, DEFAULT_COMPANY_PREFIX_LENGTH,
+    decode_sgtin96
+)
+from src.utils.epc_schemes import DEFAULT_SCHEME, EPC_SCHEMES, detect_scheme, detect_scheme_counts
+from src.utils.epc_manifest import locate_serial
+from src.utils.serial_index import get_serial_index
+import src.config as config
+
+
+# Valid EPC lengths in hex characters (24 for the 96-bit schemes, 52 for SGTIN-198)
+EPC_HEX_LENGTHS = sorted({scheme.hex_length for scheme in EPC_SCHEMES.values()})
+
+
+def load_epc_values(file_path):
+    """
+    Read the EPC column of a reader export.
+
+    CSV and Excel files use the column named "EPC" (or the first column if
+    there is none); any other file is treated as whitespace separated EPCs.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.csv', '.xlsx', '.xls'):
+        if extension == '.csv':
+            frame = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        else:
+            frame = pd.read_excel(file_path, dtype=str)
+        epc_columns = [c for c in frame.columns if str(c).strip().upper() == 'EPC']
+        if epc_columns:
+            return frame[epc_columns[0]].fillna('').to_numpy(dtype=str)
+        # No header row - the first "column name" is actually the first EPC
+        if extension == '.csv':
+            frame = pd.read_csv(file_path, dtype=str, keep_default_na=False, header=None)
+        else:
+            frame = pd.read_excel(file_path, dtype=str, header=None)
+        return frame[frame.columns[0]].fillna('').to_numpy(dtype=str)
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read().split()
+
+
+class BulkEPCValidationWorker(QThread):
+    """Worker thread that loads a read log and validates every EPC in bulk."""
+
+    validation_complete = Signal(dict)
+    validation_failed = Signal(str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            started = time.perf_counter()
+            epc_values = load_epc_values(self.file_path)
+            loaded = time.perf_counter()
+            summary = summarize_epc_array(epc_values)
+            summary['scheme_counts'] = detect_scheme_counts(epc_values)
+            summary['load_seconds'] = loaded - started
+            summary['validate_seconds'] = time.perf_counter() - loaded
+            self.validation_complete.emit(summary)
+        except Exception as e:
+            self.validation_failed.emit(str(e))
+
+
+class AllocationLookupWorker(QThread):
+    """Worker thread that finds the allocations holding a serial in the serial index."""
+
+    lookup_complete = Signal(list)
+    lookup_failed = Signal(str)
+
+    def __init__(self, serial, upc=None):
+        super().__init__()
+        self.serial = serial
+        self.upc = upc
+
+    def run(self):
+        try:
+            index = get_serial_index(config.get_serial_numbers_path(), config.SERIAL_INDEX_FILE)
+            self.lookup_complete.emit(index.find_allocation(self.serial, upc=self.upc))
+        except Exception as e:
+            self.lookup_failed.emit(str(e))
 
 
 class EPCValidatorDialog(QDialog):
@@ -29,6 +116,12 @@ class EPCValidatorDialog(QDialog):
         self.setModal(True)
         self.setMinimumSize(700, 650)  # Match UPC validator size
         self.resize(750, 700)  # Match UPC validator initial size
+        # Serial/UPC of the last decoded EPC, for the job file lookup
+        self.decoded_serial = None
+        self.decoded_upc = None
+        self.last_job_folder = ""
+        self.lookup_worker = None
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -72,7 +165,7 @@ class EPCValidatorDialog(QDialog):
         input_layout.setLabelAlignment(Qt.AlignRight)
         
         self.epc_input = QLineEdit()
-        self.epc_input.setPlaceholderText("Enter EPC hex code (24 characters, e.g., 3034257BF7194E4000001F40)")
+        self.epc_input.setPlaceholderText("Enter EPC hex code (24 or 52 characters, e.g., 3034257BF7194E4000001F40)")
         self.epc_input.textChanged.connect(self.on_epc_changed)
         
         self.validate_btn = QPushButton("Validate EPC")
@@ -151,12 +244,14 @@ class EPCValidatorDialog(QDialog):
         self.partition_label.setStyleSheet("font-family: monospace; background: #2b2b2b; padding: 2px;")
         binary_layout.addWidget(self.partition_label, 2, 1)
         
-        binary_layout.addWidget(QLabel("Company Prefix (24 bits):"), 3, 0)
+        self.company_prefix_title_label = QLabel("Company Prefix (24 bits):")
+        binary_layout.addWidget(self.company_prefix_title_label, 3, 0)
         self.company_prefix_binary_label = QLabel("—")
         self.company_prefix_binary_label.setStyleSheet("font-family: monospace; background: #2b2b2b; padding: 2px;")
         binary_layout.addWidget(self.company_prefix_binary_label, 3, 1)
         
-        binary_layout.addWidget(QLabel("Item Reference (20 bits):"), 4, 0)
+        self.item_reference_title_label = QLabel("Item Reference (20 bits):")
+        binary_layout.addWidget(self.item_reference_title_label, 4, 0)
         self.item_reference_binary_label = QLabel("—")
         self.item_reference_binary_label.setStyleSheet("font-family: monospace; background: #2b2b2b; padding: 2px;")
         binary_layout.addWidget(self.item_reference_binary_label, 4, 1)
@@ -200,6 +295,53 @@ class EPCValidatorDialog(QDialog):
         
         content_layout.addWidget(test_group)
         
+        # Locate the decoded serial in a job's DB files via its manifest
+        locate_group = QGroupBox("Locate in Job Files")
+        locate_layout = QFormLayout(locate_group)
+        locate_layout.setLabelAlignment(Qt.AlignRight)
+        
+        self.locate_btn = QPushButton("Find in Job Folder...")
+        self.locate_btn.setToolTip("Pick a job or data folder to find the DB file and row holding this serial")
+        self.locate_btn.clicked.connect(self.locate_in_job_folder)
+        self.locate_btn.setEnabled(False)
+        
+        self.locate_result_label = QLabel("—")
+        self.locate_result_label.setWordWrap(True)
+        
+        self.allocation_btn = QPushButton("Find Allocating Job")
+        self.allocation_btn.setToolTip("Look the serial up in the allocation history of the serial numbers folder")
+        self.allocation_btn.clicked.connect(self.find_allocating_job)
+        self.allocation_btn.setEnabled(False)
+        
+        self.allocation_result_label = QLabel("—")
+        self.allocation_result_label.setWordWrap(True)
+        
+        locate_layout.addRow("", self.locate_btn)
+        locate_layout.addRow("DB File:", self.locate_result_label)
+        locate_layout.addRow("", self.allocation_btn)
+        locate_layout.addRow("Allocated By:", self.allocation_result_label)
+        
+        content_layout.addWidget(locate_group)
+        
+        # Bulk validation section (read logs / reader exports)
+        bulk_group = QGroupBox("Bulk Validation (Read Log)")
+        bulk_layout = QFormLayout(bulk_group)
+        bulk_layout.setLabelAlignment(Qt.AlignRight)
+        
+        self.load_file_btn = QPushButton("Load File...")
+        self.load_file_btn.setToolTip("Validate every EPC in a .txt, .csv or .xlsx reader export")
+        self.load_file_btn.clicked.connect(self.load_epc_file)
+        
+        self.bulk_result_label = QLabel("—")
+        self.bulk_result_label.setWordWrap(True)
+        self.bulk_result_label.setAlignment(Qt.AlignTop)
+        self.bulk_result_label.setStyleSheet("font-family: monospace; background: #2b2b2b; padding: 8px; border: 1px solid #555;")
+        
+        bulk_layout.addRow("", self.load_file_btn)
+        bulk_layout.addRow("Summary:", self.bulk_result_label)
+        
+        content_layout.addWidget(bulk_group)
+        
         # Set the content widget to the scroll area
         scroll_area.setWidget(content_widget)
         main_layout.addWidget(scroll_area)
@@ -226,13 +368,13 @@ class EPCValidatorDialog(QDialog):
         """Handle EPC input changes"""
         epc = self.epc_input.text().strip().upper()
         
-        # Basic format check: should be 24 hex characters
-        is_valid_format = len(epc) == 24 and all(c in '0123456789ABCDEF' for c in epc)
+        # Basic format check: a supported length of hex characters
+        is_valid_format = len(epc) in EPC_HEX_LENGTHS and all(c in '0123456789ABCDEF' for c in epc)
         
         self.validate_btn.setEnabled(is_valid_format)
         self.test_btn.setEnabled(False)
         
-        if len(epc) < 24:
+        if len(epc) < EPC_HEX_LENGTHS[0]:
             self.clear_results()
         
     def validate_epc(self):
@@ -247,13 +389,25 @@ class EPCValidatorDialog(QDialog):
         
         try:
             # Basic format validation
-            format_valid = len(epc) == 24 and all(c in '0123456789ABCDEF' for c in epc)
+            format_valid = len(epc) in EPC_HEX_LENGTHS and all(c in '0123456789ABCDEF' for c in epc)
+            
+            # The tool has no job data, so other schemes are recognised by header and length
+            scheme = detect_scheme(epc) if format_valid else None
+            if scheme is not None and scheme.name != DEFAULT_SCHEME:
+                self.format_valid_label.setText(f"✅ Valid ({scheme.name})")
+                self.show_scheme_decode(epc, scheme)
+                return
+            
+            format_valid = format_valid and len(epc) == 24
             self.format_valid_label.setText("✅ Valid" if format_valid else "❌ Invalid")
             
             if not format_valid:
                 self.status_label.setText("❌ Invalid EPC Format")
                 self.status_frame.setStyleSheet("background-color: #4a2c2c; border: 1px solid #8b0000;")
-                self.results_text.setPlainText("EPC must be exactly 24 hexadecimal characters.")
+                self.results_text.setPlainText(
+                    "EPC must be 24 hexadecimal characters (SGTIN-96, SSCC-96, GRAI-96) "
+                    "or 52 characters with the SGTIN-198 header (36)."
+                )
                 return
             
             # Convert to binary for analysis
@@ -267,13 +421,19 @@ class EPCValidatorDialog(QDialog):
                 self.results_text.setPlainText(f"Failed to convert EPC to binary: {str(e)}")
                 return
             
-            # Extract EPC components
+            # Extract EPC components; the company prefix / item reference split
+            # depends on the partition (unknown partitions fall back to 5)
             header = epc_binary[0:8]
             filter_value = epc_binary[8:11]
             partition = epc_binary[11:14]
-            gs1_binary = epc_binary[14:38]
-            item_reference_binary = epc_binary[38:58]
+            company_bits, company_digits, item_bits, _ = PARTITION_TABLE.get(
+                bin_to_dec(partition), PARTITION_TABLE[5]
+            )
+            gs1_binary = epc_binary[14:14 + company_bits]
+            item_reference_binary = epc_binary[14 + company_bits:58]
             serial_binary = epc_binary[58:96]
+            self.company_prefix_title_label.setText(f"Company Prefix ({company_bits} bits):")
+            self.item_reference_title_label.setText(f"Item Reference ({item_bits} bits):")
             
             # Update binary breakdown display
             self.header_label.setText(f"{header} ({bin_to_dec(header)})")
@@ -285,8 +445,13 @@ class EPCValidatorDialog(QDialog):
             
             # Attempt reverse conversion
             extracted_upc, extracted_serial = reverse_epc_to_upc_and_serial(epc)
+            decoded = decode_sgtin96(epc)
             
             if extracted_upc and extracted_serial is not None:
+                self.decoded_upc = extracted_upc
+                self.decoded_serial = extracted_serial
+                self.locate_btn.setEnabled(True)
+                self.allocation_btn.setEnabled(True)
                 self.extracted_upc_label.setText(extracted_upc)
                 self.serial_number_label.setText(f"{extracted_serial:,}")
                 
@@ -295,7 +460,11 @@ class EPCValidatorDialog(QDialog):
                 
                 # Test round-trip conversion
                 if upc_valid:
-                    test_epc = generate_epc(extracted_upc, extracted_serial)
+                    test_epc = generate_epc(
+                        extracted_upc, extracted_serial,
+                        filter_value=decoded['filter'],
+                        company_prefix_length=PARTITION_TABLE[decoded['partition']][1]
+                    )
                     round_trip_valid = test_epc.upper() == epc.upper()
                     self.round_trip_label.setText("✅ Passed" if round_trip_valid else "❌ Failed")
                     self.test_btn.setEnabled(True)
@@ -337,8 +506,8 @@ class EPCValidatorDialog(QDialog):
             
             # Expected values validation
             expected_header = "00110000"
-            expected_filter = "001"
-            expected_partition = "101"
+            expected_filter = format(DEFAULT_FILTER_VALUE, "03b")
+            expected_partition = format(PARTITION_BY_PREFIX_LENGTH[DEFAULT_COMPANY_PREFIX_LENGTH], "03b")
             
             if header == expected_header:
                 results.append("✅ Header matches expected value (00110000)")
@@ -346,14 +515,18 @@ class EPCValidatorDialog(QDialog):
                 results.append(f"❌ Header mismatch: expected {expected_header}, got {header}")
                 
             if filter_value == expected_filter:
-                results.append("✅ Filter matches expected value (001)")
+                results.append(f"✅ Filter matches expected value ({expected_filter})")
             else:
-                results.append(f"❌ Filter mismatch: expected {expected_filter}, got {filter_value}")
+                results.append(f"⚠️ Filter {filter_value} (decimal: {bin_to_dec(filter_value)}) "
+                               f"differs from the default {expected_filter}")
                 
             if partition == expected_partition:
-                results.append("✅ Partition matches expected value (101)")
+                results.append(f"✅ Partition matches expected value ({expected_partition})")
+            elif bin_to_dec(partition) in PARTITION_TABLE:
+                results.append(f"⚠️ Partition {partition} ({company_digits}-digit company prefix) "
+                               f"differs from the default {expected_partition}")
             else:
-                results.append(f"❌ Partition mismatch: expected {expected_partition}, got {partition}")
+                results.append(f"❌ Partition {partition} is not defined for SGTIN-96")
             
             results.append("")
             if extracted_upc:
@@ -369,6 +542,91 @@ class EPCValidatorDialog(QDialog):
             self.status_frame.setStyleSheet("background-color: #4a2c2c; border: 1px solid #8b0000;")
             self.results_text.setPlainText(f"Error during validation: {str(e)}")
     
+    def show_scheme_decode(self, epc, scheme):
+        """Show the key and serial of an EPC encoded with a scheme other than SGTIN-96"""
+        decoded = scheme.decode_array([epc])
+        valid = bool(decoded['valid'][0])
+        key = decoded['key'][0]
+        serial = int(decoded['serial'][0])
+        
+        self.header_label.setText(f"{epc[:2]} ({scheme.name})")
+        self.extracted_upc_label.setText(key if valid else "❌ Extraction Failed")
+        self.serial_number_label.setText(f"{serial:,}" if valid else "❌ Extraction Failed")
+        self.round_trip_label.setText(f"Not available for {scheme.name}")
+        
+        results = [f"EPC Analysis for: {epc}", "=" * 50, f"Scheme: {scheme.name} (header {epc[:2]})", ""]
+        if valid:
+            self.decoded_serial = serial
+            self.locate_btn.setEnabled(True)
+            self.allocation_btn.setEnabled(True)
+            self.status_label.setText(f"✅ {scheme.name} EPC is Valid")
+            self.status_frame.setStyleSheet("background-color: #2c4a2c; border: 1px solid #008000;")
+            results.append(f"✅ Identifier: {key}")
+            results.append(f"✅ Serial: {serial:,}")
+        else:
+            self.status_label.setText(f"❌ Invalid {scheme.name} Structure")
+            self.status_frame.setStyleSheet("background-color: #4a2c2c; border: 1px solid #8b0000;")
+            results.append(f"❌ The EPC has the {scheme.name} header but its fields do not decode")
+        self.results_text.setPlainText("\n".join(results))
+    
+    def locate_in_job_folder(self):
+        """Look the decoded serial up in the manifest of a chosen job folder"""
+        if self.decoded_serial is None:
+            return
+        
+        folder = QFileDialog.getExistingDirectory(self, "Select Job or Data Folder", self.last_job_folder)
+        if not folder:
+            return
+        self.last_job_folder = folder
+        
+        location = locate_serial(folder, self.decoded_serial, upc=self.decoded_upc)
+        if location:
+            file_path, row = location
+            self.locate_result_label.setText(f"✅ {os.path.basename(file_path)}, row {row:,}\n{os.path.dirname(file_path)}")
+        else:
+            self.locate_result_label.setText(
+                f"❌ Serial {self.decoded_serial:,} not found in the manifests under {folder}"
+            )
+    
+    def find_allocating_job(self):
+        """Find which job allocated the decoded serial, in a worker thread"""
+        if self.decoded_serial is None or (self.lookup_worker and self.lookup_worker.isRunning()):
+            return
+        
+        self.allocation_btn.setEnabled(False)
+        self.allocation_result_label.setText("Searching allocation history...")
+        self.lookup_worker = AllocationLookupWorker(self.decoded_serial, self.decoded_upc)
+        self.lookup_worker.lookup_complete.connect(self.on_allocation_lookup_complete)
+        self.lookup_worker.lookup_failed.connect(self.on_allocation_lookup_failed)
+        self.lookup_worker.start()
+    
+    def on_allocation_lookup_complete(self, allocations):
+        """Show the allocations that hold the serial"""
+        self.allocation_btn.setEnabled(self.decoded_serial is not None)
+        if not allocations:
+            upc_note = f" for UPC {self.decoded_upc}" if self.decoded_upc else ""
+            self.allocation_result_label.setText(f"❌ No allocation{upc_note} contains this serial")
+            return
+        
+        lines = []
+        for allocation in allocations[:5]:
+            if allocation.get('kind') == 'lease':
+                lines.append(f"⚠️ {allocation['day']}: leased to {allocation.get('machine') or 'unknown machine'} "
+                             f"(lease {allocation.get('lease_id')}), job not recorded yet "
+                             f"(serials {allocation['start_serial']:,}-{allocation['end_serial']:,})")
+                continue
+            job = " / ".join(str(allocation[field]) for field in ('customer', 'ticket_number', 'po_number')
+                             if allocation.get(field))
+            lines.append(f"✅ {allocation['day']}: {job or 'unknown job'} "
+                         f"(serials {allocation['start_serial']:,}-{allocation['end_serial']:,})")
+        if len(allocations) > 5:
+            lines.append(f"... and {len(allocations) - 5} more")
+        self.allocation_result_label.setText("\n".join(lines))
+    
+    def on_allocation_lookup_failed(self, error_message):
+        self.allocation_btn.setEnabled(self.decoded_serial is not None)
+        self.allocation_result_label.setText(f"❌ Lookup failed: {error_message}")
+    
     def test_round_trip(self):
         """Test round-trip conversion: EPC -> UPC/Serial -> EPC"""
         epc = self.epc_input.text().strip().upper()
@@ -381,8 +639,13 @@ class EPCValidatorDialog(QDialog):
                 self.test_result_label.setText("❌ Cannot perform round-trip test - extraction failed")
                 return
             
-            # Generate EPC from extracted data
-            regenerated_epc = generate_epc(extracted_upc, extracted_serial)
+            # Generate EPC from extracted data with the same filter and partition
+            decoded = decode_sgtin96(epc)
+            regenerated_epc = generate_epc(
+                extracted_upc, extracted_serial,
+                filter_value=decoded['filter'],
+                company_prefix_length=PARTITION_TABLE[decoded['partition']][1]
+            )
             
             # Compare original and regenerated EPCs
             if regenerated_epc.upper() == epc.upper():
@@ -401,6 +664,63 @@ class EPCValidatorDialog(QDialog):
         except Exception as e:
             self.test_result_label.setText(f"❌ Round-trip test error: {str(e)}")
     
+    def load_epc_file(self):
+        """Pick a read log and validate all of its EPCs in a background thread"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Select EPC Read Log", "",
+            "EPC Files (*.txt *.csv *.xlsx *.xls);;All Files (*)"
+        )
+        if not file_path:
+            return
+        
+        self.load_file_btn.setEnabled(False)
+        self.bulk_result_label.setText(f"Validating {os.path.basename(file_path)}...")
+        
+        self.bulk_worker = BulkEPCValidationWorker(file_path)
+        self.bulk_worker.validation_complete.connect(
+            lambda summary: self.on_bulk_validation_complete(file_path, summary)
+        )
+        self.bulk_worker.validation_failed.connect(self.on_bulk_validation_failed)
+        self.bulk_worker.start()
+    
+    def on_bulk_validation_complete(self, file_path, summary):
+        """Show the counts produced by the bulk validator"""
+        self.load_file_btn.setEnabled(True)
+        
+        lines = [
+            f"File: {os.path.basename(file_path)}",
+            f"Total tags:      {summary['total']:,}",
+            f"Valid:           {summary['valid']:,}",
+            f"Invalid:         {summary['invalid']:,}",
+            f"Foreign header:  {summary['foreign_header']:,}",
+            f"Duplicate reads: {summary['duplicates']:,}",
+        ]
+        if summary['serial_min'] is not None:
+            lines.append(f"Serial range:    {summary['serial_min']:,} - {summary['serial_max']:,}")
+        for upc, count in sorted(summary['upc_counts'].items(), key=lambda item: -item[1])[:10]:
+            lines.append(f"  UPC {upc}: {count:,}")
+        if len(summary['upc_counts']) > 10:
+            lines.append(f"  ... {len(summary['upc_counts']) - 10} more UPCs")
+        scheme_counts = summary.get('scheme_counts', {})
+        if len(scheme_counts) > 1 or any(name != DEFAULT_SCHEME for name in scheme_counts):
+            lines.append("Schemes:")
+            for name, count in sorted(scheme_counts.items(), key=lambda item: -item[1]):
+                lines.append(f"  {name}: {count:,}")
+        lines.append(f"Loaded in {summary['load_seconds']:.2f}s, validated in {summary['validate_seconds']:.2f}s")
+        self.bulk_result_label.setText("\n".join(lines))
+        
+        if summary['total'] and summary['valid'] == summary['total']:
+            self.status_label.setText(f"✅ All {summary['total']:,} EPCs are Valid")
+            self.status_frame.setStyleSheet("background-color: #2c4a2c; border: 1px solid #008000;")
+        else:
+            self.status_label.setText(f"⚠️ {summary['total'] - summary['valid']:,} of {summary['total']:,} EPCs have Issues")
+            self.status_frame.setStyleSheet("background-color: #4a4a2c; border: 1px solid #ffaa00;")
+    
+    def on_bulk_validation_failed(self, error_message):
+        """Report a read log that could not be loaded"""
+        self.load_file_btn.setEnabled(True)
+        self.bulk_result_label.setText(f"❌ Bulk validation failed: {error_message}")
+    
     def clear_results(self, keep_status=True):
         """Clear all validation results"""
         if not keep_status:
@@ -422,4 +742,11 @@ class EPCValidatorDialog(QDialog):
         
         self.test_result_label.setText("—")
         self.results_text.clear()
+        
+        self.decoded_serial = None
+        self.decoded_upc = None
+        self.locate_btn.setEnabled(False)
+        self.locate_result_label.setText("—")
+        self.allocation_btn.setEnabled(False)
+        self.allocation_result_label.setText("—")
         self.test_btn.setEnabled(False) 
\ No newline at end of file
@@ -9,7 +9,6 @@ This dialog provides comprehensive search functionality across all job data incl
 """
 
 import os
-import json
 from datetime import datetime
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, 
@@ -17,80 +16,52 @@ from PySide6.QtWidgets import (
     QTableView, QHeaderView, QComboBox, QCheckBox, QProgressBar,
     QMessageBox, QSizePolicy, QTabWidget, QSplitter
 )
-from PySide6.QtCore import Qt, QThread, Signal, QTimer, QAbstractTableModel
-from PySide6.QtGui import QFont, QStandardItem, QStandardItemModel
+from PySide6.QtCore import Qt, QThread, Signal, QTimer
+from PySide6.QtGui import QFont
 
 import src.config as config
+from src.utils.job_index import get_job_index, ACTIVE, ARCHIVE
+from src.widgets.job_table_model import (
+    JobTableModel, JobSortFilterProxyModel, JobColumn, job_field, format_quantity, quantity_sort_key
+)
+
+
+def search_result_date(job_data, job_type=None):
+    """Archive date for archived jobs, due date for active ones."""
+    if job_type == "Archive":
+        archive_date = str(job_data.get("dateArchived", job_data.get("archivedDate", "")) or "")
+        return archive_date.split()[0] if archive_date else ""
+    return str(job_data.get("Due Date", "") or "")
 
 
-class JobDataModel(QStandardItemModel):
+class JobDataModel(JobTableModel):
     """Model for displaying job search results"""
     
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.headers = [
-            "Customer", "Ticket#", "PO#", "Part#", 
-            "Inlay", "Size", "Qty", "UPC", "Status", "Date"
-        ]
-        self.setHorizontalHeaderLabels(self.headers)
-        
-        self.jobs_data = []  # Store full job data for details
+        super().__init__([
+            JobColumn("Customer", job_field("Customer")),
+            JobColumn("Ticket#", job_field("Ticket#", "Job Ticket#")),
+            JobColumn("PO#", job_field("PO#")),
+            JobColumn("Part#", job_field("Part#")),
+            JobColumn("Inlay", job_field("Inlay Type")),
+            JobColumn("Size", job_field("Label Size")),
+            JobColumn("Qty", job_field("Qty", "Quantity"), format_quantity, quantity_sort_key),
+            JobColumn("UPC", job_field("UPC Number")),
+            JobColumn("Status", job_field("Status")),
+            JobColumn("Date", search_result_date),
+        ], parent)
     
     def add_job_result(self, job_data, job_type="Active"):
         """Add a job to the search results"""
-        # Handle both old and new field names
-        ticket_num = job_data.get("Ticket#", job_data.get("Job Ticket#", ""))
-        quantity = job_data.get("Qty", job_data.get("Quantity", ""))
-        
-        # Format quantity with commas if it's a number
-        if quantity and str(quantity).replace(",", "").isdigit():
-            quantity = f"{int(str(quantity).replace(',', '')):,}"
-        
-        # Determine date to display
-        date_display = ""
-        if job_type == "Archive":
-            archive_date = job_data.get("dateArchived", job_data.get("archivedDate", ""))
-            if archive_date:
-                try:
-                    if " " in archive_date:
-                        date_display = archive_date.split()[0]  # Extract date part
-                    else:
-                        date_display = archive_date
-                except Exception:
-                    date_display = archive_date
-        else:
-            # For active jobs, try to get due date or creation date
-            due_date = job_data.get("Due Date", "")
-            if due_date:
-                date_display = due_date
-        
-        row_items = [
-            QStandardItem(job_data.get("Customer", "")),
-            QStandardItem(ticket_num),
-            QStandardItem(job_data.get("PO#", "")),
-            QStandardItem(job_data.get("Part#", "")),
-            QStandardItem(job_data.get("Inlay Type", "")),
-            QStandardItem(job_data.get("Label Size", "")),
-            QStandardItem(str(quantity)),
-            QStandardItem(job_data.get("UPC Number", "")),
-            QStandardItem(job_data.get("Status", "")),
-            QStandardItem(date_display)
-        ]
-        
-        self.appendRow(row_items)
-        self.jobs_data.append(job_data)
+        self.append_job(job_data, job_type)
     
     def clear_results(self):
         """Clear all search results"""
         self.clear()
-        self.setHorizontalHeaderLabels(self.headers)
-        self.jobs_data = []
     
     def get_job_data(self, row):
-        """Get full job data for a specific row"""
-        if 0 <= row < len(self.jobs_data):
-            return self.jobs_data[row]
-        return None
+        """Get full job data for a specific (source) row"""
+        return self.job_at(row)
 
 
 class GlobalSearchWorker(QThread):
@@ -141,107 +112,33 @@ class GlobalSearchWorker(QThread):
     
     def search_active_jobs(self):
         """Search through active jobs"""
-        results_count = 0
-        active_source_dir = config.ACTIVE_JOBS_SOURCE_DIR
-        
-        if not os.path.exists(active_source_dir):
-            return 0
-        
-        try:
-            for root, dirs, files in os.walk(active_source_dir):
-                if self.is_cancelled:
-                    break
-                    
-                if "job_data.json" in files:
-                    job_data_path = os.path.join(root, "job_data.json")
-                    try:
-                        with open(job_data_path, 'r', encoding='utf-8') as f:
-                            job_data = json.load(f)
-                        
-                        if self.matches_search_criteria(job_data):
-                            self.result_found.emit(job_data, "Active")
-                            results_count += 1
-                            
-                    except Exception as e:
-                        continue  # Skip corrupted files
-                        
-        except Exception as e:
-            print(f"Error searching active jobs: {e}")
-        
-        return results_count
+        return self._search_index(ACTIVE, config.ACTIVE_JOBS_SOURCE_DIR, "Active", top_level_only=False)
     
     def search_archived_jobs(self):
         """Search through archived jobs"""
+        return self._search_index(ARCHIVE, config.ARCHIVE_DIR, "Archive", top_level_only=True)
+    
+    def _search_index(self, kind, directory, job_type, top_level_only):
+        """Update the job index for one directory and emit its matching jobs"""
         results_count = 0
-        archive_dir = config.ARCHIVE_DIR
         
-        if not os.path.exists(archive_dir):
+        if not os.path.exists(directory):
             return 0
         
         try:
-            for folder_name in os.listdir(archive_dir):
+            job_index = get_job_index()
+            job_index.scan(kind, directory, cancelled=lambda: self.is_cancelled)
+            
+            for job_data in job_index.search(self.search_terms, kind, top_level_only=top_level_only):
                 if self.is_cancelled:
                     break
-                    
-                job_folder_path = os.path.join(archive_dir, folder_name)
-                if os.path.isdir(job_folder_path):
-                    metadata_path = os.path.join(job_folder_path, 'job_data.json')
-                    if os.path.exists(metadata_path):
-                        try:
-                            with open(metadata_path, 'r', encoding='utf-8') as f:
-                                job_data = json.load(f)
-                            
-                            if self.matches_search_criteria(job_data):
-                                self.result_found.emit(job_data, "Archive")
-                                results_count += 1
-                                
-                        except Exception as e:
-                            continue  # Skip corrupted files
-                            
+                self.result_found.emit(job_data, job_type)
+                results_count += 1
+                
         except Exception as e:
-            print(f"Error searching archived jobs: {e}")
+            print(f"Error searching {job_type.lower()} jobs: {e}")
         
         return results_count
-    
-    def matches_search_criteria(self, job_data):
-        """Check if job data matches search criteria"""
-        if not self.search_terms:
-            return True  # Empty search returns all
-        
-        # List of fields to search
-        searchable_fields = [
-            job_data.get("Customer", ""),
-            job_data.get("Part#", ""),
-            job_data.get("Job Ticket#", ""),
-            job_data.get("Ticket#", ""),
-            job_data.get("PO#", ""),
-            job_data.get("Inlay Type", ""),
-            job_data.get("Label Size", ""),
-            job_data.get("Quantity", ""),
-            job_data.get("Qty", ""),
-            job_data.get("Status", ""),
-            job_data.get("UPC Number", ""),
-            job_data.get("Serial Number", ""),
-            job_data.get("Due Date", ""),
-            job_data.get("dateArchived", ""),
-            job_data.get("archivedDate", ""),
-            job_data.get("Item", ""),
-            job_data.get("LPR", ""),
-            job_data.get("Rolls", ""),
-        ]
-        
-        # Combine all searchable text
-        combined_text = " ".join(str(field) for field in searchable_fields if field).lower()
-        
-        # Check if search terms are in the combined text
-        search_words = self.search_terms.split()
-        
-        # For multi-word searches, all words must be present
-        for word in search_words:
-            if word not in combined_text:
-                return False
-        
-        return True
 
 
 class GlobalSearchDialog(QDialog):
@@ -345,8 +242,10 @@ class GlobalSearchDialog(QDialog):
         
         # Results table
         self.results_model = JobDataModel()
+        self.results_proxy = JobSortFilterProxyModel()
+        self.results_proxy.setSourceModel(self.results_model)
         self.results_table = QTableView()
-        self.results_table.setModel(self.results_model)
+        self.results_table.setModel(self.results_proxy)
         self.results_table.setSortingEnabled(True)
         self.results_table.setAlternatingRowColors(True)
         self.results_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
@@ -462,7 +361,7 @@ class GlobalSearchDialog(QDialog):
         if not index.isValid():
             return
         
-        row = index.row()
+        row = self.results_proxy.mapToSource(index).row()
         job_data = self.results_model.get_job_data(row)
         
         if not job_data:
@@ -529,12 +428,12 @@ class GlobalSearchDialog(QDialog):
                 f.write("\t".join(headers) + "\n")
                 f.write("-" * 100 + "\n")
                 
-                # Write data
-                for row in range(self.results_model.rowCount()):
+                # Write data, in the order shown
+                for row in range(self.results_proxy.rowCount()):
                     row_data = []
                     for col in range(len(headers)):
-                        item = self.results_model.item(row, col)
-                        row_data.append(item.text() if item else "")
+                        text = self.results_proxy.index(row, col).data()
+                        row_data.append(text or "")
                     f.write("\t".join(row_data) + "\n")
             
             QMessageBox.information(self, "Export Complete", f"Results exported to:\n{filename}")
@@ -9,7 +9,9 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, Signal, QTimer
 from PySide6.QtGui import QFont, QPalette, QIcon
-from src.utils.epc_conversion import generate_epc
+from src.utils.epc_schemes import scheme_from_job_data
+from src.utils.epc_conversion import EPCRange
+from src.utils.roll_tracker import roll_boundary_epcs, short_epc
 from src.utils.file_utils import resource_path
 from filelock import FileLock, Timeout
 
@@ -174,6 +176,12 @@ class InteractiveRollTrackerDialog(QDialog):
             # Calculate rolls with job metadata
             num_rolls = math.ceil(quantity / lpr)
             current_serial = start_serial
+            roll_quantities = [min(lpr, quantity - roll_index * lpr) for roll_index in range(num_rolls)]
+            if upc:
+                # Same scheme and options as the job's database files
+                scheme, scheme_options = scheme_from_job_data(self.job_data)
+                start_epcs, end_epcs = roll_boundary_epcs(
+                    EPCRange(upc, start_serial, quantity, scheme, scheme_options).split(lpr))
             
             # Store job validation info in tracker metadata
             self.tracker_metadata = {
@@ -189,11 +197,10 @@ class InteractiveRollTrackerDialog(QDialog):
             }
             
             for roll_num in range(1, num_rolls + 1):
-                remaining_qty = quantity - (roll_num - 1) * lpr
-                roll_qty = min(lpr, remaining_qty)
+                roll_qty = roll_quantities[roll_num - 1]
                 
-                start_epc = generate_epc(upc, current_serial) if upc else "N/A"
-                end_epc = generate_epc(upc, current_serial + roll_qty - 1) if upc else "N/A"
+                start_epc = start_epcs[roll_num - 1] if upc else "N/A"
+                end_epc = end_epcs[roll_num - 1] if upc else "N/A"
                 
                 roll_info = {
                     'roll_number': roll_num,
@@ -395,8 +402,8 @@ class InteractiveRollTrackerDialog(QDialog):
         epc_header.setStyleSheet("color: #606060; font-size: 8px; font-weight: bold;")
         epc_section.addWidget(epc_header)
         
-        start_epc_short = roll_info['start_epc'][-8:] if len(roll_info['start_epc']) > 8 else roll_info['start_epc']
-        end_epc_short = roll_info['end_epc'][-8:] if len(roll_info['end_epc']) > 8 else roll_info['end_epc']
+        start_epc_short = short_epc(roll_info['start_epc'], 8)
+        end_epc_short = short_epc(roll_info['end_epc'], 8)
         epc_label = QLabel(f"{start_epc_short} → {end_epc_short}")
         epc_font = QFont("Consolas", 10)
         epc_label.setFont(epc_font)
@@ -9,13 +9,16 @@ from PySide6.QtWidgets import (
     QGroupBox, QFormLayout, QTextEdit, QComboBox, QListWidget,
     QTabWidget, QWidget, QMessageBox, QGridLayout, QLineEdit, QProgressDialog,
     QTreeWidget, QTreeWidgetItem, QSplitter, QFrame, QScrollArea,
-    QSizePolicy
+    QSizePolicy, QCheckBox
 )
 from PySide6.QtCore import Qt, Signal, QThread, QTimer
 from PySide6.QtGui import QFont, QIcon
 import fitz
 import shutil
 import src.config as config
+from src.utils.epc_manifest import locate_serial, find_unfinished_checkpoint
+from src.utils.epc_schemes import scheme_from_job_data
+from src.utils.job_journal import record_job_change
 
 
 
@@ -43,6 +46,7 @@ class JobDetailsDialog(QDialog):
         self.encoding_fields_read = {}
         self.job_fields_edit = {}
         self.encoding_fields_edit = {}
+        self.encoding_checks_edit = {}
         
         self.setup_ui()
         self.load_job_data()
@@ -350,6 +354,23 @@ class JobDetailsDialog(QDialog):
         checklist_layout.addWidget(self.regen_checklist_btn)
         actions_layout.addLayout(checklist_layout)
         
+        # Serial lookup via the EPC manifest
+        locate_layout = QHBoxLayout()
+        self.locate_serial_input = QLineEdit()
+        self.locate_serial_input.setPlaceholderText("Serial # to locate in the DB files")
+        self.locate_serial_input.returnPressed.connect(self.locate_serial_number)
+        self.locate_serial_btn = QPushButton("Locate Serial")
+        self.locate_serial_btn.setMaximumHeight(30)
+        self.locate_serial_btn.clicked.connect(self.locate_serial_number)
+        locate_layout.addWidget(self.locate_serial_input)
+        locate_layout.addWidget(self.locate_serial_btn)
+        actions_layout.addLayout(locate_layout)
+        
+        self.locate_result_label = QLabel("")
+        self.locate_result_label.setWordWrap(True)
+        self.locate_result_label.setStyleSheet("padding: 4px; font-size: 11px;")
+        actions_layout.addWidget(self.locate_result_label)
+        
         left_layout.addWidget(actions_group)
         left_layout.addStretch()
         
@@ -487,6 +508,52 @@ class JobDetailsDialog(QDialog):
             return os.path.join(job_path, *path_parts)
         return None
 
+    def locate_serial_number(self):
+        """Find the DB file and row holding a serial and select that file in the tree."""
+        serial_text = self.locate_serial_input.text().strip().replace(',', '')
+        if not serial_text.isdigit():
+            self.locate_result_label.setText("Enter a serial number")
+            self.locate_result_label.setStyleSheet("padding: 4px; font-size: 11px; color: orange;")
+            return
+        
+        job = dict(self.job_data)
+        job_path = self.find_job_directory()
+        if job_path:
+            job['job_folder_path'] = job_path
+        
+        location = locate_serial(job, int(serial_text))
+        if not location:
+            self.locate_result_label.setText(
+                f"Serial {int(serial_text):,} is not in this job's EPC manifest "
+                f"(files generated before manifests existed cannot be searched)"
+            )
+            self.locate_result_label.setStyleSheet("padding: 4px; font-size: 11px; color: orange;")
+            return
+        
+        file_path, row = location
+        self.locate_result_label.setText(f"Serial {int(serial_text):,}: {os.path.basename(file_path)}, row {row:,}")
+        self.locate_result_label.setStyleSheet("padding: 4px; font-size: 11px; color: green;")
+        self.select_file_in_tree(file_path)
+    
+    def select_file_in_tree(self, file_path):
+        """Expand the file tree down to a file and select it."""
+        target = os.path.normcase(os.path.normpath(file_path))
+        items = [self.file_tree.topLevelItem(i) for i in range(self.file_tree.topLevelItemCount())]
+        while items:
+            item = items.pop()
+            item_path = self.get_item_path(item) if item.parent() is not None else self.find_job_directory()
+            if not item_path:
+                continue
+            item_path = os.path.normcase(os.path.normpath(item_path))
+            if item_path == target:
+                self.file_tree.setCurrentItem(item)
+                self.file_tree.scrollToItem(item)
+                return True
+            if target.startswith(item_path + os.sep):
+                item.setExpanded(True)
+                items.extend(item.child(i) for i in range(item.childCount()))
+        return False
+
     def enter_edit_mode(self):
         """Enter edit mode by creating a new tab."""
         # Create edit tab if it doesn't exist
@@ -563,6 +630,13 @@ class JobDetailsDialog(QDialog):
             field.setMinimumWidth(120)
             encoding_form_layout.addRow(label, field)
             self.encoding_fields_edit[key] = field
+        
+        # Options that change the serial range
+        for key in ["Manual Serial Override", "Include 2% Buffer", "Include 7% Buffer"]:
+            check = QCheckBox(key)
+            check.setChecked(self.is_checked(self.job_data.get(key)))
+            encoding_form_layout.addRow("", check)
+            self.encoding_checks_edit[key] = check
         right_layout.addWidget(encoding_details_group)
         right_layout.addStretch()
 
@@ -604,17 +678,21 @@ class JobDetailsDialog(QDialog):
             updated_data[key] = field.text()
         for key, field in self.encoding_fields_edit.items():
             updated_data[key] = field.text()
+        for key, check in self.encoding_checks_edit.items():
+            updated_data[key] = check.isChecked()
         
-        # Detect critical changes that require regeneration
+        # Detect critical changes that require regeneration; the serial
+        # range follows the quantity, serial number, override and buffers
         critical_fields = {
-            'UPC Number': ['pdf', 'qc', 'database'],
-            'Quantity': ['pdf', 'qc', 'serials', 'database'], 
-            'Qty': ['pdf', 'qc', 'serials', 'database'],
+            'UPC Number': ['pdf', 'qc', 'database', 'epc'],
+            'Quantity': ['pdf', 'qc', 'serials', 'database', 'epc'], 
+            'Qty': ['pdf', 'qc', 'serials', 'database', 'epc'],
             'Customer': ['pdf', 'qc', 'folders'],
             'Label Size': ['pdf', 'qc', 'folders', 'template'],
-            'Serial Number': ['pdf', 'database'],
-            'Include 2% Buffer': ['serials', 'epc'],
-            'Include 7% Buffer': ['serials', 'epc']
+            'Serial Number': ['pdf', 'qc', 'serials', 'database', 'epc'],
+            'Manual Serial Override': ['pdf', 'qc', 'serials', 'database', 'epc'],
+            'Include 2% Buffer': ['qc', 'serials', 'epc'],
+            'Include 7% Buffer': ['qc', 'serials', 'epc']
         }
         
         # Determine what needs regeneration
@@ -622,8 +700,13 @@ class JobDetailsDialog(QDialog):
         changed_fields = []
         
         for field, artifacts in critical_fields.items():
-            old_val = str(original_data.get(field, '')).strip()
-            new_val = str(updated_data.get(field, '')).strip()
+            if field in self.encoding_checks_edit:
+                old_val = self.is_checked(original_data.get(field))
+                new_val = updated_data[field]
+            else:
+                # Fields without an edit box (e.g. Qty) keep their value
+                old_val = str(original_data.get(field, '')).strip()
+                new_val = str(updated_data.get(field, original_data.get(field, ''))).strip()
             if old_val != new_val:
                 changed_fields.append(field)
                 artifacts_to_regenerate.update(artifacts)
@@ -653,13 +736,26 @@ class JobDetailsDialog(QDialog):
                 self.regenerate_all_artifacts(original_data, changed_fields, artifacts_to_regenerate)
             else:
                 # Just emit the update without regeneration
-                self.job_updated.emit(self.job_data)
+                self.emit_job_updated()
                 self.finalize_edit(skip_checklist_prompt=True)
         else:
             # No critical changes, just update
-            self.job_updated.emit(self.job_data)
+            self.emit_job_updated()
             self.finalize_edit(skip_checklist_prompt=False)
 
+    @staticmethod
+    def is_checked(value):
+        """Read a yes/no job field, which older job files may store as text."""
+        if isinstance(value, str):
+            return value.strip().lower() in ('true', '1', 'yes')
+        return bool(value)
+
+    def emit_job_updated(self):
+        """Tell the jobs page about an edit and record it in the change journal for other workstations."""
+        if not self.is_archived:
+            record_job_change("updated", self.job_data)
+        self.job_updated.emit(self.job_data)
+
     def regenerate_all_artifacts(self, original_data, changed_fields, artifacts_to_regenerate):
         """Regenerate all job artifacts after critical field changes."""
         job_path = self.find_job_directory()
@@ -705,7 +801,7 @@ class JobDetailsDialog(QDialog):
         
         if success:
             self.job_data = updated_job_data
-            self.job_updated.emit(self.job_data)
+            self.emit_job_updated()
             
             # Mark that artifacts were regenerated
             self.artifacts_regenerated = True
@@ -765,13 +861,13 @@ class JobDetailsDialog(QDialog):
         if reply == QMessageBox.StandardButton.Yes:
             # Complete and archive
             self.job_data['Status'] = 'Completed'
-            self.job_updated.emit(self.job_data)
+            self.emit_job_updated()
             self.load_job_data()
             self.archive_job()
         elif reply == QMessageBox.StandardButton.No:
             # Just complete, don't archive
             self.job_data['Status'] = 'Completed'
-            self.job_updated.emit(self.job_data)
+            self.emit_job_updated()
             self.load_job_data()
 
     def find_job_directory(self):
@@ -1015,6 +1111,7 @@ class JobDetailsDialog(QDialog):
         """Copy .btw template file to the job's print folder."""
         try:
             from src.utils.epc_conversion import get_template_path_with_inlay
+            from src.utils.template_index import get_template_index
             from src.utils.template_mapping import get_template_manager
             
             # First, check template mappings
@@ -1027,7 +1124,7 @@ class JobDetailsDialog(QDialog):
                 # Fall back to directory scanning
                 template_base_path = config.get_template_base_path()
                 
-                if not template_base_path or not os.path.exists(template_base_path):
+                if not template_base_path or not get_template_index(template_base_path).exists():
                     print(f"Template base path not configured or doesn't exist: {template_base_path}")
                     return
                 
@@ -1123,7 +1220,7 @@ class EPCGenerationWorker(QThread):
     generation_complete = Signal(list)   # list of created files
     generation_failed = Signal(str)      # error message
     
-    def __init__(self, upc, start_serial, total_qty, qty_per_db, save_location, job_data=None):
+    def __init__(self, upc, start_serial, total_qty, qty_per_db, save_location, job_data=None, resume=False):
         super().__init__()
         self.upc = upc
         self.start_serial = start_serial
@@ -1131,6 +1228,7 @@ class EPCGenerationWorker(QThread):
         self.qty_per_db = qty_per_db
         self.save_location = save_location
         self.job_data = job_data
+        self.resume = resume
         self.is_cancelled = False
         
     def cancel(self):
@@ -1142,6 +1240,9 @@ class EPCGenerationWorker(QThread):
         try:
             from src.utils.epc_conversion import generate_epc_database_files_with_progress
             
+            # Jobs without an 'EPC Scheme' entry are encoded as SGTIN-96
+            scheme, scheme_options = scheme_from_job_data(self.job_data)
+            
             # Use the new progress-aware function
             created_files = generate_epc_database_files_with_progress(
                 self.upc, 
@@ -1150,7 +1251,11 @@ class EPCGenerationWorker(QThread):
                 self.qty_per_db, 
                 self.save_location,
                 progress_callback=self.emit_progress,
-                cancel_check=self.check_cancelled
+                cancel_check=self.check_cancelled,
+                max_workers=config.get_epc_generation_workers(),
+                scheme=scheme.name,
+                scheme_options=scheme_options,
+                resume=self.resume
             )
             
             if not self.is_cancelled:
@@ -1187,8 +1292,11 @@ class EPCProgressDialog(QProgressDialog):
         self.setMinimumDuration(500)  # Show after 500ms
         self.setCancelButtonText("Cancel")
         
+        # Offer to continue an interrupted run of the same job layout
+        resume = self.ask_resume(upc, start_serial, total_qty, qty_per_db, save_location, job_data, parent)
+        
         # Create worker thread
-        self.worker = EPCGenerationWorker(upc, start_serial, total_qty, qty_per_db, save_location, job_data)
+        self.worker = EPCGenerationWorker(upc, start_serial, total_qty, qty_per_db, save_location, job_data, resume)
         
         # Connect signals
         self.worker.progress_updated.connect(self.update_progress)
@@ -1199,6 +1307,35 @@ class EPCProgressDialog(QProgressDialog):
         # Start generation
         self.worker.start()
     
+    @staticmethod
+    def ask_resume(upc, start_serial, total_qty, qty_per_db, save_location, job_data, parent=None):
+        """Ask whether to resume if the data folder holds an unfinished checkpoint for this job."""
+        try:
+            scheme, scheme_options = scheme_from_job_data(job_data)
+            checkpoint = find_unfinished_checkpoint(
+                save_location, upc, start_serial, total_qty, qty_per_db, scheme.name, scheme_options
+            )
+        except Exception as e:
+            print(f"Could not read EPC generation checkpoint: {e}")
+            return False
+        if not checkpoint or not checkpoint['files']:
+            return False
+        
+        num_dbs = -(-int(total_qty) // int(qty_per_db))
+        box = QMessageBox(parent)
+        box.setIcon(QMessageBox.Icon.Question)
+        box.setWindowTitle("Resume EPC Generation")
+        box.setText(
+            f"A previous run stopped after {len(checkpoint['files'])} of {num_dbs} database files.\n\n"
+            f"Resume verifies the finished files and generates only the rest. "
+            f"Start Over regenerates every file."
+        )
+        resume_button = box.addButton("Resume", QMessageBox.ButtonRole.AcceptRole)
+        box.addButton("Start Over", QMessageBox.ButtonRole.DestructiveRole)
+        box.setDefaultButton(resume_button)
+        box.exec()
+        return box.clickedButton() is resume_button
+    
     def update_progress(self, percentage, message):
         """Update progress bar and message."""
         self.setValue(percentage)
@@ -1790,7 +1927,12 @@ class JobRegenerationWorker(QThread):
             self.restore_backups()
     
     def backup_original_files(self):
-        """Create timestamped backups of original files."""
+        """
+        Create timestamped backups of original files.
+        
+        EPC database files are not copied here; regenerate_epc_files() backs
+        up only the ones it is about to overwrite or delete.
+        """
         import shutil
         import os
         from datetime import datetime
@@ -1806,11 +1948,6 @@ class JobRegenerationWorker(QThread):
             f"{self.job_data.get('Customer', '')}-{self.job_data.get('Job Ticket#', '')}-{self.job_data.get('PO#', '')}-QualityControl.html"
         ]
         
-        # Add EPC files if they exist
-        data_folder = os.path.join(self.job_path, self.job_data.get('UPC Number', ''), 'data')
-        if os.path.exists(data_folder):
-            files_to_backup.extend([os.path.join('data', f) for f in os.listdir(data_folder) if f.endswith('.xlsx')])
-        
         # Backup each file
         for filename in files_to_backup:
             src = os.path.join(self.job_path, filename)
@@ -1821,46 +1958,50 @@ class JobRegenerationWorker(QThread):
                 shutil.copy2(src, dst)
                 
         # Save backup manifest
-        manifest = {
+        self.backup_manifest = {
             'timestamp': timestamp,
             'original_data': self.original_data,
-            'files_backed_up': files_to_backup
+            'files_backed_up': files_to_backup,
+            'files_created': []
         }
-        with open(os.path.join(self.backup_dir, 'manifest.json'), 'w') as f:
-            json.dump(manifest, f, indent=2)
+        self.write_backup_manifest()
                 
         return True
     
+    def write_backup_manifest(self):
+        """Save the list of backed up and newly created files into the backup folder."""
+        with open(os.path.join(self.backup_dir, 'manifest.json'), 'w') as f:
+            json.dump(self.backup_manifest, f, indent=2)
+    
+    def backup_job_file(self, file_path):
+        """Copy one file below the job folder into the backup (or note it as new if it does not exist)."""
+        import shutil
+        
+        relative_path = os.path.relpath(file_path, self.job_path)
+        if os.path.exists(file_path):
+            dst = os.path.join(self.backup_dir, relative_path)
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(file_path, dst)
+            self.backup_manifest['files_backed_up'].append(relative_path)
+        else:
+            self.backup_manifest['files_created'].append(relative_path)
+    
     def refresh_serial_numbers(self):
-        """Recalculate serial numbers if quantity changed."""
-        if 'Quantity' not in self.changed_fields and 'Qty' not in self.changed_fields:
+        """Recalculate the serial range if the quantity, serial number, override or buffers changed."""
+        from src.utils.serial_manager import SERIAL_RANGE_FIELDS, serial_range_for_edited_job
+        
+        if not any(field in self.changed_fields for field in SERIAL_RANGE_FIELDS):
             return True
             
         try:
-            from src.utils.serial_manager import allocate_serials_for_job
-            from src.utils.epc_conversion import calculate_total_quantity_with_percentages
-            
-            base_qty = int(str(self.job_data.get('Quantity', self.job_data.get('Qty', '0'))).replace(',', ''))
-            
-            # Check if EPC generation is enabled
-            if self.job_data.get('Enable EPC Generation', False):
-                total_qty = calculate_total_quantity_with_percentages(
-                    base_qty,
-                    self.job_data.get('Include 2% Buffer', False),
-                    self.job_data.get('Include 7% Buffer', False)
-                )
-            else:
-                total_qty = base_qty
-            
-            # Check for manual override
-            if self.job_data.get('Manual Serial Override', False):
-                start_serial = int(self.job_data.get('Serial Number', '1'))
-                end_serial = start_serial + total_qty - 1
-                self.progress_updated.emit(15, f"Using manual serials: {start_serial:,} - {end_serial:,}")
-            else:
-                # Allocate new serials
-                start_serial, end_serial = allocate_serials_for_job(total_qty, self.job_data)
-                self.progress_updated.emit(15, f"Allocated new serials: {start_serial:,} - {end_serial:,}")
+            start_serial, end_serial, total_qty, source = serial_range_for_edited_job(
+                self.job_data, self.original_data)
+            messages = {
+                'manual': "Using manual serials",
+                'kept': "Keeping allocated serials",
+                'allocated': "Allocated new serials",
+            }
+            self.progress_updated.emit(15, f"{messages[source]}: {start_serial:,} - {end_serial:,}")
             
             # Update job data
             self.job_data['Start'] = str(start_serial)
@@ -2007,13 +2148,87 @@ class JobRegenerationWorker(QThread):
         self.progress_updated.emit(70, "Database records updated")
         return True
     
+    def epc_layout(self, job_data):
+        """Return (upc, start_serial, total_qty, qty_per_db) of a job's EPC files, or None."""
+        try:
+            upc = str(job_data.get('UPC Number', '')).strip()
+            start_serial = job_data.get('Serial Range Start', job_data.get('Start', job_data.get('Serial Number')))
+            total_qty = job_data.get('Total Quantity with Buffers')
+            if total_qty in (None, ''):
+                start, end = job_data.get('Serial Range Start'), job_data.get('Serial Range End')
+                total_qty = int(end) - int(start) + 1
+            qty_per_db = int(str(job_data.get('Qty per DB', '1000')).replace(',', ''))
+            start_serial = int(str(start_serial).replace(',', ''))
+            total_qty = int(str(total_qty).replace(',', ''))
+        except (TypeError, ValueError):
+            return None
+        if not upc or total_qty <= 0 or qty_per_db <= 0:
+            return None
+        return upc, start_serial, total_qty, qty_per_db
+    
     def regenerate_epc_files(self):
-        """Regenerate EPC files if UPC or quantity changed."""
-        if 'UPC Number' not in self.changed_fields and 'Quantity' not in self.changed_fields:
+        """
+        Bring the EPC database files in line with the edited job.
+        
+        The old and new chunk layouts are compared and only chunks whose UPC
+        or serial range changed are rewritten; orphaned chunks are deleted.
+        Only those files are backed up first.
+        """
+        from src.utils.epc_conversion import plan_epc_regeneration, apply_epc_regeneration
+        from src.utils.epc_manifest import MANIFEST_FILE_NAME
+        
+        new_layout = self.epc_layout(self.job_data)
+        old_layout = self.epc_layout(self.original_data)
+        
+        # Generate into the folder that holds the current files
+        data_folder = self.original_data.get('data_folder_path')
+        if not data_folder or not os.path.isdir(data_folder):
+            data_folder = os.path.join(self.job_path, self.original_data.get('UPC Number', ''), 'data')
+        has_db_files = os.path.isdir(data_folder) and any(
+            name.endswith('.xlsx') for name in os.listdir(data_folder)
+        )
+        if not has_db_files and not self.job_data.get('Enable EPC Generation', False):
             return True
-            
-        # This would trigger EPC regeneration if implemented
-        self.progress_updated.emit(80, "EPC files regenerated")
+        if new_layout is None:
+            raise ValueError("Job has no valid UPC, serial range and Qty per DB for EPC files")
+        
+        upc, start_serial, total_qty, qty_per_db = new_layout
+        scheme, scheme_options = scheme_from_job_data(self.job_data)
+        previous = None
+        if old_layout:
+            old_scheme, old_options = scheme_from_job_data(self.original_data)
+            previous = {
+                'upc': old_layout[0], 'start_serial': old_layout[1],
+                'total_qty': old_layout[2], 'qty_per_db': old_layout[3],
+                'scheme': old_scheme.name, 'scheme_options': old_options
+            }
+        
+        plan = plan_epc_regeneration(data_folder, upc, start_serial, total_qty, qty_per_db,
+                                     scheme.name, scheme_options, previous)
+        if not plan['write'] and not plan['delete']:
+            self.progress_updated.emit(80, f"EPC files unchanged ({len(plan['keep'])} kept)")
+            return True
+        
+        # Back up only what is about to change, plus the manifest
+        for file_name in set(plan['touched']) | {chunk[3] for chunk in plan['write']} | {MANIFEST_FILE_NAME}:
+            self.backup_job_file(os.path.join(data_folder, file_name))
+        self.write_backup_manifest()
+        
+        def report(percentage, message):
+            self.progress_updated.emit(75 + percentage // 10, message)
+        
+        created_files = apply_epc_regeneration(
+            plan, data_folder, upc, start_serial, total_qty, qty_per_db,
+            scheme.name, scheme_options, progress_callback=report,
+            cancel_check=lambda: self.is_cancelled
+        )
+        if created_files is None:
+            raise Exception("EPC regeneration cancelled")
+        
+        self.progress_updated.emit(
+            85, f"EPC files regenerated: {len(plan['write'])} written, "
+                f"{len(plan['keep'])} unchanged, {len(plan['delete'])} removed"
+        )
         return True
     
     def save_updated_data(self):
@@ -2074,6 +2289,12 @@ class JobRegenerationWorker(QThread):
                     if os.path.exists(src):
                         os.makedirs(os.path.dirname(dst), exist_ok=True)
                         shutil.copy2(src, dst)
+                
+                # Remove files that did not exist before regeneration
+                for filename in manifest.get('files_created', []):
+                    created = os.path.join(self.job_path, filename)
+                    if os.path.exists(created):
+                        os.remove(created)
             
             # Clean up backup directory
             shutil.rmtree(self.backup_dir)
@@ -0,0 +1,456 @@
+"""
+Job Table Model
+
+Table model shared by the Jobs, Archive and Global Search tables.
+
+The model keeps its rows column by column: when a job is added, each column
+stores one plain value read from the job dict (a ticket, a quantity, an ISO
+date). Display text is only formatted when a view asks for a cell, and is
+then cached, so a table of 100K jobs costs eight small lists rather than
+800K QStandardItem objects.
+
+Sorting is done by the model on the stored values (one Python sort per
+click) instead of by QSortFilterProxyModel, which would call data() twice
+per comparison. Pages still put a JobSortFilterProxyModel in front of the
+model; it forwards sorting to the model and filters rows with a predicate
+on the job dict.
+
+The model also keeps dict indexes on ticket, UPC, PO# and job folder, so
+duplicate checks and "which row shows this job" do not scan the table, and
+caches a fingerprint per row (see fingerprints()) so a page can tell a
+background refresh what it shows without serializing every job again.
+"""
+
+from datetime import datetime
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QTimer
+
+
+# Full job dict of a row, on any column (the old models kept it on column 0)
+JOB_DATA_ROLE = Qt.ItemDataRole.UserRole
+# Stored value of a cell, what the model sorts on
+SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def job_field(*keys):
+    """
+    Column value reader for a job field.
+
+    Args:
+        *keys: Field names to try in order, e.g. "Ticket#", "Job Ticket#"
+            for jobs saved with the old field name
+
+    Returns:
+        function: job_data, tag -> str
+    """
+    def read(job_data, tag=None):
+        for key in keys:
+            if key in job_data:
+                value = job_data[key]
+                return "" if value is None else str(value)
+        return ""
+    return read
+
+
+def ticket_of(job_data):
+    return str(job_data.get("Ticket#", job_data.get("Job Ticket#", "")) or "").strip()
+
+
+def format_quantity(quantity):
+    """Add thousands separators to a whole number, leave anything else as it is."""
+    digits = quantity.replace(",", "")
+    if digits.isdigit():
+        return f"{int(digits):,}"
+    return quantity
+
+
+def quantity_sort_key(quantity):
+    """Sort quantities by number; anything that is not a number sorts first."""
+    digits = quantity.replace(",", "")
+    return int(digits) if digits.isdigit() else -1
+
+
+def format_iso_date(date_string):
+    """Convert a yyyy-mm-dd date (or timestamp) to mm/dd/yyyy; other text is returned as is."""
+    if len(date_string) >= 10 and date_string[4] == '-' and date_string[7] == '-':
+        try:
+            return datetime.strptime(date_string[:10], '%Y-%m-%d').strftime('%m/%d/%Y')
+        except ValueError:
+            pass
+    return date_string
+
+
+class JobColumn:
+    """One table column: its header, how to read its value from a job and how to show it."""
+
+    def __init__(self, header, value, display=None, sort_key=None):
+        """
+        Args:
+            header (str): Header text
+            value (callable): job_data, tag -> stored value (a str)
+            display (callable): stored value -> display text; defaults to
+                the value itself
+            sort_key (callable): stored value -> sort key; defaults to the
+                value itself
+        """
+        self.header = header
+        self.value = value
+        self.display = display
+        self.sort_key = sort_key
+
+
+class JobTableModel(QAbstractTableModel):
+    """Read-only table of job dicts, stored by column."""
+
+    def __init__(self, columns, parent=None):
+        """
+        Args:
+            columns (list): JobColumn per table column
+        """
+        super().__init__(parent)
+        self._columns = list(columns)
+        self.headers = [column.header for column in self._columns]
+        self._jobs = []
+        self._tags = []
+        self._values = [[] for _ in self._columns]
+        self._display = [[] for _ in self._columns]   # formatted text, None until shown
+        self._sort_column = -1
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._resort_pending = False
+        self._rows = None   # id(job) -> row, rebuilt after rows moved
+        self._by_ticket = {}
+        self._by_upc = {}
+        self._by_po = {}
+        self._by_folder = {}
+        self._index_keys = []   # keys each row was indexed under
+        self._fingerprints = []   # (key, fingerprint) per row, None until asked for
+        self._fingerprint_funcs = None
+        self._fingerprint_snapshot = None
+
+    # --- Qt model interface ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._jobs)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            if 0 <= section < len(self.headers):
+                return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            text = self._display[col][row]
+            if text is None:
+                column = self._columns[col]
+                value = self._values[col][row]
+                text = column.display(value) if column.display else value
+                self._display[col][row] = text
+            return text
+        if role == JOB_DATA_ROLE:
+            return self._jobs[row]
+        if role == SORT_ROLE:
+            column = self._columns[col]
+            value = self._values[col][row]
+            return column.sort_key(value) if column.sort_key else value
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort the rows by a column's stored values, keeping selections on their jobs."""
+        self._sort_column = column
+        self._sort_order = order
+        if not 0 <= column < len(self._columns) or len(self._jobs) < 2:
+            return
+
+        values = self._values[column]
+        sort_key = self._columns[column].sort_key
+        keys = [sort_key(value) for value in values] if sort_key else values
+        order_rows = sorted(range(len(keys)), key=keys.__getitem__,
+                            reverse=order == Qt.SortOrder.DescendingOrder)
+        if all(new == old for new, old in enumerate(order_rows)):
+            return
+
+        self.layoutAboutToBeChanged.emit()
+        new_rows = [0] * len(order_rows)
+        for new, old in enumerate(order_rows):
+            new_rows[old] = new
+
+        self._jobs = [self._jobs[old] for old in order_rows]
+        self._tags = [self._tags[old] for old in order_rows]
+        self._index_keys = [self._index_keys[old] for old in order_rows]
+        self._fingerprints = [self._fingerprints[old] for old in order_rows]
+        self._values = [[column_values[old] for old in order_rows] for column_values in self._values]
+        self._display = [[display[old] for old in order_rows] for display in self._display]
+        self._rows = None
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_rows[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def _resort(self):
+        self._resort_pending = False
+        if self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def _schedule_resort(self):
+        # Rows arriving one by one (search results, refreshes) are sorted in
+        # once control returns to the event loop, not after every row
+        if self._sort_column >= 0 and not self._resort_pending:
+            self._resort_pending = True
+            QTimer.singleShot(0, self._resort)
+
+    # --- Indexes ---
+
+    def _add_to_indexes(self, job_data):
+        keys = (ticket_of(job_data),
+                str(job_data.get("UPC Number", "") or "").strip(),
+                str(job_data.get("PO#", "") or "").strip(),
+                job_data.get("job_folder_path") or "")
+        for index, key in zip((self._by_ticket, self._by_upc, self._by_po, self._by_folder), keys):
+            if key:
+                index.setdefault(key, []).append(job_data)
+        return keys
+
+    def _remove_from_indexes(self, job_data, keys):
+        for index, key in zip((self._by_ticket, self._by_upc, self._by_po, self._by_folder), keys):
+            jobs = index.get(key)
+            if jobs is None:
+                continue
+            jobs[:] = [job for job in jobs if job is not job_data]
+            if not jobs:
+                del index[key]
+
+    def _clear_indexes(self):
+        self._by_ticket = {}
+        self._by_upc = {}
+        self._by_po = {}
+        self._by_folder = {}
+        self._rows = None
+
+    def find_ticket(self, ticket):
+        """First job with this ticket number, or None."""
+        jobs = self._by_ticket.get(str(ticket).strip())
+        return jobs[0] if jobs else None
+
+    def find_upc(self, upc):
+        """First job with this UPC, or None."""
+        jobs = self._by_upc.get(str(upc).strip())
+        return jobs[0] if jobs else None
+
+    def find_po(self, po_number):
+        """All jobs with this PO# (several tickets may share one)."""
+        return list(self._by_po.get(str(po_number).strip(), []))
+
+    def row_of_job(self, job_data):
+        """Row showing this job dict (the same object, not an equal one), or None."""
+        if self._rows is None:
+            self._rows = {id(job): row for row, job in enumerate(self._jobs)}
+        return self._rows.get(id(job_data))
+
+    def row_for_ticket(self, ticket):
+        job_data = self.find_ticket(ticket)
+        return None if job_data is None else self.row_of_job(job_data)
+
+    def row_for_folder(self, job_folder_path):
+        """Row of the job saved in job_folder_path, or None."""
+        jobs = self._by_folder.get(job_folder_path or "")
+        return self.row_of_job(jobs[0]) if jobs else None
+
+    def fingerprints(self, key, fingerprint):
+        """
+        Snapshot {key(job): fingerprint(job)} of the rows; the first row
+        wins when two jobs share a key.
+
+        Each row's pair is computed once and kept until its job is
+        replaced, and the snapshot itself until a row changes, so asking
+        again for an unchanged table costs nothing. The dict belongs to the
+        model; do not change it.
+
+        Args:
+            key (callable): job_data -> key of the job's row
+            fingerprint (callable): job_data -> value that changes with the job
+        """
+        if self._fingerprint_funcs != (key, fingerprint):
+            self._fingerprint_funcs = (key, fingerprint)
+            self._fingerprints = [None] * len(self._jobs)
+            self._fingerprint_snapshot = None
+        if self._fingerprint_snapshot is None:
+            snapshot = {}
+            for row, job_data in enumerate(self._jobs):
+                pair = self._fingerprints[row]
+                if pair is None:
+                    pair = self._fingerprints[row] = (key(job_data), fingerprint(job_data))
+                snapshot.setdefault(pair[0], pair[1])
+            self._fingerprint_snapshot = snapshot
+        return self._fingerprint_snapshot
+
+    # --- Rows ---
+
+    def _row_values(self, job_data, tag):
+        return [column.value(job_data, tag) for column in self._columns]
+
+    def jobs(self):
+        """Jobs in row order. The list belongs to the model; do not change it."""
+        return self._jobs
+
+    def job_at(self, row):
+        """Job dict of a row (a source row, map proxy rows first), or None."""
+        if 0 <= row < len(self._jobs):
+            return self._jobs[row]
+        return None
+
+    def tag_at(self, row):
+        """Tag passed in with the row's job, or None."""
+        if 0 <= row < len(self._tags):
+            return self._tags[row]
+        return None
+
+    def set_jobs(self, jobs, tags=None):
+        """Replace all rows."""
+        jobs = list(jobs)
+        tags = list(tags) if tags is not None else [None] * len(jobs)
+        self.beginResetModel()
+        self._jobs = jobs
+        self._tags = tags
+        self._values = [[] for _ in self._columns]
+        for job_data, tag in zip(jobs, tags):
+            for values, value in zip(self._values, self._row_values(job_data, tag)):
+                values.append(value)
+        self._display = [[None] * len(jobs) for _ in self._columns]
+        self._clear_indexes()
+        self._index_keys = [self._add_to_indexes(job_data) for job_data in jobs]
+        self._fingerprints = [None] * len(jobs)
+        self._fingerprint_snapshot = None
+        self.endResetModel()
+        self._resort()
+
+    def append_jobs(self, jobs, tags=None):
+        """Add rows at the end; a sorted table re-sorts them into place shortly after."""
+        jobs = list(jobs)
+        if not jobs:
+            return
+        tags = list(tags) if tags is not None else [None] * len(jobs)
+        first = len(self._jobs)
+        self.beginInsertRows(QModelIndex(), first, first + len(jobs) - 1)
+        for job_data, tag in zip(jobs, tags):
+            self._jobs.append(job_data)
+            self._tags.append(tag)
+            for values, display, value in zip(self._values, self._display, self._row_values(job_data, tag)):
+                values.append(value)
+                display.append(None)
+            self._index_keys.append(self._add_to_indexes(job_data))
+            self._fingerprints.append(None)
+        self._fingerprint_snapshot = None
+        if self._rows is not None:
+            for row in range(first, len(self._jobs)):
+                self._rows[id(self._jobs[row])] = row
+        self.endInsertRows()
+        self._schedule_resort()
+
+    def append_job(self, job_data, tag=None):
+        self.append_jobs([job_data], [tag])
+
+    def update_job(self, row, job_data, tag=None):
+        """Show job_data in a row; only the cells whose value changed are repainted."""
+        if not 0 <= row < len(self._jobs):
+            return
+        old_job = self._jobs[row]
+        self._remove_from_indexes(old_job, self._index_keys[row])
+        if self._rows is not None:
+            self._rows.pop(id(old_job), None)
+            self._rows[id(job_data)] = row
+        self._jobs[row] = job_data
+        if tag is not None:
+            self._tags[row] = tag
+        self._index_keys[row] = self._add_to_indexes(job_data)
+        self._fingerprints[row] = None
+        self._fingerprint_snapshot = None
+
+        changed = []
+        for col, value in enumerate(self._row_values(job_data, self._tags[row])):
+            if self._values[col][row] != value:
+                self._values[col][row] = value
+                self._display[col][row] = None
+                changed.append(col)
+        if changed:
+            self.dataChanged.emit(self.index(row, min(changed)), self.index(row, max(changed)),
+                                  [Qt.ItemDataRole.DisplayRole])
+            if self._sort_column in changed:
+                self._schedule_resort()
+
+    def remove_rows(self, rows):
+        """Remove rows by source row number, in any order."""
+        rows = sorted({row for row in rows if 0 <= row < len(self._jobs)}, reverse=True)
+        # One beginRemoveRows per run of consecutive rows, from the bottom up
+        while rows:
+            last = rows.pop(0)
+            first = last
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for row in range(first, last + 1):
+                self._remove_from_indexes(self._jobs[row], self._index_keys[row])
+            del self._jobs[first:last + 1]
+            del self._tags[first:last + 1]
+            del self._index_keys[first:last + 1]
+            del self._fingerprints[first:last + 1]
+            self._fingerprint_snapshot = None
+            for values in self._values:
+                del values[first:last + 1]
+            for display in self._display:
+                del display[first:last + 1]
+            self._rows = None
+            self.endRemoveRows()
+
+    def remove_row(self, row):
+        self.remove_rows([row])
+
+    def remove_job(self, job_data):
+        """Remove the row showing this job dict; returns False if it is not in the table."""
+        row = self.row_of_job(job_data)
+        if row is None:
+            return False
+        self.remove_rows([row])
+        return True
+
+    def clear(self):
+        self.set_jobs([])
+
+
+class JobSortFilterProxyModel(QSortFilterProxyModel):
+    """
+    Proxy in front of a JobTableModel.
+
+    Sorting is handed to the model, which sorts its stored column values in
+    one pass; the proxy keeps the model's row order. Rows can be filtered
+    with a predicate on the job dict.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._row_filter = None
+
+    def set_row_filter(self, row_filter):
+        """
+        Args:
+            row_filter (callable): job_data -> bool, or None to show every row
+        """
+        self._row_filter = row_filter
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._row_filter is None:
+            return True
+        job_data = self.sourceModel().job_at(source_row)
+        return job_data is not None and self._row_filter(job_data)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
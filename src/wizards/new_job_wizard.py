@@ -15,6 +15,8 @@ from src.utils.epc_conversion import (
     populate_customer_dropdown_from_templates, populate_label_sizes_for_customer,
     get_template_path, reverse_epc_to_upc_and_serial
 )
+from src.utils.epc_schemes import DEFAULT_SCHEME, SCHEME_OPTION_FIELDS, list_schemes, get_scheme
+from src.utils.serial_status import get_serial_status_cache
 
 class QuantityLineEdit(QLineEdit):
     """Custom QLineEdit that formats numbers with commas for readability."""
@@ -407,6 +409,9 @@ class EncodingPage(QWizardPage):
         # Add error label at the bottom
         self.layout.addRow("", self.error_label)
         
+        # Serial status is read in the background and pushed here when it changes
+        get_serial_status_cache().status_changed.connect(self.apply_serial_status)
+        
         # Auto-populate serial on initial load
         self.auto_populate_serial()
     
@@ -425,27 +430,24 @@ class EncodingPage(QWizardPage):
             self.auto_populate_serial()
     
     def auto_populate_serial(self):
-        """Auto-populate serial number from centralized source."""
-        try:
-            from src.utils.serial_manager import get_serial_manager
-            import src.config as config
-            
-            serial_manager = get_serial_manager(config.get_serial_numbers_path())
-            
-            # Validate the path first
-            is_valid, message = serial_manager.validate_base_path()
-            if not is_valid:
-                print(f"Warning: Serial numbers path not accessible: {message}")
-                raise Exception(f"Path validation failed: {message}")
-            
-            next_serial = serial_manager.get_next_serial()
-            
-            # Set the serial number but don't show the field
-            self.serial_number.setText(str(next_serial))
-            print(f"Auto-populated serial number: {next_serial}")
-            
-        except Exception as e:
-            print(f"Warning: Could not auto-populate serial from centralized source: {e}")
+        """Auto-populate serial number from the cached centralized serial status."""
+        serial_status_cache = get_serial_status_cache()
+        self.apply_serial_status(serial_status_cache.current_status())
+        serial_status_cache.request_refresh()
+    
+    def apply_serial_status(self, status):
+        """Set the serial number from a serial status update (automatic mode only)."""
+        if self.manual_serial_override.isChecked() or not status.get('ready'):
+            return
+        
+        next_serial = status.get('next_serial')
+        if status.get('is_valid') and next_serial is not None:
+            if self.serial_number.text() != str(next_serial):
+                # Set the serial number but don't show the field
+                self.serial_number.setText(str(next_serial))
+                print(f"Auto-populated serial number: {next_serial}")
+        else:
+            print(f"Warning: Could not auto-populate serial from centralized source: {status.get('message')}")
             print("Using default serial number. Centralized tracking will not be available.")
             # Set a default if centralized system fails
             self.serial_number.setText("1000")
@@ -479,7 +481,7 @@ class EncodingPage(QWizardPage):
             if not self.serial_number.text().strip():
                 self.auto_populate_serial()  # Try to populate again
             if not self.serial_number.text().strip():
-                errors.append("Could not allocate serial number from centralized source")
+                errors.append("Serial number is still being read from the centralized source, please try again in a moment")
         
         if not self.lpr.text().strip():
             errors.append("LPR is required")
@@ -566,6 +568,9 @@ class EPCDatabasePage(QWizardPage):
     def __init__(self, parent=None, base_path=None):
         super().__init__(parent)
         self.base_path = base_path
+        # Scheme option fields of a job loaded with set_data(), kept so they
+        # reach the preview and the saved job
+        self.scheme_option_data = {}
         self.setTitle("Step 3: EPC Database Generation & UPC Validation")
         self.setSubTitle("Configure EPC database generation settings, validate UPC, and preview data.")
 
@@ -626,6 +631,13 @@ class EPCDatabasePage(QWizardPage):
         self.epc_options_group.setEnabled(False)
         epc_layout = QFormLayout(self.epc_options_group)
 
+        # EPC encoding scheme
+        self.epc_scheme = QComboBox()
+        self.epc_scheme.addItems(list_schemes())
+        self.epc_scheme.setCurrentText(DEFAULT_SCHEME)
+        self.epc_scheme.currentTextChanged.connect(lambda _: self.preview_table.setRowCount(0))
+        epc_layout.addRow("EPC Scheme:", self.epc_scheme)
+
         # Quantity per database file
         self.qty_per_db = QLineEdit("1000")
         self.qty_per_db.setPlaceholderText("Number of records per database file")
@@ -720,6 +732,7 @@ class EPCDatabasePage(QWizardPage):
         template_layout.addRow("Serial Info:", self.serial_info_label)
 
         layout.addWidget(self.template_info_group)
+        get_serial_status_cache().status_changed.connect(self.show_serial_status)
 
         # Error label
         self.error_label = QLabel()
@@ -795,6 +808,11 @@ class EPCDatabasePage(QWizardPage):
                 """)
                 return
             
+            scheme, scheme_options = self.scheme_and_options()
+            if scheme.name != DEFAULT_SCHEME or scheme_options:
+                self.test_scheme_reverse_validation(scheme, scheme_options)
+                return
+            
             # Get a few EPCs from the preview table
             test_results = []
             test_count = min(3, self.preview_table.rowCount())  # Test first 3 rows
@@ -846,6 +864,46 @@ class EPCDatabasePage(QWizardPage):
             <p><strong>Error:</strong> {str(e)}</p>
             """)
 
+    def scheme_and_options(self):
+        """The selected EPC scheme and the encoding options of the job."""
+        scheme = get_scheme(self.epc_scheme.currentText())
+        return scheme, scheme.options_from_job_data(self.scheme_option_data)
+
+    def test_scheme_reverse_validation(self, scheme, scheme_options=None):
+        """Decode the preview EPCs with a non-default scheme or options and compare key and serial."""
+        test_count = min(3, self.preview_table.rowCount())
+        rows = [
+            (self.preview_table.item(row, 0).text(),
+             int(self.preview_table.item(row, 1).text()),
+             self.preview_table.item(row, 2).text())
+            for row in range(test_count)
+        ]
+        decoded = scheme.decode_array([epc_hex for _, _, epc_hex in rows])
+        
+        html_content = []
+        results = []
+        for row, (upc, serial, epc_hex) in enumerate(rows):
+            expected_key = scheme.reference_key(upc, **(scheme_options or {}))
+            recovered_key = decoded['key'][row]
+            recovered_serial = int(decoded['serial'][row])
+            success = bool(decoded['valid'][row]) and recovered_key == expected_key and recovered_serial == serial
+            results.append(success)
+            status = "✅" if success else "❌"
+            color = "green" if success else "red"
+            html_content.append(f"""
+            <p style='color: {color};'><strong>Row {row + 1}:</strong> {status}</p>
+            <p style='margin-left: 20px; font-size: 11px;'>
+            {scheme.name} key: {expected_key} → {recovered_key or 'N/A'}<br/>
+            Serial: {serial} → {recovered_serial if recovered_serial >= 0 else 'N/A'}
+            </p>
+            """)
+        
+        if all(results):
+            header = "<p style='color: green; font-weight: bold;'>✅ All reverse validations passed!</p>"
+        else:
+            header = "<p style='color: red; font-weight: bold;'>❌ Some reverse validations failed!</p>"
+        self.reverse_validation_display.setHtml(header + "".join(html_content))
+
     def toggle_epc_options(self, state):
         """Enable/disable EPC options based on checkbox state."""
         enabled = state == Qt.CheckState.Checked.value
@@ -890,6 +948,7 @@ class EPCDatabasePage(QWizardPage):
             # Update template status
             if customer and label_size:
                 from src.utils.epc_conversion import get_template_path_with_inlay, list_available_templates
+                from src.utils.template_index import get_template_index
                 from src.utils.template_mapping import get_template_manager
                 
                 # First, check template mappings
@@ -925,15 +984,8 @@ class EPCDatabasePage(QWizardPage):
                             # Try to find label size directory with case-insensitive matching
                             template_base_path = config.get_template_base_path()
                             found_label_size = None
-                            if template_base_path and os.path.exists(template_base_path):
-                                try:
-                                    for item in os.listdir(template_base_path):
-                                        if os.path.isdir(os.path.join(template_base_path, item)):
-                                            if item.lower() == label_size.lower():
-                                                found_label_size = item
-                                                break
-                                except Exception:
-                                    pass
+                            if template_base_path:
+                                found_label_size = get_template_index(template_base_path).find_label_size_folder(label_size)
                             
                             if found_label_size and found_label_size in available_templates:
                                 template_list = available_templates[found_label_size]
@@ -957,18 +1009,25 @@ class EPCDatabasePage(QWizardPage):
             self.template_status_label.setStyleSheet("color: red;")
     
     def update_serial_info(self):
-        """Update serial number information from centralized serial manager."""
+        """Show the cached serial status and refresh it in the background."""
+        serial_status_cache = get_serial_status_cache()
+        self.show_serial_status(serial_status_cache.current_status())
+        serial_status_cache.request_refresh()
+
+    def show_serial_status(self, status):
+        """Update the serial number information from a serial status update."""
         try:
-            from src.utils.serial_manager import get_serial_manager
-            
-            # Initialize serial manager with configured path
-            serial_manager = get_serial_manager(config.get_serial_numbers_path())
-            
-            # Validate access to serial numbers path
-            is_valid, message = serial_manager.validate_base_path()
-            
-            if is_valid:
-                next_serial = serial_manager.get_next_serial()
+            if not status.get('ready'):
+                self.serial_info_label.setText(
+                    f"📊 Serial Numbers (Centralized Management)\n"
+                    f"Checking serial numbers path..."
+                )
+                self.serial_info_label.setStyleSheet("")
+                return
+
+            if status.get('is_valid') and status.get('next_serial') is not None:
+                next_serial = status['next_serial']
+                base_path = status.get('base_path')
                 
                 # Calculate range for the current job
                 try:
@@ -987,19 +1046,14 @@ class EPCDatabasePage(QWizardPage):
                         
                         end_serial = next_serial + total_qty - 1
                         
-                        # Update the starting serial number field to the next available
-                        self.serial_number.setText(str(next_serial))
-                        
-                        # Show serial range information
-                        daily_summary = serial_manager.get_daily_usage_summary()
-                        total_allocated_today = daily_summary.get('total_allocated', 0)
+                        total_allocated_today = status.get('total_allocated', 0)
                         
                         self.serial_info_label.setText(
                             f"📊 Serial Numbers (Centralized Management)\n"
                             f"Next Available: {next_serial:,}\n"
                             f"Range for this job: {next_serial:,} - {end_serial:,}\n"
                             f"Total allocated today: {total_allocated_today:,}\n"
-                            f"Path: {serial_manager.base_path}"
+                            f"Path: {base_path}"
                         )
                         self.serial_info_label.setStyleSheet("color: green;")
                     else:
@@ -1007,7 +1061,7 @@ class EPCDatabasePage(QWizardPage):
                             f"📊 Serial Numbers (Centralized Management)\n"
                             f"Next Available: {next_serial:,}\n"
                             f"Enter quantity on previous page to see range\n"
-                            f"Path: {serial_manager.base_path}"
+                            f"Path: {base_path}"
                         )
                         self.serial_info_label.setStyleSheet("color: orange;")
                         
@@ -1016,13 +1070,13 @@ class EPCDatabasePage(QWizardPage):
                     self.serial_info_label.setText(
                         f"📊 Serial Numbers (Centralized Management)\n"
                         f"Next Available: {next_serial:,}\n"
-                        f"Path: {serial_manager.base_path}"
+                        f"Path: {base_path}"
                     )
                     self.serial_info_label.setStyleSheet("color: green;")
             else:
                 self.serial_info_label.setText(
                     f"⚠️ Centralized Serial Management Unavailable\n"
-                    f"{message}\n"
+                    f"{status.get('message', '')}\n"
                     f"Using fallback mode - jobs will use default serials"
                 )
                 self.serial_info_label.setStyleSheet("color: orange;")
@@ -1063,7 +1117,9 @@ class EPCDatabasePage(QWizardPage):
             start_serial = int(serial_text)
             
             # Generate preview data
-            preview_df = generate_epc_preview_data(upc, start_serial, 10)
+            scheme, scheme_options = self.scheme_and_options()
+            preview_df = generate_epc_preview_data(upc, start_serial, 10, scheme=scheme.name,
+                                                   scheme_options=scheme_options)
             
             # Populate table
             self.preview_table.setRowCount(len(preview_df))
@@ -1126,9 +1182,11 @@ class EPCDatabasePage(QWizardPage):
         data = {
             "Enable EPC Generation": self.enable_epc_generation.isChecked(),
             "Qty per DB": self.qty_per_db.text().strip(),
+            "EPC Scheme": self.epc_scheme.currentText(),
             "Include 2% Buffer": self.include_2_percent.isChecked(),
             "Include 7% Buffer": self.include_7_percent.isChecked()
         }
+        data.update(self.scheme_option_data)
         
         if self.enable_epc_generation.isChecked():
             # Calculate total quantity for storage
@@ -1153,6 +1211,9 @@ class EPCDatabasePage(QWizardPage):
         """Set EPC database configuration data."""
         self.enable_epc_generation.setChecked(data.get("Enable EPC Generation", False))
         self.qty_per_db.setText(data.get("Qty per DB", "1000"))
+        self.epc_scheme.setCurrentText(data.get("EPC Scheme") or DEFAULT_SCHEME)
+        self.scheme_option_data = {field: data[field] for field in SCHEME_OPTION_FIELDS
+                                   if data.get(field) not in (None, '')}
         self.include_2_percent.setChecked(data.get("Include 2% Buffer", False))
         self.include_7_percent.setChecked(data.get("Include 7% Buffer", False))
         